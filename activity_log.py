@@ -0,0 +1,355 @@
+"""
+Per-tenant activity log — the Maya / ops feed behind /api/activity-feed.
+
+Each tenant has its own ring (capacity configurable per tenant), so a busy tenant
+can no longer push everyone else's events out.  Entries carry a monotonically
+increasing ``seq``; cursor reads (?cursor=<seq> or ?since=<ts ms>) binary-search
+the ring instead of scanning it.  With a store attached, appends are written to
+the ``activity_log`` table in batches by a background flusher and the rings are
+reloaded from it on start, so the feed survives restarts.
+No Flask imports here.
+"""
+from __future__ import annotations
+
+import json
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    from sqlalchemy import text as _sql_text
+except ImportError:  # pragma: no cover - the app always has SQLAlchemy
+    _sql_text = None
+
+
+class _Ring:
+    """Fixed-capacity circular buffer of (seq, sort_ts, entry) with O(log n) cursor lookups."""
+
+    __slots__ = ("capacity", "_items", "_start", "_len")
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = max(1, int(capacity))
+        self._items: List[Optional[Tuple[int, float, Dict[str, Any]]]] = [None] * self.capacity
+        self._start = 0
+        self._len = 0
+
+    def __len__(self) -> int:
+        return self._len
+
+    def _at(self, i: int) -> Tuple[int, float, Dict[str, Any]]:
+        return self._items[(self._start + i) % self.capacity]  # type: ignore[return-value]
+
+    def append(self, item: Tuple[int, float, Dict[str, Any]]) -> None:
+        if self._len < self.capacity:
+            self._items[(self._start + self._len) % self.capacity] = item
+            self._len += 1
+        else:
+            self._items[self._start] = item
+            self._start = (self._start + 1) % self.capacity
+
+    def last(self) -> Optional[Tuple[int, float, Dict[str, Any]]]:
+        return self._at(self._len - 1) if self._len else None
+
+    def first(self) -> Optional[Tuple[int, float, Dict[str, Any]]]:
+        return self._at(0) if self._len else None
+
+    def index_after(self, value: float, field: int) -> int:
+        """First logical index whose key (0 = seq, 1 = sort_ts) is > value."""
+        lo, hi = 0, self._len
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._at(mid)[field] <= value:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def slice(self, start: int) -> List[Dict[str, Any]]:
+        return [self._at(i)[2] for i in range(start, self._len)]
+
+    def resized(self, capacity: int) -> "_Ring":
+        ring = _Ring(capacity)
+        for i in range(max(0, self._len - ring.capacity), self._len):
+            ring.append(self._at(i))
+        return ring
+
+
+class ActivityLog:
+    """
+    add() is the only writer (app.py calls it from the shared-state "activity"
+    channel so every worker assigns the same seq).  Readers: since(), recent(),
+    last_seq(); iterating the log yields every tenant's entries in seq order.
+    """
+
+    def __init__(self, default_capacity: int = 200, capacities: Optional[Dict[str, int]] = None) -> None:
+        self.default_capacity = max(1, int(default_capacity))
+        self._capacities: Dict[str, int] = {k: max(1, int(v)) for k, v in (capacities or {}).items()}
+        self._lock = threading.Lock()
+        self._rings: Dict[str, _Ring] = {}
+        self._last_seq = 0
+        self._store: Optional["_SqlStore"] = None
+        self._stats = {"appended": 0, "restored": 0}
+
+    # ── capacity ──────────────────────────────────────────────────────────────
+    def capacity(self, tenant_id: str) -> int:
+        return self._capacities.get(tenant_id, self.default_capacity)
+
+    def set_capacity(self, tenant_id: str, capacity: int) -> None:
+        with self._lock:
+            self._capacities[tenant_id] = max(1, int(capacity))
+            ring = self._rings.get(tenant_id)
+            if ring is not None:
+                self._rings[tenant_id] = ring.resized(self._capacities[tenant_id])
+
+    def _ring(self, tenant_id: str) -> _Ring:
+        ring = self._rings.get(tenant_id)
+        if ring is None:
+            ring = _Ring(self.capacity(tenant_id))
+            self._rings[tenant_id] = ring
+        return ring
+
+    # ── writes ────────────────────────────────────────────────────────────────
+    def add(self, tenant_id: str, entry: Dict[str, Any], seq: Optional[int] = None, persist: bool = True) -> Dict[str, Any]:
+        """
+        Append one entry; stamps ``seq`` and ``tenant_id`` on it.  A caller-supplied seq
+        (the shared message sequence) is kept unless it would go backwards — e.g. the
+        in-process sequence after a restart restored higher ids from the store.
+        """
+        entry = dict(entry)
+        entry.setdefault("ts", int(time.time() * 1000))
+        entry["tenant_id"] = tenant_id
+        with self._lock:
+            s = self._last_seq + 1 if seq is None else max(int(seq), self._last_seq + 1)
+            self._last_seq = s
+            entry["seq"] = s
+            ring = self._ring(tenant_id)
+            prev = ring.last()
+            sort_ts = float(entry.get("ts") or 0)
+            if prev is not None and sort_ts < prev[1]:
+                sort_ts = prev[1]  # keep the ts index monotonic when the wall clock steps back
+            ring.append((s, sort_ts, entry))
+            self._stats["appended"] += 1
+            store = self._store
+        if store is not None and persist:
+            store.enqueue(tenant_id, entry)
+        return entry
+
+    # ── reads ─────────────────────────────────────────────────────────────────
+    def since(
+        self,
+        tenant_id: str,
+        cursor: Optional[int] = None,
+        since_ts: Optional[float] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Entries after ``cursor`` (seq) or newer than ``since_ts`` (ms), oldest first."""
+        with self._lock:
+            ring = self._rings.get(tenant_id)
+            if ring is None:
+                return []
+            if cursor is not None:
+                start = ring.index_after(cursor, 0)
+            elif since_ts is not None:
+                start = ring.index_after(since_ts, 1)
+            else:
+                start = 0
+            if limit is not None:
+                start = max(start, len(ring) - int(limit))
+            return ring.slice(start)
+
+    def recent(self, tenant_id: str, n: int) -> List[Dict[str, Any]]:
+        return self.since(tenant_id, limit=max(0, int(n)))
+
+    def last_seq(self, tenant_id: Optional[str] = None) -> int:
+        with self._lock:
+            if tenant_id is None:
+                return self._last_seq
+            ring = self._rings.get(tenant_id)
+            last = ring.last() if ring is not None else None
+            return last[0] if last else 0
+
+    def floor_seq(self, tenant_id: str) -> int:
+        """Oldest seq still held for the tenant (0 when empty)."""
+        with self._lock:
+            ring = self._rings.get(tenant_id)
+            first = ring.first() if ring is not None else None
+            return first[0] if first else 0
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        with self._lock:
+            items = [it for ring in self._rings.values() for it in (ring._at(i) for i in range(len(ring)))]
+        items.sort(key=lambda it: it[0])
+        return iter([it[2] for it in items])
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out: Dict[str, Any] = dict(self._stats)
+            out.update({
+                "tenants": len(self._rings),
+                "entries": sum(len(r) for r in self._rings.values()),
+                "last_seq": self._last_seq,
+                "default_capacity": self.default_capacity,
+                "capacities": dict(self._capacities),
+            })
+            store = self._store
+        if store is not None:
+            out["store"] = store.stats()
+        return out
+
+    # ── persistence ───────────────────────────────────────────────────────────
+    def attach_store(self, engine, flush_interval: float = 2.0, batch_size: int = 100) -> None:
+        """Persist appends to ``activity_log`` and restore each tenant's ring from it."""
+        store = _SqlStore(engine, flush_interval=flush_interval, batch_size=batch_size)
+        store.ensure_schema()
+        restored = store.load(self.capacity, self.default_capacity)
+        with self._lock:
+            for tenant_id, rows in restored.items():
+                ring = self._ring(tenant_id)
+                merged = sorted(
+                    [(e["seq"], float(e.get("ts") or 0), e) for e in rows]
+                    + [ring._at(i) for i in range(len(ring))],
+                    key=lambda it: it[0],
+                )
+                fresh = _Ring(ring.capacity)
+                seen = set()
+                prev_ts = 0.0
+                for s, ts, e in merged:
+                    if s in seen:
+                        continue
+                    seen.add(s)
+                    prev_ts = max(prev_ts, ts)
+                    fresh.append((s, prev_ts, e))
+                self._rings[tenant_id] = fresh
+                if merged:
+                    self._last_seq = max(self._last_seq, merged[-1][0])
+                self._stats["restored"] += len(rows)
+            self._store = store
+        store.start(self.floor_seq)
+
+    def flush(self) -> int:
+        store = self._store
+        return store.flush() if store is not None else 0
+
+
+class _SqlStore:
+    """Batched writer for the activity_log table (one flusher thread per process)."""
+
+    def __init__(self, engine, flush_interval: float, batch_size: int) -> None:
+        self.engine = engine
+        self.flush_interval = max(0.2, float(flush_interval))
+        self.batch_size = max(1, int(batch_size))
+        self._lock = threading.Lock()
+        self._pending: List[Tuple[str, Dict[str, Any]]] = []
+        self._wake = threading.Event()
+        self._started = False
+        self._floor_of = None
+        self._stats = {"written": 0, "batches": 0, "errors": 0, "pruned": 0}
+
+    def ensure_schema(self) -> None:
+        is_pg = self.engine.dialect.name == "postgresql"
+        ts_type = "DOUBLE PRECISION" if is_pg else "REAL"
+        with self.engine.begin() as conn:
+            conn.execute(_sql_text(
+                "CREATE TABLE IF NOT EXISTS activity_log ("
+                "tenant_id VARCHAR(64) NOT NULL, seq BIGINT NOT NULL, "
+                f"ts {ts_type}, payload TEXT NOT NULL, PRIMARY KEY (tenant_id, seq))"
+            ))
+
+    def load(self, capacity_of, default_capacity: int) -> Dict[str, List[Dict[str, Any]]]:
+        out: Dict[str, List[Dict[str, Any]]] = {}
+        with self.engine.connect() as conn:
+            tenants = [r[0] for r in conn.execute(_sql_text("SELECT DISTINCT tenant_id FROM activity_log"))]
+            for tenant_id in tenants:
+                rows = conn.execute(
+                    _sql_text(
+                        "SELECT seq, payload FROM activity_log WHERE tenant_id = :t "
+                        "ORDER BY seq DESC LIMIT :n"
+                    ),
+                    {"t": tenant_id, "n": capacity_of(tenant_id) or default_capacity},
+                ).fetchall()
+                entries = []
+                for seq, payload in reversed(rows):
+                    try:
+                        entry = json.loads(payload)
+                    except (TypeError, ValueError):
+                        continue
+                    entry["seq"] = int(seq)
+                    entry["tenant_id"] = tenant_id
+                    entries.append(entry)
+                out[tenant_id] = entries
+        return out
+
+    def enqueue(self, tenant_id: str, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self._pending.append((tenant_id, entry))
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self._wake.set()
+
+    def start(self, floor_of) -> None:
+        self._floor_of = floor_of
+        if self._started:
+            return
+        self._started = True
+        threading.Thread(target=self._loop, daemon=True, name="ActivityLogFlusher").start()
+
+    def _loop(self) -> None:
+        last_prune = time.time()
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+            if time.time() - last_prune >= 300:
+                last_prune = time.time()
+                self.prune()
+
+    def flush(self) -> int:
+        with self._lock:
+            batch, self._pending = self._pending, []
+        if not batch:
+            return 0
+        rows = [
+            {"t": tid, "s": int(e["seq"]), "ts": float(e.get("ts") or 0), "p": json.dumps(e, default=str, ensure_ascii=False)}
+            for tid, e in batch
+        ]
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(
+                    _sql_text("INSERT INTO activity_log (tenant_id, seq, ts, payload) VALUES (:t, :s, :ts, :p)"),
+                    rows,
+                )
+        except Exception as e:
+            with self._lock:
+                self._stats["errors"] += 1
+                # Keep the batch for the next tick unless the backlog is getting silly.
+                if len(self._pending) < self.batch_size * 50:
+                    self._pending[:0] = batch
+            print(f"[activity_log] flush of {len(rows)} rows failed: {e!r}", flush=True)
+            return 0
+        with self._lock:
+            self._stats["written"] += len(rows)
+            self._stats["batches"] += 1
+        return len(rows)
+
+    def prune(self) -> None:
+        """Drop persisted rows older than what each tenant's ring still holds."""
+        try:
+            with self.engine.begin() as conn:
+                tenants = [r[0] for r in conn.execute(_sql_text("SELECT DISTINCT tenant_id FROM activity_log"))]
+                for tenant_id in tenants:
+                    floor = self._floor_of(tenant_id) if self._floor_of else 0
+                    if floor:
+                        res = conn.execute(
+                            _sql_text("DELETE FROM activity_log WHERE tenant_id = :t AND seq < :s"),
+                            {"t": tenant_id, "s": floor},
+                        )
+                        with self._lock:
+                            self._stats["pruned"] += max(0, res.rowcount or 0)
+        except Exception as e:
+            print(f"[activity_log] prune failed: {e!r}", flush=True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out: Dict[str, Any] = dict(self._stats)
+            out["pending"] = len(self._pending)
+        return out
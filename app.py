@@ -56,7 +56,7 @@ import base64
 import hmac
 import hashlib
 import re
-from collections import deque
+from collections import OrderedDict, deque
 from urllib.request import urlopen, Request
 from urllib.parse import quote_plus, urlparse
 from functools import wraps
@@ -64,10 +64,59 @@ from datetime import datetime, timezone, timedelta
 import math
 import logging
 import copy
+from tenant_cache import get_cache as _get_tenant_cache, all_cache_stats as _all_tenant_cache_stats
+import domain_events as _domain_events
+import shared_state as _shared_state
+import sse_hub as _sse_hub
+import activity_log as _activity_log
+import room_state as _room_state
+import stage_runner as _stage_runner
+import prompt_budget as _prompt_budget
+import model_health as _model_health
+import llm_gate as _llm_gate
+
+# ── Activity log — SIMULATE / live-ops / field events shown as Maya chat lines ──
+# One ring per tenant (ACTIVITY_LOG_SIZE entries, per-tenant overrides in
+# ACTIVITY_LOG_TENANT_SIZES="tenant:500,other:100"); entries carry a seq that
+# /api/activity-feed?cursor= and the realtime channel resume from.  Writes go
+# through the shared-state "activity" channel so every worker assigns the same
+# seq, and the publishing worker persists them in batches (see _init_activity_log_store).
+ACTIVITY_LOG_SIZE = max(10, int(os.getenv("ACTIVITY_LOG_SIZE", "200") or 200))
+
+
+def _parse_activity_log_tenant_sizes(raw):
+    sizes = {}
+    for part in (raw or "").split(","):
+        tid, _, n = part.strip().rpartition(":")
+        try:
+            if tid and int(n) > 0:
+                sizes[tid.strip()] = int(n)
+        except ValueError:
+            print(f"[activity_log] ignoring ACTIVITY_LOG_TENANT_SIZES item {part!r}", flush=True)
+    return sizes
 
-# ── Shared activity log — captures every SIMULATE event ──────────────────────
-# Frontend polls /api/activity-feed and shows these as Maya chat messages.
-_ACTIVITY_LOG: deque = deque(maxlen=80)
+
+_ACTIVITY_LOG = _activity_log.ActivityLog(
+    ACTIVITY_LOG_SIZE, _parse_activity_log_tenant_sizes(os.getenv("ACTIVITY_LOG_TENANT_SIZES"))
+)
+
+
+def _log_activity(entry, tenant_id=None):
+    """Append to the tenant's activity ring (entries without a tenant belong to the default tenant)."""
+    tid = tenant_id or entry.get("tenant_id") or DEFAULT_TENANT_ID
+    _shared_state.publish("activity", {"tenant_id": tid, "entry": entry})
+
+
+def _deliver_activity_entry(msg):
+    body = msg.get("payload") or {}
+    tid = body.get("tenant_id") or DEFAULT_TENANT_ID
+    _ACTIVITY_LOG.add(
+        tid, body.get("entry") or {}, seq=msg.get("seq"), persist=msg.get("origin") == _shared_state.ORIGIN
+    )
+    _REALTIME_NOTIFIER.notify(tid)
+
+
+_shared_state.subscribe("activity", _deliver_activity_entry)
 
 
 def _log_staff_field_status(tenant_id, staff_id, staff_name, task_id, room_label, action_status):
@@ -82,7 +131,7 @@ def _log_staff_field_status(tenant_id, staff_id, staff_name, task_id, room_label
     room_s = (room_label or "—").strip()
     at_iso = now_iso()
     text = f"שטח · {name_s} · חדר {room_s} · {label}"
-    _ACTIVITY_LOG.append({
+    _log_activity({
         "id": str(uuid.uuid4()),
         "ts": int(time.time() * 1000),
         "type": "staff_field_status",
@@ -93,22 +142,70 @@ def _log_staff_field_status(tenant_id, staff_id, staff_name, task_id, room_label
         "status": action_status,
         "at_iso": at_iso,
         "room": room_s,
-    })
+    }, tenant_id)
 
-# In-memory cache for GET /api/rooms/status-grid — instant repeat loads (frontend polls ~20s)
-_STATUS_GRID_CACHE = {"ts": 0.0, "key": None, "payload": None}
+# In-memory cache for GET /api/rooms/status-grid — instant repeat loads (frontend polls ~20s).
+# Keyed per tenant by (user_id, data etag) so several tenants polling at once don't evict each other.
 STATUS_GRID_CACHE_TTL_SEC = 120
+_STATUS_GRID_CACHE = _get_tenant_cache(
+    "status_grid", STATUS_GRID_CACHE_TTL_SEC, max_entries=int(os.getenv("STATUS_GRID_CACHE_MAX", "256"))
+)
+# Normalised manual_rooms catalogue per (tenant, owner scope) behind list_manual_rooms —
+# task lists, stats, grid, owner analytics and Maya all read it, often several times per
+# request.  Keyed by the tenant's "rooms" data version: every manual_rooms commit
+# (create_manual_room, upsert_property_db, PUT/DELETE /api/properties, photo uploads)
+# publishes a room.* event that bumps it, so a stale catalogue is never served.
+PROPERTY_CATALOGUE_TTL_SEC = int(os.getenv("PROPERTY_CATALOGUE_TTL_SEC", "600") or 600)
+_PROPERTY_CATALOGUE_CACHE = _get_tenant_cache(
+    "property_catalogue", PROPERTY_CATALOGUE_TTL_SEC, max_entries=int(os.getenv("PROPERTY_CATALOGUE_MAX", "512"))
+)
+# Room-state model behind the grid (room_state.py): layout built once per tenant + owner
+# scope, statuses moved in place by task events and occupancy changes.
+ROOM_STATE_MAX_SCOPES = int(os.getenv("ROOM_STATE_MAX_SCOPES", "16") or 16)
+_ROOM_STATE = _room_state.RoomStateStore(max_scopes=ROOM_STATE_MAX_SCOPES)
+_ROOM_GRID_BAZAAR_ID = "bazaar-jaffa-hotel"
+_ROOM_GRID_BAZAAR_UNIT_RE = re.compile(r"יחידה\s*(\d+)\s*/\s*10")
+
+
+def _room_grid_unit_for_task(property_id, task_type, status_category, description):
+    """Grid unit an open Bazaar cleaning task pins to dirty («ניקיון יחידה X/10» → …-uX), else None."""
+    if property_id != _ROOM_GRID_BAZAAR_ID or status_category == "done":
+        return None
+    if task_type not in ("Cleaning", TASK_TYPE_CLEANING_HE):
+        return None
+    m = _ROOM_GRID_BAZAAR_UNIT_RE.search(description or "")
+    if not m or not 1 <= int(m.group(1)) <= 10:
+        return None
+    return f"{_ROOM_GRID_BAZAAR_ID}-u{int(m.group(1))}"
+
+
 # Owner analytics — heavy DB scans; cache separately
-_OWNER_DASHBOARD_CACHE = {"ts": 0.0, "key": None, "payload": None}
 OWNER_DASHBOARD_CACHE_TTL_SEC = 45
+_OWNER_DASHBOARD_CACHE = _get_tenant_cache(
+    "owner_dashboard", OWNER_DASHBOARD_CACHE_TTL_SEC, max_entries=int(os.getenv("OWNER_DASHBOARD_CACHE_MAX", "256"))
+)
+# Task KPIs of the owner dashboard don't depend on the viewer — one entry per tenant, shared by its users.
+_OWNER_DASHBOARD_KPI_CACHE = _get_tenant_cache("owner_dashboard_kpis", OWNER_DASHBOARD_CACHE_TTL_SEC, max_entries=256)
+# Window (days, by completion day) for top performer + average clean time; the chart is always 7 days.
+OWNER_DASHBOARD_KPI_WINDOW_DAYS = max(7, int(os.getenv("OWNER_DASHBOARD_KPI_WINDOW_DAYS", "30") or 30))
+# Maya answers to repeated questions (POST /ai/maya-command), keyed on the normalised command,
+# its truth-layer intent and a digest of the live facts the model saw — see _maya_answer_cache_key.
+MAYA_ANSWER_CACHE_TTL_SEC = int(os.getenv("MAYA_ANSWER_CACHE_TTL_SEC", "300") or 0)
+_MAYA_ANSWER_CACHE = _get_tenant_cache(
+    "maya_answers", max(1, MAYA_ANSWER_CACHE_TTL_SEC), max_entries=int(os.getenv("MAYA_ANSWER_CACHE_MAX", "512"))
+)
+_MAYA_ANSWER_CACHE_COUNTS = {"bypassed": 0, "stored": 0, "not_stored": 0}
+_MAYA_ANSWER_CACHE_COUNTS_LOCK = threading.Lock()
 # Bumped when property_tasks change so MissionContext can refetch (GET /api/tasks/version).
 _TASKS_VERSION_V = 1
 
 
-def _invalidate_status_grid_cache():
-    _STATUS_GRID_CACHE["ts"] = 0.0
-    _STATUS_GRID_CACHE["key"] = None
-    _STATUS_GRID_CACHE["payload"] = None
+def _invalidate_status_grid_cache(tenant_id=None, version=None, layout=True):
+    """layout=False when only statuses moved (the room-state model already applied them)."""
+    if layout:
+        _ROOM_STATE.invalidate_layout(tenant_id)
+    _STATUS_GRID_CACHE.invalidate(tenant_id)
+    _bump_data_version("grid", tenant_id, version)
 
 
 def _no_cache_json(resp):
@@ -119,6 +216,89 @@ def _no_cache_json(resp):
     return resp
 
 
+# ── Per-tenant data versions + conditional GET (ETag / 304) ──────────────────
+# Polled dashboards answer If-None-Match from counters instead of rebuilding
+# the payload.  "tasks" is the task change log version; "rooms" / "bookings"
+# are bumped by domain event subscribers (see _DOMAIN_EVENT_SUBSCRIPTIONS) and
+# "grid" / "dashboard" whenever the matching in-memory cache is invalidated
+# (covers non-ORM causes such as an occupancy refresh).  tenant "*" counts
+# process-wide bumps that apply to every tenant.
+# With a shared-state backend, ORM-driven bumps carry the global message
+# sequence number (the same on every worker, see _apply_commit_effects); bumps
+# without one are process-local and kept apart so they can never make two
+# workers' tags collide.
+_DATA_VERSIONS: dict = {}  # (domain, tenant_id | "*") -> int
+_DATA_VERSIONS_LOCAL: dict = {}  # same keys, process-local bump counts
+_DATA_VERSIONS_LOCK = threading.Lock()
+# Wakes /api/stream/realtime connections of a tenant (None → all) on any version bump.
+_REALTIME_NOTIFIER = _sse_hub.ChangeNotifier()
+
+
+def _bump_data_version(domain, tenant_id=None, version=None):
+    key = (domain, tenant_id or "*")
+    with _DATA_VERSIONS_LOCK:
+        if version is None:
+            _DATA_VERSIONS_LOCAL[key] = _DATA_VERSIONS_LOCAL.get(key, 0) + 1
+        else:
+            _DATA_VERSIONS[key] = max(_DATA_VERSIONS.get(key, _STATE_SEQ_BASELINE), int(version))
+    _REALTIME_NOTIFIER.notify(tenant_id or None)
+
+
+def _data_version(domain, tenant_id) -> str:
+    if domain == "tasks":
+        return str(_task_change_log_version(tenant_id))
+    keys = ((domain, tenant_id or DEFAULT_TENANT_ID), (domain, "*"))
+    with _DATA_VERSIONS_LOCK:
+        seq = [_DATA_VERSIONS.get(k, _STATE_SEQ_BASELINE) for k in keys]
+        local = [_DATA_VERSIONS_LOCAL.get(k, 0) for k in keys]
+    return ".".join(str(n) for n in seq + local)
+
+
+def _tenant_data_etag(scope, tenant_id, domains, *parts, ttl_bucket_sec=None) -> str:
+    """
+    Strong ETag for a tenant-scoped payload: scope + request-specific parts + the
+    versions of every data domain the payload reads.  ``ttl_bucket_sec`` folds in a
+    time bucket for payloads with wall-clock-derived fields (delayed flags, "today",
+    rolling windows) so they are re-sent at most that often while data is unchanged.
+    """
+    tid = tenant_id or DEFAULT_TENANT_ID
+    bits = [scope, tid, _TASK_CHANGE_LOG_EPOCH]
+    bits.extend(f"{d}={_data_version(d, tid)}" for d in domains)
+    bits.extend(str(p) for p in parts)
+    if ttl_bucket_sec:
+        bits.append(str(int(time.time() // ttl_bucket_sec)))
+    digest = hashlib.sha1("|".join(bits).encode("utf-8")).hexdigest()[:24]
+    return f'"{digest}"'
+
+
+def _request_etag_query_key(ignore=("t", "_")) -> str:
+    """Query string minus cache-busters, order-independent — part of list ETags."""
+    items = sorted((k, v) for k, v in request.args.items(multi=True) if k not in ignore)
+    return "&".join(f"{k}={v}" for k, v in items)
+
+
+def _etag_matches_request(etag) -> bool:
+    inm = request.headers.get("If-None-Match") or ""
+    if not inm or not etag:
+        return False
+    if inm.strip() == "*":
+        return True
+    return etag in {tok.strip() for tok in inm.split(",")}
+
+
+def _revalidate_json(resp, etag):
+    """Like _no_cache_json, but cacheable-with-revalidation so browsers send If-None-Match."""
+    resp.headers["Cache-Control"] = "private, no-cache"
+    resp.headers.pop("Pragma", None)
+    resp.headers.pop("Expires", None)
+    resp.headers["ETag"] = etag
+    return resp
+
+
+def _not_modified(etag):
+    return _revalidate_json(Response(status=304), etag), 304
+
+
 def _is_raw_api_tasks_get():
     """True only for GET /api/tasks — not /api/property-tasks or /api/worker/tasks."""
     p = (request.path or "").rstrip("/")
@@ -132,14 +312,11 @@ def _attach_task_table_count_headers(resp, property_tasks_len):
     except Exception:
         resp.headers["X-Property-Tasks-Count"] = "0"
     if SessionLocal and TaskModel:
-        _ls = SessionLocal()
         try:
-            legacy_all = _ls.query(TaskModel).all()
-            resp.headers["X-Legacy-Tasks-Table-Count"] = str(len(legacy_all))
+            legacy_total = sum(_task_counter_snapshot("tasks").values())
+            resp.headers["X-Legacy-Tasks-Table-Count"] = str(int(legacy_total))
         except Exception:
             resp.headers["X-Legacy-Tasks-Table-Count"] = "0"
-        finally:
-            _ls.close()
     else:
         resp.headers["X-Legacy-Tasks-Table-Count"] = "0"
     return resp
@@ -185,14 +362,517 @@ def _attach_tasks_list_pagination_headers(resp, total, offset, returned_len, lim
     return resp
 
 
-def _bump_tasks_version():
+PROPERTY_TASKS_CURSOR_DEFAULT_LIMIT = 50
+
+
+def _encode_property_tasks_cursor(created_at, task_id):
+    """Opaque keyset cursor for GET /api/property-tasks — position after (created_at, id).
+    created_at stays null for undated rows (they are paged after every dated row)."""
+    raw = json.dumps([created_at, task_id or ""], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_property_tasks_cursor(token):
+    """Return (created_at, id) or raise ValueError for a malformed cursor."""
+    s = (token or "").strip()
+    if not s:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(s + "=" * (-len(s) % 4))
+        created_at, task_id = json.loads(raw.decode("utf-8"))
+    except Exception:
+        raise ValueError("invalid cursor")
+    if not (created_at is None or isinstance(created_at, str)) or not isinstance(task_id, str):
+        raise ValueError("invalid cursor")
+    return created_at, task_id
+
+
+def _property_tasks_keyset_page(query, position, limit):
+    """
+    One keyset page on (created_at, id) DESC.  Predicate and ORDER BY use the raw columns,
+    so idx_property_tasks_tenant_created_id serves both; rows without created_at follow
+    every dated row, ordered by id.  Returns (rows, next (created_at, id) or None).
+    """
+    ca, tid = PropertyTaskModel.created_at, PropertyTaskModel.id
+    rows = []
+    if position is None or position[0] is not None:
+        q = query.filter(ca.isnot(None))
+        if position is not None:
+            q = q.filter(or_(ca < position[0], and_(ca == position[0], tid < position[1])))
+        rows = q.order_by(ca.desc(), tid.desc()).limit(limit + 1).all()
+    if len(rows) <= limit:
+        q = query.filter(ca.is_(None))
+        if position is not None and position[0] is None:
+            q = q.filter(tid < position[1])
+        rows += q.order_by(tid.desc()).limit(limit + 1 - len(rows)).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, (rows[-1].created_at, rows[-1].id)
+
+
+def _parse_property_tasks_cursor():
+    """Keyset mode is opt-in: ?cursor= (empty = first page) or ?paginate=cursor.
+    Returns (enabled, position, limit); position is None on the first page."""
+    enabled = "cursor" in request.args or (request.args.get("paginate") or "").strip().lower() == "cursor"
+    if not enabled:
+        return False, None, None
+    position = _decode_property_tasks_cursor(request.args.get("cursor"))
+    try:
+        limit = int(request.args.get("limit") or PROPERTY_TASKS_CURSOR_DEFAULT_LIMIT)
+    except (TypeError, ValueError):
+        limit = PROPERTY_TASKS_CURSOR_DEFAULT_LIMIT
+    return True, position, max(1, min(limit, 500))
+
+
+# ?schema=v2 — one key per value (no title/room/room_number/worker_name/room_id aliases),
+# actions sent once at the top level.  Maps each field to the ORM columns it reads so the
+# query can load_only() what the projection needs.
+PROPERTY_TASKS_V2_FIELDS = {
+    "id": ("id",),
+    "property_id": ("property_id",),
+    "property_name": ("property_name", "property_id"),
+    "task_type": ("task_type", "description"),
+    "assigned_to": ("assigned_to",),
+    "description": ("description",),
+    "status": ("status",),
+    "delayed": ("status", "started_ts", "created_ts", "started_at", "created_at"),
+    "created_at": ("created_at",),
+    "started_at": ("started_at",),
+    "completed_at": ("completed_at",),
+    "duration_minutes": ("duration_minutes",),
+    "staff_name": ("staff_name", "staff_phone", "assigned_to"),
+    "staff_phone": ("staff_name", "staff_phone", "assigned_to"),
+    "property_context": ("property_id",),
+    "photo_url": ("photo_url",),
+    "priority": ("priority", "worker_notes"),
+    "worker_notes": ("worker_notes",),
+    "escalated": ("priority", "worker_notes"),
+    "due_at": ("due_at",),
+}
+
+
+def _parse_property_tasks_schema():
+    """None for the legacy payload; for ?schema=v2 the requested field tuple
+    (?fields=a,b — default all v2 fields, ``id`` always first).  Raises ValueError."""
+    schema = (request.args.get("schema") or "").strip().lower()
+    if schema in ("", "v1"):
+        return None
+    if schema != "v2":
+        raise ValueError("unsupported schema")
+    raw = (request.args.get("fields") or "").strip()
+    if not raw:
+        return tuple(PROPERTY_TASKS_V2_FIELDS)
+    wanted = [f.strip() for f in raw.split(",") if f.strip()]
+    unknown = [f for f in wanted if f not in PROPERTY_TASKS_V2_FIELDS]
+    if unknown:
+        raise ValueError(f"unknown fields: {', '.join(unknown)}")
+    return tuple(dict.fromkeys(["id"] + wanted))
+
+
+def _bump_tasks_version(tenant_id=None, version=None):
+    """Manual bump after writes the task events don't describe (raw SQL): re-read grid pins too."""
+    global _TASKS_VERSION_V
+    _TASKS_VERSION_V += 1
+    _ROOM_STATE.reset_pins(tenant_id)
+    _invalidate_status_grid_cache(tenant_id, version, layout=False)
+
+
+# ── Domain event subscriptions ───────────────────────────────────────────────
+# ORM commits publish task.* / room.* / staff.* / booking.* events (listeners next
+# to the models).  Each cache and version counter reacts here, so write paths —
+# including the live-ops ticks and simulations — no longer invalidate by hand.
+# tenant_id None on an event means "every tenant" (bulk statement / untenanted table);
+# seq is the shared-state sequence of the commit (None with the in-process backend).
+def _on_task_event(ev):
     global _TASKS_VERSION_V
+    tid, seq = ev.get("tenant_id"), ev.get("seq")
     _TASKS_VERSION_V += 1
-    _invalidate_status_grid_cache()
+    # Only writes that pin / unpin a grid unit move the grid version (and its ETag).
+    if tid is None or ev.get("op") == "bulk":
+        _ROOM_STATE.reset_pins(tid)
+        _invalidate_status_grid_cache(tid, seq, layout=False)
+    elif _ROOM_STATE.apply_task(tid, ev.get("id"), None if ev.get("op") == "delete" else ev.get("room_unit")):
+        _invalidate_status_grid_cache(tid, seq, layout=False)
+    _invalidate_owner_dashboard_cache(tid, seq)
+    _invalidate_maya_derived_caches(tid)
+
+
+def _on_room_event(ev):
+    tid, seq = ev.get("tenant_id"), ev.get("seq")
+    _bump_data_version("rooms", tid, seq)
+    _PROPERTY_CATALOGUE_CACHE.invalidate(tid)
+    _invalidate_status_grid_cache(tid, seq)
+    _invalidate_owner_dashboard_cache(tid, seq)
+    _invalidate_maya_rooms_staff_cache(tid)
+    _invalidate_maya_derived_caches(tid)
+
+
+def _on_staff_event(ev):
+    _bump_data_version("rooms", None, ev.get("seq"))
+    _invalidate_property_staff_directory()
+    _invalidate_maya_rooms_staff_cache(None)
+
+
+def _on_booking_event(ev):
+    tid, seq = ev.get("tenant_id"), ev.get("seq")
+    _bump_data_version("bookings", tid, seq)
+    _invalidate_status_grid_cache(tid, seq, layout=False)
+    _invalidate_owner_dashboard_cache(tid, seq)
+    _invalidate_maya_derived_caches(tid)
+
+
+def _on_legacy_task_event(ev):
+    _bump_data_version("legacy_tasks", None, ev.get("seq"))  # stats summary reports the table-wide count
+
+
+def _on_task_change_log_event(ev):
+    """task.*: append the write to its tenant's change log (a bulk statement resets it)."""
+    tid, seq = ev.get("tenant_id"), ev.get("seq")
+    if ev.get("op") == "bulk":
+        _reset_task_change_log(tid, version=seq)
+        return
+    changes = [(tid, ev.get("id"), ev.get("op"))]
+    prev_tid = ev.get("prev_tenant_id")
+    if prev_tid and prev_tid != tid:
+        # Row moved tenants (legacy NULL stamping) — the old board must drop it.
+        changes.append((prev_tid, ev.get("id"), "delete"))
+    _record_task_changes(changes, version=seq)
+
+
+_TASK_COUNTER_TABLES = {"task": "property_tasks", "legacy_task": "tasks"}
+
+
+def _on_task_counter_event(ev):
+    """task.* / legacy_task.*: move the row between status-category counters."""
+    table = _TASK_COUNTER_TABLES[(ev.get("type") or "").split(".", 1)[0]]
+    tid, op = ev.get("tenant_id"), ev.get("op")
+    if op == "bulk":
+        _mark_task_counters_dirty(table, tid)
+        return
+    new_key = (tid, ev.get("status_category"))
+    if op == "insert":
+        deltas = [(table, *new_key, 1)]
+    elif op == "delete":
+        deltas = [(table, *new_key, -1)]
+    else:
+        old_key = (ev.get("prev_tenant_id") or tid, ev.get("prev_status_category") or new_key[1])
+        deltas = [(table, *old_key, -1), (table, *new_key, 1)] if old_key != new_key else []
+    _apply_task_counter_deltas(deltas)
+
+
+def _on_staff_member_event(ev):
+    _bump_data_version("staff", ev.get("tenant_id"), ev.get("seq"))
+
+
+def _on_message_event(ev):
+    _bump_data_version("messages", ev.get("tenant_id"), ev.get("seq"))
+
+
+def _on_knowledge_event(ev):
+    tid = ev.get("tenant_id")
+    _bump_data_version("knowledge", tid, ev.get("seq"))
+    _MAYA_ANSWER_CACHE.invalidate(tid)
+
+
+_DOMAIN_EVENT_SUBSCRIPTIONS = (
+    # Change log and counters first: cache subscribers below may re-read them.
+    ("task.*", _on_task_change_log_event),
+    ("task.*", _on_task_counter_event),
+    ("legacy_task.*", _on_task_counter_event),
+    ("task.*", _on_task_event),
+    ("room.*", _on_room_event),
+    ("staff.*", _on_staff_event),
+    ("booking.*", _on_booking_event),
+    ("legacy_task.*", _on_legacy_task_event),
+    ("staff_member.*", _on_staff_member_event),
+    ("message.*", _on_message_event),
+    ("knowledge.*", _on_knowledge_event),
+)
+for _de_pattern, _de_handler in _DOMAIN_EVENT_SUBSCRIPTIONS:
+    _domain_events.subscribe(_de_pattern, _de_handler)
+
+
+def _apply_commit_effects(msg):
+    """Shared-state "commit" channel: replay one ORM commit's side effects on this worker."""
+    eff = msg.get("payload") or {}
+    seq = msg["seq"] if msg.get("shared") else None
+    # One event per (type, tenant, id), in first-seen order but with the latest payload
+    # (a row flushed twice in one transaction reports its final state) — except the
+    # prev_* values, which keep the state before the transaction's first flush.
+    events, seen = [], {}
+    for ev in eff.get("events") or ():
+        key = (ev.get("type"), ev.get("tenant_id"), ev.get("id"))
+        if key in seen:
+            first = events[seen[key]]
+            events[seen[key]] = dict(ev, seq=seq, **{k: v for k, v in first.items() if k.startswith("prev_")})
+        else:
+            seen[key] = len(events)
+            events.append(dict(ev, seq=seq))
+    _domain_events.publish_many(events)
+
+
+_shared_state.subscribe("commit", _apply_commit_effects)
+
+# ── Per-tenant property_tasks change log ─────────────────────────────────────
+# Every committed insert/update/delete of a PropertyTaskModel row is appended
+# here by the task.* domain event subscriber (_on_task_change_log_event).  Each tenant has
+# its own monotonically increasing version; GET /api/property-tasks/changes
+# answers "what changed since v" from the ring instead of re-sending the whole
+# board.  When a client's version has been evicted from the ring, was issued
+# by a previous process (epoch mismatch) or predates a bulk delete whose row
+# ids are unknown, the endpoint returns resync=true and the client refetches.
+TASK_CHANGE_LOG_SIZE = max(50, int(os.getenv("TASK_CHANGE_LOG_SIZE", "2000") or 2000))
+_TASK_CHANGE_LOG_EPOCH = uuid.uuid4().hex[:12]  # shared by all workers under a shared-state backend
+# Global message sequence already applied when this process started consuming
+# (0 for the in-process backend); fresh slots start here so versions issued by
+# other workers before we joined can never be answered from an incomplete ring.
+_STATE_SEQ_BASELINE = 0
+_TASK_CHANGE_LOG: dict = {}  # tenant_id -> {"v", "floor", "entries": deque[(v, task_id, op, ts_ms)]}
+_TASK_CHANGE_LOG_LOCK = threading.Lock()
+
+
+def _task_change_log_slot(tenant_id):
+    slot = _TASK_CHANGE_LOG.get(tenant_id)
+    if slot is None:
+        slot = {"v": _STATE_SEQ_BASELINE, "floor": _STATE_SEQ_BASELINE, "entries": deque()}
+        _TASK_CHANGE_LOG[tenant_id] = slot
+    return slot
+
+
+def _record_task_changes(changes, version=None):
+    """Append committed (tenant_id, task_id, op) tuples; op is insert | update | delete.
+    ``version`` is the shared message sequence (same on every worker); None bumps by one."""
+    if not changes:
+        return
+    ts_ms = int(time.time() * 1000)
+    touched = set()
+    with _TASK_CHANGE_LOG_LOCK:
+        for tenant_id, task_id, op in changes:
+            tid = tenant_id or DEFAULT_TENANT_ID
+            touched.add(tid)
+            slot = _task_change_log_slot(tid)
+            slot["v"] = slot["v"] + 1 if version is None else max(slot["v"], int(version))
+            entries = slot["entries"]
+            entries.append((slot["v"], task_id, op, ts_ms))
+            while len(entries) > TASK_CHANGE_LOG_SIZE:
+                slot["floor"] = entries.popleft()[0]
+    for tid in touched:
+        _REALTIME_NOTIFIER.notify(tid)
+
+
+def _reset_task_change_log(tenant_id=None, version=None):
+    """Bulk statement touched rows we can't enumerate — force the tenant's open cursors to
+    resync (every tenant's when the statement was not pinned to one)."""
+    with _TASK_CHANGE_LOG_LOCK:
+        slots = [_task_change_log_slot(tenant_id)] if tenant_id else list(_TASK_CHANGE_LOG.values())
+        for slot in slots:
+            slot["v"] = slot["v"] + 1 if version is None else max(slot["v"], int(version))
+            slot["floor"] = slot["v"]
+            slot["entries"].clear()
+    _REALTIME_NOTIFIER.notify(tenant_id or None)
+
+
+def _task_change_log_version(tenant_id) -> int:
+    with _TASK_CHANGE_LOG_LOCK:
+        slot = _TASK_CHANGE_LOG.get(tenant_id or DEFAULT_TENANT_ID)
+        return slot["v"] if slot else _STATE_SEQ_BASELINE
+
+
+def _attach_task_change_version_headers(resp, version):
+    """Hand list callers the change-log cursor to pass as ?since= / ?epoch= on /api/property-tasks/changes."""
+    resp.headers["X-Tasks-Version"] = str(int(version))
+    resp.headers["X-Tasks-Epoch"] = _TASK_CHANGE_LOG_EPOCH
+    return resp
+
+
+def _task_changes_since(tenant_id, since):
+    """
+    Return (version, changes, resync).  ``changes`` maps task_id -> last op after
+    ``since``; resync=True means the ring can no longer answer for that cursor.
+    """
+    with _TASK_CHANGE_LOG_LOCK:
+        slot = _TASK_CHANGE_LOG.get(tenant_id or DEFAULT_TENANT_ID)
+        if slot is None:
+            return _STATE_SEQ_BASELINE, {}, since not in (None, _STATE_SEQ_BASELINE)
+        v = slot["v"]
+        if since is None or since > v or since < slot["floor"]:
+            return v, {}, True
+        changes = {}
+        for ev_v, task_id, op, _ts in reversed(slot["entries"]):
+            if ev_v <= since:
+                break
+            changes.setdefault(task_id, op)
+        return v, changes, False
+
+
+# ── Per-tenant task counters ─────────────────────────────────────────────────
+# Row totals by status category (pending | in_progress | done | archived) for
+# property_tasks and the legacy tasks table, kept in memory so count headers,
+# /api/tasks/status-counts and the stats snapshots never scan a table.  The
+# task.* / legacy_task.* domain events move rows between categories
+# (_on_task_counter_event); a bulk statement's event marks its tenant stale
+# (every tenant when its WHERE clause is not pinned to one).  A stale tenant is re-counted on its
+# next read with one GROUP BY status over that tenant's rows (tenant_id index);
+# whole-table passes run only on the background reconciler — woken for
+# tenant-wide staleness, and every TASK_COUNTERS_RECONCILE_SEC to repair drift
+# from writes that bypass the ORM.
+TASK_COUNTERS_RECONCILE_SEC = max(30, int(os.getenv("TASK_COUNTERS_RECONCILE_SEC", "300") or 300))
+_TASK_COUNTERS: dict = {"property_tasks": {}, "tasks": {}}  # table -> {tenant_id: {category: n}}
+_TASK_COUNTERS_LOCK = threading.Lock()
+# stale[table]: "all" — every tenant stale except those in "fresh" (re-counted since);
+# "tenants" — stale on their own.  Everything starts stale until the first full pass.
+_TASK_COUNTERS_STATE = {
+    "seq": 0,
+    "reconciled_at": 0.0,
+    "stale": {t: {"all": True, "fresh": set(), "tenants": set()} for t in _TASK_COUNTERS},
+}
+_TASK_COUNTERS_WAKE = threading.Event()
+_TASK_COUNTERS_RECONCILER_STARTED = False
+
+
+def _task_counters_stale(table, tenant_id) -> bool:
+    """Lock held.  tenant_id None: is any tenant of the table stale."""
+    st = _TASK_COUNTERS_STATE["stale"][table]
+    if tenant_id is None:
+        return st["all"] or bool(st["tenants"])
+    return tenant_id in st["tenants"] or (st["all"] and tenant_id not in st["fresh"])
+
+
+def _apply_task_counter_deltas(deltas):
+    """deltas: iterable of (table, tenant_id, category, +1 | -1) from a committed session."""
+    if not deltas:
+        return
+    with _TASK_COUNTERS_LOCK:
+        _TASK_COUNTERS_STATE["seq"] += 1
+        for table, tenant_id, category, n in deltas:
+            # Deltas on a stale tenant are harmless: its re-count replaces the totals.
+            per_tenant = _TASK_COUNTERS[table].setdefault(tenant_id or DEFAULT_TENANT_ID, {})
+            per_tenant[category] = max(0, per_tenant.get(category, 0) + n)
+
+
+def _mark_task_counters_dirty(table=None, tenant_id=None):
+    """Mark one tenant's counters stale (tenant_id None: every tenant; table None: every table)."""
+    with _TASK_COUNTERS_LOCK:
+        _TASK_COUNTERS_STATE["seq"] += 1
+        for t in ((table,) if table else tuple(_TASK_COUNTERS)):
+            st = _TASK_COUNTERS_STATE["stale"][t]
+            if tenant_id is None:
+                st.update(all=True, fresh=set(), tenants=set())
+            else:
+                st["tenants"].add(tenant_id)
+                st["fresh"].discard(tenant_id)
+    if tenant_id is None:
+        _TASK_COUNTERS_WAKE.set()
+
+
+def _count_task_categories(session, model, tenant_id=None) -> dict:
+    """{tenant_id: {category: n}} from one GROUP BY (only ``tenant_id``'s rows when given)."""
+    q = session.query(model.tenant_id, model.status, func.count(model.id))
+    if tenant_id == DEFAULT_TENANT_ID and model is TaskModel:
+        # The legacy tasks table is never stamped: its NULL/'' rows belong to the default tenant
+        # (as their events do).  property_tasks is stamped + NOT NULL (ensure_property_tasks_tenant_not_null).
+        q = q.filter(or_(model.tenant_id == tenant_id, model.tenant_id.is_(None), model.tenant_id == ""))
+    elif tenant_id is not None:
+        q = q.filter(model.tenant_id == tenant_id)
+    out = {}
+    for tid, status, n in q.group_by(model.tenant_id, model.status).all():
+        per_tenant = out.setdefault(tid or DEFAULT_TENANT_ID, {})
+        cat = _norm_task_status_category(status)
+        per_tenant[cat] = per_tenant.get(cat, 0) + int(n or 0)
+    return out
+
+
+def _reconcile_task_counters(force=False, table=None, tenant_id=None) -> bool:
+    """
+    Re-count one tenant of one table (table + tenant_id), or every tenant of every
+    table (whole-table GROUP BYs — background reconciler / startup only).
+    Skipped (returns False) when a commit landed mid-query — the next run retries —
+    unless ``force`` (a reader that must not stay on stale counters).
+    """
+    if not SessionLocal or not PropertyTaskModel or func is None:
+        return False
+    models = {"property_tasks": PropertyTaskModel, "tasks": TaskModel}
+    scoped = table is not None and tenant_id is not None
+    with _TASK_COUNTERS_LOCK:
+        seq = _TASK_COUNTERS_STATE["seq"]
+    fresh = {}
+    session = SessionLocal()
+    try:
+        for t in ((table,) if scoped else tuple(models)):
+            if models[t] is not None:
+                fresh[t] = _count_task_categories(session, models[t], tenant_id if scoped else None)
+    except Exception as e:
+        print(f"[task_counters] reconcile failed: {e}", flush=True)
+        return False
+    finally:
+        session.close()
+    with _TASK_COUNTERS_LOCK:
+        if _TASK_COUNTERS_STATE["seq"] != seq and not force:
+            return False
+        for t, per_tenant in fresh.items():
+            st = _TASK_COUNTERS_STATE["stale"][t]
+            if scoped:
+                _TASK_COUNTERS[t][tenant_id] = per_tenant.get(tenant_id, {})
+                st["tenants"].discard(tenant_id)
+                if st["all"]:
+                    st["fresh"].add(tenant_id)
+            else:
+                _TASK_COUNTERS[t] = per_tenant
+                st.update(all=False, fresh=set(), tenants=set())
+        if not scoped:
+            _TASK_COUNTERS_STATE["reconciled_at"] = time.time()
+    return True
+
+
+def _task_counter_snapshot(table, tenant_id=None) -> dict:
+    """
+    {category: n} for one tenant — re-counted first when stale — or summed over all
+    tenants when tenant_id is None.  The all-tenant sum never queries: while any
+    tenant is stale it wakes the background reconciler and returns the current totals.
+    """
+    if tenant_id is not None:
+        for _attempt in range(3):
+            with _TASK_COUNTERS_LOCK:
+                stale = _task_counters_stale(table, tenant_id)
+            if not stale or _reconcile_task_counters(force=_attempt == 2, table=table, tenant_id=tenant_id):
+                break
+    with _TASK_COUNTERS_LOCK:
+        per_table = _TASK_COUNTERS.get(table) or {}
+        if tenant_id is not None:
+            return dict(per_table.get(tenant_id, {}))
+        if _task_counters_stale(table, None):
+            _TASK_COUNTERS_WAKE.set()
+        out = {}
+        for cats in per_table.values():
+            for cat, n in cats.items():
+                out[cat] = out.get(cat, 0) + n
+        return out
+
+
+def _run_task_counter_reconciler():
+    while True:
+        _TASK_COUNTERS_WAKE.wait(TASK_COUNTERS_RECONCILE_SEC)
+        _TASK_COUNTERS_WAKE.clear()
+        try:
+            if not _reconcile_task_counters():
+                time.sleep(5)
+                _reconcile_task_counters()
+        except Exception as e:
+            print(f"[task_counters] reconciler error: {e}", flush=True)
+
+
+def start_task_counter_reconciler():
+    global _TASK_COUNTERS_RECONCILER_STARTED
+    if _TASK_COUNTERS_RECONCILER_STARTED or not SessionLocal:
+        return
+    _TASK_COUNTERS_RECONCILER_STARTED = True
+    threading.Thread(target=_run_task_counter_reconciler, daemon=True, name="TaskCounterReconciler").start()
+
 
 # ── Simulation-only log — shown in the God Mode admin dashboard ───────────────
 # Each entry: { ts_ms, ts_str, level, message }
-_SIM_LOG: deque = deque(maxlen=200)
+_SIM_LOG = _shared_state.SharedFeed("sim", maxlen=200)
 
 def _sim_log(message: str, level: str = "info"):
     """Append a timestamped entry to the simulation log."""
@@ -250,9 +930,14 @@ from werkzeug.exceptions import HTTPException
 from flask_cors import CORS, cross_origin
 
 try:
-    from sqlalchemy import create_engine, Column, String, Integer, Float, Text, ForeignKey, text, func, or_, and_
-    from sqlalchemy.orm import sessionmaker, declarative_base, relationship
+    from sqlalchemy import create_engine, Column, String, Integer, Float, Text, ForeignKey, text, func, or_, and_, case, literal
+    from sqlalchemy import DateTime, Date
+    from sqlalchemy import event as sa_event
+    from sqlalchemy.orm import sessionmaker, declarative_base, relationship, object_session, load_only, column_property
+    from sqlalchemy import inspect as sa_inspect
     from sqlalchemy.exc import SQLAlchemyError, IntegrityError
+    from sqlalchemy.sql import operators as sa_operators
+    from sqlalchemy.sql.elements import BinaryExpression, BindParameter, BooleanClauseList
 except Exception:
     create_engine = None
     Column = None
@@ -260,14 +945,25 @@ except Exception:
     Integer = None
     Float = None
     Text = None
+    DateTime = None
+    Date = None
     ForeignKey = None
     text = None
     func = None
     or_ = None
     and_ = None
+    case = None
+    literal = None
+    sa_event = None
+    sa_inspect = None
     sessionmaker = None
     declarative_base = None
     relationship = None
+    object_session = None
+    load_only = None
+    column_property = None
+    sa_operators = None
+    BinaryExpression = BindParameter = BooleanClauseList = None
     SQLAlchemyError = Exception
     IntegrityError = Exception
 
@@ -396,7 +1092,7 @@ Primary language is Hebrew — user-facing "message" / "question" strings and ta
 
 INTENT FIRST (always classify before acting):
 • SERVICE REQUEST — user wants work dispatched (clean, fix, send staff, "open a task", "תתקן", "תנקו", urgent leak, etc.) → add_task / add_tasks with a full, specific content line (issue + room + site when known).
-• OPERATIONAL QUESTION — who / when / why / how many / status / fastest / last cleaner / occupancy / what's open. Treat STATS_JSON plus the LIVE DATA / SEARCH_TOOL block in your system prompt as the result of an internal database search over tasks and properties — cite only those facts; never invent workers or room states. → action "info" only; do NOT create tasks for pure questions.
+• OPERATIONAL QUESTION — who / when / why / how many / status / fastest / last cleaner / occupancy / what's open. Treat STATS_JSON plus the LIVE DATA / SEARCH_TOOL block sent with each request as the result of an internal database search over tasks and properties — cite only those facts; never invent workers or room states. → action "info" only; do NOT create tasks for pure questions.
 • SMALL TALK & GUEST EXPERIENCE — hello, thanks, jokes, venting, "how are you", casual chat, local tips without a work order → action "info" with a short, warm human reply; no task unless they add an explicit request.
 
 You are also Maya — the live ops brain for Kobi's multi-site portfolio. For operational questions, your first grounding step is the live snapshot in STATS_JSON (same facts as GET /api/stats) plus LIVE DATA. Kobi is your owner; address him as קובי. Do not name other people in replies except when Kobi explicitly asks comparative staff questions (e.g. who is fastest / מי הכי מהיר) — then name exactly one worker with one evidence-based line from the data. Synthesize occupancy, staffing, and the task board from the prompt only — never invent a fixed "80%" occupancy; use real numbers or say "לפי לוח החדרים" / "לפי הנתונים" when unsure. Never describe yourself as software, an AI, a chatbot, or a language model.
@@ -442,7 +1138,7 @@ MULTI-PROPERTY DISAMBIGUATION (critical):
 
 HOTEL BAZAAR JAFFA — authoritative facts (use for guest/staff answers; do not contradict):
 - Guest room inventory (hotel): 32 rooms at this property for stay/product questions.
-- Operations / occupancy dashboards: the live 61-unit portfolio grid (Bazaar + 14 ROOMS sites) is the source of truth for occupancy — use LIVE DATA in the system prompt; occupancy% = (occupied units / 61) × 100 when the grid total is 61. Never invent "80%" or a fixed task count.
+- Operations / occupancy dashboards: the live 61-unit portfolio grid (Bazaar + 14 ROOMS sites) is the source of truth for occupancy — use the LIVE DATA block sent with the request; occupancy% = (occupied units / 61) × 100 when the grid total is 61. Never invent "80%" or a fixed task count.
 - Check-in: 15:00–23:59. On Saturdays and public holidays: check-in only after 18:00.
 - Check-out: until 11:00. On Saturdays and public holidays: until 14:00.
 - Late check-out: 170 ILS, subject to availability/approval.
@@ -650,6 +1346,8 @@ def _gemini_invalidate_model_cache():
     global _GEMINI_MODEL_CANDIDATES_CACHE, _GEMINI_MODEL_CANDIDATES_CACHE_FOR_KEY
     _GEMINI_MODEL_CANDIDATES_CACHE = None
     _GEMINI_MODEL_CANDIDATES_CACHE_FOR_KEY = None
+    with _GEMINI_MODEL_POOL_LOCK:
+        _GEMINI_MODEL_POOL.clear()
 
 
 # Ids that often 404 on generateContent (v1beta); string built so the old default name is not a single literal in source.
@@ -969,16 +1667,122 @@ def _safe_gemini_chunk_text(chunk, label: str = "") -> str:
         return ""
 
 
-def _gemini_generate(prompt: str, timeout: int = 25, extra_system: str = "") -> str:
-    """
-    Maya unified LLM: **Gemini** (google-generativeai). Same MAYA_SYSTEM_INSTRUCTION / LIVE DATA.
-    """
-    import traceback as _tb
+# GenerativeModel instances per (model name, system instruction).  The system
+# instruction is the static MAYA_SYSTEM_INSTRUCTION only — the per-request live-data
+# block travels in the request contents (_maya_contents), so the pool holds one
+# instance per model instead of one per data version.  Dropped with the candidate
+# cache when the API key changes.
+GEMINI_MODEL_POOL_MAX = int(os.getenv("GEMINI_MODEL_POOL_MAX", "32") or 32)
+_GEMINI_MODEL_POOL = OrderedDict()  # (model_name, sha1(system), temperature, max tokens) -> GenerativeModel
+_GEMINI_MODEL_POOL_LOCK = threading.Lock()
+_GEMINI_MODEL_POOL_STATS = {"hits": 0, "misses": 0, "evictions": 0}
+_MAYA_LIVE_DATA_HEADER = "\n\n--- LIVE DATA (authoritative) ---\n"
+
+
+def _maya_contents(prompt, extra_system):
+    """generate_content() contents: the LIVE DATA block as its own part ahead of the prompt."""
+    extra = (extra_system or "").strip()
+    return [_MAYA_LIVE_DATA_HEADER.lstrip() + extra, prompt] if extra else prompt
+
+
+def _gemini_model_instance(model_name, system_text, temperature=0.42, max_output_tokens=768):
+    key = (model_name, hashlib.sha1(system_text.encode("utf-8")).hexdigest(), temperature, max_output_tokens)
+    with _GEMINI_MODEL_POOL_LOCK:
+        model = _GEMINI_MODEL_POOL.get(key)
+        if model is not None:
+            _GEMINI_MODEL_POOL.move_to_end(key)
+            _GEMINI_MODEL_POOL_STATS["hits"] += 1
+            return model
+        _GEMINI_MODEL_POOL_STATS["misses"] += 1
+    model = genai.GenerativeModel(
+        model_name=model_name,
+        system_instruction=system_text,
+        generation_config=genai.types.GenerationConfig(
+            temperature=temperature,
+            max_output_tokens=max_output_tokens,
+        ),
+    )
+    with _GEMINI_MODEL_POOL_LOCK:
+        _GEMINI_MODEL_POOL[key] = model
+        while len(_GEMINI_MODEL_POOL) > GEMINI_MODEL_POOL_MAX:
+            _GEMINI_MODEL_POOL.popitem(last=False)
+            _GEMINI_MODEL_POOL_STATS["evictions"] += 1
+    return model
+
+
+def _gemini_model_pool_stats():
+    with _GEMINI_MODEL_POOL_LOCK:
+        return dict(_GEMINI_MODEL_POOL_STATS, size=len(_GEMINI_MODEL_POOL), max=GEMINI_MODEL_POOL_MAX)
+
+
+# ── Gemini model health ──────────────────────────────────────────────────────
+# Every call goes through _GEMINI_HEALTH (model_health.py): rolling latency / error
+# window and a circuit breaker per model id.  A 404 model is skipped for an hour, a
+# quota-limited one for the server's retry hint, a failing one with exponential
+# cool-down and half-open probing — instead of every turn walking the fixed chain
+# from the top; a 400 / invalid-argument rejection ends the turn without counting
+# against the model.  MAYA_GEMINI_HEDGE=1 also fires the next model when the first has
+# not answered within its p95 latency (non-streaming calls only).
+_GEMINI_KEY_INVALID_NEEDLES = (
+    "api_key_invalid",
+    "api key not valid",
+    "invalid api key",
+    "permission_denied",
+    "api key expired",
+    "key has expired",
+    "unauthenticated",
+)
+MAYA_GEMINI_HEDGE = (os.getenv("MAYA_GEMINI_HEDGE", "0") or "").strip().lower() in ("1", "true", "yes", "on")
+MAYA_GEMINI_HEDGE_DEFAULT_MS = int(os.getenv("MAYA_GEMINI_HEDGE_DEFAULT_MS", "4000") or 4000)
+MAYA_GEMINI_HEDGE_MIN_MS = int(os.getenv("MAYA_GEMINI_HEDGE_MIN_MS", "800") or 800)
+MAYA_GEMINI_HEDGE_MAX_MS = int(os.getenv("MAYA_GEMINI_HEDGE_MAX_MS", "10000") or 10000)
+_GEMINI_HEDGE_STATS = {"hedged_calls": 0, "secondary_wins": 0}
+_GEMINI_HEDGE_STATS_LOCK = threading.Lock()
+
+
+def _count_gemini_hedge(outcome):
+    with _GEMINI_HEDGE_STATS_LOCK:
+        _GEMINI_HEDGE_STATS[outcome] += 1
+
+
+def _gemini_hedge_stats():
+    with _GEMINI_HEDGE_STATS_LOCK:
+        return dict(_GEMINI_HEDGE_STATS, enabled=MAYA_GEMINI_HEDGE)
+# 400 / INVALID_ARGUMENT: the request itself was rejected (bad payload, too long) — retrying it on
+# another model does not help and it says nothing about the model's health.
+_GEMINI_INVALID_REQUEST_RE = re.compile(r"\b400\b|invalid[_ ]argument|bad request")
+
 
+def _gemini_failure_kind(e: BaseException) -> str:
+    err_str = str(e).lower()
+    if any(x in err_str for x in _GEMINI_KEY_INVALID_NEEDLES):
+        return _model_health.AUTH
+    if "quota" in err_str or "429" in err_str or "resource_exhausted" in err_str:
+        return _model_health.QUOTA
+    if _gemini_err_is_model_not_found(e):
+        return _model_health.NOT_FOUND
+    if _GEMINI_INVALID_REQUEST_RE.search(err_str):
+        return _model_health.INVALID
+    if isinstance(e, TimeoutError) or "timeout" in err_str or "timed out" in err_str or "deadline" in err_str:
+        return _model_health.TIMEOUT
+    if "empty/blocked response" in err_str:
+        return _model_health.EMPTY
+    return _model_health.ERROR
+
+
+_GEMINI_HEALTH = _model_health.ModelHealthRegistry(
+    _gemini_failure_kind,
+    failure_threshold=int(os.getenv("GEMINI_BREAKER_FAILURES", "3") or 3),
+    base_cooldown=float(os.getenv("GEMINI_BREAKER_COOLDOWN_SEC", "15") or 15),
+    max_cooldown=float(os.getenv("GEMINI_BREAKER_MAX_COOLDOWN_SEC", "300") or 300),
+    quota_cooldown=float(os.getenv("GEMINI_QUOTA_COOLDOWN_SEC", "60") or 60),
+)
+
+
+def _gemini_ensure_configured():
+    """Re-read the key at call time so a new .env value is picked up after restart."""
     if not _USE_NEW_GENAI:
         raise RuntimeError("[Gemini] google-generativeai not installed — run: pip install google-generativeai")
-
-    # Re-read key at call time so a new .env value is picked up after restart
     live_key = os.getenv("GEMINI_API_KEY", "").strip() or _GEMINI_API_KEY
     if not live_key:
         raise RuntimeError("GEMINI_API_KEY not set — add it to .env or Render Environment Variables")
@@ -990,27 +1794,133 @@ def _gemini_generate(prompt: str, timeout: int = 25, extra_system: str = "") ->
             print(f"[Gemini] genai.configure OK (key len={len(live_key)})")
         except Exception as _cfg_e:
             print(f"[Gemini] ❌ genai.configure FAILED: {type(_cfg_e).__name__}: {_cfg_e}")
-            _tb.print_exc()
             raise
 
+
+def _gemini_key_invalid_error():
+    return RuntimeError(
+        "__KEY_INVALID__: The Gemini API key is invalid or expired. "
+        "Get a new key at https://aistudio.google.com/apikey and update GEMINI_API_KEY."
+    )
+
+
+# Failures after which the next candidate is tried; anything else ends the turn.
+_GEMINI_FAILOVER_KINDS = (_model_health.NOT_FOUND, _model_health.QUOTA, _model_health.TIMEOUT, _model_health.EMPTY)
+
+
+def _gemini_hedge_delay_sec(model_name):
+    p95 = _GEMINI_HEALTH.percentile(model_name, 0.95)
+    ms = MAYA_GEMINI_HEDGE_DEFAULT_MS if p95 is None else p95
+    return max(MAYA_GEMINI_HEDGE_MIN_MS, min(MAYA_GEMINI_HEDGE_MAX_MS, ms)) / 1000.0
+
+
+def _gemini_run_candidates(call_one, label, hedge=False):
+    """
+    call_one(model_name) -> text over the health-ordered candidates: the first success wins;
+    404 / quota / timeout / empty answers move on to the next model, other errors (400 /
+    invalid argument included) end the turn.  hedge: the second model starts only when the
+    first is slower than its p95 or fails with one of those fail-over kinds.
+    """
+    models = _GEMINI_HEALTH.order(_gemini_model_candidates())
+    last_exc = None
+    start = 0
+    if hedge and len(models) >= 2:
+        start = 2
+        _count_gemini_hedge("hedged_calls")
+        try:
+            winner, text = _model_health.call_hedged(
+                _GEMINI_HEALTH, _stage_runner.get_pool("gemini-hedge", 8), call_one,
+                models[0], models[1], _gemini_hedge_delay_sec(models[0]),
+                fail_over=lambda exc: _gemini_failure_kind(exc) in _GEMINI_FAILOVER_KINDS,
+            )
+            if winner != models[0]:
+                _count_gemini_hedge("secondary_wins")
+            print(f"[Gemini] ✅ {winner} responded ({len(text)} chars, hedged)")
+            return text
+        except Exception as e:
+            last_exc = e
+            kind = _gemini_failure_kind(e)
+            print(f"[Gemini] ❌ hedged {models[0]} / {models[1]} failed ({kind}): {type(e).__name__}: {e}")
+            if kind == _model_health.AUTH:
+                raise _gemini_key_invalid_error()
+            if kind not in _GEMINI_FAILOVER_KINDS:
+                raise
+    for model_name in models[start:]:
+        try:
+            text = _GEMINI_HEALTH.call(model_name, call_one)
+            print(f"[Gemini] ✅ {model_name} responded ({len(text)} chars)")
+            return text
+        except Exception as e:
+            last_exc = e
+            kind = _gemini_failure_kind(e)
+            print(f"[Gemini] ❌ {model_name} failed ({kind}): {type(e).__name__}: {e}")
+            if kind == _model_health.AUTH:
+                raise _gemini_key_invalid_error()
+            if kind in _GEMINI_FAILOVER_KINDS:
+                continue
+            break
+    raise last_exc or RuntimeError(f"[Gemini] All models failed{label}")
+
+
+# ── LLM admission ────────────────────────────────────────────────────────────
+# Every Gemini turn is admitted by _LLM_GATE (llm_gate.py): identical prompts of one
+# tenant already in flight are answered by that call instead of a new one; a per-tenant
+# and a global token bucket cap the request rate below the provider quota; waiting
+# callers are served interactive chat first, background summaries (morning brief,
+# daily action plan, weekly report) after.  Rates are requests per minute (0 = no cap).
+LLM_TENANT_RPM = float(os.getenv("LLM_TENANT_RPM", "30") or 30)
+LLM_TENANT_BURST = float(os.getenv("LLM_TENANT_BURST", "10") or 10)
+LLM_GLOBAL_RPM = float(os.getenv("LLM_GLOBAL_RPM", "120") or 120)
+LLM_GLOBAL_BURST = float(os.getenv("LLM_GLOBAL_BURST", "30") or 30)
+LLM_MAX_CONCURRENT = int(os.getenv("LLM_MAX_CONCURRENT", "8") or 8)
+LLM_INTERACTIVE_MAX_WAIT_SEC = float(os.getenv("LLM_INTERACTIVE_MAX_WAIT_SEC", "10") or 10)
+LLM_BACKGROUND_MAX_WAIT_SEC = float(os.getenv("LLM_BACKGROUND_MAX_WAIT_SEC", "30") or 30)
+# A coalesced caller waits for the leader's admission plus its call, at most this much longer.
+LLM_CALL_MAX_SEC = float(os.getenv("LLM_CALL_MAX_SEC", "60") or 60)
+# Inbound guest WhatsApp: Twilio cuts the webhook off at 15 s and retries, so admission waits briefly.
+TWILIO_WEBHOOK_LLM_MAX_WAIT_SEC = float(os.getenv("TWILIO_WEBHOOK_LLM_MAX_WAIT_SEC", "3") or 3)
+
+_LLM_GATE = _llm_gate.LlmGate(
+    tenant_rpm=LLM_TENANT_RPM,
+    tenant_burst=LLM_TENANT_BURST,
+    global_rpm=LLM_GLOBAL_RPM,
+    global_burst=LLM_GLOBAL_BURST,
+    max_concurrent=LLM_MAX_CONCURRENT,
+)
+
+
+def _llm_max_wait(priority):
+    return LLM_BACKGROUND_MAX_WAIT_SEC if priority == _llm_gate.BACKGROUND else LLM_INTERACTIVE_MAX_WAIT_SEC
+
+
+def _llm_gated(tenant_id, priority, prompt, extra_system, fn, max_wait=None):
+    """
+    fn() admitted by _LLM_GATE, coalesced with an identical in-flight prompt of the same tenant.
+    max_wait: a caller with its own hard deadline (webhooks) — bounds a coalesced wait as well.
+    """
+    key = hashlib.sha1(f"{extra_system}\x1f{prompt}".encode("utf-8", "replace")).hexdigest()
+    if max_wait is None:
+        max_wait = _llm_max_wait(priority)
+        follow_wait = max_wait + LLM_CALL_MAX_SEC
+    else:
+        follow_wait = max_wait
+    return _LLM_GATE.run(tenant_id, key, fn, priority=priority, max_wait=max_wait, follow_wait=follow_wait)
+
+
+def _gemini_generate(prompt: str, timeout: int = 25, extra_system: str = "", tenant_id=None,
+                     priority: int = _llm_gate.INTERACTIVE, max_wait=None) -> str:
+    """
+    Maya unified LLM: **Gemini** (google-generativeai). Same MAYA_SYSTEM_INSTRUCTION / LIVE DATA.
+    """
+    _gemini_ensure_configured()
+
     def _call_model(model_name):
-        _sys = MAYA_SYSTEM_INSTRUCTION
-        if (extra_system or "").strip():
-            _sys = MAYA_SYSTEM_INSTRUCTION + "\n\n--- LIVE DATA (authoritative) ---\n" + extra_system.strip()
-        model = genai.GenerativeModel(
-            model_name=model_name,
-            system_instruction=_sys,
-            generation_config=genai.types.GenerationConfig(
-                temperature=0.42,
-                max_output_tokens=768,
-            ),
-        )
-        resp = model.generate_content(prompt)
+        print(f"[Gemini] → calling {model_name} …")
+        model = _gemini_model_instance(model_name, MAYA_SYSTEM_INSTRUCTION)
+        resp = model.generate_content(_maya_contents(prompt, extra_system))
         text = _safe_gemini_text(resp, label=model_name)
         if not text:
             # _safe_gemini_text already logged the real failure mode.
-            # Raise so the for-loop treats this the same as an API error
-            # and we fall through to the last_exc / RuntimeError path.
             _cands = getattr(resp, "candidates", None) or []
             _fr = str(getattr(_cands[0], "finish_reason", "none")) if _cands else "no_candidates"
             raise ValueError(
@@ -1019,179 +1929,85 @@ def _gemini_generate(prompt: str, timeout: int = 25, extra_system: str = "") ->
             )
         return text
 
-    last_exc = None
-    for model_name in _gemini_model_candidates():
-        try:
-            print("--- API CALL START ---")
-            print(f"[Gemini] → calling {model_name} …")
-            text = _call_model(model_name)
-            print(f"[Gemini] ✅ {model_name} responded ({len(text)} chars)")
-            return text
-        except Exception as e:
-            last_exc = e
-            err_str = str(e).lower()
-            print(f"[Gemini] ❌ {model_name} failed: {type(e).__name__}: {e}")
-            _tb.print_exc()
-            if any(
-                x in err_str
-                for x in (
-                    "api_key_invalid",
-                    "api key not valid",
-                    "invalid api key",
-                    "permission_denied",
-                    "api key expired",
-                    "key has expired",
-                    "unauthenticated",
-                )
-            ):
-                raise RuntimeError(
-                    "__KEY_INVALID__: The Gemini API key is invalid or expired. "
-                    "Get a new key at https://aistudio.google.com/apikey and update GEMINI_API_KEY."
-                )
-            if "quota" in err_str or "429" in err_str or "resource_exhausted" in err_str:
-                raise
-            if _gemini_err_is_model_not_found(e):
-                continue
-            break
-
-    raise last_exc or RuntimeError("[Gemini] All models failed")
+    return _llm_gated(
+        tenant_id, priority, prompt, extra_system,
+        lambda: _gemini_run_candidates(_call_model, "", hedge=MAYA_GEMINI_HEDGE),
+        max_wait=max_wait,
+    )
 
 
-def _gemini_stream_collect_string(prompt: str, timeout: int = 55, extra_system: str = "") -> str:
+def _gemini_stream_collect_string(prompt: str, timeout: int = 55, extra_system: str = "", tenant_id=None,
+                                  priority: int = _llm_gate.INTERACTIVE) -> str:
     """
     Same final string as _gemini_generate, using generate_content(stream=True) for lower time-to-first-token.
     """
-    import traceback as _tb
-
-    if not _USE_NEW_GENAI:
-        raise RuntimeError("[Gemini] google-generativeai not installed — run: pip install google-generativeai")
-    live_key = os.getenv("GEMINI_API_KEY", "").strip() or _GEMINI_API_KEY
-    if not live_key:
-        raise RuntimeError("GEMINI_API_KEY not set — add it to .env or Render Environment Variables")
-    if live_key != getattr(genai, "_configured_key", None):
-        genai.configure(api_key=live_key)
-        genai._configured_key = live_key
-        _gemini_invalidate_model_cache()
+    _gemini_ensure_configured()
 
     def _stream_one(model_name: str) -> str:
-        _sys = MAYA_SYSTEM_INSTRUCTION
-        if (extra_system or "").strip():
-            _sys = MAYA_SYSTEM_INSTRUCTION + "\n\n--- LIVE DATA (authoritative) ---\n" + extra_system.strip()
-        model = genai.GenerativeModel(
-            model_name=model_name,
-            system_instruction=_sys,
-            generation_config=genai.types.GenerationConfig(
-                temperature=0.42,
-                max_output_tokens=768,
-            ),
-        )
-        stream = model.generate_content(prompt, stream=True)
+        model = _gemini_model_instance(model_name, MAYA_SYSTEM_INSTRUCTION)
+        stream = model.generate_content(_maya_contents(prompt, extra_system), stream=True)
         parts = []
         for chunk in stream:
             piece = _safe_gemini_chunk_text(chunk, label=model_name).strip()
             if piece:
                 parts.append(piece)
-        return "".join(parts).strip()
+        text = "".join(parts).strip()
+        if not text:
+            raise ValueError(f"[Gemini] {model_name} returned empty/blocked response (stream)")
+        return text
 
-    last_exc = None
-    for model_name in _gemini_model_candidates():
-        try:
-            text = _stream_one(model_name)
-            if text:
-                return text
-        except Exception as e:
-            last_exc = e
-            err_str = str(e).lower()
-            if any(
-                x in err_str
-                for x in (
-                    "api_key_invalid",
-                    "api key not valid",
-                    "invalid api key",
-                    "permission_denied",
-                    "api key expired",
-                    "key has expired",
-                    "unauthenticated",
-                )
-            ):
-                raise RuntimeError(
-                    "__KEY_INVALID__: The Gemini API key is invalid or expired. "
-                    "Get a new key at https://aistudio.google.com/apikey and update GEMINI_API_KEY."
-                )
-            if "quota" in err_str or "429" in err_str or "resource_exhausted" in err_str:
-                raise
-            if _gemini_err_is_model_not_found(e):
-                continue
-            break
-    raise last_exc or RuntimeError("[Gemini] All models failed (stream)")
+    return _llm_gated(
+        tenant_id, priority, prompt, extra_system,
+        lambda: _gemini_run_candidates(_stream_one, " (stream)", hedge=MAYA_GEMINI_HEDGE),
+    )
 
 
-def _maya_llm_stream_text_chunks(prompt: str, timeout: int, extra_system: str):
+def _maya_llm_stream_text_chunks(prompt: str, timeout: int, extra_system: str, tenant_id=None):
     """
     Yield incremental text fragments from Gemini (stream=True).
     Used for SSE maya-command so the UI can render tokens before the full JSON is ready.
+    Fails over to the next model only before the first fragment has been yielded.
+    Holds one interactive _LLM_GATE slot while streaming (not coalesced: fragments are per client).
     """
-    import traceback as _tb
+    _gemini_ensure_configured()
+    with _LLM_GATE.slot(tenant_id, _llm_gate.INTERACTIVE, LLM_INTERACTIVE_MAX_WAIT_SEC):
+        yield from _maya_llm_stream_models(prompt, timeout, extra_system)
 
-    if not _USE_NEW_GENAI:
-        raise RuntimeError("[Gemini] google-generativeai not installed — run: pip install google-generativeai")
-    live_key = os.getenv("GEMINI_API_KEY", "").strip() or _GEMINI_API_KEY
-    if not live_key:
-        raise RuntimeError("GEMINI_API_KEY not set — add it to .env or Render Environment Variables")
-    if live_key != getattr(genai, "_configured_key", None):
-        genai.configure(api_key=live_key)
-        genai._configured_key = live_key
-        _gemini_invalidate_model_cache()
+
+def _maya_llm_stream_models(prompt: str, timeout: int, extra_system: str):
 
     def _stream_one(model_name: str):
-        _sys = MAYA_SYSTEM_INSTRUCTION
-        if (extra_system or "").strip():
-            _sys = MAYA_SYSTEM_INSTRUCTION + "\n\n--- LIVE DATA (authoritative) ---\n" + extra_system.strip()
-        model = genai.GenerativeModel(
-            model_name=model_name,
-            system_instruction=_sys,
-            generation_config=genai.types.GenerationConfig(
-                temperature=0.42,
-                max_output_tokens=768,
-            ),
-        )
+        model = _gemini_model_instance(model_name, MAYA_SYSTEM_INSTRUCTION)
         # Apply a hard wall-clock timeout so the call never hangs silently.
         # request_options is honoured by the google-generativeai gRPC/HTTP transport.
         _req_opts = {"timeout": int(timeout)} if timeout else {}
-        stream = model.generate_content(prompt, stream=True, request_options=_req_opts)
+        stream = model.generate_content(
+            _maya_contents(prompt, extra_system), stream=True, request_options=_req_opts
+        )
         for chunk in stream:
             piece = _safe_gemini_chunk_text(chunk, label=model_name)
             if piece:
                 yield piece
 
     last_exc = None
-    for model_name in _gemini_model_candidates():
+    for model_name in _GEMINI_HEALTH.order(_gemini_model_candidates()):
+        t0 = time.perf_counter()
+        yielded = False
         try:
             for piece in _stream_one(model_name):
+                yielded = True
                 yield piece
+            _GEMINI_HEALTH.record_success(model_name, (time.perf_counter() - t0) * 1000)
             return
         except Exception as e:
             last_exc = e
-            err_str = str(e).lower()
-            if any(
-                x in err_str
-                for x in (
-                    "api_key_invalid",
-                    "api key not valid",
-                    "invalid api key",
-                    "permission_denied",
-                    "api key expired",
-                    "key has expired",
-                    "unauthenticated",
-                )
-            ):
-                raise RuntimeError(
-                    "__KEY_INVALID__: The Gemini API key is invalid or expired. "
-                    "Get a new key at https://aistudio.google.com/apikey and update GEMINI_API_KEY."
-                )
-            if "quota" in err_str or "429" in err_str or "resource_exhausted" in err_str:
+            kind = _GEMINI_HEALTH.record_failure(model_name, e, (time.perf_counter() - t0) * 1000)
+            print(f"[Gemini] ❌ {model_name} stream failed ({kind}): {type(e).__name__}: {e}")
+            if kind == _model_health.AUTH:
+                raise _gemini_key_invalid_error()
+            if yielded:
                 raise
-            if _gemini_err_is_model_not_found(e):
+            if kind in _GEMINI_FAILOVER_KINDS:
                 continue
             break
     raise last_exc or RuntimeError("[Gemini] All models failed (stream chunks)")
@@ -1217,11 +2033,6 @@ def _promote_property_task_to_in_progress_after_worker_notify(task_id: str) -> N
         if not getattr(row, "started_at", None):
             row.started_at = now_ts
         session.commit()
-        try:
-            _bump_tasks_version()
-            _invalidate_owner_dashboard_cache()
-        except Exception:
-            pass
     except Exception as ex:
         try:
             session.rollback()
@@ -1262,11 +2073,12 @@ _CORS_RESOURCE_KW = {
     "supports_credentials": True,
     "allow_headers": [
         "Content-Type", "Authorization", "X-Tenant-Id",
-        "Accept", "X-Requested-With", "Cache-Control",
+        "Accept", "X-Requested-With", "Cache-Control", "If-None-Match",
     ],
     "methods": ["GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
-    "expose_headers": ["Content-Type", "X-DB-Status", "X-Portfolio-Fallback",
-                       "X-Tasks-Total", "X-Tasks-Has-More"],
+    "expose_headers": ["Content-Type", "ETag", "X-DB-Status", "X-Portfolio-Fallback",
+                       "X-Tasks-Total", "X-Tasks-Has-More", "X-Tasks-Next-Cursor",
+                       "X-Tasks-Version", "X-Tasks-Epoch"],
 }
 CORS(app, resources={r"/*": _CORS_RESOURCE_KW})
 
@@ -1352,6 +2164,27 @@ def api_health():
     }), 200
 
 
+@app.route("/api/cache-stats", methods=["GET", "OPTIONS"])
+@cross_origin(origins="*", allow_headers=["Content-Type", "Authorization", "X-Tenant-Id"], methods=["GET", "OPTIONS"])
+def api_cache_stats():
+    """Diagnostic probe — tenant cache hit/miss/eviction counters, event bus, shared-state backend, activity log, room state, Maya answer cache, context stages, prompt sizes, Gemini model health."""
+    if request.method == "OPTIONS":
+        return Response(status=204)
+    return _no_cache_json(jsonify({
+        "caches": _all_tenant_cache_stats(),
+        "events": _domain_events.stats(),
+        "shared_state": _shared_state.backend().stats(),
+        "sse": [_LEADS_SSE_HUB.stats(), _STAFF_SSE_HUB.stats()],
+        "activity_log": _ACTIVITY_LOG.stats(),
+        "room_state": _ROOM_STATE.stats(),
+        "maya_answers": _maya_answer_cache_counts(),
+        "context_stages": _stage_runner.stats(),
+        "prompts": dict(_prompt_budget.stats(), model_pool=_gemini_model_pool_stats()),
+        "gemini_models": {"health": _GEMINI_HEALTH.stats(), "hedge": _gemini_hedge_stats()},
+        "llm_gate": _LLM_GATE.stats(),
+    })), 200
+
+
 @app.route("/api/db-status", methods=["GET", "OPTIONS"])
 @cross_origin(origins="*", allow_headers=["Content-Type", "Authorization", "X-Tenant-Id"], methods=["GET", "OPTIONS"])
 def api_db_status():
@@ -1503,7 +2336,7 @@ def add_cors_headers(response):
     if allow != "*":
         response.headers["Access-Control-Allow-Credentials"] = "true"
     response.headers["Access-Control-Allow-Methods"] = "GET, POST, PUT, PATCH, DELETE, OPTIONS"
-    response.headers["Access-Control-Allow-Headers"] = "Content-Type, Authorization, X-Tenant-Id"
+    response.headers["Access-Control-Allow-Headers"] = "Content-Type, Authorization, X-Tenant-Id, If-None-Match"
     return response
 
 
@@ -1737,6 +2570,20 @@ def _coerce_demo_tenant_id(tenant_id):
     return s
 
 
+# Raw-SQL twin of _norm_task_status_category — used for the one-time status_category backfill.
+_PROPERTY_TASK_STATUS_CATEGORY_CASE_SQL = """
+    CASE
+        WHEN LOWER(REPLACE(TRIM(COALESCE(status, '')), ' ', '_')) IN ('done', 'completed') THEN 'done'
+        WHEN LOWER(REPLACE(TRIM(COALESCE(status, '')), ' ', '_')) = 'archived' THEN 'archived'
+        WHEN LOWER(REPLACE(TRIM(COALESCE(status, '')), ' ', '_')) IN (
+            'accepted', 'in_progress', 'inprogress', 'seen', 'started',
+            'assigned', 'delayed', 'searching_for_staff'
+        ) THEN 'in_progress'
+        ELSE 'pending'
+    END
+"""
+
+
 ENGINE = None
 SessionLocal = None
 Base = None
@@ -1984,12 +2831,13 @@ if create_engine and sessionmaker and declarative_base:
         __tablename__ = "tasks"
 
         id = Column(String, primary_key=True)
-        tenant_id = Column(String, ForeignKey("tenants.id"))
+        # active_history: the task counters need the old tenant/status in after_update.
+        tenant_id = column_property(Column(String, ForeignKey("tenants.id")), active_history=True)
         staff_id = Column(String, ForeignKey("staff.id"))
         task_type = Column(String)
         room = Column(String)
         room_id = Column(String)
-        status = Column(String)
+        status = column_property(Column(String), active_history=True)
         created_at = Column(String)
         assigned_at = Column(String)
         on_my_way_at = Column(String)
@@ -2056,7 +2904,9 @@ if create_engine and sessionmaker and declarative_base:
         staff_id = Column(String)  # FK to property_staff.id
         assigned_to = Column(String)  # Legacy alias for staff_id
         description = Column(Text)
-        status = Column(String, default="Pending")  # Pending / Accepted / Done
+        # Pending / Accepted / Done.  active_history: the old value reaches after_update
+        # (task counters, task.status_changed events) even when the row was expired.
+        status = column_property(Column(String, default="Pending"), active_history=True)
         created_at = Column(String)
         property_name = Column(String)
         staff_name = Column(String)
@@ -2069,8 +2919,51 @@ if create_engine and sessionmaker and declarative_base:
         photo_url = Column(String)           # Image linked to this task (uploaded on creation)
         priority  = Column(String, default="normal")   # normal | high (set when "דחוף"/"urgent")
         task_type = Column(String)           # Cleaning | Maintenance | Service
-        tenant_id = Column(String, index=True, default=DEFAULT_TENANT_ID)  # multi-tenant isolation
+        tenant_id = column_property(Column(String, index=True, default=DEFAULT_TENANT_ID), active_history=True)  # multi-tenant isolation
         due_at = Column(String)              # ISO target time (check-in prep, iCal-driven)
+        # pending | in_progress | done | archived — derived from status on every flush (see listener below)
+        status_category = Column(String, default="pending")
+        # Typed twins of the ISO string columns — dual-written on flush, backfilled by _run_typed_time_backfill.
+        created_ts = Column(DateTime(timezone=True))
+        started_ts = Column(DateTime(timezone=True))
+        completed_ts = Column(DateTime(timezone=True))
+        due_ts = Column(DateTime(timezone=True))
+
+    def _sync_property_task_status_category(_mapper, _connection, target):
+        """Keep status_category in lockstep with status for every ORM insert/update path."""
+        target.status_category = _norm_task_status_category(getattr(target, "status", None))
+
+    def _stamp_property_task_tenant(_mapper, _connection, target):
+        """tenant_id is NOT NULL — callers passing tenant_id=None/'' land on the default tenant."""
+        if not (getattr(target, "tenant_id", None) or "").strip():
+            target.tenant_id = DEFAULT_TENANT_ID
+
+    sa_event.listen(PropertyTaskModel, "before_insert", _stamp_property_task_tenant)
+    sa_event.listen(PropertyTaskModel, "before_update", _stamp_property_task_tenant)
+    sa_event.listen(PropertyTaskModel, "before_insert", _sync_property_task_status_category)
+    sa_event.listen(PropertyTaskModel, "before_update", _sync_property_task_status_category)
+
+    def _bulk_statement_tenant_id(orm_execute_state):
+        """
+        Tenant a bulk UPDATE/DELETE is pinned to by a top-level ``tenant_id = :value``
+        conjunct of its WHERE clause (query.filter(Model.tenant_id == t) / filter_by);
+        None when it may touch rows of every tenant.
+        """
+        clause = getattr(orm_execute_state.statement, "whereclause", None)
+        stack = [clause] if clause is not None else []
+        while stack:
+            c = stack.pop()
+            if isinstance(c, BooleanClauseList) and c.operator is sa_operators.and_:
+                stack.extend(c.clauses)
+            elif isinstance(c, BinaryExpression) and c.operator is sa_operators.eq:
+                col, val = c.left, c.right
+                if isinstance(col, BindParameter):
+                    col, val = val, col
+                if getattr(col, "name", None) == "tenant_id" and isinstance(val, BindParameter):
+                    value = val.effective_value
+                    if value:
+                        return str(value)
+        return None
 
     class WorkerStatsModel(Base):
         """Aggregated per-worker daily performance — updated by the Performance Agent."""
@@ -2104,6 +2997,9 @@ if create_engine and sessionmaker and declarative_base:
         completed_at = Column(String)               # worker finished ISO
         duration_minutes = Column(String)           # float as string
         date = Column(String, index=True)           # YYYY-MM-DD UTC for date-range queries
+        created_ts = Column(DateTime(timezone=True))
+        started_ts = Column(DateTime(timezone=True))
+        completed_ts = Column(DateTime(timezone=True))
 
     class TaskAuditLogModel(Base):
         """Immutable audit trail — task lifecycle events (e.g. completion). Not exposed to guests."""
@@ -2151,6 +3047,8 @@ if create_engine and sessionmaker and declarative_base:
         total_price  = Column(Integer, default=0)   # NIS / USD
         status       = Column(String, default="confirmed")  # confirmed / cancelled / completed
         created_at   = Column(String)
+        check_in_date  = Column(Date)          # typed twin of check_in
+        check_out_date = Column(Date)          # typed twin of check_out
 
     class PropertyKnowledgeModel(Base):
         """Maya property research — persisted in property_knowledge; offices, pricing, rules, POIs."""
@@ -2174,6 +3072,197 @@ if create_engine and sessionmaker and declarative_base:
         created_at = Column(String)
         updated_at = Column(String)
 
+    class BackfillProgressModel(Base):
+        """Checkpoint for resumable online backfills — last processed primary key per job."""
+        __tablename__ = "schema_backfill_progress"
+
+        job = Column(String, primary_key=True)
+        last_id = Column(String)
+        rows_done = Column(Integer, default=0)
+        completed = Column(Integer, default=0)
+        updated_at = Column(String)
+
+    # (model, [(string column, typed column), ...], parser) — dual-write + backfill spec.
+    _TYPED_TIME_COLUMN_SPECS = {
+        "property_tasks": (
+            PropertyTaskModel,
+            [("created_at", "created_ts"), ("started_at", "started_ts"),
+             ("completed_at", "completed_ts"), ("due_at", "due_ts")],
+            "ts",
+        ),
+        "worker_performance": (
+            WorkerPerformanceModel,
+            [("created_at", "created_ts"), ("started_at", "started_ts"), ("completed_at", "completed_ts")],
+            "ts",
+        ),
+        "bookings": (
+            BookingModel,
+            [("check_in", "check_in_date"), ("check_out", "check_out_date")],
+            "date",
+        ),
+    }
+
+    def _make_typed_time_listener(pairs, kind):
+        def _sync(_mapper, _connection, target):
+            parse = _parse_ts_for_column if kind == "ts" else _parse_date_for_column
+            for src, dst in pairs:
+                setattr(target, dst, parse(getattr(target, src, None)))
+        return _sync
+
+    for _tt_model, _tt_pairs, _tt_kind in _TYPED_TIME_COLUMN_SPECS.values():
+        _tt_listener = _make_typed_time_listener(_tt_pairs, _tt_kind)
+        sa_event.listen(_tt_model, "before_insert", _tt_listener)
+        sa_event.listen(_tt_model, "before_update", _tt_listener)
+
+    # model -> (domain event type, has tenant_id).  Every committed ORM write is
+    # published on the domain event bus (see _DOMAIN_EVENT_SUBSCRIPTIONS); caches and
+    # data versions subscribe instead of each write path invalidating by hand.
+    # property_staff rows carry no tenant_id, so staff events fan out to every tenant.
+    # Events of the counted task tables also carry the row's status category (and, on
+    # update, the previous tenant / category) for the change log and task counters.
+    _TASK_COUNTER_MODELS = (PropertyTaskModel, TaskModel)
+    _DOMAIN_EVENT_MODELS = {
+        PropertyTaskModel: (_domain_events.TASK_UPDATED, True),
+        ManualRoomModel: (_domain_events.ROOM_UPDATED, True),
+        PropertyStaffModel: (_domain_events.STAFF_CHANGED, False),
+        BookingModel: (_domain_events.BOOKING_CHANGED, True),
+        TaskModel: (_domain_events.LEGACY_TASK_CHANGED, True),
+        StaffModel: (_domain_events.STAFF_MEMBER_CHANGED, True),
+        MessageModel: (_domain_events.MESSAGE_CHANGED, True),
+        PropertyKnowledgeModel: (_domain_events.KNOWLEDGE_CHANGED, True),
+    }
+
+    def _property_task_event_type(op, target):
+        if op == "insert":
+            return _domain_events.TASK_CREATED
+        if op == "delete":
+            return _domain_events.TASK_DELETED
+        # status is mapped with active_history, so the old value is loaded.
+        if sa_inspect(target).attrs.status.history.deleted:
+            return _domain_events.TASK_STATUS_CHANGED
+        return _domain_events.TASK_UPDATED
+
+    def _make_domain_event_listener(model, op):
+        event_type, has_tenant = _DOMAIN_EVENT_MODELS[model]
+
+        def _listener(_mapper, _connection, target):
+            sess = object_session(target)
+            if sess is None:
+                return
+            tenant_id = (getattr(target, "tenant_id", None) or DEFAULT_TENANT_ID) if has_tenant else None
+            extra = {}
+            if model is PropertyTaskModel:
+                etype = _property_task_event_type(op, target)
+                if op != "delete":
+                    # Room-state model input: the grid unit this task now pins (None: none).
+                    extra["room_unit"] = _room_grid_unit_for_task(
+                        target.property_id, target.task_type, target.status_category, target.description
+                    )
+            else:
+                etype = event_type
+            if model in _TASK_COUNTER_MODELS:
+                extra["status_category"] = _norm_task_status_category(target.status)
+                if op == "update":
+                    # status/tenant_id are mapped with active_history: old values are loaded.
+                    attrs = sa_inspect(target).attrs
+                    old_status = attrs.status.history.deleted
+                    old_tenant = attrs.tenant_id.history.deleted
+                    extra["prev_status_category"] = _norm_task_status_category(
+                        old_status[0] if old_status else target.status
+                    )
+                    extra["prev_tenant_id"] = (old_tenant[0] if old_tenant else tenant_id) or DEFAULT_TENANT_ID
+            sess.info.setdefault("_domain_events", []).append(_domain_events.make_event(
+                etype, tenant_id, id=getattr(target, "id", None), op=op,
+                property_id=getattr(target, "property_id", None), **extra,
+            ))
+        return _listener
+
+    for _de_model in _DOMAIN_EVENT_MODELS:
+        for _de_op in ("insert", "update", "delete"):
+            sa_event.listen(_de_model, f"after_{_de_op}", _make_domain_event_listener(_de_model, _de_op))
+
+    def _flag_bulk_domain_event_statement(orm_execute_state):
+        if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+            return
+        mapper = orm_execute_state.bind_mapper
+        spec = _DOMAIN_EVENT_MODELS.get(mapper.class_) if mapper is not None else None
+        if spec:
+            # Query.update()/delete() bypass the mapper events: report a tenant-wide change
+            # (every tenant when the WHERE clause is not pinned to one).
+            tenant_id = _bulk_statement_tenant_id(orm_execute_state) if spec[1] else None
+            orm_execute_state.session.info.setdefault("_domain_events", []).append(
+                _domain_events.make_event(spec[0], tenant_id, id=None, op="bulk", property_id=None)
+            )
+
+    def _discard_domain_events(sess):
+        sess.info.pop("_domain_events", None)
+
+    sa_event.listen(SessionLocal, "do_orm_execute", _flag_bulk_domain_event_statement)
+    sa_event.listen(SessionLocal, "after_rollback", _discard_domain_events)
+
+    # The domain events of one commit travel as a single shared-state message, so every
+    # worker applies them (change log, counters, caches) in the same order (see
+    # _apply_commit_effects).  A shared backend gets the message as an outbox row written
+    # by before_commit in the committing transaction itself: it exists exactly when the
+    # rows do, and a crash between COMMIT and delivery cannot lose it.  The in-process
+    # backend has no outbox and delivers synchronously from after_commit.
+    def _stage_commit_effects(sess):
+        sess.flush()  # before_commit runs ahead of the final flush — collect its events too
+        effects = {
+            "events": sess.info.pop("_domain_events", None),
+        }
+        if not any(effects.values()):
+            return
+        if not _shared_state.publish_on(sess.connection(), "commit", effects):
+            sess.info["_commit_effects"] = effects
+
+    def _publish_commit_effects(sess):
+        effects = sess.info.pop("_commit_effects", None)
+        if not effects:
+            return
+        try:
+            _shared_state.publish("commit", effects)
+        except Exception as e:
+            # The row is already committed; the counters reconciler / TTLs repair the rest.
+            print(f"[shared_state] commit effects not published: {e!r}", flush=True)
+            _mark_task_counters_dirty()
+
+    def _discard_commit_effects(sess):
+        sess.info.pop("_commit_effects", None)
+
+    sa_event.listen(SessionLocal, "before_commit", _stage_commit_effects)
+    sa_event.listen(SessionLocal, "after_commit", _publish_commit_effects)
+    sa_event.listen(SessionLocal, "after_rollback", _discard_commit_effects)
+
+    def ensure_typed_time_columns():
+        """Add typed timestamptz/date columns + indexes next to the legacy ISO string columns."""
+        if not ENGINE or not text:
+            return
+        dname = getattr(ENGINE.dialect, "name", "sqlite")
+        ts_type = "TIMESTAMPTZ" if dname == "postgresql" else "TIMESTAMP"
+        for table, (_model, pairs, kind) in _TYPED_TIME_COLUMN_SPECS.items():
+            col_type = ts_type if kind == "ts" else "DATE"
+            for _src, dst in pairs:
+                try:
+                    with ENGINE.begin() as conn:
+                        if dname == "postgresql":
+                            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {dst} {col_type}"))
+                        else:
+                            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {dst} {col_type}"))
+                except Exception:
+                    pass  # SQLite: duplicate column on restart
+        for raw in (
+            "CREATE INDEX IF NOT EXISTS idx_property_tasks_tenant_created_ts ON property_tasks (tenant_id, created_ts)",
+            "CREATE INDEX IF NOT EXISTS idx_property_tasks_tenant_completed_ts ON property_tasks (tenant_id, completed_ts)",
+            "CREATE INDEX IF NOT EXISTS idx_bookings_tenant_check_out_date ON bookings (tenant_id, check_out_date)",
+            "CREATE INDEX IF NOT EXISTS idx_worker_performance_completed_ts ON worker_performance (completed_ts)",
+        ):
+            try:
+                with ENGINE.begin() as conn:
+                    conn.execute(text(raw))
+            except Exception as _ix_e:
+                print(f"[ensure_typed_time_columns] {_ix_e}", flush=True)
+
     def ensure_staff_schema():
         if not ENGINE or not text:
             return
@@ -2468,6 +3557,8 @@ if create_engine and sessionmaker and declarative_base:
             ensure_manual_rooms_occupancy_column()
             ensure_property_staff_table()
             ensure_property_tasks_table()
+            ensure_property_tasks_status_category()
+            ensure_typed_time_columns()
             ensure_property_tasks_reporting_indexes()
             ensure_bookings_table()
             ensure_property_knowledge_table()
@@ -2591,15 +3682,130 @@ if create_engine and sessionmaker and declarative_base:
                         connection.commit()
                     except Exception:
                         pass
+        ensure_property_tasks_tenant_not_null()
+
+    def ensure_property_tasks_tenant_not_null():
+        """One-time migration: stamp legacy NULL/'' tenant ids, then enforce NOT NULL.
+
+        Task queries scope with a plain ``tenant_id = :t`` (no ``OR tenant_id IS NULL``), so the
+        (tenant_id, …) composite indexes stay usable for the default tenant. Batched so it can run
+        online; on PostgreSQL the constraint is added NOT VALID + VALIDATE to avoid a long lock.
+        """
+        if not ENGINE or not text:
+            return
+        dname = getattr(ENGINE.dialect, "name", "sqlite")
+        if dname == "postgresql":
+            try:
+                with ENGINE.connect() as conn:
+                    if conn.execute(text(
+                        "SELECT 1 FROM pg_constraint WHERE conname = 'property_tasks_tenant_id_present' "
+                        "AND convalidated"
+                    )).fetchone():
+                        return  # already migrated — nothing left to stamp
+            except Exception:
+                pass
         try:
-            with ENGINE.connect() as connection:
-                connection.execute(
-                    text("UPDATE property_tasks SET tenant_id = :d WHERE tenant_id IS NULL OR tenant_id = ''"),
-                    {"d": DEFAULT_TENANT_ID},
+            stamp_sql = text(
+                """
+                UPDATE property_tasks SET tenant_id = :d
+                WHERE id IN (
+                    SELECT id FROM property_tasks WHERE tenant_id IS NULL OR tenant_id = '' LIMIT :batch
                 )
-                connection.commit()
+                """
+            )
+            total = 0
+            while True:
+                with ENGINE.begin() as conn:
+                    n = conn.execute(stamp_sql, {"d": DEFAULT_TENANT_ID, "batch": 5000}).rowcount or 0
+                total += n
+                if n < 5000:
+                    break
+            if total:
+                print(f"[schema] property_tasks.tenant_id stamped on {total} legacy rows", flush=True)
         except Exception as _ue:
-            print("[ensure_property_tasks] tenant backfill note:", _ue)
+            print("[ensure_property_tasks] tenant backfill note:", _ue, flush=True)
+            return
+        if dname != "postgresql":
+            return  # SQLite cannot add NOT NULL in place — the ORM before_insert listener stamps it.
+        try:
+            with ENGINE.connect() as conn:
+                has_ck = conn.execute(
+                    text(
+                        "SELECT 1 FROM pg_constraint WHERE conname = 'property_tasks_tenant_id_present'"
+                    )
+                ).fetchone()
+            if not has_ck:
+                with ENGINE.begin() as conn:
+                    conn.execute(text(
+                        "ALTER TABLE property_tasks ADD CONSTRAINT property_tasks_tenant_id_present "
+                        "CHECK (tenant_id IS NOT NULL AND tenant_id <> '') NOT VALID"
+                    ))
+                with ENGINE.begin() as conn:
+                    conn.execute(text("ALTER TABLE property_tasks VALIDATE CONSTRAINT property_tasks_tenant_id_present"))
+            with ENGINE.begin() as conn:
+                conn.execute(text("ALTER TABLE property_tasks ALTER COLUMN tenant_id SET DEFAULT " + "'" + DEFAULT_TENANT_ID.replace("'", "''") + "'"))
+                # Validated CHECK lets PostgreSQL 12+ skip the full-table scan here.
+                conn.execute(text("ALTER TABLE property_tasks ALTER COLUMN tenant_id SET NOT NULL"))
+        except Exception as _nn:
+            print(f"[ensure_property_tasks] tenant_id NOT NULL note: {_nn}", flush=True)
+
+    def ensure_property_tasks_status_category():
+        """Add + backfill property_tasks.status_category and index it with tenant_id.
+
+        Backfill runs in bounded batches (only rows still NULL), so it is a no-op after the first
+        successful run and never holds a long lock on Supabase.
+        """
+        if not ENGINE or not text:
+            return
+        dname = getattr(ENGINE.dialect, "name", "sqlite")
+        try:
+            _has = False
+            if dname == "postgresql":
+                with ENGINE.connect() as _c:
+                    _has = bool(
+                        _c.execute(
+                            text(
+                                "SELECT 1 FROM information_schema.columns "
+                                "WHERE table_schema = 'public' AND table_name = 'property_tasks' "
+                                "AND column_name = 'status_category'"
+                            )
+                        ).fetchone()
+                    )
+            if not _has:
+                try:
+                    with ENGINE.begin() as conn:
+                        if dname == "postgresql":
+                            conn.execute(text("ALTER TABLE property_tasks ADD COLUMN IF NOT EXISTS status_category VARCHAR"))
+                        else:
+                            conn.execute(text("ALTER TABLE property_tasks ADD COLUMN status_category VARCHAR"))
+                except Exception:
+                    pass  # SQLite: duplicate column on restart
+            backfill_sql = text(
+                f"""
+                UPDATE property_tasks SET status_category = {_PROPERTY_TASK_STATUS_CATEGORY_CASE_SQL}
+                WHERE id IN (
+                    SELECT id FROM property_tasks WHERE status_category IS NULL LIMIT :batch
+                )
+                """
+            )
+            total = 0
+            while True:
+                with ENGINE.begin() as conn:
+                    n = conn.execute(backfill_sql, {"batch": 5000}).rowcount or 0
+                total += n
+                if n < 5000:
+                    break
+            if total:
+                print(f"[schema] property_tasks.status_category backfilled {total} rows", flush=True)
+            with ENGINE.begin() as conn:
+                conn.execute(
+                    text(
+                        "CREATE INDEX IF NOT EXISTS idx_property_tasks_tenant_status_category "
+                        "ON property_tasks (tenant_id, status_category)"
+                    )
+                )
+        except Exception as e:
+            print(f"[ensure_property_tasks_status_category] {e}", flush=True)
 
     def ensure_bookings_table():
         """Create bookings table if it doesn't exist."""
@@ -2837,6 +4043,49 @@ else:
     DamageReportModel       = None
     BookingModel            = None
     PropertyKnowledgeModel = None
+    BackfillProgressModel = None
+    _TYPED_TIME_COLUMN_SPECS = {}
+
+# ── Shared-state backend ─────────────────────────────────────────────────────
+# "memory" (default): SSE queues, activity/sim feeds, change-log versions and cache
+# invalidations stay in this process — run gunicorn with one worker.
+# "db": the same state goes through shared_state.SqlBackend on the app database
+# (LISTEN/NOTIFY on PostgreSQL, polling on SQLite) so N workers / instances agree.
+SHARED_STATE_BACKEND = (os.getenv("SHARED_STATE_BACKEND") or "memory").strip().lower()
+
+
+def _configure_shared_state():
+    global _TASK_CHANGE_LOG_EPOCH, _STATE_SEQ_BASELINE
+    if SHARED_STATE_BACKEND not in ("db", "sql") or not ENGINE:
+        return
+    try:
+        backend = _shared_state.configure(_shared_state.SqlBackend(
+            ENGINE, poll_interval=float(os.getenv("SHARED_STATE_POLL_SEC", "0.25") or 0.25),
+        ))
+        # Cursors and ETags must mean the same thing on every worker.
+        _TASK_CHANGE_LOG_EPOCH = backend.kv_setdefault("task_change_log_epoch", _TASK_CHANGE_LOG_EPOCH)
+        _STATE_SEQ_BASELINE = backend.baseline_seq()
+        print(f"[shared_state] ✅ database backend ({backend.dialect}) from seq {_STATE_SEQ_BASELINE}", flush=True)
+    except Exception as e:
+        _shared_state.configure(_shared_state.MemoryBackend())
+        print(f"[shared_state] ⚠️ database backend unavailable, staying in-process: {e}", flush=True)
+
+
+def _init_activity_log_store():
+    """Restore the per-tenant activity rings from activity_log and persist new entries in batches."""
+    if not ENGINE or os.getenv("ACTIVITY_LOG_PERSIST", "1").strip().lower() in ("0", "false", "no"):
+        return
+    try:
+        _ACTIVITY_LOG.attach_store(
+            ENGINE,
+            flush_interval=float(os.getenv("ACTIVITY_LOG_FLUSH_SEC", "2") or 2),
+            batch_size=int(os.getenv("ACTIVITY_LOG_FLUSH_BATCH", "100") or 100),
+        )
+        st = _ACTIVITY_LOG.stats()
+        print(f"[activity_log] ✅ restored {st['restored']} entries for {st['tenants']} tenant(s)", flush=True)
+    except Exception as e:
+        print(f"[activity_log] ⚠️ persistence unavailable, feed is in-memory only: {e}", flush=True)
+
 
 # ── Eager schema init ────────────────────────────────────────────────────────
 # This runs at module import time (when Gunicorn loads app.py), so Supabase
@@ -2856,6 +4105,10 @@ if ENGINE and Base:
             ensure_manual_rooms_occupancy_column()
         except Exception as _occ_e:
             print(f"[app.py] manual_rooms.occupancy_rate ensure (non-fatal): {_occ_e}", flush=True)
+        ensure_property_tasks_status_category()
+        ensure_typed_time_columns()
+        _configure_shared_state()
+        _init_activity_log_store()
         try:
             ensure_property_knowledge_table()
             ensure_builtin_property_knowledge_bsr_city()
@@ -2878,8 +4131,6 @@ INIT_LOCK = threading.Lock()
 _STARTUP_THREAD_STARTED = False
 _STARTUP_THREAD_GUARD = threading.Lock()
 
-EVENT_QUEUES = {}
-EVENT_LOCK = threading.Lock()
 MESSAGE_QUEUE = queue.Queue()
 MESSAGE_WORKERS_STARTED = False
 MESSAGE_WORKERS_LOCK = threading.Lock()
@@ -2902,8 +4153,6 @@ try:
 except OSError as _e:
     print(f"[uploads] Warning: could not create upload dirs: {_e}")
 
-STAFF_EVENT_QUEUES = {}
-STAFF_EVENT_LOCK = threading.Lock()
 
 AUTOMATION_STATS = {
     "automated_messages": 0,
@@ -2916,7 +4165,8 @@ DEMO_AUTOMATION_SETTINGS = {
     "smart_task_assignment_enabled": False,
 }
 
-ICAL_CACHE = {}
+# Conditional-GET state per tenant feed (hash / ETag / Last-Modified); a day covers the slowest sync interval.
+ICAL_CACHE = _get_tenant_cache("ical_feed", 86400, max_entries=int(os.getenv("ICAL_CACHE_MAX", "1024")))
 ICAL_LAST_SYNC = {}
 ICAL_SYNC_LOCK = threading.Lock()
 ICAL_SYNC_STARTED = False
@@ -2997,15 +4247,153 @@ def now_iso():
     return datetime.now(timezone.utc).isoformat()
 
 
-def parse_iso_datetime(value):
+def parse_iso_datetime(value):
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except Exception:
+        return None
+
+
+def _parse_ts_for_column(value):
+    """ISO string → UTC-aware datetime for the typed *_ts columns (None when blank/unparseable)."""
+    if isinstance(value, datetime):
+        dt = value
+    else:
+        dt = parse_iso_datetime(str(value).strip()) if value else None
+    if dt is None:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+def _parse_date_for_column(value):
+    """YYYY-MM-DD… string → date for bookings.check_in_date / check_out_date."""
     if not value:
         return None
     try:
-        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+        return datetime.strptime(str(value).strip()[:10], "%Y-%m-%d").date()
     except Exception:
         return None
 
 
+def _ts_as_utc(value):
+    """Typed column read-back: SQLite returns naive datetimes — treat them as UTC."""
+    if value is None:
+        return None
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+
+# ── Typed time columns — resumable online backfill ───────────────────────────
+# Readers switch from ISO-string parsing to the typed columns once a table's backfill has completed.
+_TYPED_TIME_READY = {"property_tasks": False, "worker_performance": False, "bookings": False}
+_TYPED_TIME_BACKFILL_BATCH = int(os.getenv("TYPED_TIME_BACKFILL_BATCH", "500") or "500")
+_TYPED_TIME_BACKFILL_STARTED = False
+_TYPED_TIME_BACKFILL_LOCK = threading.Lock()
+
+
+def _typed_time_ready(table):
+    return bool(_TYPED_TIME_READY.get(table))
+
+
+def _load_typed_time_backfill_state():
+    if not SessionLocal or not BackfillProgressModel:
+        return
+    session = SessionLocal()
+    try:
+        for row in session.query(BackfillProgressModel).all():
+            job = (row.job or "").replace("typed_time:", "", 1)
+            if job in _TYPED_TIME_READY:
+                _TYPED_TIME_READY[job] = bool(row.completed)
+    except Exception as e:
+        print(f"[typed_time_backfill] state load: {e}", flush=True)
+    finally:
+        session.close()
+
+
+def _typed_time_backfill_table(table):
+    """Walk one table in primary-key order, filling typed columns; checkpoint commits with each batch."""
+    model, pairs, kind = _TYPED_TIME_COLUMN_SPECS[table]
+    parse = _parse_ts_for_column if kind == "ts" else _parse_date_for_column
+    job = f"typed_time:{table}"
+    src_cols = [getattr(model, src) for src, _dst in pairs]
+    dst_cols = [getattr(model, dst) for _src, dst in pairs]
+    while True:
+        session = SessionLocal()
+        try:
+            prog = session.query(BackfillProgressModel).filter_by(job=job).first()
+            if prog is None:
+                prog = BackfillProgressModel(job=job, last_id="", rows_done=0, completed=0)
+                session.add(prog)
+            if prog.completed:
+                _TYPED_TIME_READY[table] = True
+                return
+            rows = (
+                session.query(model.id, *src_cols, *dst_cols)
+                .filter(model.id > (prog.last_id or ""))
+                .order_by(model.id)
+                .limit(_TYPED_TIME_BACKFILL_BATCH)
+                .all()
+            )
+            mappings = []
+            for r in rows:
+                upd = {}
+                for i, (_src, dst) in enumerate(pairs):
+                    if r[1 + len(pairs) + i] is None:
+                        val = parse(r[1 + i])
+                        if val is not None:
+                            upd[dst] = val
+                if upd:
+                    upd["id"] = r[0]
+                    mappings.append(upd)
+            if mappings:
+                session.bulk_update_mappings(model, mappings)
+            if rows:
+                prog.last_id = rows[-1][0]
+                prog.rows_done = int(prog.rows_done or 0) + len(rows)
+            if len(rows) < _TYPED_TIME_BACKFILL_BATCH:
+                prog.completed = 1
+            prog.updated_at = now_iso()
+            session.commit()
+            if prog.completed:
+                _TYPED_TIME_READY[table] = True
+                print(f"[typed_time_backfill] {table} complete ({prog.rows_done} rows scanned)", flush=True)
+                return
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+        time.sleep(0.05)  # yield to request traffic between batches
+
+
+def _run_typed_time_backfill():
+    for table in ("property_tasks", "bookings", "worker_performance"):
+        if _typed_time_ready(table):
+            continue
+        try:
+            _typed_time_backfill_table(table)
+        except Exception as e:
+            # Checkpoint survives — the next process start resumes after the last committed batch.
+            print(f"[typed_time_backfill] {table} interrupted: {e}", flush=True)
+
+
+_load_typed_time_backfill_state()
+
+
+def start_typed_time_backfill():
+    global _TYPED_TIME_BACKFILL_STARTED
+    if not SessionLocal or not BackfillProgressModel:
+        return
+    with _TYPED_TIME_BACKFILL_LOCK:
+        if _TYPED_TIME_BACKFILL_STARTED or all(_TYPED_TIME_READY.values()):
+            return
+        _TYPED_TIME_BACKFILL_STARTED = True
+    threading.Thread(target=_run_typed_time_backfill, daemon=True, name="TypedTimeBackfill").start()
+
+
 def get_property_location():
     try:
         lat = float(os.getenv("PROPERTY_LAT", "0"))
@@ -3157,7 +4545,7 @@ def get_ical_sync_interval_seconds(now_local):
 
 def fetch_ical_text(tenant_id, ical_url, force=False):
     headers = {}
-    cache = ICAL_CACHE.get(tenant_id, {})
+    cache = ICAL_CACHE.get(tenant_id, None, {})
     if not force:
         if cache.get("etag"):
             headers["If-None-Match"] = cache["etag"]
@@ -3189,7 +4577,7 @@ def sync_ical_for_tenant(tenant_id, force=False, nightly_rate_override=None):
         if not ics_text:
             return None
         ics_hash = hashlib.sha256(ics_text.encode("utf-8")).hexdigest()
-        cache = ICAL_CACHE.get(tenant_id, {})
+        cache = ICAL_CACHE.get(tenant_id, None, {})
         if cache.get("hash") == ics_hash and not force:
             return {"synced": True, "changed": False, "vacancy_windows": json.loads(record.vacancy_windows or "[]")}
         booked_ranges = parse_ical_dates(ics_text)
@@ -3220,11 +4608,11 @@ def sync_ical_for_tenant(tenant_id, force=False, nightly_rate_override=None):
         record.potential_revenue = potential_revenue
         record.last_sync = now_iso()
         session.commit()
-        ICAL_CACHE[tenant_id] = {
+        ICAL_CACHE.set(tenant_id, None, {
             "hash": ics_hash,
             "etag": etag,
             "last_modified": last_modified,
-        }
+        })
     finally:
         session.close()
     if new_windows:
@@ -3262,28 +4650,33 @@ def translate_message(message, target_lang):
     return f"[{target_lang}] {message}"
 
 
-def get_event_queue(tenant_id):
-    with EVENT_LOCK:
-        if tenant_id not in EVENT_QUEUES:
-            EVENT_QUEUES[tenant_id] = queue.Queue()
-        return EVENT_QUEUES[tenant_id]
+# ── SSE broadcast hubs (/api/stream/leads, /api/stream/staff) ────────────────
+# One topic per tenant; every open stream gets every event through its own bounded
+# buffer, and a reconnect resumes from Last-Event-ID out of the history ring.
+# Event ids are the shared-state sequence, so they stay valid across workers; on the
+# wire they carry the state epoch (_TASK_CHANGE_LOG_EPOCH — per process in memory
+# mode, shared under the database backend), because the in-process sequence starts
+# over on restart and an old id would otherwise resume at the wrong place.
+SSE_HEARTBEAT_SEC = max(5, int(os.getenv("SSE_HEARTBEAT_SEC", "20") or 20))
+SSE_HISTORY_PER_TENANT = max(16, int(os.getenv("SSE_HISTORY_PER_TENANT", "256") or 256))
+SSE_SUBSCRIBER_BUFFER = max(8, int(os.getenv("SSE_SUBSCRIBER_BUFFER", "100") or 100))
+_LEADS_SSE_HUB = _sse_hub.SseHub(
+    "leads", history=SSE_HISTORY_PER_TENANT, buffer_size=SSE_SUBSCRIBER_BUFFER, baseline=_STATE_SEQ_BASELINE,
+)
+_STAFF_SSE_HUB = _sse_hub.SseHub(
+    "staff", history=SSE_HISTORY_PER_TENANT, buffer_size=SSE_SUBSCRIBER_BUFFER, baseline=_STATE_SEQ_BASELINE,
+)
 
 
 def enqueue_event(tenant_id, event_type, payload):
+    """Publish through the shared-state backend so the worker holding the SSE stream gets it."""
     event = {
         "type": event_type,
         "timestamp": now_iso(),
         "payload": payload,
         "tenant_id": tenant_id,
     }
-    get_event_queue(tenant_id).put(event)
-
-
-def get_staff_event_queue(tenant_id):
-    with STAFF_EVENT_LOCK:
-        if tenant_id not in STAFF_EVENT_QUEUES:
-            STAFF_EVENT_QUEUES[tenant_id] = queue.Queue()
-        return STAFF_EVENT_QUEUES[tenant_id]
+    _shared_state.publish("sse.leads", event)
 
 
 def enqueue_staff_event(tenant_id, event_type, payload):
@@ -3293,7 +4686,56 @@ def enqueue_staff_event(tenant_id, event_type, payload):
         "payload": payload,
         "tenant_id": tenant_id,
     }
-    get_staff_event_queue(tenant_id).put(event)
+    _shared_state.publish("sse.staff", event)
+
+
+def _deliver_lead_sse_event(msg):
+    event = msg.get("payload") or {}
+    _LEADS_SSE_HUB.publish(event.get("tenant_id"), event.get("type"), event.get("payload"), event_id=msg.get("seq"))
+    _REALTIME_NOTIFIER.notify(event.get("tenant_id"))
+
+
+def _deliver_staff_sse_event(msg):
+    event = msg.get("payload") or {}
+    _STAFF_SSE_HUB.publish(event.get("tenant_id"), event.get("type"), event.get("payload"), event_id=msg.get("seq"))
+    _REALTIME_NOTIFIER.notify(event.get("tenant_id"))
+
+
+def _sse_hub_response(hub, tenant_id, label):
+    """text/event-stream over a hub subscription: replay after Last-Event-ID, then live events + heartbeats."""
+    epoch = _TASK_CHANGE_LOG_EPOCH
+    last_event_id = _sse_hub.parse_last_event_id(
+        request.headers.get("Last-Event-ID") or request.args.get("last_event_id"), epoch
+    )
+
+    @stream_with_context
+    def event_stream():
+        sub = hub.subscribe(tenant_id, last_event_id)
+        print(f"[SSE {label}] stream open tenant={tenant_id!r} last_event_id={last_event_id}", flush=True)
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                events = sub.get(timeout=SSE_HEARTBEAT_SEC)
+                if not events:
+                    yield ": heartbeat\n\n"
+                    continue
+                for ev in events:
+                    yield _sse_hub.format_event(ev, epoch)
+        except GeneratorExit:
+            print(f"[SSE {label}] disconnect tenant={tenant_id!r}", flush=True)
+            raise
+        finally:
+            sub.close()
+
+    return Response(
+        event_stream(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+_shared_state.subscribe("sse.leads", _deliver_lead_sse_event)
+_shared_state.subscribe("sse.staff", _deliver_staff_sse_event)
 
 
 def get_tenant_id_from_request():
@@ -3546,22 +4988,21 @@ def _apply_staff_task_scope(identity, worker_filter_raw):
 
 
 def _property_tasks_query_for_tenant(session, tenant_id):
-    """Filter ORM query to tasks belonging to this tenant (legacy NULL → default tenant only)."""
+    """Filter ORM query to tasks belonging to this tenant — plain equality (tenant_id is NOT NULL,
+    legacy NULL rows were stamped by ensure_property_tasks_tenant_not_null)."""
     if not PropertyTaskModel:
         return None
-    q = session.query(PropertyTaskModel)
-    if tenant_id == DEFAULT_TENANT_ID:
-        q = q.filter(or_(PropertyTaskModel.tenant_id == tenant_id, PropertyTaskModel.tenant_id.is_(None)))
-    else:
-        q = q.filter(PropertyTaskModel.tenant_id == tenant_id)
-    return q
+    return session.query(PropertyTaskModel).filter(PropertyTaskModel.tenant_id == tenant_id)
 
 
 def _norm_task_status_category(status_val):
-    """Map DB status to pending | in_progress | done (aligned with frontend taskStatusRank)."""
+    """Map DB status to pending | in_progress | done | archived (aligned with frontend taskStatusRank).
+    Persisted as property_tasks.status_category — keep _PROPERTY_TASK_STATUS_CATEGORY_CASE_SQL in sync."""
     raw = (status_val or "").strip().lower().replace(" ", "_")
     if raw in ("done", "completed"):
         return "done"
+    if raw == "archived":
+        return "archived"
     if raw in (
         "accepted",
         "in_progress",
@@ -3576,10 +5017,63 @@ def _norm_task_status_category(status_val):
     return "pending"
 
 
+def _property_task_status_norm_sql():
+    """SQL twin of the row_status mapping in GET /api/property-tasks, lower-cased.
+
+    Accepted/seen/confirmed/started/assigned → in_progress, done/completed → done,
+    queued → pending, NULL → pending; anything else is passed through lower-cased.
+    """
+    st = func.lower(func.trim(func.coalesce(PropertyTaskModel.status, "Pending")))
+    return case(
+        (st.in_(("accepted", "seen", "confirmed", "started", "assigned")), "in_progress"),
+        (st.in_(("done", "completed")), "done"),
+        (st.in_(("pending", "queued", "")), "pending"),
+        else_=st,
+    )
+
+
+def _filter_property_tasks_query_sql(q, worker_filter, status_filter):
+    """Push the task-list filters into WHERE: archived rows, ?worker= and ?status=.
+
+    Mirrors _worker_name_matches_filter (substring either way; an empty staff_name or
+    assigned_to always matches) and the ?status=pending → Pending + Waiting rule, so a page
+    costs O(limit) instead of a full tenant scan followed by Python filtering.
+    """
+    q = q.filter(
+        or_(
+            PropertyTaskModel.status.is_(None),
+            func.lower(PropertyTaskModel.status) != "archived",
+        )
+    )
+    wf = (worker_filter or "").strip().lower()
+    if wf:
+        esc = wf.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        pat = f"%{esc}%"
+        sn = func.lower(func.coalesce(PropertyTaskModel.staff_name, ""))
+        at = func.lower(func.coalesce(PropertyTaskModel.assigned_to, ""))
+        wf_lit = literal(wf)
+        q = q.filter(
+            or_(
+                sn == "",
+                at == "",
+                sn.like(pat, escape="\\"),
+                at.like(pat, escape="\\"),
+                wf_lit.like(literal("%") + sn + literal("%")),
+                wf_lit.like(literal("%") + at + literal("%")),
+            )
+        )
+    sf = (status_filter or "").strip().lower()
+    if sf:
+        norm = _property_task_status_norm_sql()
+        if sf == "pending":
+            q = q.filter(norm.in_(("pending", "waiting")))
+        else:
+            q = q.filter(norm == sf)
+    return q
+
+
 def _task_property_filters_sql(tenant_id):
     """Match _property_tasks_query_for_tenant — raw SQL WHERE fragment (parameter :tenant_id)."""
-    if tenant_id == DEFAULT_TENANT_ID:
-        return "(tenant_id = :tenant_id OR tenant_id IS NULL OR tenant_id = '')"
     return "tenant_id = :tenant_id"
 
 
@@ -3636,6 +5130,10 @@ def ensure_property_tasks_reporting_indexes():
             CREATE INDEX IF NOT EXISTS idx_property_tasks_report_tenant_status
             ON property_tasks (tenant_id, status)
             """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_property_tasks_tenant_created_id
+            ON property_tasks (tenant_id, created_at DESC, id DESC)
+            """,
         ]
         with ENGINE.begin() as conn:
             for raw in stmts:
@@ -3653,30 +5151,35 @@ def _task_report_metrics_orm(session, tenant_id, start_iso, end_iso):
         return None
 
     def _tenant_clause(base):
-        if tenant_id == DEFAULT_TENANT_ID:
-            return base.filter(or_(PropertyTaskModel.tenant_id == tenant_id, PropertyTaskModel.tenant_id.is_(None)))
         return base.filter(PropertyTaskModel.tenant_id == tenant_id)
 
-    created_q = _tenant_clause(session.query(func.count(PropertyTaskModel.id))).filter(
-        PropertyTaskModel.created_at >= start_iso,
-        PropertyTaskModel.created_at < end_iso,
-    )
+    if _typed_time_ready("property_tasks"):
+        # Native timestamptz range predicates — sargable on idx_property_tasks_tenant_*_ts.
+        start_dt, end_dt = _parse_ts_for_column(start_iso), _parse_ts_for_column(end_iso)
+        created_rng = (PropertyTaskModel.created_ts >= start_dt, PropertyTaskModel.created_ts < end_dt)
+        completed_rng = (PropertyTaskModel.completed_ts >= start_dt, PropertyTaskModel.completed_ts < end_dt)
+    else:
+        created_rng = (PropertyTaskModel.created_at >= start_iso, PropertyTaskModel.created_at < end_iso)
+        completed_rng = (
+            PropertyTaskModel.completed_at.isnot(None),
+            PropertyTaskModel.completed_at != "",
+            PropertyTaskModel.completed_at >= start_iso,
+            PropertyTaskModel.completed_at < end_iso,
+        )
+
+    created_q = _tenant_clause(session.query(func.count(PropertyTaskModel.id))).filter(*created_rng)
     total_created = int(created_q.scalar() or 0)
 
     st_done = ("done", "completed", "Done", "Completed")
     completed_q = _tenant_clause(session.query(func.count(PropertyTaskModel.id))).filter(
         PropertyTaskModel.status.in_(st_done),
-        PropertyTaskModel.completed_at.isnot(None),
-        PropertyTaskModel.completed_at != "",
-        PropertyTaskModel.completed_at >= start_iso,
-        PropertyTaskModel.completed_at < end_iso,
+        *completed_rng,
     )
     total_completed = int(completed_q.scalar() or 0)
 
     norm_stat = func.lower(func.replace(PropertyTaskModel.status, " ", "_"))
     inprog_q = _tenant_clause(session.query(func.count(PropertyTaskModel.id))).filter(
-        PropertyTaskModel.created_at >= start_iso,
-        PropertyTaskModel.created_at < end_iso,
+        *created_rng,
         norm_stat.in_(_SENT_TO_STAFF_STATUS_KEYS),
     )
     total_in_progress = int(inprog_q.scalar() or 0)
@@ -3707,17 +5210,30 @@ def _task_report_series_raw(session, tenant_id, start_iso, end_iso, period):
                 trunc = "month"
             if trunc not in ("hour", "day", "month"):
                 trunc = "day"
-            q = text(f"""
-                SELECT date_trunc('{trunc}', created_at::timestamptz) AS bucket,
-                       COUNT(*)::bigint AS created_n
-                FROM property_tasks
-                WHERE ({tclause})
-                  AND created_at IS NOT NULL AND created_at != ''
-                  AND created_at::timestamptz >= CAST(:start_ts AS timestamptz)
-                  AND created_at::timestamptz < CAST(:end_ts AS timestamptz)
-                GROUP BY 1
-                ORDER BY 1
-            """)
+            if _typed_time_ready("property_tasks"):
+                # Typed column: no per-row ::timestamptz cast, so the (tenant_id, created_ts) index applies.
+                q = text(f"""
+                    SELECT date_trunc('{trunc}', created_ts) AS bucket,
+                           COUNT(*)::bigint AS created_n
+                    FROM property_tasks
+                    WHERE ({tclause})
+                      AND created_ts >= CAST(:start_ts AS timestamptz)
+                      AND created_ts < CAST(:end_ts AS timestamptz)
+                    GROUP BY 1
+                    ORDER BY 1
+                """)
+            else:
+                q = text(f"""
+                    SELECT date_trunc('{trunc}', created_at::timestamptz) AS bucket,
+                           COUNT(*)::bigint AS created_n
+                    FROM property_tasks
+                    WHERE ({tclause})
+                      AND created_at IS NOT NULL AND created_at != ''
+                      AND created_at::timestamptz >= CAST(:start_ts AS timestamptz)
+                      AND created_at::timestamptz < CAST(:end_ts AS timestamptz)
+                    GROUP BY 1
+                    ORDER BY 1
+                """)
             rows = session.execute(
                 q,
                 {"tenant_id": tenant_id, "start_ts": start_iso, "end_ts": end_iso},
@@ -3745,13 +5261,13 @@ def _task_report_series_raw(session, tenant_id, start_iso, end_iso, period):
         return []
 
 
-def _bazaar_open_cleaning_unit_indices(tenant_id):
+def _room_grid_open_cleaning_pins(tenant_id):
     """
-    Bazaar grid rooms are …-u1 … -u10. Descriptions use «ניקיון יחידה X/10».
-    Open Cleaning tasks (not Done) force those units to yellow (dirty) in the room grid.
+    {task_id: unit_id} for open Bazaar Cleaning tasks («ניקיון יחידה X/10», not Done) —
+    the units they force to yellow (dirty) in the room grid.  Loaded once per tenant by the
+    room-state model; task events keep it current afterwards.
     """
-    bazaar_id = "bazaar-jaffa-hotel"
-    out = set()
+    out = {}
     if not SessionLocal or not PropertyTaskModel:
         return out
     session = SessionLocal()
@@ -3760,104 +5276,73 @@ def _bazaar_open_cleaning_unit_indices(tenant_id):
         if q is None:
             return out
         rows = q.filter(
-            PropertyTaskModel.property_id == bazaar_id,
+            PropertyTaskModel.property_id == _ROOM_GRID_BAZAAR_ID,
             or_(PropertyTaskModel.task_type == "Cleaning", PropertyTaskModel.task_type == TASK_TYPE_CLEANING_HE),
-        ).all()
+            or_(PropertyTaskModel.status_category.is_(None), PropertyTaskModel.status_category != "done"),
+        ).with_entities(PropertyTaskModel.id, PropertyTaskModel.task_type, PropertyTaskModel.description).all()
         for row in rows:
-            if _norm_task_status_category(getattr(row, "status", None)) == "done":
-                continue
-            d = row.description or ""
-            m = re.search(r"יחידה\s*(\d+)\s*/\s*10", d)
-            if m:
-                u = int(m.group(1))
-                if 1 <= u <= 10:
-                    out.add(u)
+            unit = _room_grid_unit_for_task(_ROOM_GRID_BAZAAR_ID, row.task_type, None, row.description)
+            if unit:
+                out[row.id] = unit
     except Exception as e:
-        print(f"[_bazaar_open_cleaning_unit_indices] {e}", flush=True)
+        print(f"[_room_grid_open_cleaning_pins] {e}", flush=True)
     finally:
         session.close()
     return out
 
 
 def _task_status_counts_for_tenant(tenant_id):
-    """Live counts from property_tasks for Maya status answers (excludes archived — matches GET /api/tasks)."""
+    """Live counts from property_tasks for Maya status answers (excludes archived — matches GET /api/tasks).
+    Served from the in-memory status-category counters — no query on the hot path."""
     if not SessionLocal or not PropertyTaskModel:
         return None
-    session = SessionLocal()
-    try:
-        q = _property_tasks_query_for_tenant(session, tenant_id)
-        if q is None:
-            return None
-        q = q.filter(
-            or_(
-                PropertyTaskModel.status.is_(None),
-                func.lower(PropertyTaskModel.status) != "archived",
-            )
-        )
-        rows = q.all()
-        total = len(rows)
-        pending = in_progress = done = 0
-        for r in rows:
-            cat = _norm_task_status_category(getattr(r, "status", None))
-            if cat == "done":
-                done += 1
-            elif cat == "in_progress":
-                in_progress += 1
-            else:
-                pending += 1
-        return {"total": total, "pending": pending, "in_progress": in_progress, "done": done}
-    finally:
-        session.close()
-
-
-_MAYA_BAZAAR_METRICS_CACHE: dict = {}
-_MAYA_BAZAAR_METRICS_TTL: int = 45  # seconds — same as room inventory text cache
+    cats = _task_counter_snapshot("property_tasks", tenant_id or DEFAULT_TENANT_ID)
+    pending = int(cats.get("pending", 0))
+    in_progress = int(cats.get("in_progress", 0))
+    done = int(cats.get("done", 0))
+    total = pending + in_progress + done
+    return {"total": total, "pending": pending, "in_progress": in_progress, "done": done}
 
 
 def _maya_bazaar_61_room_metrics(tenant_id, user_id):
     """
     Authoritative occupancy for Maya: 61-unit operations grid (Bazaar + 14 ROOMS).
     Equivalent to counting rows with status 'occupied' in the synthetic 61-room inventory.
-    Occupancy % = (occupied / 61) * 100 when the grid total is 61.
-
-    Cached for _MAYA_BAZAAR_METRICS_TTL seconds to avoid re-calling _room_status_grid_payload
-    on every Maya turn (the room-inventory text cache already pays for the grid once; this
-    cache prevents a second independent DB round-trip from _maya_live_facts_system_block).
+    Occupancy % = (occupied / total) * 100 — total is the grid's own unit count (61).
+    Read from the room-state model's summary counters — no grid rebuild per Maya turn.
     """
-    _now = time.time()
-    _ck = tenant_id or "_"
-    _hit = _MAYA_BAZAAR_METRICS_CACHE.get(_ck)
-    if _hit and (_now - _hit["ts"]) < _MAYA_BAZAAR_METRICS_TTL:
-        return _hit["data"]
     try:
-        grid = _room_status_grid_payload(tenant_id, user_id)
-        s = grid.get("summary") or {}
-        occ = int(s.get("occupied") or 0)
-        tot = int(s.get("total") or 0)
-        dirty = int(s.get("dirty") or 0)
-        ready = int(s.get("ready") or 0)
-        if tot == 61:
-            pct = round((occ / 61.0) * 100.0, 1)
-        elif tot > 0:
-            pct = round((occ / float(tot)) * 100.0, 1)
-        else:
-            pct = 0.0
-        result = {
-            "occupied": occ,
-            "total": tot,
-            "dirty": dirty,
-            "ready": ready,
-            "occupancy_pct": pct,
-        }
-        _MAYA_BAZAAR_METRICS_CACHE[_ck] = {"data": result, "ts": _now}
-        return result
+        s = _room_status_grid_counts(tenant_id, user_id)["summary"]
     except Exception as e:
         print(f"[_maya_bazaar_61_room_metrics] {e}", flush=True)
         return None
+    occ = int(s.get("occupied") or 0)
+    tot = int(s.get("total") or 0)
+    dirty = int(s.get("dirty") or 0)
+    ready = int(s.get("ready") or 0)
+    if tot > 0:
+        pct = round((occ / float(tot)) * 100.0, 1)
+    else:
+        pct = 0.0
+    result = {
+        "occupied": occ,
+        "total": tot,
+        "dirty": dirty,
+        "ready": ready,
+        "occupancy_pct": pct,
+    }
+    return result
+
+
+_MAYA_LIVE_FACTS_CLOSING = (
+    "Answer like a luxury-hospitality GM: warm, concise, grounded in the numbers above; no robotic boilerplate."
+)
 
 
-def _maya_live_facts_system_block(tenant_id, user_id, stats_snapshot=None, user_message=None):
+def _maya_live_facts_system_block(tenant_id, user_id, stats_snapshot=None, user_message=None, include_knowledge=True):
     """Inject real DB + 61-unit grid + task/property search samples + PROPERTY_KNOWLEDGE (Gemini context).
+    include_knowledge=False leaves PROPERTY_KNOWLEDGE and the closing line out (maya-command budgets
+    knowledge as its own section, see _maya_live_data_block).
 
     When stats_snapshot already has task counts (from _build_maya_chat_stats_payload), we skip a fresh
     _task_status_counts_for_tenant query so the LLM sees one consistent set of numbers instead of two
@@ -3926,12 +5411,11 @@ def _maya_live_facts_system_block(tenant_id, user_id, stats_snapshot=None, user_
         )
     ):
         lines.append("Live DB thin in this turn — say you cannot see live rows; do not invent 80% or fake task lists.")
-    pk_ctx = _maya_property_knowledge_context_for_message(tenant_id, user_message or "")
+    pk_ctx = _maya_property_knowledge_context_for_message(tenant_id, user_message or "") if include_knowledge else ""
     if pk_ctx:
         lines.append(pk_ctx)
-    lines.append(
-        "Answer like a luxury-hospitality GM: warm, concise, grounded in the numbers above; no robotic boilerplate."
-    )
+    if include_knowledge:
+        lines.append(_MAYA_LIVE_FACTS_CLOSING)
     return "\n".join(lines)
 
 
@@ -4217,8 +5701,8 @@ def _places_place_details(place_id):
         return None
 
 
-def _pk_structure_with_gemini(display_name: str, research_blob: str) -> dict:
-    """Optional: turn messy text into labelled fields (offices/rules/pricing/location)."""
+def _pk_structure_with_gemini(display_name: str, research_blob: str, tenant_id=None) -> dict:
+    """Optional: turn messy text into labelled fields (offices/rules/pricing/location).  Admitted by _LLM_GATE."""
     if not (research_blob or "").strip():
         return {}
     prompt = (
@@ -4241,33 +5725,23 @@ def _pk_structure_with_gemini(display_name: str, research_blob: str) -> dict:
         "branded (e.g. WeWork London); otherwise Hebrew or bilingual as fits. No markdown."
     )
     _json_sys = "You output only valid minified JSON objects."
+    if not _USE_NEW_GENAI or not (os.getenv("GEMINI_API_KEY", "").strip() or _GEMINI_API_KEY):
+        return {}
+
+    def _call_model(model_name):
+        model = _gemini_model_instance(model_name, _json_sys, temperature=0.2, max_output_tokens=1024)
+        text = _safe_gemini_text(model.generate_content(prompt), label="_pk_structure_with_gemini").strip()
+        if not text:
+            raise ValueError(f"[Gemini] {model_name} returned empty/blocked response (property knowledge)")
+        return text
+
     try:
-        raw = ""
-        if _USE_NEW_GENAI:
-            live_key = os.getenv("GEMINI_API_KEY", "").strip() or _GEMINI_API_KEY
-            if not live_key:
-                return {}
-            if live_key != getattr(genai, "_configured_key", None):
-                genai.configure(api_key=live_key)
-                genai._configured_key = live_key
-                _gemini_invalidate_model_cache()
-            for model_name in _gemini_model_candidates():
-                try:
-                    model = genai.GenerativeModel(
-                        model_name=model_name,
-                        system_instruction=_json_sys,
-                        generation_config=genai.types.GenerationConfig(temperature=0.2, max_output_tokens=1024),
-                    )
-                    resp = model.generate_content(prompt)
-                    raw = _safe_gemini_text(resp, label="_pk_structure_with_gemini").strip()
-                    break
-                except Exception as e:
-                    if _gemini_err_is_model_not_found(e):
-                        continue
-                    print(f"[_pk_structure_with_gemini] {model_name}: {e}", flush=True)
-                    break
-        else:
-            return {}
+        _gemini_ensure_configured()
+        # Same health-ordered chain + breakers as Maya turns; one model at a time (no hedge).
+        raw = _llm_gated(
+            tenant_id, _llm_gate.INTERACTIVE, prompt, _json_sys,
+            lambda: _gemini_run_candidates(_call_model, " (property knowledge)"),
+        )
         if raw.startswith("```"):
             raw = re.sub(r"^```(?:json)?\s*", "", raw)
             raw = re.sub(r"\s*```$", "", raw)
@@ -4365,7 +5839,7 @@ def acquire_property_knowledge(tenant_id, display_name, source_url=None):
         )
     research_blob = "\n\n".join(blob_parts)
 
-    structured = _pk_structure_with_gemini(disp, research_blob)
+    structured = _pk_structure_with_gemini(disp, research_blob, tenant_id=tenant_id)
     summary = (structured.get("summary") or "").strip()
     if not summary and place:
         summary = f"{place.get('name') or disp} — {place.get('formatted_address') or ''}".strip()[:400]
@@ -4573,18 +6047,18 @@ def _maya_task_board_status_reply(tenant_id, user_id=None):
     pct = m["occupancy_pct"]
     if random.random() < 0.5:
         return (
-            f"קובי, כרגע יש לנו {occ} חדרים תפוסים מתוך 61 בפורטפוליו ({pct}% תפוסה), "
+            f"קובי, כרגע יש לנו {occ} חדרים תפוסים מתוך {m['total']} בפורטפוליו ({pct}% תפוסה), "
             f"ו-{open_tasks} משימות פתוחות בלוח. אני על זה!"
         )
     return (
-        f"קובי, מהמצב: תפוסה בלוח החדרים {pct}% ({occ}/61), "
+        f"קובי, מהמצב: תפוסה בלוח החדרים {pct}% ({occ}/{m['total']}), "
         f"ובמשימות — {open_tasks} פתוחות מתוך {c['total']}. אני מנטרת את זה."
     )
 
 
 def _maya_whats_happening_reply(tenant_id):
     """Grounded 'מה קורה עכשיו?' from last Live Ops Engine lines (same feed as activity-feed)."""
-    items = [e for e in _ACTIVITY_LOG if (e.get("text") or "").strip()]
+    items = [e for e in _ACTIVITY_LOG.recent(tenant_id, 20) if (e.get("text") or "").strip()]
     if items:
         last = items[-1]
         t = (last.get("text") or "").strip()
@@ -5247,8 +6721,14 @@ def _maya_log_timing(
     prompt_chars: int = 0,
     sse: bool = False,
     model: str = "",
+    stages=None,
+    degraded=None,
+    prompt=None,
+    system=None,
 ):
-    """One-line structured latency log for Maya (terminal / log aggregation)."""
+    """One-line structured latency log for Maya (terminal / log aggregation).
+    db_ms is the wall time of context assembly; stages maps each context stage to its own ms;
+    prompt / system are prompt_budget size reports of the user prompt and the live-data block."""
     parts = [
         f"intent={intent!r}",
         f"total_ms={int(total_ms)}",
@@ -5264,6 +6744,15 @@ def _maya_log_timing(
     ]
     if model:
         parts.append(f"model={model!r}")
+    if stages:
+        parts.append("stages=" + ",".join(f"{k}:{int(v)}" for k, v in stages.items()))
+    if degraded:
+        parts.append("degraded=" + ",".join(f"{k}:{v}" for k, v in degraded.items()))
+    for label, size in (("prompt", prompt), ("system", system)):
+        if size:
+            parts.append(f"{label}_tokens_est={size.get('tokens_est', 0)}")
+            if size.get("trimmed"):
+                parts.append(f"{label}_trimmed=" + ",".join(f"{k}:{v}" for k, v in size["trimmed"].items()))
     print("[MayaTiming] " + " ".join(parts), flush=True)
 
 
@@ -5623,13 +7112,14 @@ def _maya_kobi_tasks_reply(tenant_id=None, user_id=None):
     pct = m["occupancy_pct"]
     return (
         f"היי קובי, יש לנו {total_t} משימות בלוח, "
-        f"ובפורטפוליו {occ_n} חדרים תפוסים מתוך 61 ({pct}% תפוסה לפי לוח החדרים). הכל מסונכרן."
+        f"ובפורטפוליו {occ_n} חדרים תפוסים מתוך {m['total']} ({pct}% תפוסה לפי לוח החדרים). הכל מסונכרן."
     )
 
 
-def _invalidate_owner_dashboard_cache():
-    _OWNER_DASHBOARD_CACHE["ts"] = 0.0
-    _OWNER_DASHBOARD_CACHE["payload"] = None
+def _invalidate_owner_dashboard_cache(tenant_id=None, version=None):
+    _OWNER_DASHBOARD_CACHE.invalidate(tenant_id)
+    _OWNER_DASHBOARD_KPI_CACHE.invalidate(tenant_id)
+    _bump_data_version("dashboard", tenant_id, version)
 
 
 def _task_escalation_fields(r):
@@ -5825,7 +7315,7 @@ def _send_whatsapp_inner(to_number, message, media_url=None, _retries=3):
     if TWILIO_SIMULATE:
         preview = (message or "")[:80]
         print("[Twilio SIMULATE mode] - message print to terminal | WhatsApp ->", to, "|", preview)
-        _ACTIVITY_LOG.append({
+        _log_activity({
             "id": str(uuid.uuid4()),
             "ts": int(time.time() * 1000),   # milliseconds — matches JS Date.now()
             "type": "whatsapp",
@@ -5877,7 +7367,7 @@ def _send_sms_inner(to_number, message, _retries=3):
     if TWILIO_SIMULATE:
         preview = (message or "")[:80]
         print("[Twilio SIMULATE mode] - message print to terminal | SMS ->", to, "|", preview)
-        _ACTIVITY_LOG.append({
+        _log_activity({
             "id": str(uuid.uuid4()),
             "ts": int(time.time() * 1000),
             "type": "sms",
@@ -6031,8 +7521,6 @@ def reset_bazaar_jaffa_variety_100(tenant_id=DEFAULT_TENANT_ID):
         session.commit()
 
         _BAZAAR_VARIETY_100_RESET_DONE = True
-        _bump_tasks_version()
-        _invalidate_owner_dashboard_cache()
         print(
             f"[reset_bazaar_jaffa_variety_100] replaced Bazaar tasks (deleted={deleted}); "
             f"inserted 100 (10 In_Progress, 5 Done) batch={batch}",
@@ -6062,7 +7550,7 @@ def make_voice_call(to_number, message_he=None):
     if TWILIO_SIMULATE:
         preview = say_text[:80]
         print("[Twilio SIMULATE mode] - message print to terminal | Voice ->", to, "|", preview)
-        _ACTIVITY_LOG.append({
+        _log_activity({
             "id": str(uuid.uuid4()),
             "ts": int(time.time() * 1000),
             "type": "voice",
@@ -6522,6 +8010,94 @@ def upsert_staff(tenant_id, staff_id, name=None, phone=None, language=None, phot
         session.close()
 
 
+# ── Property staff directory ─────────────────────────────────────────────────
+# Task list enrichment, Maya's rooms+staff context and the stats summary all
+# need the property_staff rows for every property a tenant owns.  Querying one
+# property at a time is an N+1 against Supabase (hundreds of round trips for a
+# large portfolio), so they share this directory instead: missing properties
+# are loaded with a single IN query and kept per tenant until a committed
+# staff.changed event calls _invalidate_property_staff_directory (the TTL is a
+# backstop for raw-SQL writes that bypass the ORM).
+_PROPERTY_STAFF_DIRECTORY: dict = {}
+_PROPERTY_STAFF_DIRECTORY_TTL: int = 1800  # seconds
+_PROPERTY_STAFF_DIRECTORY_LOCK = threading.Lock()
+_PROPERTY_STAFF_IN_CHUNK = 500  # keep IN lists well under driver parameter limits
+
+
+def _property_staff_directory_row(s) -> dict:
+    return {
+        "id": s.id,
+        "property_id": s.property_id,
+        "name": s.name,
+        "role": s.role or "Staff",
+        "department": getattr(s, "department", None),
+        "branch_slug": getattr(s, "branch_slug", None),
+        "phone_number": getattr(s, "phone_number", None),
+    }
+
+
+def _get_property_staff_directory(tenant_id, property_ids, session=None) -> dict:
+    """
+    Return {property_id: [staff dict, ...]} for property_ids (every requested id
+    is present, with an empty list when the property has no staff).
+    Properties not yet cached for the tenant are fetched in one IN query; pass
+    ``session`` to reuse the caller's connection.
+    """
+    tid = tenant_id or DEFAULT_TENANT_ID
+    wanted = [str(p) for p in dict.fromkeys(property_ids or []) if p]
+    if not wanted:
+        return {}
+    now = time.time()
+    with _PROPERTY_STAFF_DIRECTORY_LOCK:
+        entry = _PROPERTY_STAFF_DIRECTORY.get(tid)
+        if entry is None or (now - entry["ts"]) >= _PROPERTY_STAFF_DIRECTORY_TTL:
+            entry = {"ts": now, "by_property": {}, "gen": (entry or {}).get("gen", 0) + 1}
+            _PROPERTY_STAFF_DIRECTORY[tid] = entry
+        by_property = entry["by_property"]
+        missing = [p for p in wanted if p not in by_property]
+        gen = entry["gen"]
+        if not missing:
+            return {p: list(by_property[p]) for p in wanted}
+
+    loaded = {p: [] for p in missing}
+    if SessionLocal and PropertyStaffModel:
+        own_session = session is None
+        sess = SessionLocal() if own_session else session
+        try:
+            for i in range(0, len(missing), _PROPERTY_STAFF_IN_CHUNK):
+                chunk = missing[i:i + _PROPERTY_STAFF_IN_CHUNK]
+                for s in sess.query(PropertyStaffModel).filter(PropertyStaffModel.property_id.in_(chunk)).all():
+                    loaded.setdefault(s.property_id, []).append(_property_staff_directory_row(s))
+        except Exception as e:
+            print(f"[property_staff_directory] load failed: {e}", flush=True)
+            return {p: list(by_property.get(p) or loaded.get(p) or []) for p in wanted}
+        finally:
+            if own_session:
+                sess.close()
+
+    with _PROPERTY_STAFF_DIRECTORY_LOCK:
+        entry = _PROPERTY_STAFF_DIRECTORY.get(tid)
+        # Only publish if nobody invalidated the tenant while we were querying.
+        if entry is not None and entry["gen"] == gen:
+            entry["by_property"].update(loaded)
+        merged = dict(by_property)
+    merged.update(loaded)
+    return {p: list(merged.get(p) or []) for p in wanted}
+
+
+def _invalidate_property_staff_directory(tenant_id=None):
+    """Drop the cached staff directory (one tenant, or all when tenant_id is None)."""
+    with _PROPERTY_STAFF_DIRECTORY_LOCK:
+        if tenant_id is None:
+            keys = list(_PROPERTY_STAFF_DIRECTORY)
+        else:
+            keys = [tenant_id]
+        for k in keys:
+            entry = _PROPERTY_STAFF_DIRECTORY.get(k)
+            if entry is not None:
+                _PROPERTY_STAFF_DIRECTORY[k] = {"ts": 0, "by_property": {}, "gen": entry["gen"] + 1}
+
+
 def _maya_register_staff_from_action(tenant_id: str, user_id: str, staff_obj: dict, rooms: list):
     """
     Handle action:register_staff from the LLM.
@@ -7003,15 +8579,35 @@ def _absolutize_property_image_url(purl: str, tenant_id: str) -> str:
 def list_manual_rooms(tenant_id, owner_id=None):
     """Return list of dicts. When owner_id is set, only return properties owned by that user.
     Demo/guest sessions (owner_id starts with 'demo-') skip the owner filter so they can
-    see all properties in the tenant — needed for the God Mode dashboard and client demos."""
+    see all properties in the tenant — needed for the God Mode dashboard and client demos.
+    Served from the property catalogue cache; every call gets its own copies to mutate."""
     if not SessionLocal or not ManualRoomModel:
         return []
+    # Skip owner filter for demo sessions so all properties remain visible
+    is_demo_session = owner_id is not None and str(owner_id).startswith("demo-")
+    scope = None if owner_id is None or is_demo_session else owner_id
+    rooms = _PROPERTY_CATALOGUE_CACHE.get_or_load(
+        tenant_id, (scope, _data_version("rooms", tenant_id)),
+        lambda: _load_property_catalogue(tenant_id, scope),
+    )
+    return [_copy_catalogue_room(r) for r in rooms]
+
+
+def _copy_catalogue_room(room):
+    out = dict(room)
+    out["pictures"] = list(room["pictures"])
+    if isinstance(room["amenities"], (list, dict)):
+        out["amenities"] = copy.copy(room["amenities"])
+    return out
+
+
+def _load_property_catalogue(tenant_id, owner_id):
+    """manual_rooms rows for one tenant (owner_id None = all) as finished property dicts:
+    amenities parsed, gallery split out of the description, photo URLs absolutised."""
     session = SessionLocal()
     try:
         q = session.query(ManualRoomModel).filter_by(tenant_id=tenant_id)
-        # Skip owner filter for demo sessions so all properties remain visible
-        is_demo_session = owner_id is not None and str(owner_id).startswith("demo-")
-        if owner_id is not None and not is_demo_session:
+        if owner_id is not None:
             q = q.filter(or_(ManualRoomModel.owner_id.is_(None), ManualRoomModel.owner_id == owner_id))
         rows = q.all()
         out = []
@@ -7204,10 +8800,10 @@ def _default_portfolio_seed_rooms():
     return rows
 
 
-def _grid_dirty_slots_from_occ(occ_pct, n_total=61):
+def _grid_dirty_slots_from_occ(occ_pct, n_total):
     """
-    Map simulated occupancy to global dirty/cleaning slot count for the 61-unit grid.
-    Previously used fixed 10% of 61 (=6 dirty) — pilot refresh must move this number.
+    Map simulated occupancy to global dirty/cleaning slot count for an n_total-unit grid.
+    Previously used fixed 10% of the units (=6 dirty of 61) — pilot refresh must move this number.
     """
     occ_pct = float(max(0.0, min(100.0, float(occ_pct))))
     n_occ = int(round(n_total * occ_pct / 100.0))
@@ -7219,11 +8815,11 @@ def _grid_dirty_slots_from_occ(occ_pct, n_total=61):
     return n_dirty, n_occ, rem
 
 
-def _room_status_grid_payload(tenant_id, user_id):
+def _room_grid_layout(tenant_id, user_id):
     """
-    61 room units across 15 properties (Bazaar 10 + 14×ROOMS with 3–4 units each).
-    Status mix: ~80% occupied (red), ~10% ready (green), ~10% cleaning/dirty (yellow).
-    Heavy seed/assign runs on startup + Maya autonomous loop — omitted here for <500ms cached loads.
+    61 room units across 15 properties (Bazaar 10 + 14×ROOMS with 3–4 units each), in grid
+    order, without statuses — the room-state model assigns those.  Built once per tenant +
+    owner scope; room.* events rebuild it.  info carries the Bazaar «grid_dirty=N» override.
     """
     props = list_manual_rooms(tenant_id, owner_id=user_id)
     if not props:
@@ -7235,24 +8831,19 @@ def _room_status_grid_payload(tenant_id, user_id):
         for row in _default_portfolio_seed_rooms():
             if isinstance(row, dict) and row.get("id"):
                 prop_by_id.setdefault(row["id"], _ensure_room_image_urls(dict(row)))
-    bazaar_id = "bazaar-jaffa-hotel"
+    bazaar_id = _ROOM_GRID_BAZAAR_ID
     non_bazaar = sorted([pid for pid in prop_by_id.keys() if pid != bazaar_id])
     counts_tail = [4] * 9 + [3] * 5
     room_counts = [(bazaar_id, 10)] + list(zip(non_bazaar[:14], counts_tail))
     rooms_out = []
-    room_idx = 0
-    n_total = 61
-    occ_pct = float(get_daily_stats()["occupancy_pct"])
-    p_bazaar = prop_by_id.get(bazaar_id) or {}
-    st_b = str(p_bazaar.get("status") or "")
+    grid_dirty = None
+    st_b = str((prop_by_id.get(bazaar_id) or {}).get("status") or "")
     m_gd = re.search(r"grid_dirty=(\d+)", st_b, re.I)
-    n_dirty, n_occ, _rem = _grid_dirty_slots_from_occ(occ_pct, n_total)
     if m_gd:
         try:
-            n_dirty = max(0, min(_rem, int(m_gd.group(1))))
+            grid_dirty = int(m_gd.group(1))
         except Exception:
             pass
-    # ready = remainder after occupied + dirty
     acro_id = "rooms-branch-acro-tlv"
     for pid, n in room_counts:
         p = prop_by_id.get(pid) or {}
@@ -7263,13 +8854,6 @@ def _room_status_grid_payload(tenant_id, user_id):
             p.get("id"),
         )
         for j in range(n):
-            room_idx += 1
-            if room_idx <= n_occ:
-                status = "occupied"
-            elif room_idx <= n_occ + n_dirty:
-                status = "dirty"
-            else:
-                status = "ready"
             if pid == bazaar_id:
                 if j < 4:
                     label = f"Bazaar · Standard Queen {j + 1:02d}"
@@ -7284,40 +8868,64 @@ def _room_status_grid_payload(tenant_id, user_id):
                 label = f"ROOMS Acro TLV · Office/Meeting {j + 1}"
             else:
                 label = f"{pname} · Unit {j + 1}"
-            guest = "Demo Guest" if status == "occupied" else None
             rooms_out.append(
                 {
                     "id": f"{pid}-u{j + 1}",
                     "name": label,
                     "property_id": pid,
                     "property_name": pname,
-                    "status": status,
+                    "status": "ready",
                     "beds": 1 if int(p.get("bedrooms") or 1) == 0 else 2,
                     "bedrooms": max(1, int(p.get("bedrooms") or 1)),
                     "photo_url": photo,
-                    "guest": guest,
+                    "guest": None,
                 }
             )
-    # Live link: open Cleaning tasks for Bazaar → unit goes yellow (dirty / בניקיון)
-    dirty_units = _bazaar_open_cleaning_unit_indices(tenant_id)
-    if dirty_units:
-        for r in rooms_out:
-            if r.get("property_id") != bazaar_id:
-                continue
-            rid = str(r.get("id") or "")
-            mu = re.search(r"-u(\d+)$", rid)
-            if not mu:
-                continue
-            u = int(mu.group(1))
-            if u in dirty_units:
-                r["status"] = "dirty"
-                r["guest"] = None
-    summary = {"ready": 0, "occupied": 0, "dirty": 0, "total": len(rooms_out)}
-    for r in rooms_out:
-        st = r.get("status")
-        if st in summary:
-            summary[st] += 1
-    return {"rooms": rooms_out, "summary": summary}
+    return rooms_out, {"grid_dirty": grid_dirty}
+
+
+def _room_grid_split(info, n_total):
+    """(occupied, dirty) counts of the grid's n_total units from the live occupancy %
+    (get_daily_stats) and the Bazaar grid_dirty override; ready = remainder.  Re-read on
+    every view — O(1)."""
+    occ_pct = float(get_daily_stats()["occupancy_pct"])
+    n_dirty, n_occ, _rem = _grid_dirty_slots_from_occ(occ_pct, n_total)
+    if info.get("grid_dirty") is not None:
+        n_dirty = max(0, min(_rem, int(info["grid_dirty"])))
+    return n_occ, n_dirty
+
+
+def _room_grid_view(tenant_id, user_id, rooms=True):
+    # Demo sessions and tenant-wide callers see every property (see list_manual_rooms).
+    scope = None if user_id is None or str(user_id).startswith("demo-") else str(user_id)
+    return _ROOM_STATE.view(
+        tenant_id, scope,
+        build=lambda: _room_grid_layout(tenant_id, user_id),
+        split_for=_room_grid_split,
+        load_pins=lambda: _room_grid_open_cleaning_pins(tenant_id),
+        rooms=rooms,
+    )
+
+
+def _room_status_grid_payload(tenant_id, user_id):
+    """
+    61 room units across 15 properties (Bazaar 10 + 14×ROOMS with 3–4 units each).
+    Status mix: ~80% occupied (red), ~10% ready (green), ~10% cleaning/dirty (yellow);
+    open Bazaar Cleaning tasks force their unit to dirty (בניקיון).
+    Served from the room-state model — only the row copies are O(units).
+    """
+    view = _room_grid_view(tenant_id, user_id)
+    return {"rooms": view["rooms"], "summary": view["summary"]}
+
+
+def _room_status_grid_counts(tenant_id, user_id):
+    """{"summary", "by_property"} — the grid's counters without copying the rows."""
+    return _room_grid_view(tenant_id, user_id, rooms=False)
+
+
+def _room_grid_total(tenant_id, user_id=None):
+    """Unit count of the tenant's grid (summary counter — no rows copied)."""
+    return int(_room_status_grid_counts(tenant_id, user_id)["summary"].get("total") or 0)
 
 
 def _upcoming_bookings_payload(tenant_id, user_id):
@@ -7390,41 +8998,26 @@ def _upcoming_bookings_payload(tenant_id, user_id):
     return {"bookings": out[:15]}
 
 
-_ROOM_INVENTORY_TEXT_CACHE: dict = {}
-_ROOM_INVENTORY_TEXT_TTL: int = 45  # seconds — stale is fine for LLM context
+def _room_inventory_block_line(counts, title, suffix=""):
+    """One "<title>: N units — x Occupied, y Ready, z Dirty" line from room-state per-property counts."""
+    if not counts or not counts.get("total"):
+        return ""
+    return (
+        f"{title}: {counts['total']} units — {counts['occupied']} Occupied, {counts['ready']} Ready, "
+        f"{counts['dirty']} Dirty{suffix}."
+    )
 
 
 def _build_maya_room_inventory_text(tenant_id, user_id):
     """Compact lines for Gemini: Bazaar + ROOMS Acro room counts by status (Occupied/Ready/Dirty).
-    Result is cached for _ROOM_INVENTORY_TEXT_TTL seconds so consecutive Maya messages skip the
-    _room_status_grid_payload DB call entirely."""
-    _now = time.time()
-    _ck = tenant_id or "_"
-    _hit = _ROOM_INVENTORY_TEXT_CACHE.get(_ck)
-    if _hit and (_now - _hit["ts"]) < _ROOM_INVENTORY_TEXT_TTL:
-        return _hit["text"]
-    data = _room_status_grid_payload(tenant_id, user_id)
-    rooms = data.get("rooms") or []
-
-    def _lines_for(pid, title):
-        block = [r for r in rooms if r.get("property_id") == pid]
-        if not block:
-            return ""
-        occ = sum(1 for r in block if r.get("status") == "occupied")
-        rd = sum(1 for r in block if r.get("status") == "ready")
-        dirty = sum(1 for r in block if r.get("status") == "dirty")
-        return (
-            f"{title}: {len(block)} units — {occ} Occupied, {rd} Ready, {dirty} Dirty "
-            f"(portfolio ~80% occupancy target)."
-        )
-
+    Per-property counters come straight from the room-state model — no grid rebuild."""
+    by_property = _room_status_grid_counts(tenant_id, user_id)["by_property"]
+    suffix = " (portfolio ~80% occupancy target)"
     parts = [
-        _lines_for("bazaar-jaffa-hotel", "Hotel Bazaar Jaffa"),
-        _lines_for("rooms-branch-acro-tlv", "ROOMS Acro TLV"),
+        _room_inventory_block_line(by_property.get(_ROOM_GRID_BAZAAR_ID), "Hotel Bazaar Jaffa", suffix),
+        _room_inventory_block_line(by_property.get("rooms-branch-acro-tlv"), "ROOMS Acro TLV", suffix),
     ]
-    result = " ".join(p for p in parts if p)
-    _ROOM_INVENTORY_TEXT_CACHE[_ck] = {"text": result, "ts": _now}
-    return result
+    return " ".join(p for p in parts if p)
 
 
 def initial_tasks():
@@ -7657,11 +9250,6 @@ def _maya_mark_property_task_done(tenant_id, task_id, user_id=None):
         if hasattr(task, "completed_at"):
             task.completed_at = now_iso()
         session.commit()
-        _bump_tasks_version()
-        try:
-            _invalidate_owner_dashboard_cache()
-        except Exception:
-            pass
         try:
             dshort = ((getattr(task, "description", None) or "")[:100]).strip()
             _push_activity(
@@ -7774,16 +9362,21 @@ def _escalate_stale_red_tasks(tenant_id=DEFAULT_TENANT_ID):
         q = _property_tasks_query_for_tenant(session, tenant_id)
         if q is None:
             return 0
-        rows = q.filter(PropertyTaskModel.status == "Pending").all()
+        q = q.filter(PropertyTaskModel.status == "Pending")
+        typed = _typed_time_ready("property_tasks")
+        if typed:
+            q = q.filter(PropertyTaskModel.created_ts <= cutoff)
+        rows = q.all()
         assignees = ("Goni", "Alma")
         for i, t in enumerate(rows):
-            ca = parse_iso_datetime(getattr(t, "created_at", None) or "")
-            if ca is None:
-                continue
-            if ca.tzinfo is None:
-                ca = ca.replace(tzinfo=timezone.utc)
-            if ca > cutoff:
-                continue
+            if not typed:
+                ca = parse_iso_datetime(getattr(t, "created_at", None) or "")
+                if ca is None:
+                    continue
+                if ca.tzinfo is None:
+                    ca = ca.replace(tzinfo=timezone.utc)
+                if ca > cutoff:
+                    continue
             name = assignees[i % 2]
             t.status = "In_Progress"
             t.staff_name = name
@@ -7794,8 +9387,6 @@ def _escalate_stale_red_tasks(tenant_id=DEFAULT_TENANT_ID):
             n += 1
         if n:
             session.commit()
-            _bump_tasks_version()
-            _invalidate_owner_dashboard_cache()
             _sim_log(f"⚡ Escalated {n} stale Pending task(s) to In_Progress (Goni/Alma)", "warn")
             print(f"[MayaAutonomous] escalated {n} stale red tasks to orange", flush=True)
     except Exception as e:
@@ -7841,18 +9432,16 @@ def _generate_periodic_property_task(tenant_id=DEFAULT_TENANT_ID):
         )
         session.add(row)
         session.commit()
-        _bump_tasks_version()
-        _invalidate_owner_dashboard_cache()
         room_hint = re.search(r"(\d{3})", desc) or re.search(r"חדר\s*(\d+)", desc)
         room_part = f"חדר {room_hint.group(1)}" if room_hint else (pname or "הנכס")
         maya_he = f"בדיוק נוספה משימת ניקיון ל{room_part}! ({desc[:60]})"
-        _ACTIVITY_LOG.append({
+        _log_activity({
             "id": str(uuid.uuid4()),
             "ts": int(time.time() * 1000),
             "type": "task_created",
             "text": maya_he,
             "task": {"id": tid, "description": desc, "property_name": pname, "status": "Pending"},
-        })
+        }, tenant_id)
         print(f"[MayaAutonomous] generated task {tid}", flush=True)
         return tid
     except Exception as e:
@@ -7916,11 +9505,6 @@ def _insert_random_maintenance_task(tenant_id=DEFAULT_TENANT_ID):
             )
         )
         session.commit()
-        _bump_tasks_version()
-        try:
-            _invalidate_owner_dashboard_cache()
-        except Exception:
-            pass
         try:
             _push_activity(
                 {
@@ -7949,6 +9533,9 @@ def _live_ops_engine_loop():
     while True:
         _t.sleep(10)
         try:
+            # One engine for the whole deployment, whichever worker holds the lease.
+            if not _shared_state.backend().try_lease("live_ops_engine", 45):
+                continue
             tid = DEFAULT_TENANT_ID
             now = time.time()
             global _MAINT_GEN_LAST
@@ -7980,10 +9567,6 @@ def _live_ops_engine_loop():
                 if now - _LIVE_ENGINE_TICK.get("bulk", 0) >= 120:
                     _LIVE_ENGINE_TICK["bulk"] = now
                     advance_simulation_task_statuses(tid, log_hebrew=True)
-            try:
-                _invalidate_owner_dashboard_cache()
-            except Exception:
-                pass
         except Exception as e:
             print(f"[LiveOpsEngine] {e}", flush=True)
 
@@ -8011,12 +9594,6 @@ def purge_synthetic_property_tasks(tenant_id=DEFAULT_TENANT_ID):
         )
         n = q.delete(synchronize_session=False)
         session.commit()
-        if n:
-            _bump_tasks_version()
-            try:
-                _invalidate_owner_dashboard_cache()
-            except Exception:
-                pass
         if n:
             print(f"[purge_synthetic_property_tasks] deleted {n} rows (tenant={tenant_id})", flush=True)
         return {"deleted": n}
@@ -8269,8 +9846,6 @@ def ensure_bazaar_emergency_live_tasks(tenant_id=DEFAULT_TENANT_ID):
             added += 1
         if added:
             session.commit()
-            _bump_tasks_version()
-            _invalidate_owner_dashboard_cache()
             print(f"[ensure_bazaar_emergency_live_tasks] inserted {added} emergency Bazaar task(s)", flush=True)
     except Exception as e:
         session.rollback()
@@ -8316,11 +9891,6 @@ def ensure_min_property_tasks_volume(tenant_id=DEFAULT_TENANT_ID, minimum=100):
                 )
             )
         session.commit()
-        _bump_tasks_version()
-        try:
-            _invalidate_owner_dashboard_cache()
-        except Exception:
-            pass
         print(
             f"[ensure_min_property_tasks_volume] inserted {need} rows (tenant total ≥ {minimum})",
             flush=True,
@@ -9600,12 +11170,12 @@ def run_maya_checkout_reminders_for_today():
                 task_type="Service",
             ))
             created += 1
-            _ACTIVITY_LOG.append({
+            _log_activity({
                 "id": str(uuid.uuid4()),
                 "ts": int(time.time() * 1000),
                 "type": "maya_checkout_reminder",
                 "text": f"🔔 מאיה: {desc}",
-            })
+            }, tenant_id)
         if created:
             session.commit()
             print(f"[Maya] Checkout reminders created: {created}", flush=True)
@@ -9704,7 +11274,7 @@ def _generate_demo_complaints(count=5):
                 description=full_desc, status="Pending", created_at=now_iso(),
                 property_name=prop.name, staff_name=staff_name, staff_phone=ms["phone"],
             ))
-            _ACTIVITY_LOG.append({
+            _log_activity({
                 "id": str(uuid.uuid4()),
                 "ts": int(time.time() * 1000),
                 "type": "task_created",
@@ -9746,7 +11316,7 @@ def _mock_staff_auto_respond():
             task.completed_at = now_iso()
             task.worker_notes = note
             task.photo_url    = DEMO_PLACEHOLDER_IMAGE
-            _ACTIVITY_LOG.append({
+            _log_activity({
                 "id":   str(uuid.uuid4()),
                 "ts":   int(time.time() * 1000),
                 "type": "task_created",
@@ -9994,6 +11564,12 @@ def _run_vip_escalation_tick():
         if q is None:
             return
         now = datetime.now(timezone.utc)
+        if _typed_time_ready("property_tasks"):
+            q = q.filter(
+                PropertyTaskModel.status_category != "done",
+                func.lower(PropertyTaskModel.task_type).like("%vip%"),
+                PropertyTaskModel.created_ts <= now - timedelta(minutes=VIP_ESCALATION_MINUTES),
+            )
         for r in q.all():
             st = _norm_task_status_category(getattr(r, "status", None))
             if st == "done":
@@ -10007,7 +11583,7 @@ def _run_vip_escalation_tick():
             notes = (getattr(r, "worker_notes", "") or "")
             if "[ESCALATED]" in notes:
                 continue
-            created = _parse_task_iso_dt(getattr(r, "created_at", None))
+            created = _ts_as_utc(getattr(r, "created_ts", None)) or _parse_task_iso_dt(getattr(r, "created_at", None))
             if not created:
                 continue
             if created.tzinfo is None:
@@ -10167,25 +11743,37 @@ def field_staff_activity():
     except (TypeError, ValueError):
         lim = 40
     tenant_id = getattr(request, "tenant_id", DEFAULT_TENANT_ID)
-    matched = [
-        e for e in _ACTIVITY_LOG
-        if e.get("type") == "staff_field_status" and e.get("tenant_id") == tenant_id
-    ]
-    matched.sort(key=lambda e: e.get("ts", 0), reverse=True)
+    matched = [e for e in reversed(_ACTIVITY_LOG.since(tenant_id)) if e.get("type") == "staff_field_status"]
     return jsonify({"events": matched[:lim]})
 
 
 @app.route("/api/activity-feed", methods=["GET"])
 def activity_feed():
     """
-    Returns the last N simulate/task events from _ACTIVITY_LOG.
-    MayaChat.js polls this every 4 s and shows new entries as Maya messages.
-    Query param:  ?since=<unix_ms>   — only return entries newer than this timestamp.
+    Returns the tenant's simulate/task events from _ACTIVITY_LOG (oldest first).
+    MayaChat.js shows new entries as Maya messages.
+    Query params:  ?cursor=<seq>     — only entries after this seq (``cursor`` in the reply)
+                   ?since=<unix_ms>  — only entries newer than this timestamp (legacy)
     """
-    since_ms = float(request.args.get("since", 0) or 0)
+    try:
+        tenant_id = get_tenant_id_from_request() or DEFAULT_TENANT_ID
+    except Exception:
+        tenant_id = DEFAULT_TENANT_ID
+    try:
+        cursor = int(request.args["cursor"]) if request.args.get("cursor") else None
+        since_ms = float(request.args.get("since", 0) or 0)
+    except ValueError:
+        return jsonify({"error": "invalid cursor / since"}), 400
     now_ms = int(time.time() * 1000)
-    events = [e for e in _ACTIVITY_LOG if e.get("ts", 0) > since_ms]
-    return jsonify({"events": list(events), "server_ts": now_ms})
+    if cursor is not None:
+        events = _ACTIVITY_LOG.since(tenant_id, cursor=cursor)
+    else:
+        events = _ACTIVITY_LOG.since(tenant_id, since_ts=since_ms)
+    return jsonify({
+        "events": events,
+        "server_ts": now_ms,
+        "cursor": events[-1]["seq"] if events else max(cursor or 0, _ACTIVITY_LOG.last_seq(tenant_id)),
+    })
 
 
 @app.route("/api/demo/status", methods=["GET"])
@@ -10424,8 +12012,9 @@ def sim_log_endpoint():
     Query param: ?limit=50
     """
     limit   = min(int(request.args.get("limit", 50)), 200)
-    entries = list(_SIM_LOG)[-limit:]
-    return jsonify({"entries": list(reversed(entries)), "count": len(_SIM_LOG)})
+    snapshot = _SIM_LOG.snapshot()
+    entries = snapshot[-limit:]
+    return jsonify({"entries": list(reversed(entries)), "count": len(snapshot)})
 
 
 @app.route("/api/god-mode/overview", methods=["GET"])
@@ -11066,8 +12655,6 @@ def sync_ical_prep_checkin_tasks(tenant_id, ical_url, property_id=None):
             assign_stuck_property_tasks(tenant_id)
         except Exception:
             pass
-        _bump_tasks_version()
-        _invalidate_owner_dashboard_cache()
         return out
     finally:
         session.close()
@@ -11794,9 +13381,7 @@ def create_property():
         if not room:
             return jsonify({"error": "Failed to create property"}), 500
         try:
-            _STATUS_GRID_CACHE["ts"] = 0.0
-            _STATUS_GRID_CACHE["payload"] = None
-            _STATUS_GRID_CACHE["key"] = None
+            _invalidate_status_grid_cache()
         except Exception:
             pass
         return jsonify({"ok": True, "property": room}), 201
@@ -11911,9 +13496,7 @@ def update_property(property_id):
             _upd_int("bathrooms", "bathrooms", 1)
             session.commit()
             try:
-                _STATUS_GRID_CACHE["ts"] = 0.0
-                _STATUS_GRID_CACHE["payload"] = None
-                _STATUS_GRID_CACHE["key"] = None
+                _invalidate_status_grid_cache()
             except Exception:
                 pass
             rooms = list_manual_rooms(tenant_id, owner_id=None)
@@ -11986,9 +13569,7 @@ def delete_property(property_id):
         session.delete(room)
         session.commit()
         try:
-            _STATUS_GRID_CACHE["ts"] = 0.0
-            _STATUS_GRID_CACHE["payload"] = None
-            _STATUS_GRID_CACHE["key"] = None
+            _invalidate_status_grid_cache()
         except Exception:
             pass
         return jsonify({"ok": True, "deleted": pid}), 200
@@ -12374,26 +13955,25 @@ def api_rooms_status_grid():
     except Exception:
         pass
     refresh = (request.args.get("refresh") or "").strip().lower() in ("1", "true", "yes", "force")
-    cache_key = f"{tenant_id}:{user_id}"
-    now = time.time()
-    c = _STATUS_GRID_CACHE
     identity_pii = _auth_identity_for_pii()
-    if (
-        not refresh
-        and c["payload"] is not None
-        and c["key"] == cache_key
-        and (now - float(c["ts"] or 0)) < STATUS_GRID_CACHE_TTL_SEC
-    ):
-        out = copy.deepcopy(c["payload"])
-        _redact_room_grid_payload(out, identity_pii)
-        return _no_cache_json(jsonify(out)), 200
-    payload = _room_status_grid_payload(tenant_id, user_id)
-    c["ts"] = now
-    c["key"] = cache_key
-    c["payload"] = payload
+    # The cached payload is only reused under the ETag it was built for, so a 304 never
+    # pins a client to a payload older than the versions the tag claims.
+    data_etag = _tenant_data_etag(
+        "status-grid", tenant_id, ("rooms", "grid"),
+        user_id, get_daily_stats().get("generated_at"),
+        ttl_bucket_sec=STATUS_GRID_CACHE_TTL_SEC,
+    )
+    etag = _tenant_data_etag("status-grid-view", tenant_id, (), data_etag, identity_pii.get("app_role"))
+    if not refresh and _etag_matches_request(etag):
+        return _not_modified(etag)
+    payload = _STATUS_GRID_CACHE.get_or_load(
+        tenant_id, (user_id, data_etag),
+        lambda: _room_status_grid_payload(tenant_id, user_id),
+        refresh=refresh,
+    )
     out = copy.deepcopy(payload)
     _redact_room_grid_payload(out, identity_pii)
-    return _no_cache_json(jsonify(out)), 200
+    return _revalidate_json(_no_cache_json(jsonify(out)), etag), 200
 
 
 @app.route("/api/bookings/upcoming", methods=["GET", "OPTIONS"])
@@ -12687,23 +14267,18 @@ def _maya_create_property_task_from_room_problem(tenant_id, user_id, command):
         assign_stuck_property_tasks(tenant_id)
     except Exception:
         pass
-    try:
-        _bump_tasks_version()
-        _invalidate_owner_dashboard_cache()
-    except Exception:
-        pass
     try:
         _maya_memory_log_turn(tenant_id, command or "", display)
     except Exception:
         pass
     try:
-        _ACTIVITY_LOG.append({
+        _log_activity({
             "id": str(uuid.uuid4()),
             "ts": int(time.time() * 1000),
             "type": "task_created",
             "text": f"משימת תחזוקה: חדר {room_num}",
             "task": task,
-        })
+        }, tenant_id)
     except Exception:
         pass
     return {
@@ -13015,10 +14590,7 @@ def _create_task_from_gemini(tenant_id, user_id, gemini_result, rooms, staff_by_
             PropertyTaskModel.description == (desc or ""),
             PropertyTaskModel.created_at >= cutoff_str,
         )
-        if tenant_id == DEFAULT_TENANT_ID:
-            _dup_q = _dup_q.filter(or_(PropertyTaskModel.tenant_id == tenant_id, PropertyTaskModel.tenant_id.is_(None)))
-        else:
-            _dup_q = _dup_q.filter(PropertyTaskModel.tenant_id == tenant_id)
+        _dup_q = _dup_q.filter(PropertyTaskModel.tenant_id == tenant_id)
         dup = _dup_q.first()
         if dup:
             print(f"DEBUG: Maya decided to SKIP (duplicate) task for room {room_log} — already created at {dup.created_at}")
@@ -13167,7 +14739,7 @@ def _daily_action_plan_for_tenant(tenant_id, user_id):
                 f"Start with: קובי, הנה תוכנית הפעולה ליום היום — לפי תפוסה של ~{occupancy_pct}% בכל הפורטפוליו. "
                 "Reference property names. Max 1200 characters."
             )
-            return _gemini_generate(prompt, timeout=22)
+            return _gemini_generate(prompt, timeout=22, tenant_id=tenant_id, priority=_llm_gate.BACKGROUND)
         except Exception as _e:
             print("[DailyPlan] Gemini:", _e)
     lines = [f"קובי, הנה תוכנית הפעולה ליום היום — תפוסה ~{occupancy_pct}% ב-{n_props} נכסים:"]
@@ -13267,7 +14839,7 @@ def _morning_brief_for_tenant(tenant_id, user_id):
                 f"Cleaning idea to weave in: {cleaning_block} "
                 "Max 1600 characters. No tech jargon."
             )
-            return _gemini_generate(prompt, timeout=28)
+            return _gemini_generate(prompt, timeout=28, tenant_id=tenant_id, priority=_llm_gate.BACKGROUND)
         except Exception as _me:
             print("[MorningBrief] Gemini:", _me)
 
@@ -13377,6 +14949,136 @@ def _maya_clamp_done_language_when_zero(total_tasks, display_msg, parsed=None):
     )
 
 
+_MAYA_TASK_KEYWORDS = (
+    "תקלה", "בעיה", "דליפה", "נזילה", "קצר", "חשמל", "ניקיון", "תחזוקה", "תקן", "תתקן",
+    "נשרף", "נשרפה", "מנורה", "מנקה", "לשלוח", "fix", "repair", "clean", "broken", "leak",
+)
+_MAYA_QUESTION_PREFIXES = (
+    "מי ", "מה ", "\u05d0\u05d9\u05da ", "כמה ", "למה ", "מתי ", "איפה ",
+    "who ", "what ", "when ", "why ", "how ", "where ",
+)
+# Work orders the LLM turns into add_task / register_staff / create_work_shift /
+# send_whatsapp_onboarding / mark_task_done — never answered from the answer cache.
+_MAYA_ACTION_COMMAND_MARKERS = (
+    "פתח משימה", "תפתח", "הוסף", "תוסיף", "רשום", "תרשום", "שלח", "תשלח", "צור", "תיצור", "שבץ", "תשבץ",
+    "בוצע", "סיימתי", "סגור", "תסגור", "קליטה",
+    "open a task", "add ", "register", "send", "create", "schedule", "assign", "mark ", "done", "onboard",
+)
+
+
+def _maya_command_is_task_like(command) -> bool:
+    cmd = command or ""
+    cmd_lower = cmd.lower().strip()
+    return any(kw in cmd or kw in cmd_lower for kw in _MAYA_TASK_KEYWORDS)
+
+
+def _maya_command_looks_like_question(command) -> bool:
+    cmd = command or ""
+    q_low = cmd.lower().strip()
+    return (
+        "?" in cmd
+        or any(q_low.startswith(p) or f" {p}" in q_low for p in _MAYA_QUESTION_PREFIXES)
+        or "how many" in q_low
+        or "מחובר" in cmd
+        or ("מאיה" in cmd and ("שומעת" in cmd or "כאן" in cmd or "עובד" in cmd))
+    )
+
+
+def _count_maya_answer(outcome):
+    with _MAYA_ANSWER_CACHE_COUNTS_LOCK:
+        _MAYA_ANSWER_CACHE_COUNTS[outcome] += 1
+
+
+def _maya_answer_cache_counts():
+    with _MAYA_ANSWER_CACHE_COUNTS_LOCK:
+        return dict(_MAYA_ANSWER_CACHE_COUNTS)
+
+
+def _maya_answer_cache_key(tenant_id, user_id, command, history, stats_snapshot):
+    """
+    Answer-cache key for one Maya question, or None when it must reach the model:
+    work orders and live-calendar / lead questions.
+    The digest covers what the live-facts block and STATS_JSON are built from — task /
+    room / booking / staff / knowledge versions, the tenant's activity-log position
+    (RECENT_LIVE_OPS_LINES), the grid summary and the snapshot's counts — so any data
+    change yields a new key.  The last user and Maya turns join the digest too, so a
+    context-dependent question ("ומה איתו?", "and the second one?") is only answered from a
+    conversation that led up to it the same way.  Older history and long-term memory are
+    left out: they shape tone, not the facts of the answer.
+    """
+    if MAYA_ANSWER_CACHE_TTL_SEC <= 0:
+        return None
+    norm = re.sub(r"\s+", " ", (command or "").strip().lower()).rstrip(" ?!.…")
+    intent = _maya_truth.classify_maya_intent(command or "")[0] if _maya_truth else ""
+    if (
+        not norm
+        or (_maya_truth and intent in (
+            _maya_truth.INTENT_AVAILABILITY, _maya_truth.INTENT_GUEST_LEAD, _maya_truth.INTENT_OPERATIONAL_TASK,
+        ))
+        or any(m in norm for m in _MAYA_ACTION_COMMAND_MARKERS)
+        or (_maya_command_is_task_like(command) and not _maya_command_looks_like_question(command))
+    ):
+        _count_maya_answer("bypassed")
+        return None
+    last_turns = {}
+    for turn in reversed(history if isinstance(history, list) else []):
+        if not isinstance(turn, dict):
+            continue
+        role = "user" if (turn.get("role") or "user").lower() == "user" else "maya"
+        last_turns.setdefault(role, (turn.get("content") or "").strip()[-500:])
+        if len(last_turns) == 2:
+            break
+    try:
+        grid = _room_status_grid_counts(tenant_id, user_id).get("summary") or {}
+    except Exception:
+        grid = {}
+    snap = stats_snapshot if isinstance(stats_snapshot, dict) else {}
+    facts = {
+        "v": {d: _data_version(d, tenant_id) for d in ("tasks", "rooms", "bookings", "staff", "knowledge")},
+        "ops": _ACTIVITY_LOG.last_seq(tenant_id),
+        "grid": grid,
+        "snap": [snap.get(k) for k in ("total_tasks", "tasks_by_status", "occupancy_pct", "context_scope_hint")],
+        "turns": last_turns,
+    }
+    digest = hashlib.sha1(json.dumps(facts, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:20]
+    return (user_id or "", norm, intent, digest)
+
+
+def _maya_answer_cache_store(tenant_id, key, result, degraded=None):
+    """
+    Keep pure answers (info / prose, nothing executed) under key; the stored dict is never handed out.
+    An answer built while a context stage fell back (degraded) saw partial facts — not stored.
+    """
+    if key is None or not isinstance(result, dict):
+        return
+    action = ((result.get("parsed") or {}).get("action") or "") if isinstance(result.get("parsed"), dict) else ""
+    if (
+        degraded
+        or result.get("success") is not True
+        or result.get("brainFailure")
+        or result.get("taskCreated")
+        or result.get("task")
+        or action not in ("", "info")
+    ):
+        _count_maya_answer("not_stored")
+        return
+    _MAYA_ANSWER_CACHE.set(tenant_id, key, copy.deepcopy(result))
+    _count_maya_answer("stored")
+
+
+def _maya_answer_cache_lookup(tenant_id, key, command):
+    """Cached answer for key (a fresh copy flagged answerCache="hit"), logged to Maya memory like a live reply."""
+    if key is None:
+        return None
+    hit = _MAYA_ANSWER_CACHE.get(tenant_id, key)
+    if hit is None:
+        return None
+    body = copy.deepcopy(hit)
+    body["answerCache"] = "hit"
+    _maya_memory_log_turn(tenant_id, command or "", body.get("message") or "")
+    return body
+
+
 def _maya_build_json_response_from_llm_output(
     tenant_id,
     user_id,
@@ -13434,28 +15136,8 @@ def _maya_build_json_response_from_llm_output(
     task_created = False
     task = None
 
-    cmd_lower = (command or "").lower().strip()
-    task_keywords = [
-        "תקלה", "בעיה", "דליפה", "נזילה", "קצר", "חשמל", "ניקיון", "תחזוקה", "תקן", "תתקן",
-        "נשרף", "נשרפה", "מנורה", "מנקה", "לשלוח", "fix", "repair", "clean", "broken", "leak",
-    ]
-    is_task_like = any(kw in (command or "") or kw in cmd_lower for kw in task_keywords)
-    _q_low = cmd_lower
-    _how_he = "\u05d0\u05d9\u05da "
-    _q_prefixes = (
-        "מי ", "מה ", _how_he, "כמה ", "למה ", "מתי ", "איפה ",
-        "who ", "what ", "when ", "why ", "how ", "where ",
-    )
-    looks_like_question = (
-        "?" in (command or "")
-        or any(_q_low.startswith(p) or f" {p}" in _q_low for p in _q_prefixes)
-        or "how many" in _q_low
-        or "מחובר" in (command or "")
-        or (
-            "מאיה" in (command or "")
-            and ("שומעת" in (command or "") or "כאן" in (command or "") or "עובד" in (command or ""))
-        )
-    )
+    is_task_like = _maya_command_is_task_like(command)
+    looks_like_question = _maya_command_looks_like_question(command)
     if (
         parsed
         and is_task_like
@@ -13786,6 +15468,155 @@ def _maya_build_json_response_from_llm_output(
     })
 
 
+# ── Maya command prompt ──────────────────────────────────────────────────────
+# Static head / rules of the maya-command prompt, built once.  The variable sections
+# between them go through prompt_budget.py: each has its own character budget, and
+# when the whole prompt is over MAYA_PROMPT_BUDGET_CHARS the lowest-priority sections
+# (memory transcript first) are cut further.  Verified truth-layer facts and the user
+# turn are never cut below their own budget; STATS_JSON is trimmed by whole entries to
+# MAYA_STATS_JSON_BUDGET_CHARS before assembly so it always stays parseable.
+MAYA_PROMPT_BUDGET_CHARS = int(os.getenv("MAYA_PROMPT_BUDGET_CHARS", "24000") or 24000)
+MAYA_STATS_JSON_BUDGET_CHARS = int(os.getenv("MAYA_STATS_JSON_BUDGET_CHARS", "9000") or 9000)
+_MAYA_STATS_TRIM_LISTS = ("recent_open_tasks", "recent_completed_snapshot", "recent_bookings")
+MAYA_LIVE_DATA_BUDGET_CHARS = int(os.getenv("MAYA_LIVE_DATA_BUDGET_CHARS", "10000") or 10000)
+_MAYA_COMMAND_PROMPT_HEAD = """LUXURY HOSPITALITY + OPS — You are Maya (GM-level). First infer intent: (A) service request → tasks; (B) question about operations → search STATS_JSON + the LIVE DATA SEARCH_TOOL only, reply as "info"; (C) small talk / empathy → "info", warm and brief, no task.
+ANALYST MODE — Authoritative snapshot (same data as GET /api/stats). Ground every factual claim in STATS_JSON and SEARCH_TOOL; never invent occupancy %, task counts, or staff names.
+STATS_JSON.recent_open_tasks: ONLY non-completed property_tasks (Pending / In_Progress / etc.) — capped for speed; use these ids for mark_task_done.
+STATS_JSON.recent_completed_snapshot: tasks already Done in the DB — NEVER say these are still open or "in progress".
+STATS_JSON.tasks_digest: one-line counts; use with total_tasks for "how many open" answers.
+If STATS_JSON.context_scope_hint is set (e.g. bazaar), answer ONLY about that site — do not enumerate unrelated properties.
+If the user asks "מה המצב?" or similar: cite total_tasks / total_active_tasks and tasks_by_status from STATS_JSON exactly. Mention occupancy only if STATS_JSON.occupancy_pct is a number (use that value); never say "~80%" or a default percentage.
+If the user asks what just happened in the field, prefer paraphrasing RECENT_LIVE_OPS_LINES (real Hebrew lines from the live ops engine).
+Pure questions (Who? When? Why? How many?) must get action "info" — never add_task unless the user also gives a clear work order.
+Do not open with boilerplate about "the board is back" or "I'm here" — answer directly.
+
+"""
+_MAYA_COMMAND_PROMPT_RULES = """HARD RULES (override anything above):
+1. CALENDAR / AVAILABILITY: If LIVE_CALENDAR appears in TRUTH_LAYER_POLICY, cite it and NEVER say "לא בדקתי", "I haven't checked", or "אין לי גישה ללוח". If no LIVE_CALENDAR block is present, say "אין לי נתוני הזמנות זמינים כרגע — בדוק ישירות במערכת ההזמנות" — short, honest, not "I can't".
+2. STAFF: Use register_staff / send_whatsapp_onboarding actions when user requests staff operations. Never say "I can't add staff via chat" — execute the action.
+3. SHIFTS: Use create_work_shift when user requests scheduling. Execute the action.
+4. COUNTS: Never contradict the task count from STATS_JSON.total_tasks within the same response.
+
+Remember: the portfolio has 61 room units across 15 properties. Hotel Bazaar Jaffa includes Standard Queen, Deluxe Gallery, and Jaffa Suite room types. Address Kobi only by name. Do not claim a task was completed unless you return mark_task_done with a valid task_id.
+
+Classify and return ONLY valid JSON (no extra text):
+
+• SINGLE task:
+  {"action":"add_task","task":{"staffName":"Alma|Kobi|Avi","content":"<FULL specific description in Hebrew>","propertyName":"<exact name from list or best match>","task_type":"ניקיון חדר|תחזוקה|שירות|צ'ק-אין","priority":"normal|high","status":"Pending"}}
+
+• MULTIPLE tasks (quantity OR multiple rooms/issues mentioned):
+  {"action":"add_tasks","tasks":[<task_obj>, <task_obj>, ...]}
+  Produce exactly as many task objects as requested. Each gets its own propertyName and content.
+
+• Information / question / small talk:
+  {"action":"info","message":"<warm, concise answer; match user language; for chat without ops, stay human — no fake task counts>"}
+
+• Property or room is UNCLEAR / not in the property list (include when unsure which hotel: Bazaar Jaffa vs Leonardo City Tower Ramat Gan):
+  {"action":"clarify","question":"באיזה מלון או אתר מדובר — בזאר יפו, סיטי טאוור רמת גן, או רומס סקיי טאוור? אני צריכה פרט מדויק כדי לפתוח את המשימה."}
+
+• Mark task DONE (user confirmed work finished, or you are closing a specific open task — REQUIRED so property_tasks updates in the DB):
+  {"action":"mark_task_done","task_id":"<uuid from STATS_JSON.recent_open_tasks>","message":"<short Hebrew confirmation>","match_description":"<optional substring of task description if task_id unknown>"}
+
+• Register a NEW staff member (use ONLY when user explicitly asks to add/register staff AND provides a name):
+  {"action":"register_staff","staff":{"name":"<full name>","phone":"<phone with country code, optional>","role":"<מנקה|מתחזק|מנהל|קבלה|Staff>","property_name":"<exact property name or omit>"}}
+  Triggers: "הוסף עובד", "register [name] as [role]", "add [name]", "רשום עובד חדש". If no name given, ask with action:"info".
+
+• Send WhatsApp onboarding/welcome message to staff or guest:
+  {"action":"send_whatsapp_onboarding","phone":"<phone number>","name":"<recipient name>","message":"<custom message or leave empty for default>"}
+  Triggers: "שלח הודעת קליטה", "send onboarding to [name]", "צור קשר עם [name] בוואטסאפ".
+
+• Create a work shift / schedule a staff member:
+  {"action":"create_work_shift","shift":{"employee_name":"<name>","time_slot":"<e.g. 08:00-16:00>","date":"<YYYY-MM-DD or description>","property_name":"<property or omit>"}}
+  Triggers: "צור משמרת", "שבץ [name]", "create shift for [name]", "schedule [name] on [date/time]".
+  IMPORTANT: When LIVE_CALENDAR data is present in TRUTH_LAYER_POLICY, use those booking details to
+  choose a shift that does not conflict with existing check-ins/check-outs.
+
+Rules:
+- content MUST be the full intent (e.g. "תיקון נזילה מהברז ב-302" not just "תיקון"). Include room number and hotel when known.
+- task_type: ניקיון חדר=ניקיון/housekeeping | תחזוקה=תיקון/נזילה/תחזוקה | שירות=everything else | צ'ק-אין=הכנת חדר/כניסת אורח
+- priority: "high" if דחוף/בהול/urgent/asap/critical — else "normal"
+- staffName: Alma→ניקיון חדר | Kobi→תחזוקה | Avi→חשמל(מנורה/קצר)
+- propertyName: match to the exact property name from the list (Hotel Bazaar Jaffa OR Leonardo Plaza City Tower). Pool questions: Bazaar has no pool; City Tower has seasonal rooftop pool — reflect that in "info" messages.
+- NEVER invent a property name or use "Unknown" / "חדר לא ידוע".
+- STAFF REGISTRATION: Use register_staff ONLY when user provides a name AND explicitly asks to add/register. For bulk/complex HR changes, use action:"info" directing to Dashboard → Settings → Staff.
+- BOOKING / AVAILABILITY: When LIVE_CALENDAR appears in TRUTH_LAYER_POLICY, it means fetch_calendar_availability was executed and you MUST cite those exact results. NEVER say "לא בדקתי", "I haven't checked", or "אין לי גישה" when LIVE_CALENDAR is present — you have already checked. When LIVE_CALENDAR is absent, say "אין לי נתוני הזמנות מאומתים לתאריך זה — בדוק ישירות." and use action:"info".
+- PURE QUESTIONS (offices? pricing? how many rooms? who is fastest? any question ending in '?'): ALWAYS return action:"info" — NEVER return add_task for a question unless the message also contains an explicit work order ("תקן", "שלח", "פתח משימה", "clean", "fix", etc.). Returning add_task for an informational question is a critical error.
+- COUNTS CONSISTENCY: Use STATS_JSON.total_tasks as the single authoritative open-task count. Do not report a different number elsewhere in the same response."""
+
+
+def _maya_stats_json(snapshot, budget=MAYA_STATS_JSON_BUDGET_CHARS):
+    """
+    STATS_JSON text of at most budget chars that is always valid JSON: the longest recent_* list
+    loses entries from its tail (counts and totals stay whole), and stats_trimmed tells the model
+    how many were left out.  Past that only the scalar facts, tasks_by_status and stats_trimmed are kept.
+    """
+    snap = dict(snapshot) if isinstance(snapshot, dict) else {}
+    text = json.dumps(snap, ensure_ascii=False, default=str)
+    if len(text) <= budget:
+        return text
+    lists = {k: list(snap[k]) for k in _MAYA_STATS_TRIM_LISTS if isinstance(snap.get(k), list)}
+    dropped = {}
+    while len(text) > budget and any(lists.values()):
+        k = max(lists, key=lambda name: len(lists[name]))
+        n = max(1, len(lists[k]) // 4)
+        del lists[k][-n:]
+        dropped[k] = dropped.get(k, 0) + n
+        snap[k] = lists[k]
+        snap["stats_trimmed"] = dropped
+        text = json.dumps(snap, ensure_ascii=False, default=str)
+    if len(text) > budget:
+        snap = {k: v for k, v in snap.items() if k in ("tasks_by_status", "stats_trimmed") or not isinstance(v, (list, dict))}
+        text = json.dumps(snap, ensure_ascii=False, default=str)
+    return text
+
+
+def _maya_command_prompt(*, command, stats_json, recent_ops_json, history_lines, properties, summary,
+                         room_inventory, memory_block, recall_block, truth_injection):
+    """(prompt, size report) for POST /ai/maya-command — sections in the order the model has always seen them."""
+    mem_label, mem_body = _maya_split_block_label(memory_block)
+    recall_label, recall_body = _maya_split_block_label(recall_block)
+    S = _prompt_budget.Section
+    sections = [
+        S("head", _MAYA_COMMAND_PROMPT_HEAD),
+        # Already trimmed structurally (_maya_stats_json) — a character cut would leave invalid JSON.
+        S("stats", stats_json, prefix="STATS_JSON: ", sep="\n\n"),
+        S("recent_ops", recent_ops_json, budget=1500, priority=2,
+          prefix="RECENT_LIVE_OPS_LINES (newest last): ", sep="\n\n"),
+        S("history", "\n".join(history_lines), budget=6000, priority=3, floor=1000, keep="tail",
+          prefix="\nPrevious conversation:\n" if history_lines else "", sep="\n\n" if history_lines else ""),
+        S("user", command, budget=4000, prefix='User request: "', sep='"\n\n'),
+        S("properties", properties, budget=2000, priority=5, floor=600, prefix="Available properties: [", sep="]\n\n"),
+        S("summary", summary, budget=4000, priority=3, floor=800,
+          prefix="Live portfolio summary (staff + rooms):\n", sep="\n\n"),
+        S("inventory", room_inventory or "Sync portfolio seed if empty.", budget=3000, priority=3, floor=600,
+          prefix="Room inventory (61 units, Bazaar + 14 ROOMS; Occupied / Ready / Dirty — use for room-status questions):\n",
+          sep="\n\n"),
+        S("memory", mem_body, budget=8000, priority=1, floor=1500, keep="tail", prefix=mem_label, sep="\n\n"),
+        S("recall", recall_body, budget=3000, priority=2, prefix=recall_label, sep="\n\n"),
+        S("truth", truth_injection, budget=8000, sep="\n\n" if truth_injection else ""),
+        S("rules", _MAYA_COMMAND_PROMPT_RULES),
+    ]
+    return _prompt_budget.build(sections, MAYA_PROMPT_BUDGET_CHARS)
+
+
+def _maya_live_data_block(live_facts, knowledge):
+    """(extra_system, size report) — live facts + PROPERTY_KNOWLEDGE under MAYA_LIVE_DATA_BUDGET_CHARS."""
+    S = _prompt_budget.Section
+    return _prompt_budget.build([
+        S("live_facts", live_facts, budget=7000, priority=2, floor=2500),
+        S("knowledge", knowledge, budget=5000, priority=1, floor=1000, prefix="\n" if knowledge else ""),
+        S("closing", _MAYA_LIVE_FACTS_CLOSING, prefix="\n"),
+    ], MAYA_LIVE_DATA_BUDGET_CHARS)
+
+
+def _maya_split_block_label(block):
+    """("Label:\n", body) for the memory / recall blocks, so a trimmed transcript keeps its heading."""
+    if not block:
+        return "", ""
+    label, nl, body = block.partition("\n")
+    return (label + nl, body) if label.rstrip().endswith(":") else ("", block)
+
+
 @app.route("/api/chat", methods=["POST", "OPTIONS"])
 @app.route("/api/ai/maya-command", methods=["POST", "OPTIONS"])
 @cross_origin(origins="*", allow_headers=["Content-Type", "Authorization", "X-Tenant-Id"], methods=["GET", "POST", "OPTIONS"])
@@ -13802,6 +15633,7 @@ def ai_maya_command():
             tenant_id, user_id = DEFAULT_TENANT_ID, f"demo-{DEFAULT_TENANT_ID}"
         else:
             return jsonify({"error": "Unauthorized", "success": False}), 401
+    _req_t0 = time.perf_counter()
     data = request.get_json(silent=True) or {}
     command = _scrub_maya_input_text((data.get("command") or data.get("message") or ""))
     tasks_for_analysis = data.get("tasksForAnalysis")
@@ -13834,14 +15666,9 @@ def ai_maya_command():
         # Include the scope hint in the cache key so a scoped ("bazaar") query
         # doesn't serve stale all-properties data to an unscoped ("כמה משימות?") query.
         _scope = _maya_detect_site_scope_hint(command or "")
-        _cache_key = f"{tenant_id}:{_scope}"
-        _now = time.time()
-        _hit = _MAYA_STATS_CACHE.get(_cache_key)
-        if _hit and (_now - _hit["ts"]) < _MAYA_STATS_CACHE_TTL:
-            maya_stats_snapshot = _hit["data"]
-        else:
-            maya_stats_snapshot = _build_maya_chat_stats_payload(tenant_id, user_id, command)
-            _MAYA_STATS_CACHE[_cache_key] = {"data": maya_stats_snapshot, "ts": _now}
+        maya_stats_snapshot = _MAYA_STATS_CACHE.get_or_load(
+            tenant_id, _scope, lambda: _build_maya_chat_stats_payload(tenant_id, user_id, command)
+        )
         _total_property_task_rows = int(maya_stats_snapshot.get("total_property_tasks_all") or 0)
         _open_task_count = int(maya_stats_snapshot.get("total_tasks") or 0)
 
@@ -13913,7 +15740,9 @@ def ai_maya_command():
 
     # Compute stats snapshot once here so all early-exit count replies use the same figures as the LLM path.
     # This eliminates double-query drift where _maya_task_board_status_reply and the LLM see different totals.
+    _stats_t0 = time.perf_counter()
     _ensure_maya_chat_stats()
+    _stats_ms = int((time.perf_counter() - _stats_t0) * 1000)
 
     # High priority: live DB + 61-unit Bazaar portfolio grid (before any canned / static replies)
     _st_early = (command or "").strip()
@@ -14288,13 +16117,13 @@ def ai_maya_command():
                 notify_ok = False
             display = "אני על זה! 🧹 מנקה נשלח לחדר " + room_num + " ✅"
             display = _maya_notice_whatsapp_may_sync_later(display, task_created=True, notify_enqueued=notify_ok)
-            _ACTIVITY_LOG.append({
+            _log_activity({
                 "id": str(uuid.uuid4()),
                 "ts": int(time.time() * 1000),
                 "type": "task_created",
                 "text": f"✅ משימה חדשה: ניקיון חדר {room_num}",
                 "task": task,
-            })
+            }, tenant_id)
             return jsonify({"success": True, "message": display, "displayMessage": display, "taskCreated": True, "task": task}), 200
 
     # "חדר [מספר]" - any mention of room number creates task (guest management)
@@ -14399,7 +16228,7 @@ Tasks: {json.dumps(pending[:15], ensure_ascii=False)}
 
 Format: Start with "יש לנו X משימות פתוחות." Then mention specific staff and tasks (e.g. "קובי עדיין לא סיים את הנזילה ב-104", "עלמה צריכה לסיים את 205 תוך שעה"). End with "האם להוציא להם תזכורת?" 
 Be concise, 2-3 sentences."""
-                report_text = _gemini_generate(mgmt_prompt) or f"יש לנו {len(pending)} משימות פתוחות. האם להוציא תזכורת?"
+                report_text = _gemini_generate(mgmt_prompt, tenant_id=tenant_id) or f"יש לנו {len(pending)} משימות פתוחות. האם להוציא תזכורת?"
             except Exception as e:
                 print("[Gemini] Management analysis failed:", e, flush=True)
                 return _maya_brain_error_response(e, code="management_gemini")
@@ -14448,7 +16277,7 @@ Done today ({len(done_today)}): {json.dumps(done_today[:10], ensure_ascii=False)
 Pending ({len(pending_list)}): {json.dumps(pending_list[:10], ensure_ascii=False)}
 
 Write a concise professional summary in Hebrew only (2-4 sentences). Mention counts and key tasks."""
-                report_text = _gemini_generate(report_prompt) or f"דוח יומי: הושלמו {len(done_today)} משימות. {len(pending_list)} ממתינות."
+                report_text = _gemini_generate(report_prompt, tenant_id=tenant_id) or f"דוח יומי: הושלמו {len(done_today)} משימות. {len(pending_list)} ממתינות."
             except Exception as e:
                 print("[Gemini] Daily report failed:", e, flush=True)
                 return _maya_brain_error_response(e, code="daily_report_gemini")
@@ -14461,15 +16290,44 @@ Write a concise professional summary in Hebrew only (2-4 sentences). Mention cou
             "taskCreated": False,
         }), 200
 
-    rooms, staff_by_property = _get_maya_rooms_and_staff(tenant_id, user_id)
-    summary = _build_property_summary_for_ai(rooms, staff_by_property)
+    # Repeated questions over unchanged data: answer from the cache, no model call.
+    _answer_key = _maya_answer_cache_key(tenant_id, user_id, command, data.get("history"), maya_stats_snapshot)
+    _cached_answer = _maya_answer_cache_lookup(tenant_id, _answer_key, command)
+    _accept_h = (request.headers.get("Accept") or "").lower()
+    _wants_sse = bool(data.get("sse")) or ("text/event-stream" in _accept_h)
+    if _cached_answer is not None:
+        if _wants_sse:
+            return Response(
+                "data: " + json.dumps({"type": "done", "result": _cached_answer}, ensure_ascii=False) + "\n\n",
+                mimetype="text/event-stream",
+                headers={"Content-Type": "text/event-stream; charset=utf-8", "Cache-Control": "no-cache"},
+            )
+        return jsonify(_cached_answer), 200
+
+    # Independent context stages run side by side; each falls back to empty context past its deadline.
+    # Submitted only now — past every canned reply and cache hit — so no early exit leaves a stage
+    # running for nothing.  Rooms + staff are needed by the truth stage; the rest overlap with them.
+    # _ensure_maya_chat_stats() already called at top of handler — snapshot is ready
     _chat_scope = _maya_detect_site_scope_hint(command or "")
+    _ctx = _maya_context_runner()
+    _ctx.submit("rooms_staff", _get_maya_rooms_and_staff, tenant_id, user_id, fallback=([], {}))
+    if GEMINI_MODEL:
+        _ctx.submit(
+            "inventory",
+            (lambda: _build_maya_room_inventory_text_scoped(tenant_id, user_id, _chat_scope))
+            if _chat_scope
+            else (lambda: _build_maya_room_inventory_text(tenant_id, user_id)),
+            fallback="",
+        )
+        _ctx.submit("memory", _maya_memory_prompt_blocks, tenant_id, command, fallback=("", ""))
+        _ctx.submit(
+            "live_facts", _maya_live_facts_system_block, tenant_id, user_id, maya_stats_snapshot, command,
+            include_knowledge=False, fallback="",
+        )
+        _ctx.submit("knowledge", _maya_property_knowledge_context_for_message, tenant_id, command, fallback="")
+    rooms, staff_by_property = _ctx.result("rooms_staff")
+    summary = _build_property_summary_for_ai(rooms, staff_by_property)
     summary = _maya_filter_summary_for_scope(summary, _chat_scope, rooms)
-    room_inv_text = (
-        _build_maya_room_inventory_text_scoped(tenant_id, user_id, _chat_scope)
-        if _chat_scope
-        else _build_maya_room_inventory_text(tenant_id, user_id)
-    )
 
     # Fallback when Gemini not configured: still create tasks for repair/maintenance phrases
     cmd_lower = (command or "").lower().strip()
@@ -14511,17 +16369,49 @@ Write a concise professional summary in Hebrew only (2-4 sentences). Mention cou
             code="gemini_unavailable",
         )
 
-    # _ensure_maya_chat_stats() already called at top of handler — snapshot is ready
-    _truth_audit = _maya_truth_evaluate_operational(tenant_id, user_id, command, rooms, maya_stats_snapshot)
+    _ctx.submit(
+        "truth", _maya_truth_evaluate_operational, tenant_id, user_id, command, rooms, maya_stats_snapshot,
+        fallback=_maya_truth_audit_empty(), timeout=MAYA_TRUTH_STAGE_TIMEOUT_SEC,
+    )
+
+    _prompt_report, _sys_report = None, None
+
+    def _log_timing(gemini_ms=0, response_build_ms=0, sse=False):
+        _maya_log_timing(
+            intent=_truth_audit.get("intent") or "",
+            total_ms=int((time.perf_counter() - _req_t0) * 1000),
+            gemini_ms=gemini_ms,
+            db_ms=_ctx_ms,
+            truth_ms=_ctx.timings().get("truth", 0),
+            intent_ms=_truth_audit.get("intent_detection_ms") or 0,
+            truth_tools_ms=_truth_audit.get("truth_tools_ms") or 0,
+            response_build_ms=response_build_ms,
+            grounded=bool(_truth_audit.get("grounded")),
+            prompt_chars=(_prompt_report or {}).get("chars", 0) + (_sys_report or {}).get("chars", 0),
+            sse=sse,
+            stages=dict(_ctx.timings(), stats=_stats_ms),
+            prompt=_prompt_report,
+            system=_sys_report,
+            degraded=_ctx.degraded(),
+        )
+
+    _ctx_t0 = time.perf_counter()
+    _truth_audit = _ctx.result("truth")
     if _truth_audit.get("short_circuit_response"):
+        _ctx_ms = int((time.perf_counter() - _ctx_t0) * 1000)
         body = dict(_truth_audit["short_circuit_response"])
         body = _maya_truth_wrap_llm_payload(tenant_id, command, _truth_audit, body)
         _maya_memory_log_turn(tenant_id, command, body.get("message") or "")
+        _log_timing()
         return jsonify(body), 200
     _truth_inject = (_truth_audit.get("prompt_injection") or "").strip()
+    room_inv_text = _ctx.result("inventory")
+    _maya_mem_block, _maya_recall_block = _ctx.result("memory")
+    _extra_sys, _sys_report = _maya_live_data_block(_ctx.result("live_facts"), _ctx.result("knowledge") or "")
+    _ctx_ms = int((time.perf_counter() - _ctx_t0) * 1000)
 
     history = data.get("history") or []
-    history_text = ""
+    _history_lines = []
     if isinstance(history, list) and len(history) > 0:
         try:
             _hmax = int(os.getenv("MAYA_CHAT_HISTORY_MAX_TURNS", "80") or "80")
@@ -14529,15 +16419,12 @@ Write a concise professional summary in Hebrew only (2-4 sentences). Mention cou
             _hmax = 80
         _hmax = max(6, min(_hmax, 200))
         recent = history[-_hmax:]
-        parts = []
         for m in recent:
             role = (m.get("role") or "user").lower()
             content = _scrub_maya_input_text((m.get("content") or ""))[:500]
             if content:
                 label = "User" if role == "user" else "Maya"
-                parts.append(f"{label}: {content}")
-        if parts:
-            history_text = "\nPrevious conversation:\n" + "\n".join(parts) + "\n\n"
+                _history_lines.append(f"{label}: {content}")
 
     # Build property list for AI context (name + id for matching); always include pinned pilot hotels
     _prop_names = [r.get("name", "") for r in rooms if r.get("name")]
@@ -14548,100 +16435,21 @@ Write a concise professional summary in Hebrew only (2-4 sentences). Mention cou
             _existing_lower.add(_pl.strip().lower())
     _prop_list_str = ", ".join(_prop_names) if _prop_names else ", ".join(MAYA_PINNED_PROPERTY_LABELS)
 
-    _maya_mem_block = ""
-    _maya_recall_block = ""
-    if _maya_memory:
-        try:
-            _maya_mem_block = _maya_memory.format_memory_context(tenant_id) or ""
-            _maya_recall_block = _maya_memory.recall_relevant_snippets(tenant_id, command or "") or ""
-        except Exception as _mm_e:
-            print("[Maya memory]", _mm_e, flush=True)
-
-    _stats_json = json.dumps(maya_stats_snapshot, ensure_ascii=False)
-    _recent_ops = [e.get("text") for e in list(_ACTIVITY_LOG)[-6:] if (e.get("text") or "").strip()]
+    _recent_ops = [e.get("text") for e in _ACTIVITY_LOG.recent(tenant_id, 6) if (e.get("text") or "").strip()]
     _recent_ops_json = json.dumps(_recent_ops, ensure_ascii=False)
-    prompt = f"""LUXURY HOSPITALITY + OPS — You are Maya (GM-level). First infer intent: (A) service request → tasks; (B) question about operations → search STATS_JSON + system SEARCH_TOOL only, reply as "info"; (C) small talk / empathy → "info", warm and brief, no task.
-ANALYST MODE — Authoritative snapshot (same data as GET /api/stats). Ground every factual claim in STATS_JSON and SEARCH_TOOL; never invent occupancy %, task counts, or staff names.
-STATS_JSON.recent_open_tasks: ONLY non-completed property_tasks (Pending / In_Progress / etc.) — capped for speed; use these ids for mark_task_done.
-STATS_JSON.recent_completed_snapshot: tasks already Done in the DB — NEVER say these are still open or "in progress".
-STATS_JSON.tasks_digest: one-line counts; use with total_tasks for "how many open" answers.
-If STATS_JSON.context_scope_hint is set (e.g. bazaar), answer ONLY about that site — do not enumerate unrelated properties.
-If the user asks "מה המצב?" or similar: cite total_tasks / total_active_tasks and tasks_by_status from STATS_JSON exactly. Mention occupancy only if STATS_JSON.occupancy_pct is a number (use that value); never say "~80%" or a default percentage.
-If the user asks what just happened in the field, prefer paraphrasing RECENT_LIVE_OPS_LINES (real Hebrew lines from the live ops engine).
-Pure questions (Who? When? Why? How many?) must get action "info" — never add_task unless the user also gives a clear work order.
-Do not open with boilerplate about "the board is back" or "I'm here" — answer directly.
-
-STATS_JSON: {_stats_json}
-
-RECENT_LIVE_OPS_LINES (newest last): {_recent_ops_json}
-
-{history_text}User request: "{command}"
-
-Available properties: [{_prop_list_str}]
-
-Live portfolio summary (staff + rooms):
-{summary}
-
-Room inventory (61 units, Bazaar + 14 ROOMS; Occupied / Ready / Dirty — use for room-status questions):
-{room_inv_text or "Sync portfolio seed if empty."}
-
-{_maya_mem_block}
-
-{_maya_recall_block}
-
-{_truth_inject + chr(10) + chr(10) if _truth_inject else ""}HARD RULES (override anything above):
-1. CALENDAR / AVAILABILITY: If LIVE_CALENDAR appears in TRUTH_LAYER_POLICY, cite it and NEVER say "לא בדקתי", "I haven't checked", or "אין לי גישה ללוח". If no LIVE_CALENDAR block is present, say "אין לי נתוני הזמנות זמינים כרגע — בדוק ישירות במערכת ההזמנות" — short, honest, not "I can't".
-2. STAFF: Use register_staff / send_whatsapp_onboarding actions when user requests staff operations. Never say "I can't add staff via chat" — execute the action.
-3. SHIFTS: Use create_work_shift when user requests scheduling. Execute the action.
-4. COUNTS: Never contradict the task count from STATS_JSON.total_tasks within the same response.
-
-Remember: the portfolio has 61 room units across 15 properties. Hotel Bazaar Jaffa includes Standard Queen, Deluxe Gallery, and Jaffa Suite room types. Address Kobi only by name. Do not claim a task was completed unless you return mark_task_done with a valid task_id.
-
-Classify and return ONLY valid JSON (no extra text):
-
-• SINGLE task:
-  {{"action":"add_task","task":{{"staffName":"Alma|Kobi|Avi","content":"<FULL specific description in Hebrew>","propertyName":"<exact name from list or best match>","task_type":"ניקיון חדר|תחזוקה|שירות|צ'ק-אין","priority":"normal|high","status":"Pending"}}}}
-
-• MULTIPLE tasks (quantity OR multiple rooms/issues mentioned):
-  {{"action":"add_tasks","tasks":[<task_obj>, <task_obj>, ...]}}
-  Produce exactly as many task objects as requested. Each gets its own propertyName and content.
-
-• Information / question / small talk:
-  {{"action":"info","message":"<warm, concise answer; match user language; for chat without ops, stay human — no fake task counts>"}}
-
-• Property or room is UNCLEAR / not in the property list (include when unsure which hotel: Bazaar Jaffa vs Leonardo City Tower Ramat Gan):
-  {{"action":"clarify","question":"באיזה מלון או אתר מדובר — בזאר יפו, סיטי טאוור רמת גן, או רומס סקיי טאוור? אני צריכה פרט מדויק כדי לפתוח את המשימה."}}
-
-• Mark task DONE (user confirmed work finished, or you are closing a specific open task — REQUIRED so property_tasks updates in the DB):
-  {{"action":"mark_task_done","task_id":"<uuid from STATS_JSON.recent_open_tasks>","message":"<short Hebrew confirmation>","match_description":"<optional substring of task description if task_id unknown>"}}
-
-• Register a NEW staff member (use ONLY when user explicitly asks to add/register staff AND provides a name):
-  {{"action":"register_staff","staff":{{"name":"<full name>","phone":"<phone with country code, optional>","role":"<מנקה|מתחזק|מנהל|קבלה|Staff>","property_name":"<exact property name or omit>"}}}}
-  Triggers: "הוסף עובד", "register [name] as [role]", "add [name]", "רשום עובד חדש". If no name given, ask with action:"info".
-
-• Send WhatsApp onboarding/welcome message to staff or guest:
-  {{"action":"send_whatsapp_onboarding","phone":"<phone number>","name":"<recipient name>","message":"<custom message or leave empty for default>"}}
-  Triggers: "שלח הודעת קליטה", "send onboarding to [name]", "צור קשר עם [name] בוואטסאפ".
-
-• Create a work shift / schedule a staff member:
-  {{"action":"create_work_shift","shift":{{"employee_name":"<name>","time_slot":"<e.g. 08:00-16:00>","date":"<YYYY-MM-DD or description>","property_name":"<property or omit>"}}}}
-  Triggers: "צור משמרת", "שבץ [name]", "create shift for [name]", "schedule [name] on [date/time]".
-  IMPORTANT: When LIVE_CALENDAR data is present in TRUTH_LAYER_POLICY, use those booking details to
-  choose a shift that does not conflict with existing check-ins/check-outs.
-
-Rules:
-- content MUST be the full intent (e.g. "תיקון נזילה מהברז ב-302" not just "תיקון"). Include room number and hotel when known.
-- task_type: ניקיון חדר=ניקיון/housekeeping | תחזוקה=תיקון/נזילה/תחזוקה | שירות=everything else | צ'ק-אין=הכנת חדר/כניסת אורח
-- priority: "high" if דחוף/בהול/urgent/asap/critical — else "normal"
-- staffName: Alma→ניקיון חדר | Kobi→תחזוקה | Avi→חשמל(מנורה/קצר)
-- propertyName: match to the exact property name from the list (Hotel Bazaar Jaffa OR Leonardo Plaza City Tower). Pool questions: Bazaar has no pool; City Tower has seasonal rooftop pool — reflect that in "info" messages.
-- NEVER invent a property name or use "Unknown" / "חדר לא ידוע".
-- STAFF REGISTRATION: Use register_staff ONLY when user provides a name AND explicitly asks to add/register. For bulk/complex HR changes, use action:"info" directing to Dashboard → Settings → Staff.
-- BOOKING / AVAILABILITY: When LIVE_CALENDAR appears in TRUTH_LAYER_POLICY, it means fetch_calendar_availability was executed and you MUST cite those exact results. NEVER say "לא בדקתי", "I haven't checked", or "אין לי גישה" when LIVE_CALENDAR is present — you have already checked. When LIVE_CALENDAR is absent, say "אין לי נתוני הזמנות מאומתים לתאריך זה — בדוק ישירות." and use action:"info".
-- PURE QUESTIONS (offices? pricing? how many rooms? who is fastest? any question ending in '?'): ALWAYS return action:"info" — NEVER return add_task for a question unless the message also contains an explicit work order ("תקן", "שלח", "פתח משימה", "clean", "fix", etc.). Returning add_task for an informational question is a critical error.
-- COUNTS CONSISTENCY: Use STATS_JSON.total_tasks as the single authoritative open-task count. Do not report a different number elsewhere in the same response."""
+    prompt, _prompt_report = _maya_command_prompt(
+        command=command,
+        stats_json=_maya_stats_json(maya_stats_snapshot),
+        recent_ops_json=_recent_ops_json,
+        history_lines=_history_lines,
+        properties=_prop_list_str,
+        summary=summary,
+        room_inventory=room_inv_text,
+        memory_block=_maya_mem_block,
+        recall_block=_maya_recall_block,
+        truth_injection=_truth_inject,
+    )
 
-    _extra_sys = _maya_live_facts_system_block(tenant_id, user_id, maya_stats_snapshot, command)
     _stream_env = (os.getenv("MAYA_GEMINI_USE_STREAM", "1") or "").strip().lower()
     _prefer_stream = _stream_env not in ("0", "false", "no", "off") or bool(data.get("stream"))
     try:
@@ -14650,9 +16458,6 @@ Rules:
         _stream_timeout = 15
     _stream_timeout = max(10, min(_stream_timeout, 60))
 
-    _accept_h = (request.headers.get("Accept") or "").lower()
-    _wants_sse = bool(data.get("sse")) or ("text/event-stream" in _accept_h)
-
     if _wants_sse:
 
         @stream_with_context
@@ -14660,9 +16465,10 @@ Rules:
         def _maya_sse():
             with app.app_context():
                 buf = []
+                _llm_t0 = time.perf_counter()
                 try:
                     for piece in _maya_llm_stream_text_chunks(
-                        prompt, timeout=_stream_timeout, extra_system=_extra_sys
+                        prompt, timeout=_stream_timeout, extra_system=_extra_sys, tenant_id=tenant_id
                     ):
                         buf.append(piece)
                         yield (
@@ -14671,6 +16477,8 @@ Rules:
                             + "\n\n"
                         )
                     text = "".join(buf)
+                    _gemini_ms = int((time.perf_counter() - _llm_t0) * 1000)
+                    _build_t0 = time.perf_counter()
                     result = _maya_build_json_response_from_llm_output(
                         tenant_id,
                         user_id,
@@ -14681,6 +16489,12 @@ Rules:
                         staff_by_property,
                         truth_audit=_truth_audit,
                     )
+                    _maya_answer_cache_store(tenant_id, _answer_key, result, degraded=_ctx.degraded())
+                    _log_timing(
+                        gemini_ms=_gemini_ms,
+                        response_build_ms=int((time.perf_counter() - _build_t0) * 1000),
+                        sse=True,
+                    )
                     yield (
                         "data: "
                         + json.dumps({"type": "done", "result": result}, ensure_ascii=False)
@@ -14711,12 +16525,15 @@ Rules:
             },
         )
 
+    _llm_t0 = time.perf_counter()
     try:
         with app.app_context():
             if _prefer_stream:
-                text = _gemini_stream_collect_string(prompt, timeout=_stream_timeout, extra_system=_extra_sys)
+                text = _gemini_stream_collect_string(
+                    prompt, timeout=_stream_timeout, extra_system=_extra_sys, tenant_id=tenant_id
+                )
             else:
-                text = _gemini_generate(prompt, timeout=22, extra_system=_extra_sys)
+                text = _gemini_generate(prompt, timeout=22, extra_system=_extra_sys, tenant_id=tenant_id)
     except Exception as e:
         import traceback as _tb_cmd
 
@@ -14726,6 +16543,8 @@ Rules:
         print(f"{'='*60}\n", flush=True)
         return _maya_brain_error_response(e, code="gemini_call")
 
+    _gemini_ms = int((time.perf_counter() - _llm_t0) * 1000)
+    _build_t0 = time.perf_counter()
     with app.app_context():
         result = _maya_build_json_response_from_llm_output(
             tenant_id,
@@ -14737,6 +16556,11 @@ Rules:
             staff_by_property,
             truth_audit=_truth_audit,
         )
+    _maya_answer_cache_store(tenant_id, _answer_key, result, degraded=_ctx.degraded())
+    _log_timing(
+        gemini_ms=_gemini_ms,
+        response_build_ms=int((time.perf_counter() - _build_t0) * 1000),
+    )
     return jsonify(result), 200
 
 
@@ -14955,6 +16779,241 @@ def _ensure_demo_portfolio_properties(rooms):
     return out
 
 
+def _property_task_row_status(raw_status) -> str:
+    """Normalise legacy status spellings for the JSON payload (the DB value is unchanged)."""
+    raw_status = (raw_status or "Pending").strip()
+    if raw_status in ("Accepted", "accepted", "seen", "Seen",
+                      "confirmed", "started", "Started"):
+        return "In_Progress"
+    if raw_status in ("done", "Done", "completed", "Completed"):
+        return "Done"
+    if raw_status in ("assigned", "Assigned"):
+        return "In_Progress"
+    if raw_status in ("delayed", "Delayed"):
+        return "Delayed"
+    if raw_status in ("pending", "Pending", "queued", "Queued"):
+        return "Pending"
+    if raw_status in ("waiting", "Waiting"):
+        return "Waiting"
+    return raw_status
+
+
+def _property_task_staff_cache(tenant_id, room_ids, session=None) -> dict:
+    """staff id -> {name, phone} for the tenant's properties (enriches rows missing staff fields)."""
+    staff_cache = {}
+    if SessionLocal and PropertyStaffModel:
+        staff_dir = _get_property_staff_directory(tenant_id, room_ids, session=session)
+        for staff_list in staff_dir.values():
+            for s in staff_list:
+                staff_cache[s["id"]] = {"name": s["name"] or "Staff", "phone": s["phone_number"] or ""}
+    return staff_cache
+
+
+def _property_task_staff_fields(r, staff_cache):
+    """Return (staff_name, staff_phone, assigned_to), filling blanks from the staff directory."""
+    staff_name  = getattr(r, "staff_name",  None) or ""
+    staff_phone = getattr(r, "staff_phone", None) or ""
+    assigned_to = getattr(r, "assigned_to", None) or ""
+    if (not staff_name or not staff_phone) and assigned_to:
+        cached = staff_cache.get(assigned_to)
+        if cached:
+            staff_name  = staff_name  or cached["name"]
+            staff_phone = staff_phone or cached["phone"]
+    return staff_name, staff_phone, assigned_to
+
+
+def _property_task_context(prop):
+    if not prop:
+        return ""
+    g = prop.get("max_guests") or 2
+    br = prop.get("bedrooms") or 1
+    b = prop.get("beds") or 1
+    return f"{g} Guests, {br} Bedroom, {b} Bed"
+
+
+def _serialize_property_task_row(r, room_map, staff_cache) -> dict:
+    """One PropertyTaskModel row → the dict shape GET /api/property-tasks returns."""
+    prop = room_map.get(r.property_id) if r.property_id else None
+    ctx = _property_task_context(prop)
+    staff_name, staff_phone, assigned_to = _property_task_staff_fields(r, staff_cache)
+    row_status = _property_task_row_status(r.status)
+
+    # Derive clean room label with guaranteed fallback
+    pname = (getattr(r, "property_name", None) or "").strip()
+    pid   = (r.property_id or "").strip()
+    room_label = pname or (f"חדר {pid}" if pid else "חדר לא ידוע")
+
+    desc_val = (r.description or "").strip() or "ביצוע משימה"
+    ttype = (getattr(r, "task_type", None) or "").strip() or desc_val
+    esc, pri_f, wnotes = _task_escalation_fields(r)
+    _delayed = _property_task_is_delayed(r, row_status)
+
+    return {
+        "id":               r.id,
+        # canonical field names
+        "property_id":      pid,
+        "property_name":    room_label,
+        # aliases expected by frontend fallback chain
+        "title":            desc_val,
+        "room_id":          pid,
+        "room":             room_label,
+        "room_number":      room_label,
+        "task_type":        ttype,
+        # rest of payload
+        "assigned_to":      assigned_to,
+        "description":      desc_val,
+        "status":           row_status,   # normalised
+        "delayed":          _delayed,
+        "created_at":       getattr(r, "created_at",       None),
+        "started_at":       getattr(r, "started_at",       None),
+        "completed_at":     getattr(r, "completed_at",     None),
+        "duration_minutes": getattr(r, "duration_minutes", None),
+        "staff_name":       staff_name or "Unknown",
+        "worker_name":      staff_name or "Unknown",
+        "staff_phone":      staff_phone,
+        "property_context": ctx,
+        "photo_url":        getattr(r, "photo_url", None) or "",
+        "priority":         getattr(r, "priority", None) or pri_f,
+        "worker_notes":     wnotes,
+        "escalated":        esc,
+        "due_at":           getattr(r, "due_at", None) or "",
+        "actions":          STAFF_ACTIONS,
+    }
+
+
+# ── Serialised task-row cache ────────────────────────────────────────────────
+# A board poll mostly re-serialises rows that have not changed since the last
+# poll.  Legacy-schema rows are cached per tenant under (task_id, user, redaction)
+# together with the fingerprint of the row they were built from — the row's own
+# column values, already loaded by the list query — so any write (ORM, bulk
+# statement or raw SQL) makes the entry miss, and no per-task version map is kept.
+# Room/staff edits (property_context and staff enrichment inputs) drop the whole
+# tenant bucket.  Only ``delayed`` depends on the clock and is recomputed on every
+# read.  One entry per (task, user, redaction) — a newer row overwrites the old one.
+TASK_ROW_CACHE_MAX_PER_TENANT = max(500, int(os.getenv("TASK_ROW_CACHE_MAX_PER_TENANT", "20000") or 20000))
+_TASK_ROW_CACHE: dict = {}  # tenant_id -> {"gen": rooms_v, "rows": {(task_id, user, redact): (fingerprint, dict)}}
+_TASK_ROW_CACHE_LOCK = threading.Lock()
+_TASK_ROW_CACHE_STATS = {"hits": 0, "misses": 0}
+_TASK_ROW_FINGERPRINT_COLS = ()
+
+
+def _task_row_fingerprint(r) -> tuple:
+    """Every mapped column value of a PropertyTaskModel row."""
+    global _TASK_ROW_FINGERPRINT_COLS
+    if not _TASK_ROW_FINGERPRINT_COLS:
+        _TASK_ROW_FINGERPRINT_COLS = tuple(a.key for a in sa_inspect(PropertyTaskModel).column_attrs)
+    return tuple(getattr(r, k, None) for k in _TASK_ROW_FINGERPRINT_COLS)
+
+
+def _task_row_cache_view(tenant_id, user_id, identity) -> dict:
+    """Per-request handle: the tenant bucket to read/write."""
+    tid = tenant_id or DEFAULT_TENANT_ID
+    gen = _data_version("rooms", tid)
+    with _TASK_ROW_CACHE_LOCK:
+        bucket = _TASK_ROW_CACHE.get(tid)
+        if bucket is None or bucket["gen"] != gen:
+            bucket = {"gen": gen, "rows": {}}
+            _TASK_ROW_CACHE[tid] = bucket
+    return {
+        "bucket": bucket,
+        "user_id": user_id or "",
+        "redact": bool(_should_redact_guest_pii(identity)),
+        "identity": identity,
+    }
+
+
+def _cached_property_task_row(view, r, room_map, staff_cache) -> dict:
+    """Legacy-schema row (already PII-redacted for the caller) from the cache, or built and stored."""
+    key = (r.id, view["user_id"], view["redact"])
+    fingerprint = _task_row_fingerprint(r)
+    rows = view["bucket"]["rows"]
+    entry = rows.get(key)
+    if entry is not None and entry[0] == fingerprint:
+        with _TASK_ROW_CACHE_LOCK:
+            _TASK_ROW_CACHE_STATS["hits"] += 1
+        cached = entry[1]
+    else:
+        cached = _serialize_property_task_row(r, room_map, staff_cache)
+        if view["redact"]:
+            _redact_property_task_row_dict(cached, view["identity"])
+        with _TASK_ROW_CACHE_LOCK:
+            _TASK_ROW_CACHE_STATS["misses"] += 1
+            if key not in rows and len(rows) >= TASK_ROW_CACHE_MAX_PER_TENANT:
+                rows.clear()
+            rows[key] = (fingerprint, cached)
+    row = dict(cached)
+    row["delayed"] = _property_task_is_delayed(r, row["status"])
+    return row
+
+
+def _property_task_is_delayed(r, row_status) -> bool:
+    """In_Progress for more than an hour (typed started/created timestamp, ISO string fallback)."""
+    if row_status != "In_Progress":
+        return False
+    _dt = _ts_as_utc(getattr(r, "started_ts", None) or getattr(r, "created_ts", None))
+    if _dt is None:
+        _sa = getattr(r, "started_at", None) or getattr(r, "created_at", None)
+        _dt = parse_iso_datetime(_sa)
+    if not _dt:
+        return False
+    if _dt.tzinfo is None:
+        _dt = _dt.replace(tzinfo=timezone.utc)
+    return (datetime.now(timezone.utc) - _dt) > timedelta(minutes=60)
+
+
+def _serialize_property_task_row_v2(r, room_map, staff_cache, fields) -> dict:
+    """?schema=v2 row: only ``fields``, one key per value, no per-row actions.
+    Touches only the columns PROPERTY_TASKS_V2_FIELDS lists for those fields."""
+    out = {}
+    want = set(fields)
+    if want & {"staff_name", "staff_phone"}:
+        staff_name, staff_phone, _at = _property_task_staff_fields(r, staff_cache)
+    if want & {"status", "delayed"}:
+        row_status = _property_task_row_status(r.status)
+    if want & {"priority", "escalated"}:
+        esc, pri_f, _wn = _task_escalation_fields(r)
+    for f in fields:
+        if f == "id":
+            out["id"] = r.id
+        elif f == "property_id":
+            out["property_id"] = (r.property_id or "").strip()
+        elif f == "property_name":
+            pname = (getattr(r, "property_name", None) or "").strip()
+            pid = (r.property_id or "").strip()
+            out["property_name"] = pname or (f"חדר {pid}" if pid else "חדר לא ידוע")
+        elif f == "task_type":
+            desc_val = (r.description or "").strip() or "ביצוע משימה"
+            out["task_type"] = (getattr(r, "task_type", None) or "").strip() or desc_val
+        elif f == "description":
+            out["description"] = (r.description or "").strip() or "ביצוע משימה"
+        elif f == "assigned_to":
+            out["assigned_to"] = getattr(r, "assigned_to", None) or ""
+        elif f == "status":
+            out["status"] = row_status
+        elif f == "delayed":
+            out["delayed"] = _property_task_is_delayed(r, row_status)
+        elif f == "staff_name":
+            out["staff_name"] = staff_name or "Unknown"
+        elif f == "staff_phone":
+            out["staff_phone"] = staff_phone
+        elif f == "property_context":
+            prop = room_map.get(r.property_id) if r.property_id else None
+            out["property_context"] = _property_task_context(prop)
+        elif f == "photo_url":
+            out["photo_url"] = getattr(r, "photo_url", None) or ""
+        elif f == "priority":
+            out["priority"] = getattr(r, "priority", None) or pri_f
+        elif f == "worker_notes":
+            out["worker_notes"] = getattr(r, "worker_notes", "") or ""
+        elif f == "escalated":
+            out["escalated"] = esc
+        elif f == "due_at":
+            out["due_at"] = getattr(r, "due_at", None) or ""
+        else:
+            out[f] = getattr(r, f, None)
+    return out
+
+
 @app.route("/api/property-tasks", methods=["GET", "POST", "OPTIONS"])
 def property_tasks_api():
     """GET/POST property tasks. With AUTH_DISABLED=false, requires Bearer JWT (see get_property_tasks_auth_bundle)."""
@@ -15046,21 +17105,58 @@ def property_tasks_api():
                 status_filter = (request.args.get("status") or "").strip().lower()
                 raw_get = _is_raw_api_tasks_get()
                 client_limit, client_offset = _parse_api_tasks_pagination()
+                try:
+                    use_cursor, cursor_pos, cursor_limit = _parse_property_tasks_cursor()
+                    v2_fields = _parse_property_tasks_schema()
+                except ValueError as _cur_e:
+                    return jsonify({"error": str(_cur_e)}), 400
+
+                def _list_body(tasks, next_cursor=None):
+                    """Legacy: bare list (envelope in cursor mode). v2: envelope with actions once."""
+                    if v2_fields is not None:
+                        body = {"schema": "v2", "fields": list(v2_fields), "actions": STAFF_ACTIONS, "tasks": tasks}
+                        if use_cursor:
+                            body.update(next_cursor=next_cursor, has_more=next_cursor is not None)
+                        return body
+                    if use_cursor:
+                        return {"tasks": tasks, "next_cursor": next_cursor, "has_more": next_cursor is not None}
+                    return tasks
+
                 if worker_filter == "__no_staff_handle__":
-                    resp = _no_cache_json(jsonify([]))
+                    if use_cursor:
+                        resp = _no_cache_json(jsonify(_list_body([])))
+                        _attach_task_table_count_headers(resp, 0)
+                        return resp, 200
+                    resp = _no_cache_json(jsonify(_list_body([])))
                     _attach_task_table_count_headers(resp, 0)
                     if client_limit is not None:
                         _attach_tasks_list_pagination_headers(resp, 0, client_offset, 0, client_limit)
                     return resp, 200
-                use_sql_pagination = (
-                    client_limit is not None
-                    and not worker_filter
-                    and not status_filter
-                    and func is not None
+                # Archived / ?worker= / ?status= run in SQL so a page never loads the whole tenant.
+                filters_in_sql = func is not None and case is not None
+                use_sql_pagination = client_limit is not None and filters_in_sql and not use_cursor
+                # Read before querying: a change racing this request is replayed by /changes, not lost.
+                list_version = _task_change_log_version(tenant_id)
+                # Staff/room edits change enrichment; the 60 s bucket refreshes the `delayed` flag.
+                list_etag = _tenant_data_etag(
+                    "property-tasks", tenant_id, ("tasks", "rooms"),
+                    request.path, _request_etag_query_key(), user_id,
+                    identity.get("app_role"), identity.get("worker_handle"),
+                    ttl_bucket_sec=60,
                 )
+                if _etag_matches_request(list_etag):
+                    return _not_modified(list_etag)
                 pagination_total = None  # set when client_limit is used
-
-                rooms    = list_manual_rooms(tenant_id, owner_id=user_id)
+                next_cursor = None
+
+                # Rooms feed property_context and the staff directory; a v2 projection
+                # without those fields (and with SQL filters) skips them entirely.
+                need_rooms = (
+                    v2_fields is None
+                    or not filters_in_sql
+                    or bool({"property_context", "staff_name", "staff_phone"} & set(v2_fields))
+                )
+                rooms    = list_manual_rooms(tenant_id, owner_id=user_id) if need_rooms else []
                 room_ids = [r.get("id") for r in rooms if r.get("id")]
                 room_map = {r.get("id"): r for r in rooms if r.get("id")}
 
@@ -15068,14 +17164,20 @@ def property_tasks_api():
                 # tasks use plain room numbers ("302") that are never in the UUID room_ids
                 # list, which caused them to be silently dropped.
                 _pq = _property_tasks_query_for_tenant(session, tenant_id)
+                if _pq is not None and filters_in_sql:
+                    _pq = _filter_property_tasks_query_sql(_pq, worker_filter, status_filter)
+                    if v2_fields is not None and load_only is not None:
+                        _cols = {"id", "created_at"}  # keyset cursor needs both
+                        for _f in v2_fields:
+                            _cols.update(PROPERTY_TASKS_V2_FIELDS[_f])
+                        _pq = _pq.options(load_only(*[getattr(PropertyTaskModel, c) for c in sorted(_cols)]))
                 if _pq is not None:
-                    if use_sql_pagination:
-                        _pq = _pq.filter(
-                            or_(
-                                PropertyTaskModel.status.is_(None),
-                                func.lower(PropertyTaskModel.status) != "archived",
-                            )
-                        )
+                    if use_cursor:
+                        # Keyset page on (created_at, id) DESC — cost depends on page size, not table size.
+                        rows, _next_pos = _property_tasks_keyset_page(_pq, cursor_pos, cursor_limit)
+                        if _next_pos is not None:
+                            next_cursor = _encode_property_tasks_cursor(*_next_pos)
+                    elif use_sql_pagination:
                         pagination_total = _pq.count()
                         rows = (
                             _pq.order_by(PropertyTaskModel.created_at.desc())
@@ -15091,139 +17193,73 @@ def property_tasks_api():
                     rows = []
 
                 if not rows:
-                    resp = _no_cache_json(jsonify([]))
+                    if use_cursor:
+                        resp = _no_cache_json(jsonify(_list_body([])))
+                        _attach_task_table_count_headers(resp, 0)
+                        _attach_task_change_version_headers(resp, list_version)
+                        _revalidate_json(resp, list_etag)
+                        return resp, 200
+                    resp = _no_cache_json(jsonify(_list_body([])))
                     _attach_task_table_count_headers(resp, 0)
+                    _attach_task_change_version_headers(resp, list_version)
+                    _revalidate_json(resp, list_etag)
                     if client_limit is not None:
                         tot = int(pagination_total) if pagination_total is not None else 0
                         _attach_tasks_list_pagination_headers(resp, tot, client_offset, 0, client_limit)
                     return resp, 200
 
-                def build_property_context(prop):
-                    if not prop:
-                        return ""
-                    g = prop.get("max_guests") or 2
-                    br = prop.get("bedrooms") or 1
-                    b = prop.get("beds") or 1
-                    return f"{g} Guests, {br} Bedroom, {b} Bed"
-
-                staff_cache = {}
-                if SessionLocal and PropertyStaffModel:
-                    for pid in room_ids:
-                        for s in session.query(PropertyStaffModel).filter_by(property_id=pid).all():
-                            staff_cache[s.id] = {"name": s.name or "Staff", "phone": getattr(s, "phone_number", None) or ""}
+                staff_cache = _property_task_staff_cache(tenant_id, room_ids, session)
+                row_cache = _task_row_cache_view(tenant_id, user_id, identity) if v2_fields is None else None
 
                 tasks = []
                 for r in rows:
-                    if not use_sql_pagination:
+                    if not filters_in_sql:
                         if (getattr(r, "status", None) or "").strip().lower() == "archived":
                             continue
-                    prop = room_map.get(r.property_id) if r.property_id else None
-                    ctx = build_property_context(prop)
-                    staff_name  = getattr(r, "staff_name",  None) or ""
-                    staff_phone = getattr(r, "staff_phone", None) or ""
-                    assigned_to = getattr(r, "assigned_to", None) or ""
-                    if (not staff_name or not staff_phone) and assigned_to:
-                        cached = staff_cache.get(assigned_to)
-                        if cached:
-                            staff_name  = staff_name  or cached["name"]
-                            staff_phone = staff_phone or cached["phone"]
-
-                    raw_status = (r.status or "Pending").strip()
-
-                    # Normalise legacy "Accepted" → "In_Progress" in the payload
-                    # (DB value is unchanged; only the JSON response is normalised)
-                    if raw_status in ("Accepted", "accepted", "seen", "Seen",
-                                      "confirmed", "started", "Started"):
-                        row_status = "In_Progress"
-                    elif raw_status in ("done", "Done", "completed", "Completed"):
-                        row_status = "Done"
-                    elif raw_status in ("assigned", "Assigned"):
-                        row_status = "In_Progress"
-                    elif raw_status in ("delayed", "Delayed"):
-                        row_status = "Delayed"
-                    elif raw_status in ("pending", "Pending", "queued", "Queued"):
-                        row_status = "Pending"
-                    elif raw_status in ("waiting", "Waiting"):
-                        row_status = "Waiting"
-                    else:
-                        row_status = raw_status
-
-                    # Server-side worker filter (substring / demo-friendly)
-                    if not use_sql_pagination:
+                        # Server-side worker/status filters — Python fallback only
+                        staff_name, _sp, assigned_to = _property_task_staff_fields(r, staff_cache)
                         if worker_filter and not _worker_name_matches_filter(
                             worker_filter, staff_name, assigned_to
                         ):
                             continue
-
-                        # Server-side status filter (?status=pending includes Waiting)
+                        # ?status=pending includes Waiting
                         if status_filter:
                             sf = status_filter.lower()
-                            rsl = row_status.lower()
+                            rsl = _property_task_row_status(r.status).lower()
                             if sf == "pending" and rsl not in ("pending", "waiting"):
                                 continue
                             if sf != "pending" and rsl != sf:
-                                continue
-
-                    # Derive clean room label with guaranteed fallback
-                    pname = (getattr(r, "property_name", None) or "").strip()
-                    pid   = (r.property_id or "").strip()
-                    room_label = pname or (f"חדר {pid}" if pid else "חדר לא ידוע")
-
-                    desc_val = (r.description or "").strip() or "ביצוע משימה"
-                    ttype = (getattr(r, "task_type", None) or "").strip() or desc_val
-                    esc, pri_f, wnotes = _task_escalation_fields(r)
-                    _delayed = False
-                    if row_status == "In_Progress":
-                        _sa = getattr(r, "started_at", None) or getattr(r, "created_at", None)
-                        _dt = parse_iso_datetime(_sa)
-                        if _dt:
-                            if _dt.tzinfo is None:
-                                _dt = _dt.replace(tzinfo=timezone.utc)
-                            _delayed = (datetime.now(timezone.utc) - _dt) > timedelta(minutes=60)
-
-                    tasks.append({
-                        "id":               r.id,
-                        # canonical field names
-                        "property_id":      pid,
-                        "property_name":    room_label,
-                        # aliases expected by frontend fallback chain
-                        "title":            desc_val,
-                        "room_id":          pid,
-                        "room":             room_label,
-                        "room_number":      room_label,
-                        "task_type":        ttype,
-                        # rest of payload
-                        "assigned_to":      assigned_to,
-                        "description":      desc_val,
-                        "status":           row_status,   # normalised
-                        "delayed":          _delayed,
-                        "created_at":       getattr(r, "created_at",       None),
-                        "started_at":       getattr(r, "started_at",       None),
-                        "completed_at":     getattr(r, "completed_at",     None),
-                        "duration_minutes": getattr(r, "duration_minutes", None),
-                        "staff_name":       staff_name or "Unknown",
-                        "worker_name":      staff_name or "Unknown",
-                        "staff_phone":      staff_phone,
-                        "property_context": ctx,
-                        "photo_url":        getattr(r, "photo_url", None) or "",
-                        "priority":         getattr(r, "priority", None) or pri_f,
-                        "worker_notes":     wnotes,
-                        "escalated":        esc,
-                        "due_at":           getattr(r, "due_at", None) or "",
-                        "actions":          STAFF_ACTIONS,
-                    })
+                                continue
+                    if v2_fields is not None:
+                        tasks.append(_serialize_property_task_row_v2(r, room_map, staff_cache, v2_fields))
+                    else:
+                        tasks.append(_cached_property_task_row(row_cache, r, room_map, staff_cache))
 
-                if client_limit is not None and not use_sql_pagination:
+                if client_limit is not None and not use_sql_pagination and not use_cursor:
                     pagination_total = len(tasks)
                     tasks = tasks[client_offset : client_offset + client_limit]
 
                 print(f"[Tasks] GET worker={worker_filter!r:15s} "
                       f"status={status_filter!r:12s} raw_api_tasks={raw_get} "
-                      f"limit={client_limit} offset={client_offset} → {len(tasks)} tasks returned")
-                _redact_property_task_list(tasks, identity)
-                resp = _no_cache_json(jsonify(tasks))
+                      f"limit={cursor_limit if use_cursor else client_limit} offset={client_offset} "
+                      f"cursor={use_cursor} → {len(tasks)} tasks returned")
+                if v2_fields is not None:
+                    _redact_property_task_list(tasks, identity)  # legacy rows come pre-redacted from the row cache
+                if use_cursor:
+                    resp = _no_cache_json(jsonify(_list_body(tasks, next_cursor)))
+                    _attach_task_table_count_headers(resp, len(tasks))
+                    _attach_task_change_version_headers(resp, list_version)
+                    _revalidate_json(resp, list_etag)
+                    resp.headers["X-Tasks-Limit"] = str(int(cursor_limit))
+                    resp.headers["X-Tasks-Has-More"] = "1" if next_cursor else "0"
+                    if next_cursor:
+                        resp.headers["X-Tasks-Next-Cursor"] = next_cursor
+                    return resp, 200
+                resp = _no_cache_json(jsonify(_list_body(tasks)))
                 _list_total = int(pagination_total) if pagination_total is not None else len(tasks)
                 _attach_task_table_count_headers(resp, _list_total)
+                _attach_task_change_version_headers(resp, list_version)
+                _revalidate_json(resp, list_etag)
                 if client_limit is not None and pagination_total is not None:
                     _attach_tasks_list_pagination_headers(
                         resp, pagination_total, client_offset, len(tasks), client_limit
@@ -15276,12 +17312,12 @@ def property_tasks_api():
                 mgr = f"🏨 מאיה → מנהל: מגבות ב-{display_property} — הוקצה ל-{staff_name}"
                 guest_mgr_whatsapp_msg = mgr
                 try:
-                    _ACTIVITY_LOG.append({
+                    _log_activity({
                         "id": str(uuid.uuid4()),
                         "ts": int(time.time() * 1000),
                         "type": "guest_towel_maya",
                         "text": mgr,
-                    })
+                    }, tenant_id)
                 except Exception as _gtm:
                     print(f"[guest_towel_maya] activity log: {_gtm}", flush=True)
 
@@ -15404,8 +17440,6 @@ def property_tasks_api():
             assign_stuck_property_tasks(tenant_id)
         except Exception:
             pass
-        _bump_tasks_version()
-        _invalidate_owner_dashboard_cache()
         if guest_mgr_whatsapp_msg:
             try:
                 enqueue_twilio_task("whatsapp", to=OWNER_PHONE, message=guest_mgr_whatsapp_msg)
@@ -15554,6 +17588,83 @@ def _apply_property_task_status_to_row(task, new_status, tid, now_ts):
             except Exception as _pe:
                 print(f"[Perf] duration calc error: {_pe}", flush=True)
     task.status = new_status
+    task.status_category = _norm_task_status_category(new_status)
+
+
+@app.route("/api/property-tasks/changes", methods=["GET", "OPTIONS"])
+def property_tasks_changes_api():
+    """
+    Delta sync for task boards: ?since=<v>&epoch=<epoch> → rows changed after v.
+    Returns {v, epoch, resync, tasks, removed}.  ``tasks`` are full rows (same shape
+    as GET /api/property-tasks) that still match ?worker= / ?status=; ``removed`` are
+    ids that were deleted, archived or no longer match.  resync=true means the
+    cursor is too old (or from a previous process) — refetch the list and keep v.
+    """
+    if request.method == "OPTIONS":
+        return Response(status=204)
+    try:
+        identity = get_property_tasks_auth_bundle()
+    except ValueError as _auth_e:
+        return jsonify({"error": str(_auth_e) or "Unauthorized"}), 401
+    since_raw = (request.args.get("since") or "").strip()
+    try:
+        since = int(since_raw) if since_raw else None
+    except ValueError:
+        return jsonify({"error": "invalid since"}), 400
+    client_epoch = (request.args.get("epoch") or "").strip()
+    if client_epoch and client_epoch != _TASK_CHANGE_LOG_EPOCH:
+        since = None
+
+    worker_filter = _apply_staff_task_scope(
+        identity, (request.args.get("worker") or request.args.get("worker_id") or "").strip().lower()
+    )
+    status_filter = (request.args.get("status") or "").strip().lower()
+    body = _property_task_changes_body(identity, since, worker_filter, status_filter)
+    return _no_cache_json(jsonify(body)), 200
+
+
+def _property_task_changes_body(identity, since, worker_filter, status_filter):
+    """{v, since, epoch, resync, tasks, removed} for one cursor — shared by /changes and the
+    realtime stream.  ``since`` echoes the cursor the diff starts from, so a client whose own
+    cursor is older can tell it missed a diff."""
+    tenant_id = identity["tenant_id"]
+    v, changes, resync = _task_changes_since(tenant_id, since)
+    body = {"v": v, "since": since, "epoch": _TASK_CHANGE_LOG_EPOCH, "resync": resync, "tasks": [], "removed": []}
+    if resync or not changes:
+        return body
+    if worker_filter == "__no_staff_handle__" or not SessionLocal or not PropertyTaskModel:
+        body["resync"] = not SessionLocal or not PropertyTaskModel
+        return body
+    if func is None or case is None:
+        body["resync"] = True
+        return body
+
+    live_ids = [tid for tid, op in changes.items() if op != "delete"]
+    rows = []
+    session = SessionLocal()
+    try:
+        if live_ids:
+            q = _property_tasks_query_for_tenant(session, tenant_id)
+            q = _filter_property_tasks_query_sql(q, worker_filter, status_filter)
+            for i in range(0, len(live_ids), 500):
+                rows.extend(q.filter(PropertyTaskModel.id.in_(live_ids[i:i + 500])).all())
+        if rows:
+            rooms = list_manual_rooms(tenant_id, owner_id=identity["user_id"])
+            room_ids = [r.get("id") for r in rooms if r.get("id")]
+            room_map = {r.get("id"): r for r in rooms if r.get("id")}
+            staff_cache = _property_task_staff_cache(tenant_id, room_ids, session)
+            body["tasks"] = [_serialize_property_task_row(r, room_map, staff_cache) for r in rows]
+    except Exception as e:
+        print(f"[property_tasks_changes] failed: {e!r}", flush=True)
+        body.update({"resync": True, "tasks": []})
+        return body
+    finally:
+        session.close()
+
+    returned = {t["id"] for t in body["tasks"]}
+    body["removed"] = [tid for tid in changes if tid not in returned]
+    _redact_property_task_list(body["tasks"], identity)
+    return body
 
 
 @app.route("/api/batch_update", methods=["POST", "OPTIONS"])
@@ -15580,7 +17691,6 @@ def property_tasks_batch_update():
     done_threads = []
     try:
         now_ts = datetime.now(timezone.utc).isoformat()
-        status_touched = False
         _batch_tenant_id = identity["tenant_id"]
         for item in updates:
             if not isinstance(item, dict):
@@ -15610,15 +17720,11 @@ def property_tasks_batch_update():
                 identity["email"],
             )
             results.append({"id": tid, "ok": True, "status": new_status})
-            status_touched = True
             if new_status == "Done":
                 wn = getattr(task, "staff_name", "") or ""
                 if wn:
                     done_threads.append((wn, tid))
         session.commit()
-        if status_touched:
-            _bump_tasks_version()
-            _invalidate_owner_dashboard_cache()
         for wn, tid in done_threads:
             threading.Thread(target=_run_performance_agent, args=(wn, tid), daemon=True).start()
         n_ok = sum(1 for r in results if r.get("ok"))
@@ -15725,9 +17831,6 @@ def property_task_update(task_id):
 
         session.commit()
         print(f"UPDATING TASK: {tid} — saved ✅")
-        if "status" in data or promoted:
-            _bump_tasks_version()
-            _invalidate_owner_dashboard_cache()
 
         # ── Fire Performance Agent in background after completion ──
         _worker_for_agent = getattr(task, "staff_name", "") or ""
@@ -16029,27 +18132,38 @@ def admin_workers():
     today_str = datetime.now(timezone.utc).strftime("%Y-%m-%d")
     session = SessionLocal()
     try:
-        all_tasks = session.query(PropertyTaskModel).all()
-
-        # Group tasks by worker (staff_name, case-insensitive key)
+        # Every worker ever seen (one DISTINCT), then only today's open/done rows — no full-table load.
         by_worker = {}
-        for t in all_tasks:
-            name = (getattr(t, "staff_name", "") or "").strip()
-            if not name:
-                continue
-            key = name.lower()
-            if key not in by_worker:
-                by_worker[key] = {"name": name, "tasks": []}
-            by_worker[key]["tasks"].append(t)
+        for (raw_name,) in (
+            session.query(PropertyTaskModel.staff_name)
+            .filter(PropertyTaskModel.staff_name.isnot(None), PropertyTaskModel.staff_name != "")
+            .distinct()
+            .all()
+        ):
+            name = (raw_name or "").strip()
+            if name and name.lower() not in by_worker:
+                by_worker[name.lower()] = {"name": name, "tasks": []}
+        tomorrow_str = (datetime.now(timezone.utc) + timedelta(days=1)).strftime("%Y-%m-%d")
+        for t in (
+            session.query(PropertyTaskModel)
+            .filter(
+                PropertyTaskModel.created_at >= today_str,
+                PropertyTaskModel.created_at < tomorrow_str,
+                PropertyTaskModel.status_category.in_(("pending", "in_progress", "done")),
+            )
+            .all()
+        ):
+            key = (getattr(t, "staff_name", "") or "").strip().lower()
+            if key in by_worker:
+                by_worker[key]["tasks"].append(t)
 
         result = []
         for key, wd in by_worker.items():
-            tasks       = wd["tasks"]
-            today_tasks = [t for t in tasks if str(getattr(t,"created_at","") or "")[:10] == today_str]
+            today_tasks = wd["tasks"]
 
-            in_progress = [t for t in today_tasks if t.status == "In_Progress"]
-            pending_q   = [t for t in today_tasks if t.status in ("Pending","pending")]
-            done_today  = [t for t in today_tasks if t.status in ("Done","done","Completed","completed")]
+            in_progress = [t for t in today_tasks if t.status_category == "in_progress"]
+            pending_q   = [t for t in today_tasks if t.status_category == "pending"]
+            done_today  = [t for t in today_tasks if t.status_category == "done"]
 
             # avg duration (minutes) for completed tasks today
             durs = []
@@ -16236,11 +18350,23 @@ setInterval(load, 5000);   // auto-refresh every 5 s
 
 @app.route("/api/tasks/version", methods=["GET", "OPTIONS"])
 def api_tasks_version():
-    """Compatibility endpoint for MissionContext — `v` bumps when property_tasks change."""
+    """Compatibility endpoint for MissionContext — `v` bumps when the caller's tenant's
+    property_tasks change (same counter as /api/property-tasks/changes).  Anonymous
+    callers and DB-less demo mode get the process-wide counter."""
     if request.method == "OPTIONS":
         return Response(status=204)
+    v = _TASKS_VERSION_V
+    body = {"version": "1.0.0", "ok": True}
+    if SessionLocal and PropertyTaskModel:
+        try:
+            tenant_id = get_property_tasks_auth_bundle()["tenant_id"]
+            v = _task_change_log_version(tenant_id)
+            body["epoch"] = _TASK_CHANGE_LOG_EPOCH
+        except Exception:
+            pass
+    body["v"] = v
     try:
-        return _no_cache_json(jsonify({"version": "1.0.0", "v": _TASKS_VERSION_V, "ok": True})), 200
+        return _no_cache_json(jsonify(body)), 200
     except Exception as _ve:
         print(f"[api_tasks_version] jsonify failed: {_ve!r}", flush=True)
         return _no_cache_json(jsonify({"version": "1.0.0", "v": _TASKS_VERSION_V, "ok": True})), 200
@@ -16256,7 +18382,8 @@ def api_tasks_route():
 
 @app.route("/api/tasks/status-counts", methods=["GET", "OPTIONS"])
 def api_tasks_status_counts():
-    """Authoritative property_tasks row totals for tenant — fixes drift vs filtered GET payloads."""
+    """property_tasks row totals for tenant from the in-memory status-category counters
+    (exact for ORM writes and bulk statements; raw SQL writes are repaired by the periodic reconcile)."""
     if request.method == "OPTIONS":
         return Response(status=204)
     try:
@@ -16432,13 +18559,13 @@ def dev_test_task():
     }
 
     # Also push to _ACTIVITY_LOG so the chat feed shows it
-    _ACTIVITY_LOG.append({
+    _log_activity({
         "id":   task_id,
         "ts":   int(time.time() * 1000),
         "type": "task_created",
         "text": f"✅ משימה חדשה: {room} — {description[:60]}",
         "task": task_payload,
-    })
+    }, tenant_id)
 
     return jsonify({"ok": True, "task": task_payload}), 201
 
@@ -16581,7 +18708,7 @@ def _apply_dynamic_occupancy_to_manual_rooms(tenant_id, force=False):
         if not rows:
             _OCC_APPLY_LAST = {"t": now, "tenant": tid}
             return
-        n_dirty_slots, _, _ = _grid_dirty_slots_from_occ(base)
+        n_dirty_slots, _, _ = _grid_dirty_slots_from_occ(base, _room_grid_total(tid))
         changed = False
         pilot_status = (
             f"Active|pilot_occ={round(base, 1)}|grid_dirty={n_dirty_slots}|ts={int(time.time())}"
@@ -16641,18 +18768,19 @@ def _delete_sim_engine_tasks(session, tenant_id, property_id):
 
 def _generate_simulation_tasks_for_occ(tenant_id, occupancy_pct, user_id=None):
     """
-    Task volume scales with occupancy. At ~100% → 61 Cleaning tasks for Hotel Bazaar Jaffa.
+    Task volume scales with occupancy. At ~100% → one Cleaning task per grid unit for Hotel Bazaar Jaffa.
     Otherwise mixed Cleaning / Maintenance / Mini-bar restock (Service).
     """
     if not SessionLocal or not PropertyTaskModel:
         return 0, "Tasks unavailable"
     occ = float(occupancy_pct)
     bazaar_id = BAZAAR_JAFFA_PROPERTY_ID
+    n_units = max(1, _room_grid_total(tenant_id, user_id or f"demo-{tenant_id}"))
     if occ >= 99.5:
-        n_total = 61
+        n_total = n_units
         mix_cleaning_only = True
     else:
-        n_total = max(1, int(round(61.0 * occ / 100.0)))
+        n_total = max(1, int(round(n_units * occ / 100.0)))
         mix_cleaning_only = False
 
     session = SessionLocal()
@@ -16814,19 +18942,14 @@ def _tick_one_live_task_status(tenant_id, log_hebrew=True):
                 text_he = "קובי, המנקה סיים עכשיו את הלובי."
             else:
                 text_he = f"קובי, הושלמה משימה ב{pn} — {d[:40]}"
-            _ACTIVITY_LOG.append({
+            _log_activity({
                 "id": str(uuid.uuid4()),
                 "ts": int(time.time() * 1000),
                 "type": "live_tick",
                 "text": text_he,
                 "task": {"id": getattr(row, "id", None), "description": d, "status": row.status},
-            })
+            }, tenant_id)
         session.commit()
-        _bump_tasks_version()
-        try:
-            _invalidate_owner_dashboard_cache()
-        except Exception:
-            pass
         return {"changed": True, "action": action}
     except Exception as e:
         try:
@@ -16867,13 +18990,13 @@ def advance_simulation_task_statuses(tenant_id, log_hebrew=True):
                 if log_hebrew:
                     d = (row.description or "")[:100]
                     pn = (row.property_name or "").strip() or "הנכס"
-                    _ACTIVITY_LOG.append({
+                    _log_activity({
                         "id": str(uuid.uuid4()),
                         "ts": int(time.time() * 1000),
                         "type": "status_in_progress",
                         "text": f"קובי, משימה עברה מממתין לבתהליך — {d} ({pn})",
                         "task": {"id": row.id, "description": d, "status": "In_Progress"},
-                    })
+                    }, tenant_id)
 
         k2 = math.ceil(len(inprog_list) * 0.12) if inprog_list else 0
         if k2 > 0:
@@ -16889,16 +19012,15 @@ def advance_simulation_task_statuses(tenant_id, log_hebrew=True):
                         line_he = "קובי, המנקה סיים עכשיו את הלובי."
                     else:
                         line_he = f"קובי, סיימנו עכשיו משימה ב{pn} — {d[:50]}"
-                    _ACTIVITY_LOG.append({
+                    _log_activity({
                         "id": str(uuid.uuid4()),
                         "ts": int(time.time() * 1000),
                         "type": "status_done",
                         "text": line_he,
                         "task": {"id": row.id, "description": d[:80], "status": "Done"},
-                    })
+                    }, tenant_id)
         if promoted or done_moved:
             session.commit()
-            _invalidate_owner_dashboard_cache()
     except Exception as e:
         try:
             session.rollback()
@@ -17169,69 +19291,98 @@ def _maya_fastest_worker_reply(tenant_id):
 # ── Maya task context cache (data/maya_context.json) — last ~10 open tasks per tenant ──
 _MAYA_TASK_CONTEXT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "maya_context.json")
 _MAYA_TASK_CONTEXT_LOCK = threading.Lock()
-_MAYA_ROOM_CONFIRM_PENDING = {}
 _MAYA_ROOM_CONFIRM_TTL_SEC = 360
+_MAYA_ROOM_CONFIRM_PENDING = _shared_state.SharedDict("maya_room_confirm", ttl=_MAYA_ROOM_CONFIRM_TTL_SEC)
 
-# Short-lived cache for rooms + staff data so consecutive Maya messages don't
-# re-query the DB on every single SSE request (saves 200-600 ms per message).
-_MAYA_ROOMS_STAFF_CACHE: dict = {}
-_MAYA_ROOMS_STAFF_CACHE_TTL: int = 60  # seconds
+# Cache for rooms + staff data so consecutive Maya messages don't re-query the DB
+# on every single SSE request (saves 200-600 ms per message).  room.* / staff.*
+# domain events drop it, so the TTL only bounds raw-SQL writes.
+_MAYA_ROOMS_STAFF_CACHE_TTL: int = 600  # seconds
+_MAYA_ROOMS_STAFF_CACHE = _get_tenant_cache("maya_rooms_staff", _MAYA_ROOMS_STAFF_CACHE_TTL, max_entries=256)
 
 # ── Per-tenant stats-snapshot cache ──────────────────────────────────────────
 # _build_maya_chat_stats_payload runs several DB queries (rooms, task counts,
 # bookings, recent completions).  Caching for 30 s means consecutive messages
 # in a rapid conversation skip all of that work without meaningful data drift.
-_MAYA_STATS_CACHE: dict = {}
 _MAYA_STATS_CACHE_TTL: int = 30  # seconds
+_MAYA_STATS_CACHE = _get_tenant_cache("maya_stats", _MAYA_STATS_CACHE_TTL, max_entries=512)
+
+
+# ── Maya context assembly ────────────────────────────────────────────────────
+# ai_maya_command gathers rooms + staff, truth-layer tools, room inventory, memory and
+# the live-facts block as independent stages on one bounded pool (stage_runner.py):
+# time to first token follows the slowest stage, not the sum.  A stage past its
+# deadline answers with empty context; truth tools may call the live calendar, so
+# they get a longer one.
+MAYA_CONTEXT_WORKERS = int(os.getenv("MAYA_CONTEXT_WORKERS", "8") or 8)
+MAYA_CONTEXT_STAGE_TIMEOUT_SEC = float(os.getenv("MAYA_CONTEXT_STAGE_TIMEOUT_SEC", "4") or 4)
+MAYA_TRUTH_STAGE_TIMEOUT_SEC = float(os.getenv("MAYA_TRUTH_STAGE_TIMEOUT_SEC", "8") or 8)
+
+
+def _maya_context_runner():
+    def _in_app_context(fn):
+        with app.app_context():
+            return fn()
+
+    return _stage_runner.StageRunner(
+        _stage_runner.get_pool("maya-context", MAYA_CONTEXT_WORKERS), MAYA_CONTEXT_STAGE_TIMEOUT_SEC, wrap=_in_app_context
+    )
+
+
+def _maya_memory_prompt_blocks(tenant_id, command):
+    """(long-term memory block, recalled snippets) for the Maya prompt; ("", "") without maya_service."""
+    if not _maya_memory:
+        return "", ""
+    try:
+        return (
+            _maya_memory.format_memory_context(tenant_id) or "",
+            _maya_memory.recall_relevant_snippets(tenant_id, command or "") or "",
+        )
+    except Exception as _mm_e:
+        print("[Maya memory]", _mm_e, flush=True)
+        return "", ""
 
 
 def _get_maya_rooms_and_staff(tenant_id: str, user_id: str):
     """
-    Return (rooms_list, staff_by_property_dict) with a 60-second in-process cache.
+    Return (rooms_list, staff_by_property_dict) with an in-process cache (see _MAYA_ROOMS_STAFF_CACHE_TTL).
     A cache miss runs the same DB queries as before; a hit skips them entirely.
     """
-    now = time.time()
-    cached = _MAYA_ROOMS_STAFF_CACHE.get(tenant_id)
-    if cached and (now - cached["ts"]) < _MAYA_ROOMS_STAFF_CACHE_TTL:
-        return cached["rooms"], cached["staff_by_property"]
+    return _MAYA_ROOMS_STAFF_CACHE.get_or_load(
+        tenant_id, None, lambda: _load_maya_rooms_and_staff(tenant_id, user_id)
+    )
+
 
+def _load_maya_rooms_and_staff(tenant_id: str, user_id: str):
     rooms = list_manual_rooms(tenant_id, owner_id=user_id)
     staff_by_property: dict = {}
     if SessionLocal and PropertyStaffModel:
-        _sess = SessionLocal()
-        try:
-            for r in rooms:
-                pid = r.get("id")
-                if not pid:
-                    continue
-                recs = _sess.query(PropertyStaffModel).filter_by(property_id=pid).all()
-                staff_by_property[pid] = [
-                    {
-                        "id": s.id,
-                        "name": s.name,
-                        "role": s.role or "Staff",
-                        "phone_number": getattr(s, "phone_number", None),
-                    }
-                    for s in recs
-                ]
-        finally:
-            _sess.close()
+        staff_dir = _get_property_staff_directory(tenant_id, [r.get("id") for r in rooms])
+        for pid, recs in staff_dir.items():
+            staff_by_property[pid] = [
+                {
+                    "id": s["id"],
+                    "name": s["name"],
+                    "role": s["role"],
+                    "phone_number": s["phone_number"],
+                }
+                for s in recs
+            ]
 
-    _MAYA_ROOMS_STAFF_CACHE[tenant_id] = {
-        "rooms": rooms,
-        "staff_by_property": staff_by_property,
-        "ts": now,
-    }
     return rooms, staff_by_property
 
 
-def _invalidate_maya_rooms_staff_cache(tenant_id: str):
-    """Call after a staff register or property change so the next message re-fetches."""
-    _MAYA_ROOMS_STAFF_CACHE.pop(tenant_id, None)
+def _invalidate_maya_rooms_staff_cache(tenant_id):
+    """Drop rooms+staff for one tenant (None = all); the next Maya message re-fetches."""
+    _MAYA_ROOMS_STAFF_CACHE.invalidate(tenant_id)
     # Also drop any scoped stats entries for this tenant so counts stay accurate.
-    stale_keys = [k for k in _MAYA_STATS_CACHE if k.startswith(f"{tenant_id}:")]
-    for k in stale_keys:
-        _MAYA_STATS_CACHE.pop(k, None)
+    _MAYA_STATS_CACHE.invalidate(tenant_id)
+
+
+def _invalidate_maya_derived_caches(tenant_id):
+    """Stats snapshot + cached answers for one tenant (None = all); grid counts are read live from the room-state model."""
+    _MAYA_STATS_CACHE.invalidate(tenant_id)
+    _MAYA_ANSWER_CACHE.invalidate(tenant_id)
 
 
 def _maya_room_pending_key(tenant_id, user_id):
@@ -17537,19 +19688,10 @@ def _build_maya_room_inventory_text_scoped(tenant_id, user_id, scope_hint):
     """Same grid counts as _build_maya_room_inventory_text, optionally one property block only."""
     if not scope_hint:
         return _build_maya_room_inventory_text(tenant_id, user_id)
-    data = _room_status_grid_payload(tenant_id, user_id)
-    rooms = data.get("rooms") or []
+    by_property = _room_status_grid_counts(tenant_id, user_id)["by_property"]
 
     def _lines_for(pid, title):
-        block = [r for r in rooms if r.get("property_id") == pid]
-        if not block:
-            return ""
-        occ = sum(1 for r in block if r.get("status") == "occupied")
-        rd = sum(1 for r in block if r.get("status") == "ready")
-        dirty = sum(1 for r in block if r.get("status") == "dirty")
-        return (
-            f"{title}: {len(block)} units — {occ} Occupied, {rd} Ready, {dirty} Dirty."
-        )
+        return _room_inventory_block_line(by_property.get(pid), title)
 
     if scope_hint == "bazaar":
         return _lines_for("bazaar-jaffa-hotel", "Hotel Bazaar Jaffa") or _build_maya_room_inventory_text(tenant_id, user_id)
@@ -17578,47 +19720,45 @@ def _build_stats_summary_payload(tenant_id, user_id, for_maya_chat=False):
     total_property_tasks_all = 0
 
     if SessionLocal and PropertyTaskModel:
+        # Tenant totals come from the in-memory status-category counters (no query).
+        by_cat = _task_counter_snapshot("property_tasks", tenant_id or DEFAULT_TENANT_ID)
+        total_property_tasks_all = sum(by_cat.values())
+        terminal_cnt = by_cat.get("done", 0) + by_cat.get("archived", 0)
+        total_tasks = max(0, total_property_tasks_all - terminal_cnt)
+        if for_maya_chat:
+            tasks_by_status["Done"] = terminal_cnt
+            tasks_by_status["Pending"] = max(0, int(total_property_tasks_all) - terminal_cnt)
+    if SessionLocal and PropertyTaskModel and not for_maya_chat and room_ids:
         session_obj = SessionLocal()
         try:
-            _tq = _property_tasks_query_for_tenant(session_obj, tenant_id)
-            _terminal = ("Done", "done", "Completed", "completed", "archived", "Archived")
-            if _tq is not None:
-                total_property_tasks_all = _tq.count()
-                if or_ is not None:
-                    total_tasks = _tq.filter(
-                        or_(
-                            PropertyTaskModel.status.is_(None),
-                            PropertyTaskModel.status == "",
-                            ~PropertyTaskModel.status.in_(_terminal),
-                        )
-                    ).count()
-                else:
-                    total_tasks = total_property_tasks_all
-                if for_maya_chat and or_ is not None:
-                    done_cnt = int(_tq.filter(PropertyTaskModel.status.in_(_terminal)).count() or 0)
-                    tasks_by_status["Done"] = done_cnt
-                    tasks_by_status["Pending"] = max(0, int(total_property_tasks_all) - done_cnt)
-            if not for_maya_chat:
-                if room_ids:
-                    rows = session_obj.query(PropertyTaskModel).filter(
-                        PropertyTaskModel.property_id.in_(room_ids)
-                    ).all()
+            _rq = session_obj.query(PropertyTaskModel).filter(PropertyTaskModel.property_id.in_(room_ids))
+            for cat, n in (
+                _rq.with_entities(PropertyTaskModel.status_category, func.count(PropertyTaskModel.id))
+                .group_by(PropertyTaskModel.status_category)
+                .all()
+            ):
+                if cat == "done":
+                    tasks_by_status["Done"] += int(n or 0)
                 else:
-                    rows = []
-                for r in rows:
-                    status = (r.status or "Pending").strip() or "Pending"
-                    if status in ("Done", "done", "Completed", "completed"):
-                        tasks_by_status["Done"] += 1
-                    else:
-                        tasks_by_status["Pending"] += 1
-                    key = r.staff_name or r.assigned_to or "Unknown"
-                    if key:
-                        staff_workload[key] = staff_workload.get(key, 0) + 1
-                    if (r.staff_name or r.assigned_to) and getattr(r, "staff_phone", None):
-                        ph = (r.staff_phone or "").strip()
-                        if ph:
-                            sk = (r.staff_name or r.assigned_to, ph)
-                            staff_with_phones[sk] = staff_with_phones.get(sk, 0) + 1
+                    tasks_by_status["Pending"] += int(n or 0)
+            _who = func.coalesce(
+                func.nullif(PropertyTaskModel.staff_name, ""),
+                func.nullif(PropertyTaskModel.assigned_to, ""),
+            )
+            for name, n in (
+                _rq.with_entities(func.coalesce(_who, "Unknown"), func.count(PropertyTaskModel.id))
+                .group_by(func.coalesce(_who, "Unknown"))
+                .all()
+            ):
+                staff_workload[name] = int(n or 0)
+            _ph = func.trim(PropertyTaskModel.staff_phone)
+            for name, ph, n in (
+                _rq.filter(_who.isnot(None), _ph.isnot(None), _ph != "")
+                .with_entities(_who, _ph, func.count(PropertyTaskModel.id))
+                .group_by(_who, _ph)
+                .all()
+            ):
+                staff_with_phones[(name, ph)] = int(n or 0)
         finally:
             session_obj.close()
 
@@ -17628,19 +19768,16 @@ def _build_stats_summary_payload(tenant_id, user_id, for_maya_chat=False):
 
     if len(top_staff) < 3 and SessionLocal and PropertyStaffModel:
         seen_phones = {s["phone"].replace(" ", "") for s in top_staff}
-        session_obj = SessionLocal()
-        try:
-            for r in rooms:
-                pid = r.get("id")
-                if not pid or len(top_staff) >= 3:
-                    continue
-                for s in session_obj.query(PropertyStaffModel).filter_by(property_id=pid).all():
-                    ph = (getattr(s, "phone_number", None) or "").strip().replace(" ", "")
-                    if ph and ph not in seen_phones:
-                        top_staff.append({"name": s.name or "Staff", "phone": ph, "task_count": 0})
-                        seen_phones.add(ph)
-        finally:
-            session_obj.close()
+        room_ids = [r.get("id") for r in rooms if r.get("id")]
+        staff_dir = _get_property_staff_directory(tenant_id, room_ids)
+        for pid in room_ids:
+            if len(top_staff) >= 3:
+                break
+            for s in staff_dir.get(pid) or []:
+                ph = (s["phone_number"] or "").strip().replace(" ", "")
+                if ph and ph not in seen_phones:
+                    top_staff.append({"name": s["name"] or "Staff", "phone": ph, "task_count": 0})
+                    seen_phones.add(ph)
 
     # ── Rolling 30-day revenue + recent bookings from BookingModel ───────────
     monthly_revenue = 0
@@ -17650,13 +19787,19 @@ def _build_stats_summary_payload(tenant_id, user_id, for_maya_chat=False):
         try:
             _30ago = (datetime.now(timezone.utc) - timedelta(days=30)).strftime("%Y-%m-%d")
             _today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+            if _typed_time_ready("bookings"):
+                _co_rng = (
+                    BookingModel.check_out_date >= _parse_date_for_column(_30ago),
+                    BookingModel.check_out_date <= _parse_date_for_column(_today),
+                )
+            else:
+                _co_rng = (BookingModel.check_out >= _30ago, BookingModel.check_out <= _today)
             _rev = (
                 _bs.query(func.sum(BookingModel.total_price))
                 .filter(
                     BookingModel.tenant_id == tenant_id,
                     BookingModel.status.in_(["confirmed", "completed"]),
-                    BookingModel.check_out >= _30ago,
-                    BookingModel.check_out <= _today,
+                    *_co_rng,
                 )
                 .scalar()
             )
@@ -17693,8 +19836,7 @@ def _build_stats_summary_payload(tenant_id, user_id, for_maya_chat=False):
     # Hotel Bazaar / 61-unit portfolio: occupancy = (occupied rooms / 61) * 100 from live status grid
     occ_from_grid = None
     try:
-        _grid = _room_status_grid_payload(tenant_id, user_id)
-        _summ = _grid.get("summary") or {}
+        _summ = _room_status_grid_counts(tenant_id, user_id)["summary"]
         _gtot = int(_summ.get("total") or 0)
         _gocc = int(_summ.get("occupied") or 0)
         if _gtot > 0:
@@ -17704,11 +19846,7 @@ def _build_stats_summary_payload(tenant_id, user_id, for_maya_chat=False):
 
     legacy_tasks_table_total = 0
     if SessionLocal and TaskModel:
-        _ls = SessionLocal()
-        try:
-            legacy_tasks_table_total = _ls.query(TaskModel).count()
-        finally:
-            _ls.close()
+        legacy_tasks_table_total = sum(_task_counter_snapshot("tasks").values())
 
     recent_open_tasks = []
     if not for_maya_chat:
@@ -17722,21 +19860,10 @@ def _build_stats_summary_payload(tenant_id, user_id, for_maya_chat=False):
             try:
                 _rtq = _property_tasks_query_for_tenant(_rot_s, tenant_id)
                 if _rtq is not None:
-                    _terminal = ("Done", "done", "Completed", "completed", "archived", "Archived")
-                    if or_ is not None:
-                        q_open = _rtq.filter(
-                            or_(
-                                PropertyTaskModel.status.is_(None),
-                                PropertyTaskModel.status == "",
-                                ~PropertyTaskModel.status.in_(_terminal),
-                            )
-                        ).order_by(PropertyTaskModel.created_at.desc()).limit(_ro_cap)
-                    else:
-                        q_open = _rtq.order_by(PropertyTaskModel.created_at.desc()).limit(_ro_cap)
+                    q_open = _rtq.filter(
+                        PropertyTaskModel.status_category.in_(("pending", "in_progress"))
+                    ).order_by(PropertyTaskModel.created_at.desc()).limit(_ro_cap)
                     for r in q_open:
-                        st = (getattr(r, "status", "") or "").strip().lower()
-                        if st in ("done", "completed", "archived"):
-                            continue
                         recent_open_tasks.append({
                             "id": r.id,
                             "description": ((getattr(r, "description", None) or "")[:140]).strip(),
@@ -17776,7 +19903,14 @@ def stats_summary():
             user_id = f"demo-{tenant_id}"
     else:
         user_id = f"demo-{tenant_id}"
-    return jsonify(_build_stats_summary_payload(tenant_id, user_id))
+    etag = _tenant_data_etag(
+        "stats-summary", tenant_id, ("tasks", "rooms", "bookings", "grid", "legacy_tasks"),
+        user_id, get_daily_stats().get("generated_at"),
+        ttl_bucket_sec=30,  # rolling revenue window / recent lists drift with the clock
+    )
+    if _etag_matches_request(etag):
+        return _not_modified(etag)
+    return _revalidate_json(jsonify(_build_stats_summary_payload(tenant_id, user_id)), etag)
 
 
 @app.route("/api/dashboard-stats", methods=["GET", "OPTIONS"])
@@ -17818,6 +19952,107 @@ def api_dashboard_stats():
     })
 
 
+# A done task counts on its completion day (created day when completed_at is empty) —
+# ISO strings, so the day is the 10-char prefix and ranges compare as text.  The OR keeps
+# both halves on the (tenant_id, completed_at) / (tenant_id, created_at) report indexes.
+_OWNER_KPI_DONE_WINDOW_SQL = """
+    tenant_id = :tenant_id AND status_category = 'done'
+    AND (completed_at >= :since_day
+         OR ((completed_at IS NULL OR completed_at = '') AND created_at >= :since_day))
+"""
+
+
+def _owner_kpi_duration_sql(dname):
+    """Minutes from created to completed, per dialect (typed columns once backfilled)."""
+    if dname == "postgresql":
+        if _typed_time_ready("property_tasks"):
+            return "EXTRACT(EPOCH FROM (completed_ts - created_ts)) / 60.0"
+        return "EXTRACT(EPOCH FROM (completed_at::timestamptz - created_at::timestamptz)) / 60.0"
+    return "(julianday(completed_at) - julianday(created_at)) * 1440.0"
+
+
+def _owner_dashboard_task_kpis(tenant_id):
+    """
+    Missions today, average clean minutes, top performer, 7-day completed series and the
+    latest 12 tasks — grouped queries over every task in the window (no row cap, no
+    per-row parsing in Python).  Cached per tenant until the task version or UTC day moves.
+    """
+    now = datetime.now(timezone.utc)
+    today = now.strftime("%Y-%m-%d")
+    key = (today, _data_version("tasks", tenant_id))
+    return _OWNER_DASHBOARD_KPI_CACHE.get_or_load(
+        tenant_id, key, lambda: _owner_dashboard_task_kpis_uncached(tenant_id, now)
+    )
+
+
+def _owner_dashboard_task_kpis_uncached(tenant_id, now):
+    days = [(now - timedelta(days=i)).strftime("%Y-%m-%d") for i in range(6, -1, -1)]
+    out = {
+        "missions_today": 0,
+        "avg_clean_minutes": 0,
+        "top_performer": {"name": "—", "missions": 0},
+        "chart_data": [{"date": d, "completed": 0, "goal": 10} for d in days],
+        "activity": [],
+    }
+    if not SessionLocal or not PropertyTaskModel or not text:
+        return out
+    dname = getattr(ENGINE.dialect, "name", "sqlite") if ENGINE else "sqlite"
+    kpi_since = (now - timedelta(days=OWNER_DASHBOARD_KPI_WINDOW_DAYS - 1)).strftime("%Y-%m-%d")
+    session = SessionLocal()
+    try:
+        per_day = dict(session.execute(text(f"""
+            SELECT substr(COALESCE(NULLIF(completed_at, ''), created_at), 1, 10) AS day, COUNT(*)
+            FROM property_tasks
+            WHERE {_OWNER_KPI_DONE_WINDOW_SQL}
+            GROUP BY 1
+        """), {"tenant_id": tenant_id, "since_day": days[0]}).fetchall())
+        for point in out["chart_data"]:
+            point["completed"] = int(per_day.get(point["date"]) or 0)
+        out["missions_today"] = out["chart_data"][-1]["completed"]
+
+        top = session.execute(text(f"""
+            SELECT COALESCE(NULLIF(TRIM(staff_name), ''), 'Staff') AS sn, COUNT(*) AS n
+            FROM property_tasks
+            WHERE {_OWNER_KPI_DONE_WINDOW_SQL}
+            GROUP BY 1
+            ORDER BY n DESC, sn
+            LIMIT 1
+        """), {"tenant_id": tenant_id, "since_day": kpi_since}).first()
+        if top:
+            out["top_performer"] = {"name": top[0], "missions": int(top[1] or 0)}
+
+        q = _property_tasks_query_for_tenant(session, tenant_id)
+        for r in q.order_by(PropertyTaskModel.created_at.desc()).limit(12).all():
+            out["activity"].append({
+                "id": r.id,
+                "staff": getattr(r, "staff_name", None) or "—",
+                "room": getattr(r, "property_name", None) or r.property_id or "—",
+                "status": r.status or "Pending",
+                "task_type": getattr(r, "task_type", None) or TASK_TYPE_SERVICE_HE,
+                "ts": (r.created_at or "")[:16],
+                "photo_url": (getattr(r, "photo_url", None) or "") or "",
+            })
+        # Last: on PostgreSQL a malformed ISO string fails the cast (and the transaction).
+        dur = _owner_kpi_duration_sql(dname)
+        avg = session.execute(text(f"""
+            SELECT AVG(m) FROM (
+                SELECT {dur} AS m
+                FROM property_tasks
+                WHERE {_OWNER_KPI_DONE_WINDOW_SQL}
+                  AND created_at IS NOT NULL AND created_at != ''
+                  AND completed_at IS NOT NULL AND completed_at != ''
+            ) d
+            WHERE m > 0
+        """), {"tenant_id": tenant_id, "since_day": kpi_since}).scalar()
+        if avg:
+            out["avg_clean_minutes"] = max(1, int(round(float(avg))))
+    except Exception as e:
+        print(f"[_owner_dashboard_task_kpis] {e}", flush=True)
+    finally:
+        session.close()
+    return out
+
+
 def _build_owner_dashboard_analytics(tenant_id, user_id):
     """Owner Analytics: MRR $1500, readiness from portfolio occupancy, 7-day chart (fixes missing route 404)."""
     # Portfolio seed runs at startup + Maya autonomous loop — not on every analytics request (cache speed).
@@ -17845,76 +20080,7 @@ def _build_owner_dashboard_analytics(tenant_id, user_id):
     per_property_usd = 100
     active_properties = max(n_props, 15) if n_props else 15
 
-    today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-    missions_today = 0
-    chart_data = []
-    activity = []
-    top_performer = {"name": "—", "missions": 0}
-    staff_counts = {}
-    avg_clean_minutes = 0
-
-    if SessionLocal and PropertyTaskModel:
-        session = SessionLocal()
-        try:
-            q = _property_tasks_query_for_tenant(session, tenant_id)
-            rows = q.order_by(PropertyTaskModel.created_at.desc()).limit(400).all() if q else []
-            _dur_mins = []
-            for _r in rows:
-                stx = (_r.status or "").strip().lower()
-                if stx not in ("done", "completed"):
-                    continue
-                try:
-                    cr = (_r.created_at or "").strip()
-                    comp = (getattr(_r, "completed_at", None) or "").strip()
-                    if not cr or not comp:
-                        continue
-                    t0 = datetime.fromisoformat(cr.replace("Z", "+00:00"))
-                    t1 = datetime.fromisoformat(comp.replace("Z", "+00:00"))
-                    if t1 > t0:
-                        _dur_mins.append((t1 - t0).total_seconds() / 60.0)
-                except Exception:
-                    continue
-            if _dur_mins:
-                avg_clean_minutes = max(1, int(round(sum(_dur_mins) / len(_dur_mins))))
-            for r in rows:
-                st = (r.status or "").strip().lower()
-                cr = (r.created_at or "")[:10]
-                comp = (getattr(r, "completed_at", None) or "")[:10]
-                if st in ("done", "completed"):
-                    sn = (getattr(r, "staff_name", None) or "Staff").strip() or "Staff"
-                    staff_counts[sn] = staff_counts.get(sn, 0) + 1
-                    ref_day = comp if comp else cr
-                    if ref_day == today:
-                        missions_today += 1
-            for i in range(6, -1, -1):
-                d = (datetime.now(timezone.utc) - timedelta(days=i)).strftime("%Y-%m-%d")
-                c = 0
-                for r in rows:
-                    st = (r.status or "").strip().lower()
-                    if st not in ("done", "completed"):
-                        continue
-                    comp = (getattr(r, "completed_at", None) or "")[:10]
-                    cr = (r.created_at or "")[:10]
-                    day = comp if comp else cr
-                    if day == d:
-                        c += 1
-                chart_data.append({"date": d, "completed": c, "goal": 10})
-            for r in rows[:12]:
-                activity.append({
-                    "id": r.id,
-                    "staff": getattr(r, "staff_name", None) or "—",
-                    "room": getattr(r, "property_name", None) or r.property_id or "—",
-                    "status": r.status or "Pending",
-                    "task_type": getattr(r, "task_type", None) or TASK_TYPE_SERVICE_HE,
-                    "ts": (r.created_at or "")[:16],
-                    "photo_url": (getattr(r, "photo_url", None) or "") or "",
-                })
-        finally:
-            session.close()
-
-    if staff_counts:
-        top_name = max(staff_counts.items(), key=lambda x: x[1])
-        top_performer = {"name": top_name[0], "missions": top_name[1]}
+    kpis = _owner_dashboard_task_kpis(tenant_id)
 
     maya_insight = (
         f"קובי — פורטפוליו: {n_props} נכסים · מוכנות ממוצעת {readiness_pct}% (לפי תפוסה בבסיס הנתונים). "
@@ -17924,12 +20090,12 @@ def _build_owner_dashboard_analytics(tenant_id, user_id):
     return {
         "kpi": {
             "readiness_pct": readiness_pct,
-            "missions_today": missions_today,
-            "avg_clean_minutes": avg_clean_minutes,
-            "top_performer": top_performer,
+            "missions_today": kpis["missions_today"],
+            "avg_clean_minutes": kpis["avg_clean_minutes"],
+            "top_performer": kpis["top_performer"],
         },
-        "chart_data": chart_data,
-        "activity": activity,
+        "chart_data": kpis["chart_data"],
+        "activity": kpis["activity"],
         "maya_insight": maya_insight,
         "mrr_usd": mrr_usd,
         "per_property_usd": per_property_usd,
@@ -17949,21 +20115,20 @@ def api_analytics_owner_dashboard():
     except Exception:
         pass
     refresh = (request.args.get("refresh") or "").strip().lower() in ("1", "true", "yes", "force")
-    cache_key = f"{tenant_id}:{user_id}"
-    now = time.time()
-    oc = _OWNER_DASHBOARD_CACHE
-    if (
-        not refresh
-        and oc.get("payload") is not None
-        and oc.get("key") == cache_key
-        and (now - float(oc.get("ts") or 0)) < OWNER_DASHBOARD_CACHE_TTL_SEC
-    ):
-        return jsonify(oc["payload"]), 200
-    payload = _build_owner_dashboard_analytics(tenant_id, user_id)
-    oc["ts"] = now
-    oc["key"] = cache_key
-    oc["payload"] = payload
-    return jsonify(payload), 200
+    etag = _tenant_data_etag(
+        "owner-dashboard", tenant_id, ("tasks", "rooms", "dashboard"),
+        user_id, get_daily_stats().get("generated_at"),
+        ttl_bucket_sec=OWNER_DASHBOARD_CACHE_TTL_SEC,
+    )
+    if not refresh and _etag_matches_request(etag):
+        return _not_modified(etag)
+    # Concurrent misses for the same (user, etag) share one rebuild.
+    payload = _OWNER_DASHBOARD_CACHE.get_or_load(
+        tenant_id, (user_id, etag),
+        lambda: _build_owner_dashboard_analytics(tenant_id, user_id),
+        refresh=refresh,
+    )
+    return _revalidate_json(jsonify(payload), etag), 200
 
 
 @app.route("/api/analytics/alerts", methods=["GET", "OPTIONS"])
@@ -18225,17 +20390,18 @@ def get_messages():
         )
     finally:
         session.close()
-    return jsonify([
-        {
-            "id": record.id,
-            "lead_id": record.lead_id,
-            "direction": record.direction,
-            "channel": record.channel,
-            "content": record.content,
-            "created_at": record.created_at,
-        }
-        for record in records
-    ])
+    return jsonify([_serialize_message_row(record) for record in records])
+
+
+def _serialize_message_row(record):
+    return {
+        "id": record.id,
+        "lead_id": record.lead_id,
+        "direction": record.direction,
+        "channel": record.channel,
+        "content": record.content,
+        "created_at": record.created_at,
+    }
 
 
 @app.route("/api/field/login", methods=["POST", "OPTIONS"])
@@ -18858,25 +21024,7 @@ def get_lead(lead_id):
 @require_auth
 def stream_leads():
     tenant_id = get_tenant_id_from_request() or DEFAULT_TENANT_ID
-
-    @stream_with_context
-    def event_stream():
-        event_queue = get_event_queue(tenant_id)
-        print(f"[SSE stream_leads] stream open tenant={tenant_id!r}", flush=True)
-        try:
-            while True:
-                event = event_queue.get()
-                yield f"event: {event['type']}\n"
-                yield f"data: {json.dumps(event['payload'])}\n\n"
-        except GeneratorExit:
-            print(f"[SSE stream_leads] disconnect tenant={tenant_id!r}", flush=True)
-            raise
-
-    return Response(
-        event_stream(),
-        mimetype="text/event-stream",
-        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
-    )
+    return _sse_hub_response(_LEADS_SSE_HUB, tenant_id, "stream_leads")
 
 
 @app.route("/api/stream/staff", methods=["GET"])
@@ -18888,18 +21036,194 @@ def stream_staff():
     except Exception as e:
         print(f"[SSE stream_staff] tenant resolution failed: {type(e).__name__}: {e}", flush=True)
         return jsonify({"error": "Unauthorized", "detail": str(e)}), 401
+    return _sse_hub_response(_STAFF_SSE_HUB, tenant_id, "stream_staff")
+
+
+# ── Multiplexed realtime channel ─────────────────────────────────────────────
+# One EventSource per browser tab instead of a polling timer per widget:
+# GET /api/stream/realtime?topics=tasks,grid,activity,staff,leads,messages.
+# Each stream keeps a cursor per topic and sleeps on _REALTIME_NOTIFIER (woken by
+# data-version bumps, the task change log, the leads/staff hubs and the
+# activity log).  On wake it compares versions and pushes one compact event per topic
+# that moved: task rows + removed ids, new activity entries, staff/lead hub events,
+# new message rows, or {"refetch": true} where no row-level diff exists (grid).
+# Diffs are computed once per (tenant, cursor, version) and shared by every stream
+# at that cursor, so a busy tenant's change costs one query, not one per tab.
+REALTIME_TOPICS = ("tasks", "grid", "activity", "staff", "leads", "messages")
+REALTIME_COALESCE_SEC = max(0.0, float(os.getenv("REALTIME_COALESCE_SEC", "0.25") or 0.25))
+REALTIME_MESSAGES_PER_PUSH = 50
+_REALTIME_DIFF_CACHE = _get_tenant_cache("realtime_diffs", 30, max_entries=1024)
+
+
+def _realtime_messages_head(tenant_id):
+    """Newest message created_at for the tenant ("" when none)."""
+    if not SessionLocal or not MessageModel:
+        return ""
+    session = SessionLocal()
+    try:
+        row = (
+            session.query(MessageModel.created_at)
+            .filter_by(tenant_id=tenant_id)
+            .order_by(MessageModel.created_at.desc())
+            .first()
+        )
+        return (row[0] if row else "") or ""
+    finally:
+        session.close()
+
+
+def _realtime_new_messages(tenant_id, after):
+    if not SessionLocal or not MessageModel:
+        return []
+    session = SessionLocal()
+    try:
+        rows = (
+            session.query(MessageModel)
+            .filter(MessageModel.tenant_id == tenant_id, MessageModel.created_at > after)
+            .order_by(MessageModel.created_at.asc())
+            .limit(REALTIME_MESSAGES_PER_PUSH + 1)
+            .all()
+        )
+        return [_serialize_message_row(r) for r in rows]
+    finally:
+        session.close()
+
+
+def _realtime_version(topic, tenant_id):
+    if topic == "tasks":
+        return _task_change_log_version(tenant_id)
+    if topic == "grid":
+        return _data_version("grid", tenant_id)
+    if topic == "activity":
+        return _ACTIVITY_LOG.last_seq(tenant_id)
+    if topic == "staff":
+        return (_STAFF_SSE_HUB.last_id(tenant_id), _data_version("staff", tenant_id))
+    if topic == "leads":
+        return _LEADS_SSE_HUB.last_id(tenant_id)
+    return _data_version("messages", tenant_id)
+
+
+def _realtime_hub_diff(hub, tenant_id, cursor):
+    events, gap = hub.since(tenant_id, cursor)
+    out = [{"type": etype, "payload": json.loads(data)} for _eid, etype, data in events]
+    return out, gap, (events[-1][0] if events else hub.last_id(tenant_id))
+
+
+def _realtime_topic_diff(topic, ctx, cursor, version):
+    """(payload or None, new cursor) for a topic whose version moved past the stream's cursor."""
+    tid = ctx["tenant_id"]
+    if topic == "tasks":
+        identity = ctx["identity"]
+        key = ("tasks", identity["user_id"], identity["app_role"], ctx["worker"], ctx["status"], cursor, version)
+        body = _REALTIME_DIFF_CACHE.get_or_load(
+            tid, key, lambda: _property_task_changes_body(identity, cursor, ctx["worker"], ctx["status"])
+        )
+        if not body["resync"] and not body["tasks"] and not body["removed"]:
+            return None, body["v"]
+        return body, body["v"]
+    if topic == "grid":
+        return {"v": version, "refetch": True}, version
+    if topic == "activity":
+        events = _ACTIVITY_LOG.since(tid, cursor=cursor)
+        if not events:
+            return None, version
+        return {"events": events, "server_ts": int(time.time() * 1000), "cursor": events[-1]["seq"]}, events[-1]["seq"]
+    if topic == "staff":
+        hub_cursor, staff_v = cursor
+        updates, gap, hub_last = _realtime_hub_diff(_STAFF_SSE_HUB, tid, hub_cursor)
+        refetch = gap or staff_v != version[1]
+        if not updates and not refetch:
+            return None, (hub_last, version[1])
+        return {"updates": updates, "refetch": refetch}, (hub_last, version[1])
+    if topic == "leads":
+        events, gap, hub_last = _realtime_hub_diff(_LEADS_SSE_HUB, tid, cursor)
+        if not events and not gap:
+            return None, hub_last
+        return {"events": events, "resync": gap}, hub_last
+    # messages: cursor is (data version, newest created_at pushed)
+    after = cursor[1]
+    rows = _REALTIME_DIFF_CACHE.get_or_load(
+        tid, ("messages", after, version), lambda: _realtime_new_messages(tid, after)
+    )
+    refetch = len(rows) > REALTIME_MESSAGES_PER_PUSH
+    rows = rows[:REALTIME_MESSAGES_PER_PUSH]
+    if not rows:
+        return None, (version, after)
+    return {"messages": rows, "refetch": refetch}, (version, rows[-1]["created_at"])
+
+
+@app.route("/api/stream/realtime", methods=["GET"])
+def stream_realtime():
+    """
+    Multiplexed push channel.  ?topics= comma list (default all of REALTIME_TOPICS);
+    tasks honours ?worker= / ?status= like GET /api/property-tasks and may resume from
+    ?tasks_since=<X-Tasks-Version>&epoch=<X-Tasks-Epoch>.  Sends "hello" with the
+    starting cursors, then one "<topic>" event per change; clients refetch a topic
+    on hello (after a reconnect) or when its payload says resync / refetch.
+    """
+    try:
+        identity = get_property_tasks_auth_bundle()
+    except ValueError as _auth_e:
+        return jsonify({"error": str(_auth_e) or "Unauthorized"}), 401
+    raw_topics = (request.args.get("topics") or "").strip()
+    topics = [t for t in (x.strip().lower() for x in raw_topics.split(",")) if t] if raw_topics else list(REALTIME_TOPICS)
+    unknown = [t for t in topics if t not in REALTIME_TOPICS]
+    if unknown:
+        return jsonify({"error": f"unknown topics: {', '.join(unknown)}"}), 400
+    topics = list(dict.fromkeys(topics))
+    tenant_id = identity["tenant_id"]
+    ctx = {
+        "identity": identity,
+        "tenant_id": tenant_id,
+        "worker": _apply_staff_task_scope(
+            identity, (request.args.get("worker") or request.args.get("worker_id") or "").strip().lower()
+        ),
+        "status": (request.args.get("status") or "").strip().lower(),
+    }
+    tasks_since = None
+    if (request.args.get("epoch") or "").strip() in ("", _TASK_CHANGE_LOG_EPOCH):
+        try:
+            tasks_since = int(request.args.get("tasks_since")) if request.args.get("tasks_since") else None
+        except ValueError:
+            tasks_since = None
 
     @stream_with_context
     def event_stream():
-        q = get_staff_event_queue(tenant_id)
-        print(f"[SSE stream_staff] stream open tenant={tenant_id!r}", flush=True)
+        seen = _REALTIME_NOTIFIER.generation(tenant_id)
+        cursors = {t: _realtime_version(t, tenant_id) for t in topics}
+        if "tasks" in cursors and tasks_since is not None:
+            cursors["tasks"] = tasks_since
+        if "messages" in cursors:
+            cursors["messages"] = (cursors["messages"], _realtime_messages_head(tenant_id))
+        print(f"[SSE stream_realtime] open tenant={tenant_id!r} topics={','.join(topics)}", flush=True)
         try:
+            yield "retry: 3000\n\n"
+            hello = {"topics": topics, "epoch": _TASK_CHANGE_LOG_EPOCH, "tasks_v": cursors.get("tasks")}
+            yield f"event: hello\ndata: {json.dumps(hello)}\n\n"
+            check_now = tasks_since is not None
             while True:
-                event = q.get()
-                yield f"event: {event['type']}\n"
-                yield f"data: {json.dumps(event['payload'])}\n\n"
+                timed_out = False
+                if not check_now:
+                    # A heartbeat timeout also re-checks every version (writes we were not told about).
+                    timed_out = _REALTIME_NOTIFIER.wait(tenant_id, seen, SSE_HEARTBEAT_SEC) == seen
+                    if not timed_out and REALTIME_COALESCE_SEC:
+                        time.sleep(REALTIME_COALESCE_SEC)  # let a burst of commits land as one push
+                    seen = _REALTIME_NOTIFIER.generation(tenant_id)
+                check_now = False
+                sent = False
+                for topic in topics:
+                    version = _realtime_version(topic, tenant_id)
+                    if version == (cursors[topic][0] if topic == "messages" else cursors[topic]):
+                        continue
+                    payload, cursors[topic] = _realtime_topic_diff(topic, ctx, cursors[topic], version)
+                    if payload is not None:
+                        payload["topic"] = topic
+                        yield f"event: {topic}\ndata: {json.dumps(payload, default=str)}\n\n"
+                        sent = True
+                if timed_out and not sent:
+                    yield ": heartbeat\n\n"
         except GeneratorExit:
-            print(f"[SSE stream_staff] disconnect tenant={tenant_id!r}", flush=True)
+            print(f"[SSE stream_realtime] disconnect tenant={tenant_id!r}", flush=True)
             raise
 
     return Response(
@@ -18943,9 +21267,13 @@ def twilio_whatsapp_webhook():
         # Normalise the sender number (strip "whatsapp:" prefix)
         clean_from = from_number.replace("whatsapp:", "").strip()
 
-        # Route the message through Maya
+        # Route the message through Maya — gated per receiving number (not the shared "_" bucket)
         try:
-            reply_text = _gemini_generate(f"Guest ({profile or clean_from}) says: {body}")
+            reply_text = _gemini_generate(
+                f"Guest ({profile or clean_from}) says: {body}",
+                tenant_id=f"whatsapp:{to_number.replace('whatsapp:', '').strip() or 'inbound'}",
+                max_wait=TWILIO_WEBHOOK_LLM_MAX_WAIT_SEC,
+            )
         except Exception as _e:
             reply_text = "תודה על הפנייה! נחזור אליך בהקדם. 🙏"
             print(f"[Twilio/WhatsApp] Maya offline: {_e}")
@@ -19346,6 +21674,11 @@ def generate_weekly_report(days: int = 7) -> dict:
         return {"error": "DB unavailable", "hotel_name": hotel}
 
     try:
+        # Typed *_ts columns once their backfill has completed; ISO strings before that.
+        perf_typed = _typed_time_ready("worker_performance")
+        tasks_typed = _typed_time_ready("property_tasks")
+        from_day = datetime(from_dt.year, from_dt.month, from_dt.day, tzinfo=timezone.utc)
+
         # ── WorkerPerformance (individual task completion records) ──────
         if WorkerPerformanceModel:
             perf_rows = session.query(WorkerPerformanceModel).filter(
@@ -19366,6 +21699,11 @@ def generate_weekly_report(days: int = 7) -> dict:
                     except Exception:
                         pass
                 # peak hour from completed_at
+                if perf_typed:
+                    ts = _ts_as_utc(r.completed_ts or r.created_ts)
+                    if ts is not None:
+                        peak_hours[ts.hour] += 1
+                    continue
                 for ts_field in (r.completed_at, r.created_at):
                     if ts_field:
                         try:
@@ -19378,7 +21716,16 @@ def generate_weekly_report(days: int = 7) -> dict:
                             pass
 
         # ── PropertyTask (all tasks including pending) for total count ──
-        if PropertyTaskModel:
+        if PropertyTaskModel and tasks_typed:
+            task_ts = [
+                _ts_as_utc(ts) for (ts,) in session.query(PropertyTaskModel.created_ts).filter(
+                    PropertyTaskModel.created_ts >= from_day
+                )
+            ]
+            total_tasks = len(task_ts)
+            for ts in task_ts:
+                peak_hours[ts.hour] += 1
+        elif PropertyTaskModel:
             task_rows = session.query(PropertyTaskModel).filter(
                 PropertyTaskModel.created_at >= from_str
             ).order_by(PropertyTaskModel.created_at.desc()).all()
@@ -19440,7 +21787,7 @@ def generate_weekly_report(days: int = 7) -> dict:
             f"Workers: {', '.join([w['worker'] for w in worker_rows[:5]])}\n"
             f"Be positive, data-driven, and encouraging. Include an emoji. Max 2 sentences."
         )
-        ai_summary = _gemini_generate(ai_prompt)
+        ai_summary = _gemini_generate(ai_prompt, priority=_llm_gate.BACKGROUND)
         print(f"[weekly_report] AI summary generated ({len(ai_summary or '')} chars)")
     except Exception as e:
         print(f"[weekly_report] AI summary error: {e}")
@@ -19749,6 +22096,15 @@ def _do_startup_init():
             start_vip_escalation_watcher()
         except Exception as _vip_e:
             print(f"[startup] ⚠️ VIP escalation watcher: {_vip_e}", flush=True)
+        try:
+            start_typed_time_backfill()
+        except Exception as _ttb_e:
+            print(f"[startup] ⚠️ typed time backfill: {_ttb_e}", flush=True)
+        try:
+            _reconcile_task_counters(force=True)
+            start_task_counter_reconciler()
+        except Exception as _tc_e:
+            print(f"[startup] ⚠️ task counters: {_tc_e}", flush=True)
         # run_hotel_ops_simulation_refresh is already invoked from _run_bootstrap_operational_data — avoid double DB churn.
         _sim_log(f"✅ Startup complete — DB: {db_label}", "success")
         print(f"[startup] 🚀 Server ready on port {os.environ.get('PORT', 1000)}")
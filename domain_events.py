@@ -0,0 +1,95 @@
+"""
+In-process domain event bus — task / room / staff / booking change notifications.
+app.py publishes from the SQLAlchemy session after_commit hook; caches and version
+counters subscribe so invalidation no longer depends on every write path remembering it.
+No Flask imports here.
+"""
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+_LOCK = threading.Lock()
+_SUBSCRIBERS: Dict[str, List[Callable[[Dict[str, Any]], None]]] = {}
+_STATS: Dict[str, int] = {"published": 0, "delivered": 0, "handler_errors": 0}
+
+TASK_CREATED = "task.created"
+TASK_UPDATED = "task.updated"
+TASK_STATUS_CHANGED = "task.status_changed"
+TASK_DELETED = "task.deleted"
+ROOM_UPDATED = "room.updated"
+STAFF_CHANGED = "staff.changed"
+BOOKING_CHANGED = "booking.changed"
+LEGACY_TASK_CHANGED = "legacy_task.changed"
+STAFF_MEMBER_CHANGED = "staff_member.changed"
+MESSAGE_CHANGED = "message.changed"
+KNOWLEDGE_CHANGED = "knowledge.changed"
+
+
+def subscribe(pattern: str, handler: Callable[[Dict[str, Any]], None]) -> None:
+    """
+    Register handler for an exact event type ("task.created"), a domain prefix
+    ("task.*") or everything ("*").  Handlers run synchronously on the committing
+    thread, so they must stay cheap (cache pops, counter bumps).
+    """
+    with _LOCK:
+        handlers = _SUBSCRIBERS.setdefault(pattern, [])
+        if handler not in handlers:
+            handlers.append(handler)
+
+
+def unsubscribe(pattern: str, handler: Callable[[Dict[str, Any]], None]) -> None:
+    with _LOCK:
+        handlers = _SUBSCRIBERS.get(pattern) or []
+        if handler in handlers:
+            handlers.remove(handler)
+
+
+def make_event(event_type: str, tenant_id: Optional[str], **payload: Any) -> Dict[str, Any]:
+    """tenant_id=None means the change may touch every tenant (bulk statement, untenanted table)."""
+    ev = dict(payload)
+    ev["type"] = event_type
+    ev["tenant_id"] = tenant_id
+    return ev
+
+
+def _handlers_for(event_type: str) -> List[Callable[[Dict[str, Any]], None]]:
+    domain = event_type.split(".", 1)[0]
+    with _LOCK:
+        out: List[Callable[[Dict[str, Any]], None]] = []
+        for pattern in (event_type, f"{domain}.*", "*"):
+            for h in _SUBSCRIBERS.get(pattern) or ():
+                if h not in out:
+                    out.append(h)
+    return out
+
+
+def publish(event: Dict[str, Any]) -> None:
+    publish_many([event])
+
+
+def publish_many(events: Iterable[Dict[str, Any]]) -> None:
+    """
+    Deliver events in order.  A failing handler is logged and skipped so one bad
+    subscriber cannot leave the other caches stale.
+    """
+    for ev in events or ():
+        handlers = _handlers_for(ev.get("type") or "")
+        with _LOCK:
+            _STATS["published"] += 1
+        for h in handlers:
+            try:
+                h(ev)
+                with _LOCK:
+                    _STATS["delivered"] += 1
+            except Exception as e:
+                with _LOCK:
+                    _STATS["handler_errors"] += 1
+                print(f"[domain_events] {ev.get('type')} handler {getattr(h, '__name__', h)}: {e!r}", flush=True)
+
+
+def stats() -> Dict[str, Any]:
+    with _LOCK:
+        out: Dict[str, Any] = dict(_STATS)
+        out["subscriptions"] = {k: len(v) for k, v in _SUBSCRIBERS.items() if v}
+    return out
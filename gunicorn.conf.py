@@ -0,0 +1,75 @@
+"""
+Gunicorn settings — `gunicorn app:app -c gunicorn.conf.py`.
+
+GUNICORN_PROFILE picks how a worker serves requests:
+  sync    → one request per worker process (old default). Every open /api/stream/* or
+            Maya SSE response pins a whole worker, so a few dashboards starve the API.
+  gthread → GUNICORN_THREADS threads per worker; a stream holds one thread. Fine for
+            dozens of open dashboards, no extra dependencies.
+  gevent  → cooperative event loop: each request / stream is a greenlet, so thousands of
+            idle SSE clients cost a few KB each. Blocking I/O is made cooperative here:
+            gevent monkey-patches sockets, time.sleep, select and threading (the SSE hub
+            and shared-state dispatcher wait on those), psycopg2 gets a green wait
+            callback (psycogreen) and grpc (Gemini) its gevent poller.
+
+Flask routes are unchanged in every profile.  scripts/bench_sse_streams.py measures
+/api/property-tasks latency with 1,000+ idle streams open.
+"""
+import os
+
+PROFILE = (os.getenv("GUNICORN_PROFILE") or "sync").strip().lower()
+if PROFILE not in ("sync", "gthread", "gevent"):
+    print(f"[gunicorn] unknown GUNICORN_PROFILE={PROFILE!r} — using sync", flush=True)
+    PROFILE = "sync"
+
+bind = f"0.0.0.0:{os.getenv('PORT', '10000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", "1") or 1)
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120") or 120)
+# SSE heartbeats every SSE_HEARTBEAT_SEC keep idle streams under proxy idle timeouts;
+# keepalive only covers the gap between ordinary requests on one connection.
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5") or 5)
+# Each worker runs its own background loops and imports app.py after the fork
+# (the gevent patch has to happen before app import).
+preload_app = False
+
+if PROFILE == "gthread":
+    worker_class = "gthread"
+    threads = int(os.getenv("GUNICORN_THREADS", "32") or 32)
+elif PROFILE == "gevent":
+    worker_class = "gevent"
+    worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", "4000") or 4000)
+    # A greenlet per stream needs a socket per stream.
+    try:
+        import resource
+
+        _soft, _hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        _want = worker_connections + 256
+        if _soft != resource.RLIM_INFINITY and _soft < _want:
+            _new = _want if _hard == resource.RLIM_INFINITY else min(_want, _hard)
+            resource.setrlimit(resource.RLIMIT_NOFILE, (_new, _hard))
+    except (ImportError, ValueError, OSError):
+        pass
+
+
+def post_fork(server, worker):
+    if PROFILE != "gevent":
+        return
+    # Before app import, so the eager schema init and the pool already use the green callback.
+    try:
+        from psycogreen.gevent import patch_psycopg
+
+        patch_psycopg()
+    except ImportError:
+        server.log.warning("psycogreen not installed — psycopg2 calls will block the gevent worker")
+
+
+def post_worker_init(worker):
+    if PROFILE == "gevent":
+        # Needs the monkey patch in place (done by the worker right before app import).
+        try:
+            from grpc.experimental import gevent as _grpc_gevent
+
+            _grpc_gevent.init_gevent()
+        except ImportError:
+            pass
+    print(f"[gunicorn] worker {worker.pid} ready — profile={PROFILE}", flush=True)
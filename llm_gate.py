@@ -0,0 +1,255 @@
+"""
+Admission gate in front of LLM calls — coalescing, token buckets and priorities.
+
+  single flight  → identical prompts of one tenant that are already in flight are not
+                   sent again: followers wait for the leader (bounded — see run())
+                   and get its answer (or its exception);
+  token buckets  → one bucket per tenant and one for the whole process; a call needs a
+                   token from both, so one busy tenant cannot use up the shared quota;
+  priorities     → callers that cannot be admitted yet wait in one queue ordered by
+                   priority, then arrival: interactive chat is admitted ahead of
+                   background summaries.  A waiter whose own tenant is out of tokens
+                   does not hold back other tenants behind it.
+
+A caller that is not admitted within its max wait gets RateLimited (a RuntimeError
+whose message mentions the quota, so existing fallbacks treat it like a provider 429).
+No Flask imports here.
+"""
+from __future__ import annotations
+
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional
+
+INTERACTIVE, BACKGROUND = 0, 1
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BACKGROUND: "background"}
+
+
+class RateLimited(RuntimeError):
+    """Not admitted within the caller's max wait (local quota guard)."""
+
+
+class TokenBucket:
+    """rate_per_min tokens per minute, at most burst banked.  rate_per_min <= 0: unlimited.  Not thread-safe."""
+
+    __slots__ = ("rate", "capacity", "tokens", "stamp")
+
+    def __init__(self, rate_per_min: float, burst: float) -> None:
+        self.rate = max(0.0, float(rate_per_min)) / 60.0
+        self.capacity = max(1.0, float(burst))
+        self.tokens = self.capacity
+        self.stamp = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        if now > self.stamp:
+            self.tokens = min(self.capacity, self.tokens + (now - self.stamp) * self.rate)
+            self.stamp = now
+
+    def ready(self, now: float) -> bool:
+        if self.rate <= 0:
+            return True
+        self._refill(now)
+        return self.tokens >= 1.0
+
+    def take(self, now: float) -> None:
+        if self.rate > 0:
+            self._refill(now)
+            self.tokens -= 1.0
+
+    def wait_time(self, now: float) -> float:
+        """Seconds until one token is available (0 when one is)."""
+        if self.ready(now):
+            return 0.0
+        return (1.0 - self.tokens) / self.rate
+
+
+class _Flight:
+    __slots__ = ("done", "value", "error", "followers")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+        self.followers = 0
+
+
+class _Ticket:
+    __slots__ = ("priority", "seq", "tenant", "granted")
+
+    def __init__(self, priority: int, seq: int, tenant: str) -> None:
+        self.priority = priority
+        self.seq = seq
+        self.tenant = tenant
+        self.granted = False
+
+
+class LlmGate:
+    """Thread-safe; one per process (per provider)."""
+
+    def __init__(self, tenant_rpm: float = 30, tenant_burst: float = 10, global_rpm: float = 120,
+                 global_burst: float = 30, max_concurrent: int = 8, max_tenants: int = 1024) -> None:
+        self.tenant_rpm = float(tenant_rpm)
+        self.tenant_burst = float(tenant_burst)
+        self.max_concurrent = max(1, int(max_concurrent))
+        self.max_tenants = max(1, int(max_tenants))
+        self._global = TokenBucket(global_rpm, global_burst)
+        self._tenants: "OrderedDict[str, TokenBucket]" = OrderedDict()  # LRU
+        self._cond = threading.Condition(threading.Lock())
+        self._queue: List[_Ticket] = []
+        self._seq = itertools.count()
+        self._in_flight = 0
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._stats: Dict[str, int] = {
+            "calls": 0, "coalesced": 0, "admitted": 0, "queued": 0, "rate_limited": 0,
+            "wait_ms_total": 0, "max_queue": 0,
+        }
+        self._by_priority: Dict[str, Dict[str, int]] = {
+            name: {"admitted": 0, "queued": 0, "rate_limited": 0} for name in PRIORITY_NAMES.values()
+        }
+
+    def _bucket(self, tenant: str) -> TokenBucket:
+        b = self._tenants.get(tenant)
+        if b is None:
+            b = self._tenants[tenant] = TokenBucket(self.tenant_rpm, self.tenant_burst)
+            while len(self._tenants) > self.max_tenants:
+                self._tenants.popitem(last=False)
+        else:
+            self._tenants.move_to_end(tenant)
+        return b
+
+    def _counts(self, name: str) -> Dict[str, int]:
+        return self._by_priority.setdefault(name, {"admitted": 0, "queued": 0, "rate_limited": 0})
+
+    # ── admission ──────────────────────────────────────────────────────────────
+    def _grant(self, now: float) -> None:
+        """Admit queued tickets in priority order while slots and global tokens last.  Lock held."""
+        granted = False
+        for t in sorted(self._queue, key=lambda t: (t.priority, t.seq)):
+            if self._in_flight >= self.max_concurrent or not self._global.ready(now):
+                break
+            bucket = self._bucket(t.tenant)
+            if not bucket.ready(now):
+                continue
+            self._global.take(now)
+            bucket.take(now)
+            self._in_flight += 1
+            t.granted = True
+            self._queue.remove(t)
+            granted = True
+        if granted:
+            self._cond.notify_all()
+
+    def _next_wake(self, now: float) -> float:
+        """Seconds until a queued ticket might become admissible by token refill.  Lock held."""
+        waits = [self._global.wait_time(now)]
+        waits.extend(self._bucket(t.tenant).wait_time(now) for t in self._queue)
+        positive = [w for w in waits if w > 0]
+        return min(positive) if positive else 1.0
+
+    def _admit(self, tenant: str, priority: int, max_wait: float) -> None:
+        name = PRIORITY_NAMES.get(priority, str(priority))
+        t0 = time.monotonic()
+        with self._cond:
+            ticket = _Ticket(priority, next(self._seq), tenant)
+            self._queue.append(ticket)
+            self._grant(t0)
+            if not ticket.granted:
+                self._stats["queued"] += 1
+                self._counts(name)["queued"] += 1
+                self._stats["max_queue"] = max(self._stats["max_queue"], len(self._queue))
+            deadline = t0 + max(0.0, float(max_wait))
+            while not ticket.granted:
+                now = time.monotonic()
+                if now >= deadline:
+                    self._queue.remove(ticket)
+                    self._stats["rate_limited"] += 1
+                    self._counts(name)["rate_limited"] += 1
+                    self._grant(now)  # a blocked head may have held back others
+                    raise RateLimited(
+                        f"LLM quota guard: {name} call for tenant {tenant!r} not admitted within "
+                        f"{max_wait:g}s (429 resource_exhausted locally) — retry later"
+                    )
+                self._cond.wait(min(deadline - now, self._next_wake(now)))
+                self._grant(time.monotonic())
+            self._stats["admitted"] += 1
+            self._counts(name)["admitted"] += 1
+            self._stats["wait_ms_total"] += int((time.monotonic() - t0) * 1000)
+
+    def _release(self) -> None:
+        with self._cond:
+            self._in_flight -= 1
+            self._grant(time.monotonic())
+
+    @contextmanager
+    def slot(self, tenant_id: Optional[str], priority: int = INTERACTIVE, max_wait: float = 15.0) -> Iterator[None]:
+        """Hold one admitted call for the duration of the block (streams: the whole iteration)."""
+        self._admit(str(tenant_id or "_"), priority, max_wait)
+        try:
+            yield
+        finally:
+            self._release()
+
+    def run(self, tenant_id: Optional[str], key: Optional[Hashable], fn: Callable[[], Any],
+            priority: int = INTERACTIVE, max_wait: float = 15.0, follow_wait: Optional[float] = None) -> Any:
+        """
+        fn() once admitted.  With a key, a caller whose (tenant, key) is already in flight
+        waits for that call instead and shares its result; followers do not use a token.
+        A follower still waiting after follow_wait (default max_wait; callers add the time
+        the leader's call itself may take) gets RateLimited, like a queued caller.
+        """
+        tenant = str(tenant_id or "_")
+        with self._cond:
+            self._stats["calls"] += 1
+            flight = self._flights.get((tenant, key)) if key is not None else None
+            if flight is not None:
+                flight.followers += 1
+                self._stats["coalesced"] += 1
+            elif key is not None:
+                self._flights[(tenant, key)] = leader = _Flight()
+        if flight is not None:
+            wait_s = max_wait if follow_wait is None else follow_wait
+            if not flight.done.wait(max(0.0, float(wait_s))):
+                name = PRIORITY_NAMES.get(priority, str(priority))
+                with self._cond:
+                    self._stats["rate_limited"] += 1
+                    self._counts(name)["rate_limited"] += 1
+                raise RateLimited(
+                    f"LLM quota guard: {name} call for tenant {tenant!r} still waiting on an identical "
+                    f"in-flight call after {wait_s:g}s (429 resource_exhausted locally) — retry later"
+                )
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+        if key is None:
+            with self.slot(tenant, priority, max_wait):
+                return fn()
+        try:
+            with self.slot(tenant, priority, max_wait):
+                leader.value = fn()
+            return leader.value
+        except BaseException as e:
+            leader.error = e
+            raise
+        finally:
+            with self._cond:
+                self._flights.pop((tenant, key), None)
+            leader.done.set()
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._cond:
+            out: Dict[str, Any] = dict(self._stats)
+            out["by_priority"] = {k: dict(v) for k, v in self._by_priority.items()}
+            out["in_flight"] = self._in_flight
+            out["queue"] = len(self._queue)
+            out["flights"] = len(self._flights)
+            out["tenants"] = len(self._tenants)
+            if self._global.rate > 0:
+                self._global.ready(now)  # refill before reporting
+                out["global_tokens"] = round(self._global.tokens, 2)
+            out["max_concurrent"] = self.max_concurrent
+        out["avg_wait_ms"] = round(out["wait_ms_total"] / out["admitted"]) if out["admitted"] else None
+        return out
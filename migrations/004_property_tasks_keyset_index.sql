@@ -0,0 +1,9 @@
+-- EasyHost / Supabase: keyset (cursor) pagination for GET /api/property-tasks?cursor=
+-- Applied automatically via Flask ensure_property_tasks_reporting_indexes(); safe to run manually.
+--
+-- Pages are ordered by (created_at DESC, id DESC) inside one tenant, so each page is an index range scan.
+
+CREATE INDEX IF NOT EXISTS idx_property_tasks_tenant_created_id
+  ON property_tasks (tenant_id, created_at DESC, id DESC);
+
+COMMENT ON INDEX idx_property_tasks_tenant_created_id IS 'Task list: keyset pagination by tenant + (created_at, id)';
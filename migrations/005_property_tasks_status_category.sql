@@ -0,0 +1,24 @@
+-- EasyHost / Supabase: persisted task status category (pending | in_progress | done | archived).
+-- Applied automatically via Flask ensure_property_tasks_status_category(); safe to run manually.
+--
+-- The ORM keeps status_category in sync with status on every insert/update, so counts and
+-- open/done filters become indexed GROUP BY queries instead of per-row Python normalisation.
+
+ALTER TABLE property_tasks ADD COLUMN IF NOT EXISTS status_category VARCHAR;
+
+UPDATE property_tasks
+SET status_category = CASE
+    WHEN LOWER(REPLACE(TRIM(COALESCE(status, '')), ' ', '_')) IN ('done', 'completed') THEN 'done'
+    WHEN LOWER(REPLACE(TRIM(COALESCE(status, '')), ' ', '_')) = 'archived' THEN 'archived'
+    WHEN LOWER(REPLACE(TRIM(COALESCE(status, '')), ' ', '_')) IN (
+        'accepted', 'in_progress', 'inprogress', 'seen', 'started',
+        'assigned', 'delayed', 'searching_for_staff'
+    ) THEN 'in_progress'
+    ELSE 'pending'
+END
+WHERE status_category IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_property_tasks_tenant_status_category
+  ON property_tasks (tenant_id, status_category);
+
+COMMENT ON INDEX idx_property_tasks_tenant_status_category IS 'Task counts: GROUP BY status_category within a tenant';
@@ -0,0 +1,32 @@
+-- EasyHost / Supabase: native timestamp/date columns next to the legacy ISO string columns.
+-- Applied automatically via Flask ensure_typed_time_columns(); safe to run manually.
+--
+-- The ORM dual-writes both representations. Existing rows are filled by the in-app
+-- TypedTimeBackfill thread, which checkpoints its position in schema_backfill_progress
+-- and resumes after a restart. Reporting / SLA readers switch to the typed columns once
+-- the matching job is marked completed.
+
+ALTER TABLE property_tasks ADD COLUMN IF NOT EXISTS created_ts   TIMESTAMPTZ;
+ALTER TABLE property_tasks ADD COLUMN IF NOT EXISTS started_ts   TIMESTAMPTZ;
+ALTER TABLE property_tasks ADD COLUMN IF NOT EXISTS completed_ts TIMESTAMPTZ;
+ALTER TABLE property_tasks ADD COLUMN IF NOT EXISTS due_ts       TIMESTAMPTZ;
+
+ALTER TABLE worker_performance ADD COLUMN IF NOT EXISTS created_ts   TIMESTAMPTZ;
+ALTER TABLE worker_performance ADD COLUMN IF NOT EXISTS started_ts   TIMESTAMPTZ;
+ALTER TABLE worker_performance ADD COLUMN IF NOT EXISTS completed_ts TIMESTAMPTZ;
+
+ALTER TABLE bookings ADD COLUMN IF NOT EXISTS check_in_date  DATE;
+ALTER TABLE bookings ADD COLUMN IF NOT EXISTS check_out_date DATE;
+
+CREATE TABLE IF NOT EXISTS schema_backfill_progress (
+    job VARCHAR PRIMARY KEY,
+    last_id VARCHAR,
+    rows_done INTEGER DEFAULT 0,
+    completed INTEGER DEFAULT 0,
+    updated_at VARCHAR
+);
+
+CREATE INDEX IF NOT EXISTS idx_property_tasks_tenant_created_ts   ON property_tasks (tenant_id, created_ts);
+CREATE INDEX IF NOT EXISTS idx_property_tasks_tenant_completed_ts ON property_tasks (tenant_id, completed_ts);
+CREATE INDEX IF NOT EXISTS idx_bookings_tenant_check_out_date     ON bookings (tenant_id, check_out_date);
+CREATE INDEX IF NOT EXISTS idx_worker_performance_completed_ts    ON worker_performance (completed_ts);
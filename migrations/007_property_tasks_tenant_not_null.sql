@@ -0,0 +1,17 @@
+-- EasyHost / Supabase: every property_tasks row belongs to a tenant.
+-- Applied automatically via Flask ensure_property_tasks_tenant_not_null(); safe to run manually.
+--
+-- Tenant scoping is now a plain "tenant_id = :t" predicate (no "OR tenant_id IS NULL"),
+-- so (tenant_id, ...) composite indexes serve the default tenant too.
+-- For very large tables, run the UPDATE in batches (the app does 5,000 rows per transaction).
+
+UPDATE property_tasks SET tenant_id = 'default' WHERE tenant_id IS NULL OR tenant_id = '';
+
+ALTER TABLE property_tasks
+  ADD CONSTRAINT property_tasks_tenant_id_present
+  CHECK (tenant_id IS NOT NULL AND tenant_id <> '') NOT VALID;
+
+ALTER TABLE property_tasks VALIDATE CONSTRAINT property_tasks_tenant_id_present;
+
+ALTER TABLE property_tasks ALTER COLUMN tenant_id SET DEFAULT 'default';
+ALTER TABLE property_tasks ALTER COLUMN tenant_id SET NOT NULL;
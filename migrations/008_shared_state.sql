@@ -0,0 +1,31 @@
+-- EasyHost / Supabase: shared live state for running more than one gunicorn worker.
+-- Applied automatically via shared_state.SqlBackend.ensure_schema() when
+-- SHARED_STATE_BACKEND=db; safe to run manually.
+--
+-- shared_state_messages is an ordered outbox: each worker's dispatcher reads ids in order
+-- (woken by NOTIFY easyhost_shared_state) and rows older than ~10 minutes are pruned.
+-- shared_state_feed holds the capped activity / simulation feeds; shared_state_kv holds
+-- short-lived keys, the change-log epoch and singleton-loop leases.
+
+CREATE TABLE IF NOT EXISTS shared_state_messages (
+  id         BIGSERIAL PRIMARY KEY,
+  channel    VARCHAR(64) NOT NULL,
+  origin     VARCHAR(128),
+  payload    TEXT NOT NULL,
+  created_at DOUBLE PRECISION NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_shared_state_messages_created ON shared_state_messages (created_at);
+
+CREATE TABLE IF NOT EXISTS shared_state_feed (
+  id         BIGSERIAL PRIMARY KEY,
+  feed       VARCHAR(64) NOT NULL,
+  payload    TEXT NOT NULL,
+  created_at DOUBLE PRECISION NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_shared_state_feed_feed_id ON shared_state_feed (feed, id);
+
+CREATE TABLE IF NOT EXISTS shared_state_kv (
+  key        VARCHAR(191) PRIMARY KEY,
+  value      TEXT,
+  expires_at DOUBLE PRECISION
+);
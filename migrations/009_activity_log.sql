@@ -0,0 +1,16 @@
+-- EasyHost / Supabase: persisted per-tenant activity feed (Maya chat / live-ops lines).
+-- Applied automatically via activity_log.ActivityLog.attach_store() at startup
+-- (disable with ACTIVITY_LOG_PERSIST=0); safe to run manually.
+--
+-- The worker that logged an entry writes it here in batches (ACTIVITY_LOG_FLUSH_SEC /
+-- ACTIVITY_LOG_FLUSH_BATCH); on start each tenant's ring is reloaded from its newest
+-- rows.  seq is the feed cursor (/api/activity-feed?cursor=); rows older than what a
+-- tenant's ring holds are pruned every few minutes.
+
+CREATE TABLE IF NOT EXISTS activity_log (
+  tenant_id VARCHAR(64) NOT NULL,
+  seq       BIGINT NOT NULL,
+  ts        DOUBLE PRECISION,
+  payload   TEXT NOT NULL,
+  PRIMARY KEY (tenant_id, seq)
+);
@@ -0,0 +1,233 @@
+"""
+Health registry for LLM model ids — rolling latency / outcome window per model and a
+circuit breaker in front of each one.
+
+  closed     → requests go through; a run of failures (or a bad error rate over the
+               window) opens the breaker;
+  open       → the model is skipped until its cool-down ends: exponential for errors
+               and timeouts, the server's retry hint (or a fixed wait) for quota, long
+               for unknown model ids;
+  half-open  → after the cool-down one request at a time may probe it; success closes
+               the breaker, failure re-opens it with a doubled cool-down.
+
+Failures that say nothing about the model — a bad key (auth), a blocked answer (empty)
+or a request the API rejected as malformed (invalid: 400 / invalid argument) — are
+counted but never trip a breaker.
+
+order() turns the configured candidate chain into the chain to try now.  call_hedged()
+starts a second model when the first has not answered within its p95 latency (or has
+failed in a way another model may not) and returns whichever succeeds first.
+No Flask imports here.
+"""
+from __future__ import annotations
+
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Executor, wait
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+# classify(exc) -> one of these
+NOT_FOUND, QUOTA, TIMEOUT, AUTH, EMPTY, INVALID, ERROR = (
+    "not_found", "quota", "timeout", "auth", "empty", "invalid", "error"
+)
+# Kinds that are about the request or the key, not the model's health.
+NOT_HEALTH_KINDS = (AUTH, EMPTY, INVALID)
+
+_RETRY_HINT_RE = re.compile(r"retry(?:[ _]in|_delay[^0-9]*seconds:?)\s*([0-9]+(?:\.[0-9]+)?)\s*s?", re.I)
+
+
+def retry_hint_seconds(message: str) -> Optional[float]:
+    """Server-suggested wait in a quota error ("Please retry in 23.4s" / retry_delay { seconds: 23 })."""
+    m = _RETRY_HINT_RE.search(message or "")
+    return float(m.group(1)) if m else None
+
+
+class _ModelState:
+    __slots__ = ("samples", "state", "open_until", "cooldown", "fail_streak", "probe_until", "last_error",
+                 "calls", "failures", "opens")
+
+    def __init__(self, window: int) -> None:
+        self.samples: Deque[Tuple[float, bool]] = deque(maxlen=window)  # (latency ms, ok)
+        self.state = CLOSED
+        self.open_until = 0.0
+        self.cooldown = 0.0
+        self.fail_streak = 0
+        self.probe_until = 0.0
+        self.last_error = ""
+        self.calls = 0
+        self.failures = 0
+        self.opens = 0
+
+
+class ModelHealthRegistry:
+    """Thread-safe; one per process (per provider)."""
+
+    def __init__(self, classify: Callable[[BaseException], str], window: int = 50, failure_threshold: int = 3,
+                 error_rate: float = 0.5, min_samples: int = 8, base_cooldown: float = 15.0,
+                 max_cooldown: float = 300.0, quota_cooldown: float = 60.0, not_found_cooldown: float = 3600.0,
+                 probe_lease: float = 30.0) -> None:
+        self.classify = classify
+        self.window = max(5, int(window))
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.error_rate = float(error_rate)
+        self.min_samples = max(1, int(min_samples))
+        self.base_cooldown = float(base_cooldown)
+        self.max_cooldown = float(max_cooldown)
+        self.quota_cooldown = float(quota_cooldown)
+        self.not_found_cooldown = float(not_found_cooldown)
+        self.probe_lease = float(probe_lease)
+        self._lock = threading.Lock()
+        self._models: Dict[str, _ModelState] = {}
+
+    def _state(self, model: str) -> _ModelState:
+        st = self._models.get(model)
+        if st is None:
+            st = self._models[model] = _ModelState(self.window)
+        return st
+
+    # ── routing ────────────────────────────────────────────────────────────────
+    def order(self, candidates: List[str]) -> List[str]:
+        """
+        Candidates to try now, in configured order: closed breakers, plus at most one
+        half-open probe per model (leased to this caller).  Never empty: when every
+        breaker is open, the model that recovers first is returned alone.
+        """
+        now = time.time()
+        out: List[str] = []
+        with self._lock:
+            for model in candidates:
+                st = self._state(model)
+                if st.state == CLOSED:
+                    out.append(model)
+                elif now >= st.open_until and now >= st.probe_until:
+                    st.state = HALF_OPEN
+                    st.probe_until = now + self.probe_lease
+                    out.append(model)
+            if not out and candidates:
+                out.append(min(candidates, key=lambda m: self._state(m).open_until))
+        return out
+
+    # ── outcomes ───────────────────────────────────────────────────────────────
+    def record_success(self, model: str, latency_ms: float) -> None:
+        with self._lock:
+            st = self._state(model)
+            st.calls += 1
+            st.samples.append((float(latency_ms), True))
+            st.fail_streak = 0
+            st.state = CLOSED
+            st.cooldown = 0.0
+            st.probe_until = 0.0
+
+    def record_failure(self, model: str, exc: BaseException, latency_ms: float) -> str:
+        """Record one failed call; returns its kind (see classify)."""
+        kind = self.classify(exc)
+        now = time.time()
+        with self._lock:
+            st = self._state(model)
+            st.calls += 1
+            st.failures += 1
+            st.last_error = f"{kind}: {type(exc).__name__}: {exc}"[:300]
+            if kind in NOT_HEALTH_KINDS:
+                return kind  # the key / request is wrong or the answer was blocked — not the model's health
+            st.samples.append((float(latency_ms), False))
+            st.fail_streak += 1
+            if kind == NOT_FOUND:
+                cooldown = self.not_found_cooldown
+            elif kind == QUOTA:
+                cooldown = retry_hint_seconds(str(exc)) or self.quota_cooldown
+            else:
+                bad = sum(1 for _ms, ok in st.samples if not ok)
+                tripped = (
+                    st.state == HALF_OPEN
+                    or st.fail_streak >= self.failure_threshold
+                    or (len(st.samples) >= self.min_samples and bad / len(st.samples) >= self.error_rate)
+                )
+                if not tripped:
+                    return kind
+                cooldown = min(self.max_cooldown, max(self.base_cooldown, st.cooldown * 2))
+            st.cooldown = cooldown
+            st.state = OPEN
+            st.open_until = now + cooldown
+            st.probe_until = 0.0
+            st.opens += 1
+        return kind
+
+    def call(self, model: str, fn: Callable[[str], Any]) -> Any:
+        """fn(model), timed and recorded; exceptions are recorded and re-raised."""
+        t0 = time.perf_counter()
+        try:
+            value = fn(model)
+        except BaseException as e:
+            self.record_failure(model, e, (time.perf_counter() - t0) * 1000)
+            raise
+        self.record_success(model, (time.perf_counter() - t0) * 1000)
+        return value
+
+    # ── latency ────────────────────────────────────────────────────────────────
+    def percentile(self, model: str, q: float = 0.95) -> Optional[float]:
+        """Latency percentile (ms) over the model's successful calls in the window."""
+        with self._lock:
+            st = self._models.get(model)
+            lat = sorted(ms for ms, ok in st.samples if ok) if st else []
+        if not lat:
+            return None
+        return lat[min(len(lat) - 1, int(q * len(lat)))]
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.time()
+        out: Dict[str, Any] = {}
+        with self._lock:
+            for model, st in self._models.items():
+                lat = sorted(ms for ms, ok in st.samples if ok)
+                bad = sum(1 for _ms, ok in st.samples if not ok)
+                out[model] = {
+                    "state": st.state,
+                    "calls": st.calls,
+                    "failures": st.failures,
+                    "opens": st.opens,
+                    "window_error_rate": round(bad / len(st.samples), 3) if st.samples else None,
+                    "p50_ms": int(lat[len(lat) // 2]) if lat else None,
+                    "p95_ms": int(lat[min(len(lat) - 1, int(0.95 * len(lat)))]) if lat else None,
+                    "reopens_in_sec": max(0, int(st.open_until - now)) if st.state == OPEN else 0,
+                    "last_error": st.last_error,
+                }
+        return out
+
+    def reset(self) -> None:
+        with self._lock:
+            self._models.clear()
+
+
+def call_hedged(registry: ModelHealthRegistry, pool: Executor, fn: Callable[[str], Any],
+                primary: str, secondary: str, delay_sec: float,
+                fail_over: Optional[Callable[[BaseException], bool]] = None) -> Tuple[str, Any]:
+    """
+    (model, value) of the first successful call: primary now, secondary once primary has
+    not answered within delay_sec, or as soon as primary fails with an error fail_over(exc)
+    accepts (default: any) — other errors are raised without starting secondary.  Raises
+    the last error when both fail.  The slower call keeps running in the pool; its outcome
+    is still recorded in the registry.
+    """
+    futures = {pool.submit(registry.call, primary, fn): primary}
+    done, _ = wait(futures, timeout=max(0.0, delay_sec))
+    if done:
+        exc = next(iter(done)).exception()
+        if exc is None:
+            return primary, next(iter(done)).result()
+        if fail_over is not None and not fail_over(exc):
+            raise exc
+    futures[pool.submit(registry.call, secondary, fn)] = secondary
+    last_exc: Optional[BaseException] = None
+    pending = set(futures)
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for fut in done:
+            exc = fut.exception()
+            if exc is None:
+                return futures[fut], fut.result()
+            last_exc = exc
+    raise last_exc  # type: ignore[misc]
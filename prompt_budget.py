@@ -0,0 +1,103 @@
+"""
+Sectioned prompt assembly under a character budget (Maya / Gemini prompts).
+
+A prompt is an ordered list of sections.  Each section is first clipped to its own
+budget, then — while the whole prompt is over the total budget — sections are cut
+further, lowest priority first, down to their floor.  Transcripts keep their tail
+(newest turns), everything else keeps its head.  Text order never changes, and
+sections that fit are written byte for byte.  build() also returns a size report
+(chars, estimated tokens, what was cut) for per-request logging.
+No Flask imports here.
+"""
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+CHARS_PER_TOKEN = 4  # rough estimate for mixed Hebrew / English / JSON
+TRUNCATION_MARK = " …[truncated]"  # after a clipped head
+TAIL_TRUNCATION_MARK = "[truncated]… "  # before a clipped tail
+
+_LOCK = threading.Lock()
+_STATS: Dict[str, int] = {"prompts": 0, "chars": 0, "trimmed_prompts": 0, "trimmed_chars": 0}
+
+
+def estimate_tokens(chars: int) -> int:
+    return (int(chars) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+class Section:
+    """
+    One prompt section.  budget: max chars (None = unbounded); priority: higher is cut
+    later (None = never cut below its own budget); floor: chars kept when over the total
+    budget; keep: "head" or "tail".  prefix (label) and sep (trailing separator) are
+    written around the text as they are and never cut.
+    """
+
+    __slots__ = ("name", "text", "budget", "priority", "floor", "keep", "prefix", "sep")
+
+    def __init__(self, name: str, text: str, budget: Optional[int] = None, priority: Optional[int] = None,
+                 floor: int = 0, keep: str = "head", prefix: str = "", sep: str = "") -> None:
+        self.name = name
+        self.text = text or ""
+        self.budget = budget
+        self.priority = priority
+        self.floor = max(0, int(floor))
+        self.keep = keep
+        self.prefix = prefix or ""
+        self.sep = sep or ""
+
+
+def _clip(text: str, limit: int, keep: str) -> str:
+    if len(text) <= limit:
+        return text
+    mark = TAIL_TRUNCATION_MARK if keep == "tail" else TRUNCATION_MARK
+    room = limit - len(mark)
+    if room <= 0:
+        return ""
+    return mark + text[-room:] if keep == "tail" else text[:room] + mark
+
+
+def build(sections: Sequence[Section], total_budget: Optional[int] = None) -> Tuple[str, Dict[str, Any]]:
+    """(prompt text, report) — see module docstring."""
+    texts: List[str] = []
+    for s in sections:
+        texts.append(_clip(s.text, s.budget, s.keep) if s.budget is not None else s.text)
+    total = sum(len(t) for t in texts) + sum(len(s.prefix) + len(s.sep) for s in sections)
+    if total_budget is not None and total > total_budget:
+        order = sorted(
+            (i for i, s in enumerate(sections) if s.priority is not None),
+            key=lambda i: sections[i].priority,
+        )
+        for i in order:
+            excess = total - total_budget
+            if excess <= 0:
+                break
+            s = sections[i]
+            target = max(s.floor, len(texts[i]) - excess)
+            if target < len(texts[i]):
+                cut = _clip(s.text, target, s.keep)
+                total -= len(texts[i]) - len(cut)
+                texts[i] = cut
+    out = "".join(s.prefix + t + s.sep for s, t in zip(sections, texts))
+    trimmed = {s.name: len(s.text) - len(t) for s, t in zip(sections, texts) if len(t) < len(s.text)}
+    report: Dict[str, Any] = {
+        "chars": len(out),
+        "tokens_est": estimate_tokens(len(out)),
+        "sections": {s.name: len(t) for s, t in zip(sections, texts) if t},
+        "trimmed": trimmed,
+    }
+    with _LOCK:
+        _STATS["prompts"] += 1
+        _STATS["chars"] += len(out)
+        if trimmed:
+            _STATS["trimmed_prompts"] += 1
+            _STATS["trimmed_chars"] += sum(trimmed.values())
+    return out, report
+
+
+def stats() -> Dict[str, Any]:
+    with _LOCK:
+        out: Dict[str, Any] = dict(_STATS)
+    out["avg_chars"] = round(out["chars"] / out["prompts"]) if out["prompts"] else None
+    return out
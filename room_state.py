@@ -0,0 +1,297 @@
+"""
+Per-tenant room-state model — the operations grid (every unit of the tenant's
+properties) behind GET /api/rooms/status-grid, the stats summary and Maya's
+occupancy metrics.
+
+The unit layout (properties, units per property, labels, photos) is built once per
+tenant + owner scope and kept until a room.* event marks it stale.  After that,
+statuses are moved in place:
+  • the occupancy split — the first n_occupied units are occupied, the next n_dirty
+    dirty, the rest ready — only re-evaluates the units between the old and the new
+    boundaries;
+  • open cleaning tasks pin single units to dirty, ref-counted per unit, fed by
+    task.* events (task_id → unit id, None once the task no longer pins).
+Summary and per-property counts are kept alongside, so reading them is O(1) in the
+number of units.  Layout builds, pin loads, the occupancy split and the row copies
+of a view run outside the store lock (a view snapshots the status list under it);
+events that arrive while pins load are replayed on top of the loaded snapshot.
+No Flask imports here.
+"""
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+STATUSES = ("ready", "occupied", "dirty")
+
+# build() -> (rooms, info); split_for(info, n_units) -> (n_occupied, n_dirty); load_pins() -> {task_id: unit_id}
+LayoutBuilder = Callable[[], Tuple[List[Dict[str, Any]], Dict[str, Any]]]
+SplitFn = Callable[[Dict[str, Any], int], Tuple[int, int]]
+PinLoader = Callable[[], Dict[str, str]]
+
+
+def _empty_counts() -> Dict[str, int]:
+    return {"ready": 0, "occupied": 0, "dirty": 0, "total": 0}
+
+
+class RoomGrid:
+    """
+    One materialised grid.  ``rooms`` are the layout rows, never mutated after build;
+    ``statuses`` holds each unit's current status and the counts follow each change.
+    """
+
+    __slots__ = ("rooms", "info", "statuses", "summary", "by_property", "_index", "_occupied", "_dirty",
+                 "_pinned", "_guest")
+
+    def __init__(self, rooms: List[Dict[str, Any]], info: Optional[Dict[str, Any]] = None,
+                 guest: str = "Demo Guest") -> None:
+        self.rooms = rooms
+        self.info = info or {}
+        self.statuses: List[str] = ["ready"] * len(rooms)
+        self._index = {str(r.get("id")): i for i, r in enumerate(rooms)}
+        self._occupied = 0
+        self._dirty = 0
+        self._pinned: set = set()
+        self._guest = guest
+        self.summary = _empty_counts()
+        self.by_property: Dict[Any, Dict[str, int]] = {}
+        for r in rooms:
+            bucket = self.by_property.setdefault(r.get("property_id"), _empty_counts())
+            bucket["ready"] += 1
+            bucket["total"] += 1
+        self.summary["ready"] = self.summary["total"] = len(rooms)
+
+    def _status_at(self, i: int) -> str:
+        if i in self._pinned:
+            return "dirty"
+        if i < self._occupied:
+            return "occupied"
+        if i < self._occupied + self._dirty:
+            return "dirty"
+        return "ready"
+
+    def _refresh(self, i: int) -> bool:
+        old, new = self.statuses[i], self._status_at(i)
+        if old == new:
+            return False
+        bucket = self.by_property[self.rooms[i].get("property_id")]
+        self.summary[old] -= 1
+        bucket[old] -= 1
+        self.summary[new] += 1
+        bucket[new] += 1
+        self.statuses[i] = new
+        return True
+
+    def rows(self, statuses: List[str]) -> List[Dict[str, Any]]:
+        """Row copies for a status snapshot — no lock needed (layout rows are immutable)."""
+        guest = self._guest
+        return [
+            dict(r, status=st, guest=guest if st == "occupied" else None)
+            for r, st in zip(self.rooms, statuses)
+        ]
+
+    def set_split(self, occupied: int, dirty: int) -> int:
+        """Move the occupied / dirty boundaries; returns how many units changed status."""
+        n = len(self.rooms)
+        occupied = max(0, min(n, int(occupied)))
+        dirty = max(0, min(n - occupied, int(dirty)))
+        if (occupied, dirty) == (self._occupied, self._dirty):
+            return 0
+        old_occ, old_end = self._occupied, self._occupied + self._dirty
+        self._occupied, self._dirty = occupied, dirty
+        new_end = occupied + dirty
+        touched = set(range(min(old_occ, occupied), max(old_occ, occupied)))
+        touched.update(range(min(old_end, new_end), max(old_end, new_end)))
+        return sum(1 for i in touched if self._refresh(i))
+
+    def pin(self, unit_id: str, on: bool) -> bool:
+        i = self._index.get(unit_id)
+        if i is None or (i in self._pinned) == on:
+            return False
+        if on:
+            self._pinned.add(i)
+        else:
+            self._pinned.discard(i)
+        return self._refresh(i)
+
+
+class _TenantState:
+    __slots__ = ("grids", "layout_token", "pins", "refs", "backlog", "pin_token")
+
+    def __init__(self) -> None:
+        self.grids: "OrderedDict[Any, RoomGrid]" = OrderedDict()  # owner scope -> grid (LRU)
+        self.layout_token = 0
+        self.pins: Optional[Dict[str, str]] = None  # task_id -> unit_id; None = not loaded
+        self.refs: Dict[str, int] = {}  # unit_id -> open tasks pinning it
+        self.backlog: Optional[List[Tuple[str, Optional[str]]]] = None  # events seen while pins load
+        self.pin_token = 0
+
+
+class RoomStateStore:
+    """Room-state models for every tenant (thread-safe)."""
+
+    def __init__(self, max_scopes: int = 16) -> None:
+        self.max_scopes = max(1, int(max_scopes))
+        self._lock = threading.Lock()
+        self._tenants: Dict[str, _TenantState] = {}
+        self._stats: Dict[str, int] = {
+            "views": 0, "layout_builds": 0, "pin_loads": 0,
+            "task_events": 0, "task_status_changes": 0, "split_moves": 0,
+        }
+
+    def _tenant(self, tenant_id: str) -> _TenantState:
+        st = self._tenants.get(tenant_id)
+        if st is None:
+            st = self._tenants[tenant_id] = _TenantState()
+        return st
+
+    # ── pins (open cleaning tasks) ─────────────────────────────────────────────
+    def _set_pin(self, st: _TenantState, task_id: str, unit_id: Optional[str]) -> bool:
+        prev = st.pins.get(task_id)  # type: ignore[union-attr]
+        if prev == unit_id:
+            return False
+        changed = False
+        if prev is not None:
+            del st.pins[task_id]  # type: ignore[union-attr]
+            st.refs[prev] -= 1
+            if st.refs[prev] <= 0:
+                del st.refs[prev]
+                changed |= any([g.pin(prev, False) for g in st.grids.values()])
+        if unit_id is not None:
+            st.pins[task_id] = unit_id  # type: ignore[index]
+            st.refs[unit_id] = st.refs.get(unit_id, 0) + 1
+            if st.refs[unit_id] == 1:
+                changed |= any([g.pin(unit_id, True) for g in st.grids.values()])
+        return changed
+
+    def _ensure_pins(self, tenant_id: str, load_pins: PinLoader) -> None:
+        with self._lock:
+            st = self._tenant(tenant_id)
+            if st.pins is not None:
+                return
+            if st.backlog is None:
+                st.backlog = []
+            token = st.pin_token
+        loaded = dict(load_pins() or {})
+        with self._lock:
+            st = self._tenant(tenant_id)
+            if st.pins is not None or token != st.pin_token:
+                return  # loaded by another thread, or reset meanwhile (next view reloads)
+            for unit_id in st.refs:  # pins of the previous load (before a reset)
+                for grid in st.grids.values():
+                    grid.pin(unit_id, False)
+            st.pins, st.refs = {}, {}
+            for task_id, unit_id in loaded.items():
+                if unit_id:
+                    self._set_pin(st, str(task_id), str(unit_id))
+            for task_id, unit_id in st.backlog or ():
+                self._set_pin(st, task_id, unit_id)
+            st.backlog = None
+            self._stats["pin_loads"] += 1
+
+    def apply_task(self, tenant_id: str, task_id: Any, unit_id: Optional[str]) -> bool:
+        """One committed task write: unit_id is the unit it now pins (None: pins nothing).
+        Returns True when a grid status may have changed (always True while pins are not loaded)."""
+        if task_id is None:
+            self.reset_pins(tenant_id)
+            return True
+        task_id, unit_id = str(task_id), (str(unit_id) if unit_id else None)
+        with self._lock:
+            self._stats["task_events"] += 1
+            st = self._tenants.get(tenant_id)
+            if st is None:
+                return True
+            if st.pins is None:
+                if st.backlog is not None:
+                    st.backlog.append((task_id, unit_id))
+                return True
+            changed = self._set_pin(st, task_id, unit_id)
+            if changed:
+                self._stats["task_status_changes"] += 1
+            return changed
+
+    def reset_pins(self, tenant_id: Optional[str] = None) -> None:
+        """Tasks changed in ways the events cannot describe (bulk statement, raw SQL): reload on next read."""
+        with self._lock:
+            states = [self._tenants[tenant_id]] if tenant_id in self._tenants else (
+                [] if tenant_id else list(self._tenants.values())
+            )
+            for st in states:
+                st.pins = None
+                st.backlog = None
+                st.pin_token += 1
+
+    # ── layout ─────────────────────────────────────────────────────────────────
+    def invalidate_layout(self, tenant_id: Optional[str] = None) -> None:
+        """Properties changed: rebuild the unit layout (per scope) on the next read."""
+        with self._lock:
+            states = [self._tenants[tenant_id]] if tenant_id in self._tenants else (
+                [] if tenant_id else list(self._tenants.values())
+            )
+            for st in states:
+                st.grids.clear()
+                st.layout_token += 1
+
+    def _grid(self, tenant_id: str, scope: Any, build: LayoutBuilder) -> Tuple[_TenantState, RoomGrid]:
+        """Caller holds no lock; returns with self._lock held."""
+        self._lock.acquire()
+        st = self._tenant(tenant_id)
+        grid = st.grids.get(scope)
+        if grid is not None:
+            st.grids.move_to_end(scope)
+            return st, grid
+        token = st.layout_token
+        self._lock.release()
+        rooms, info = build()
+        fresh = RoomGrid(rooms, info)
+        self._lock.acquire()
+        st = self._tenant(tenant_id)
+        grid = st.grids.get(scope)
+        if grid is not None:
+            return st, grid
+        if st.pins is not None:
+            for unit_id, count in st.refs.items():
+                if count > 0:
+                    fresh.pin(unit_id, True)
+        self._stats["layout_builds"] += 1
+        if token == st.layout_token:
+            st.grids[scope] = fresh
+            while len(st.grids) > self.max_scopes:
+                st.grids.popitem(last=False)
+        return st, fresh
+
+    # ── reads ──────────────────────────────────────────────────────────────────
+    def view(self, tenant_id: str, scope: Any, build: LayoutBuilder, split_for: SplitFn,
+             load_pins: PinLoader, rooms: bool = True) -> Dict[str, Any]:
+        """
+        {"summary", "by_property"[, "rooms"]} for one tenant + owner scope.  Row dicts are
+        copies, so callers may mutate them (PII redaction).  rooms=False skips the O(n) copy.
+        """
+        self._ensure_pins(tenant_id, load_pins)
+        _st, grid = self._grid(tenant_id, scope, build)
+        try:
+            self._stats["views"] += 1
+        finally:
+            self._lock.release()
+        occupied, dirty = split_for(grid.info, len(grid.rooms))
+        with self._lock:
+            if grid.set_split(occupied, dirty):
+                self._stats["split_moves"] += 1
+            out: Dict[str, Any] = {
+                "summary": dict(grid.summary),
+                "by_property": {pid: dict(c) for pid, c in grid.by_property.items()},
+            }
+            statuses = list(grid.statuses) if rooms else None
+        if statuses is not None:
+            out["rooms"] = grid.rows(statuses)
+        return out
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out: Dict[str, Any] = dict(self._stats)
+            out["tenants"] = len(self._tenants)
+            out["grids"] = sum(len(st.grids) for st in self._tenants.values())
+            out["pinned_units"] = sum(len(st.refs) for st in self._tenants.values())
+        return out
+
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Idle-SSE load benchmark: p50/p95/p99 of GET /api/property-tasks with no streams open,
+then with --streams idle /api/stream/leads + /api/stream/staff clients connected.
+
+  GUNICORN_PROFILE=gevent gunicorn app:app -c gunicorn.conf.py
+  python scripts/bench_sse_streams.py --base-url http://127.0.0.1:10000 --streams 1000
+
+Auth: --token (Bearer JWT) or a server running with AUTH_DISABLED=true (--tenant-id).
+Exit code 1 when streams fail to open or p99 grows by more than --max-p99-increase-ms.
+Stdlib only (asyncio raw sockets), so it runs anywhere the app does.
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from urllib.parse import urlsplit
+
+
+def _raise_fd_limit(n):
+    try:
+        import resource
+
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        want = n + 256
+        if soft != resource.RLIM_INFINITY and soft < want:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (want if hard == resource.RLIM_INFINITY else min(want, hard), hard))
+    except (ImportError, ValueError, OSError):
+        pass
+
+
+def _request_bytes(host, path, headers):
+    lines = [f"GET {path} HTTP/1.1", f"Host: {host}"]
+    lines += [f"{k}: {v}" for k, v in headers.items()]
+    return ("\r\n".join(lines) + "\r\n\r\n").encode()
+
+
+def _percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    k = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered) + 0.5)) - 1))
+    return ordered[k]
+
+
+class Bench:
+    def __init__(self, args):
+        parts = urlsplit(args.base_url)
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port or 80
+        self.host_header = parts.netloc
+        self.args = args
+        self.auth = {"X-Tenant-Id": args.tenant_id}
+        if args.token:
+            self.auth["Authorization"] = f"Bearer {args.token}"
+        self.stream_tasks = []
+        self.streams_open = 0
+        self.streams_closed = 0
+        self.heartbeats = 0
+
+    async def _get(self, path):
+        """One request on a fresh connection; returns (status, seconds until the body is read)."""
+        t0 = time.perf_counter()
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            headers = dict(self.auth, Accept="application/json", Connection="close")
+            writer.write(_request_bytes(self.host_header, path, headers))
+            await writer.drain()
+            raw = await reader.read()
+        finally:
+            writer.close()
+        status_line = raw.split(b"\r\n", 1)[0].decode(errors="replace")
+        status = int(status_line.split()[1]) if len(status_line.split()) > 1 else 0
+        return status, time.perf_counter() - t0
+
+    async def sample(self, label):
+        path = self.args.path
+        timeout = self.args.request_timeout
+        for _ in range(self.args.warmup):
+            try:
+                await asyncio.wait_for(self._get(path), timeout)
+            except (OSError, asyncio.TimeoutError):
+                pass
+        latencies, errors = [], 0
+        sem = asyncio.Semaphore(self.args.concurrency)
+
+        async def one():
+            nonlocal errors
+            async with sem:
+                try:
+                    status, dt = await asyncio.wait_for(self._get(path), timeout)
+                except (OSError, asyncio.TimeoutError):
+                    errors += 1
+                    return
+                if status != 200:
+                    errors += 1
+                latencies.append(dt * 1000.0)
+
+        await asyncio.gather(*(one() for _ in range(self.args.samples)))
+        return {
+            "label": label,
+            "n": len(latencies),
+            "errors": errors,
+            "p50": _percentile(latencies, 50),
+            "p95": _percentile(latencies, 95),
+            "p99": _percentile(latencies, 99),
+            "mean": statistics.fmean(latencies) if latencies else None,
+        }
+
+    async def _stream(self, path, opened):
+        counted = False
+        try:
+            reader, writer = await asyncio.open_connection(self.host, self.port)
+        except OSError:
+            if not opened.done():
+                opened.set_result(False)
+            return
+        try:
+            headers = dict(self.auth, Accept="text/event-stream")
+            headers["Cache-Control"] = "no-cache"
+            writer.write(_request_bytes(self.host_header, path, headers))
+            await writer.drain()
+            head = await reader.readuntil(b"\r\n\r\n")
+            status_line = head.split(b"\r\n", 1)[0].split()
+            ok = len(status_line) > 1 and status_line[1] == b"200"
+            if not opened.done():
+                opened.set_result(ok)
+            if not ok:
+                return
+            self.streams_open += 1
+            counted = True
+            while True:
+                chunk = await reader.read(4096)
+                if not chunk:
+                    break
+                self.heartbeats += chunk.count(b": heartbeat")
+        except (OSError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            if not opened.done():
+                opened.set_result(False)
+        finally:
+            if counted:
+                self.streams_closed += 1
+            writer.close()
+
+    async def open_streams(self):
+        loop = asyncio.get_running_loop()
+        futures = []
+        paths = ("/api/stream/leads", "/api/stream/staff")
+        batch = max(1, self.args.connect_batch)
+        for i in range(self.args.streams):
+            fut = loop.create_future()
+            futures.append(fut)
+            self.stream_tasks.append(asyncio.create_task(self._stream(paths[i % 2], fut)))
+            if (i + 1) % batch == 0:
+                await asyncio.sleep(0.05)
+        results = await asyncio.wait_for(asyncio.gather(*futures), timeout=self.args.open_timeout)
+        return sum(1 for r in results if r)
+
+    def close_streams(self):
+        for t in self.stream_tasks:
+            t.cancel()
+
+
+def _fmt(v):
+    return "-" if v is None else f"{v:8.1f}"
+
+
+async def main_async(args):
+    bench = Bench(args)
+    print(f"[bench] target {args.base_url}{args.path}  streams={args.streams}  samples={args.samples}", flush=True)
+    baseline = await bench.sample("no streams")
+
+    t0 = time.perf_counter()
+    try:
+        opened = await bench.open_streams()
+    except asyncio.TimeoutError:
+        opened = bench.streams_open
+    print(f"[bench] {opened}/{args.streams} streams open in {time.perf_counter() - t0:.1f}s", flush=True)
+    if args.hold > 0:
+        await asyncio.sleep(args.hold)
+    loaded = await bench.sample(f"{opened} idle streams")
+    still_open = bench.streams_open - bench.streams_closed
+    bench.close_streams()
+    await asyncio.sleep(0)
+
+    print()
+    print(f"{'':22} {'n':>5} {'err':>4} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'mean ms':>8}")
+    for row in (baseline, loaded):
+        print(
+            f"{row['label']:22} {row['n']:5d} {row['errors']:4d} "
+            f"{_fmt(row['p50'])} {_fmt(row['p95'])} {_fmt(row['p99'])} {_fmt(row['mean'])}"
+        )
+    print(f"\nstreams still open at the end: {still_open}  heartbeats seen: {bench.heartbeats}")
+
+    failed = False
+    if opened < args.streams:
+        print(f"FAIL: only {opened} of {args.streams} streams opened")
+        failed = True
+    if still_open < opened:
+        print(f"FAIL: {opened - still_open} streams were closed by the server during the run")
+        failed = True
+    if baseline["p99"] is not None and loaded["p99"] is not None:
+        delta = loaded["p99"] - baseline["p99"]
+        print(f"p99 delta: {delta:+.1f} ms (allowed {args.max_p99_increase_ms:.1f} ms)")
+        if delta > args.max_p99_increase_ms:
+            failed = True
+    if loaded["errors"]:
+        failed = True
+    print("FAIL" if failed else "OK")
+    return 1 if failed else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:10000")
+    parser.add_argument("--path", default="/api/property-tasks")
+    parser.add_argument("--streams", type=int, default=1000)
+    parser.add_argument("--samples", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=4, help="parallel latency probes")
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--hold", type=float, default=2.0, help="seconds to idle after the streams open")
+    parser.add_argument("--connect-batch", type=int, default=100, help="streams opened per 50 ms")
+    parser.add_argument("--open-timeout", type=float, default=60.0)
+    parser.add_argument("--request-timeout", type=float, default=10.0, help="per latency probe; counted as an error")
+    parser.add_argument("--max-p99-increase-ms", type=float, default=25.0)
+    parser.add_argument("--tenant-id", default="default")
+    parser.add_argument("--token", default="")
+    args = parser.parse_args()
+    _raise_fd_limit(args.streams + args.concurrency)
+    sys.exit(asyncio.run(main_async(args)))
+
+
+if __name__ == "__main__":
+    main()
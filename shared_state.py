@@ -0,0 +1,548 @@
+"""
+Pluggable shared-state backend — lets more than one gunicorn worker / instance serve
+the same live state (SSE events, the simulation feed, commit side effects,
+short-lived key/value state, singleton-loop leases).
+
+MemoryBackend (default) keeps everything in this process, exactly as before.
+SqlBackend stores it in the app database: an ordered message table fanned out by a
+per-process dispatcher thread (woken by LISTEN/NOTIFY on PostgreSQL, polled on
+SQLite), capped feed rows and a key/value table with expiry.
+
+Channels are ordered: every process applies messages in the same global sequence,
+so counters derived from them (task change-log versions, data versions) agree
+across workers.  publish_on() writes a message inside the caller's own database
+transaction (outbox): it is delivered only if, and as soon as, that transaction
+commits.  No Flask imports here.
+"""
+from __future__ import annotations
+
+import json
+import os
+import select
+import socket
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional
+
+_LOCK = threading.Lock()
+_SUBSCRIBERS: Dict[str, List[Callable[[Dict[str, Any]], None]]] = {}
+_BACKEND: Optional["StateBackend"] = None
+
+ORIGIN = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+NOTIFY_CHANNEL = "easyhost_shared_state"
+
+
+def subscribe(channel: str, handler: Callable[[Dict[str, Any]], None]) -> None:
+    """
+    handler(msg) runs for every message on ``channel`` — published by this process or
+    any other.  msg = {"seq", "channel", "origin", "payload", "shared"}; shared is True
+    when seq is a cross-process sequence number (SqlBackend).
+    """
+    with _LOCK:
+        handlers = _SUBSCRIBERS.setdefault(channel, [])
+        if handler not in handlers:
+            handlers.append(handler)
+
+
+def _deliver(msg: Dict[str, Any]) -> None:
+    with _LOCK:
+        handlers = list(_SUBSCRIBERS.get(msg.get("channel") or "") or ())
+    for h in handlers:
+        try:
+            h(msg)
+        except Exception as e:
+            print(f"[shared_state] {msg.get('channel')} handler {getattr(h, '__name__', h)}: {e!r}", flush=True)
+
+
+class StateBackend:
+    """Interface every backend implements."""
+
+    name = "base"
+    shared = False  # True when state is visible to other processes
+
+    def publish(self, channel: str, payload: Any) -> None:
+        raise NotImplementedError
+
+    def publish_on(self, conn, channel: str, payload: Any) -> bool:
+        """
+        Write the message on ``conn`` (an open SQLAlchemy Connection of the caller's
+        transaction); it is delivered once that transaction commits.  False when the
+        backend has no outbox — the caller publish()es after its commit instead.
+        """
+        return False
+
+    def baseline_seq(self) -> int:
+        """Sequence number already applied when this process started consuming."""
+        return 0
+
+    def feed_append(self, feed: str, entry: Dict[str, Any], maxlen: int) -> None:
+        raise NotImplementedError
+
+    def feed_items(self, feed: str, maxlen: int) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def kv_get(self, key: str) -> Any:
+        raise NotImplementedError
+
+    def kv_set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        raise NotImplementedError
+
+    def kv_delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def kv_setdefault(self, key: str, value: Any) -> Any:
+        raise NotImplementedError
+
+    def try_lease(self, name: str, ttl: float) -> bool:
+        """True while this process holds the named lease (renewed on every call)."""
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.name, "shared": self.shared, "origin": ORIGIN}
+
+
+class MemoryBackend(StateBackend):
+    """Process-local state — one worker only; publish() delivers synchronously."""
+
+    name = "memory"
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._feeds: Dict[str, Deque[Dict[str, Any]]] = {}
+        self._kv: Dict[str, Any] = {}
+
+    def publish(self, channel: str, payload: Any) -> None:
+        with self._lock:
+            self._seq += 1
+            seq = self._seq
+        _deliver({"seq": seq, "channel": channel, "origin": ORIGIN, "payload": payload, "shared": False})
+
+    def feed_append(self, feed: str, entry: Dict[str, Any], maxlen: int) -> None:
+        with self._lock:
+            dq = self._feeds.get(feed)
+            if dq is None or dq.maxlen != maxlen:
+                dq = deque(dq or (), maxlen=maxlen)
+                self._feeds[feed] = dq
+            dq.append(entry)
+
+    def feed_items(self, feed: str, maxlen: int) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._feeds.get(feed) or ())[-maxlen:]
+
+    def kv_get(self, key: str) -> Any:
+        with self._lock:
+            hit = self._kv.get(key)
+            if hit is None:
+                return None
+            value, expires_at = hit
+            if expires_at is not None and expires_at <= time.time():
+                del self._kv[key]
+                return None
+            return value
+
+    def kv_set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        with self._lock:
+            self._kv[key] = (value, (time.time() + ttl) if ttl else None)
+
+    def kv_delete(self, key: str) -> None:
+        with self._lock:
+            self._kv.pop(key, None)
+
+    def kv_setdefault(self, key: str, value: Any) -> Any:
+        with self._lock:
+            hit = self._kv.get(key)
+            if hit is None:
+                self._kv[key] = (value, None)
+                return value
+            return hit[0]
+
+    def try_lease(self, name: str, ttl: float) -> bool:
+        return True
+
+
+class SqlBackend(StateBackend):
+    """
+    State in the app database via SQLAlchemy Core (PostgreSQL or SQLite).
+
+    publish() inserts into shared_state_messages (+ pg_notify on PostgreSQL); one
+    dispatcher thread per process reads rows in id order and hands them to the
+    channel subscribers.  An id that is missing from a batch (a concurrent insert
+    not committed yet) holds delivery for up to GAP_WAIT_SEC before it is skipped
+    as a rolled-back sequence value, so workers agree on the order.
+    """
+
+    name = "sql"
+    shared = True
+    GAP_WAIT_SEC = 2.0
+    BATCH = 500
+
+    def __init__(self, engine, poll_interval: float = 0.25, retention_sec: float = 600.0) -> None:
+        from sqlalchemy import text  # local: this module stays importable without SQLAlchemy
+
+        self._text = text
+        self.engine = engine
+        self.dialect = getattr(engine.dialect, "name", "sqlite")
+        self.poll_interval = max(0.05, float(poll_interval))
+        self.retention_sec = max(60.0, float(retention_sec))
+        self._lock = threading.Lock()
+        self._pid: Optional[int] = None
+        self._last_id = 0
+        self._baseline = 0
+        self._gap_since: Optional[float] = None
+        self._feed_cache: Dict[str, Any] = {}
+        self._feed_appends = 0
+        self._stats = {"published": 0, "delivered": 0, "gaps_skipped": 0, "poll_errors": 0}
+        self.ensure_schema()
+
+    # ── schema ───────────────────────────────────────────────────────────────
+    def ensure_schema(self) -> None:
+        pk = "BIGSERIAL PRIMARY KEY" if self.dialect == "postgresql" else "INTEGER PRIMARY KEY AUTOINCREMENT"
+        stmts = [
+            f"CREATE TABLE IF NOT EXISTS shared_state_messages (id {pk}, channel VARCHAR(64) NOT NULL, "
+            "origin VARCHAR(128), payload TEXT NOT NULL, created_at DOUBLE PRECISION NOT NULL)",
+            "CREATE INDEX IF NOT EXISTS ix_shared_state_messages_created ON shared_state_messages (created_at)",
+            f"CREATE TABLE IF NOT EXISTS shared_state_feed (id {pk}, feed VARCHAR(64) NOT NULL, "
+            "payload TEXT NOT NULL, created_at DOUBLE PRECISION NOT NULL)",
+            "CREATE INDEX IF NOT EXISTS ix_shared_state_feed_feed_id ON shared_state_feed (feed, id)",
+            "CREATE TABLE IF NOT EXISTS shared_state_kv (key VARCHAR(191) PRIMARY KEY, value TEXT, "
+            "expires_at DOUBLE PRECISION)",
+        ]
+        with self.engine.begin() as conn:
+            for sql in stmts:
+                conn.execute(self._text(sql))
+
+    # ── ordered messages ─────────────────────────────────────────────────────
+    def _insert_message(self, conn, channel: str, payload: Any) -> None:
+        self._ensure_dispatcher()
+        conn.execute(
+            self._text(
+                "INSERT INTO shared_state_messages (channel, origin, payload, created_at) "
+                "VALUES (:c, :o, :p, :t)"
+            ),
+            {"c": channel, "o": ORIGIN, "p": json.dumps(payload, default=str), "t": time.time()},
+        )
+        if self.dialect == "postgresql":
+            # NOTIFY is transactional: listeners wake when the inserting transaction commits.
+            conn.execute(self._text("SELECT pg_notify(:n, '')"), {"n": NOTIFY_CHANNEL})
+        with self._lock:
+            self._stats["published"] += 1
+
+    def publish(self, channel: str, payload: Any) -> None:
+        with self.engine.begin() as conn:
+            self._insert_message(conn, channel, payload)
+
+    def publish_on(self, conn, channel: str, payload: Any) -> bool:
+        self._insert_message(conn, channel, payload)
+        return True
+
+    def baseline_seq(self) -> int:
+        self._ensure_dispatcher()
+        return self._baseline
+
+    def _ensure_dispatcher(self) -> None:
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._lock:
+            if self._pid == pid:
+                return
+            # Started per process (also after a gunicorn --preload fork): consume from "now".
+            with self.engine.connect() as conn:
+                row = conn.execute(self._text("SELECT MAX(id) FROM shared_state_messages")).first()
+            self._last_id = self._baseline = int((row[0] if row else 0) or 0)
+            self._gap_since = None
+            self._pid = pid
+        threading.Thread(target=self._dispatch_loop, daemon=True, name="SharedStateDispatcher").start()
+
+    def _listen_connection(self):
+        if self.dialect != "postgresql":
+            return None
+        try:
+            # AUTOCOMMIT at the SQLAlchemy level works for every PostgreSQL driver; the
+            # socket wait / poll() below still needs a psycopg-style connection.
+            conn = self.engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+            conn.execute(self._text(f"LISTEN {NOTIFY_CHANNEL}"))
+            dbapi = conn.connection.driver_connection
+            return conn, dbapi
+        except Exception as e:
+            print(f"[shared_state] LISTEN unavailable, polling instead: {e!r}", flush=True)
+            return None
+
+    def _wait_for_notify(self, listen) -> None:
+        if listen is None:
+            time.sleep(self.poll_interval)
+            return
+        _raw, dbapi = listen
+        if select.select([dbapi], [], [], max(self.poll_interval, 1.0)) != ([], [], []):
+            dbapi.poll()
+            del dbapi.notifies[:]
+
+    def _dispatch_loop(self) -> None:
+        pid = os.getpid()
+        listen = self._listen_connection()
+        last_prune = 0.0
+        while self._pid == pid:
+            try:
+                self._wait_for_notify(listen)
+                self._drain()
+                now = time.time()
+                if now - last_prune > 60:
+                    last_prune = now
+                    self._prune(now)
+            except Exception as e:
+                with self._lock:
+                    self._stats["poll_errors"] += 1
+                print(f"[shared_state] dispatcher: {e!r}", flush=True)
+                if listen is not None:
+                    try:
+                        listen[0].close()
+                    except Exception:
+                        pass
+                    listen = self._listen_connection()
+                time.sleep(1.0)
+
+    def _drain(self) -> None:
+        while True:
+            with self.engine.connect() as conn:
+                rows = conn.execute(
+                    self._text(
+                        "SELECT id, channel, origin, payload FROM shared_state_messages "
+                        "WHERE id > :last ORDER BY id LIMIT :n"
+                    ),
+                    {"last": self._last_id, "n": self.BATCH},
+                ).fetchall()
+            if not rows:
+                self._gap_since = None
+                return
+            for row in rows:
+                msg_id = int(row[0])
+                if msg_id != self._last_id + 1:
+                    now = time.time()
+                    if self._gap_since is None:
+                        self._gap_since = now
+                    if now - self._gap_since < self.GAP_WAIT_SEC:
+                        return  # an earlier id may still commit — retry on the next wake-up
+                    with self._lock:
+                        self._stats["gaps_skipped"] += 1
+                self._gap_since = None
+                self._last_id = msg_id
+                try:
+                    payload = json.loads(row[3])
+                except Exception:
+                    payload = None
+                _deliver({"seq": msg_id, "channel": row[1], "origin": row[2], "payload": payload, "shared": True})
+                with self._lock:
+                    self._stats["delivered"] += 1
+            if len(rows) < self.BATCH:
+                return
+
+    def _prune(self, now: float) -> None:
+        with self.engine.begin() as conn:
+            conn.execute(
+                self._text("DELETE FROM shared_state_messages WHERE created_at < :t"),
+                {"t": now - self.retention_sec},
+            )
+            conn.execute(
+                self._text("DELETE FROM shared_state_kv WHERE expires_at IS NOT NULL AND expires_at < :t"),
+                {"t": now},
+            )
+
+    # ── capped feeds ─────────────────────────────────────────────────────────
+    def feed_append(self, feed: str, entry: Dict[str, Any], maxlen: int) -> None:
+        with self.engine.begin() as conn:
+            conn.execute(
+                self._text("INSERT INTO shared_state_feed (feed, payload, created_at) VALUES (:f, :p, :t)"),
+                {"f": feed, "p": json.dumps(entry, default=str), "t": time.time()},
+            )
+        with self._lock:
+            self._feed_cache.pop(feed, None)
+            self._feed_appends += 1
+            prune = self._feed_appends % 25 == 0
+        if prune:
+            with self.engine.begin() as conn:
+                conn.execute(
+                    self._text(
+                        "DELETE FROM shared_state_feed WHERE feed = :f AND id <= ("
+                        "SELECT id FROM shared_state_feed WHERE feed = :f ORDER BY id DESC LIMIT 1 OFFSET :n)"
+                    ),
+                    {"f": feed, "n": maxlen},
+                )
+
+    def feed_items(self, feed: str, maxlen: int) -> List[Dict[str, Any]]:
+        # One read per feed per second at most — request handlers iterate feeds repeatedly.
+        now = time.time()
+        with self._lock:
+            hit = self._feed_cache.get(feed)
+            if hit and now - hit[0] < 1.0 and hit[1] >= maxlen:
+                return list(hit[2][-maxlen:])
+        with self.engine.connect() as conn:
+            rows = conn.execute(
+                self._text("SELECT payload FROM shared_state_feed WHERE feed = :f ORDER BY id DESC LIMIT :n"),
+                {"f": feed, "n": maxlen},
+            ).fetchall()
+        items = []
+        for (raw,) in reversed(rows):
+            try:
+                items.append(json.loads(raw))
+            except Exception:
+                continue
+        with self._lock:
+            self._feed_cache[feed] = (now, maxlen, items)
+        return list(items)
+
+    # ── key / value ──────────────────────────────────────────────────────────
+    def kv_get(self, key: str) -> Any:
+        with self.engine.connect() as conn:
+            row = conn.execute(
+                self._text("SELECT value, expires_at FROM shared_state_kv WHERE key = :k"), {"k": key}
+            ).first()
+        if row is None or (row[1] is not None and float(row[1]) <= time.time()):
+            return None
+        try:
+            return json.loads(row[0])
+        except Exception:
+            return None
+
+    def kv_set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        with self.engine.begin() as conn:
+            conn.execute(
+                self._text(
+                    "INSERT INTO shared_state_kv (key, value, expires_at) VALUES (:k, :v, :e) "
+                    "ON CONFLICT (key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at"
+                ),
+                {"k": key, "v": json.dumps(value, default=str), "e": (time.time() + ttl) if ttl else None},
+            )
+
+    def kv_delete(self, key: str) -> None:
+        with self.engine.begin() as conn:
+            conn.execute(self._text("DELETE FROM shared_state_kv WHERE key = :k"), {"k": key})
+
+    def kv_setdefault(self, key: str, value: Any) -> Any:
+        with self.engine.begin() as conn:
+            conn.execute(
+                self._text(
+                    "INSERT INTO shared_state_kv (key, value, expires_at) VALUES (:k, :v, NULL) "
+                    "ON CONFLICT (key) DO NOTHING"
+                ),
+                {"k": key, "v": json.dumps(value, default=str)},
+            )
+        got = self.kv_get(key)
+        return value if got is None else got
+
+    def try_lease(self, name: str, ttl: float) -> bool:
+        now = time.time()
+        key = f"lease:{name}"
+        owner = json.dumps(ORIGIN)
+        with self.engine.begin() as conn:
+            conn.execute(
+                self._text(
+                    "INSERT INTO shared_state_kv (key, value, expires_at) VALUES (:k, :o, :e) "
+                    "ON CONFLICT (key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at "
+                    "WHERE shared_state_kv.value = :o OR shared_state_kv.expires_at < :now"
+                ),
+                {"k": key, "o": owner, "e": now + ttl, "now": now},
+            )
+            row = conn.execute(self._text("SELECT value FROM shared_state_kv WHERE key = :k"), {"k": key}).first()
+        return bool(row) and row[0] == owner
+
+    def stats(self) -> Dict[str, Any]:
+        out = super().stats()
+        with self._lock:
+            out.update(self._stats)
+            out.update({"dialect": self.dialect, "last_seq": self._last_id, "baseline_seq": self._baseline})
+        return out
+
+
+def backend() -> StateBackend:
+    global _BACKEND
+    if _BACKEND is None:
+        with _LOCK:
+            if _BACKEND is None:
+                _BACKEND = MemoryBackend()
+    return _BACKEND
+
+
+def configure(new_backend: StateBackend) -> StateBackend:
+    """Swap the process backend (call once at startup, before traffic)."""
+    global _BACKEND
+    with _LOCK:
+        _BACKEND = new_backend
+    return new_backend
+
+
+def publish(channel: str, payload: Any) -> None:
+    backend().publish(channel, payload)
+
+
+def publish_on(conn, channel: str, payload: Any) -> bool:
+    """Outbox publish inside the caller's transaction — see StateBackend.publish_on."""
+    return backend().publish_on(conn, channel, payload)
+
+
+class SharedFeed:
+    """
+    deque-like capped feed (append / iterate / len) stored in the active backend.
+    Every len() / bool() / iteration is a backend read (list(feed) is two: length
+    hint + iteration) — take ``snapshot()`` once when more than one is needed.
+    """
+
+    def __init__(self, name: str, maxlen: int) -> None:
+        self.name = name
+        self.maxlen = int(maxlen)
+
+    def append(self, entry: Dict[str, Any]) -> None:
+        backend().feed_append(self.name, entry, self.maxlen)
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        try:
+            return backend().feed_items(self.name, self.maxlen)
+        except Exception as e:
+            print(f"[shared_state] feed {self.name} read failed: {e!r}", flush=True)
+            return []
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self.snapshot())
+
+    def __len__(self) -> int:
+        return len(self.snapshot())
+
+    def __bool__(self) -> bool:
+        return bool(self.snapshot())
+
+
+class SharedDict:
+    """Minimal dict facade (get / [] / del / pop / in) over backend key/value with a TTL."""
+
+    def __init__(self, namespace: str, ttl: Optional[float] = None) -> None:
+        self.namespace = namespace
+        self.ttl = ttl
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = backend().kv_get(self._key(key))
+        return default if value is None else value
+
+    def __getitem__(self, key: str) -> Any:
+        value = backend().kv_get(self._key(key))
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        backend().kv_set(self._key(key), value, self.ttl)
+
+    def __delitem__(self, key: str) -> None:
+        backend().kv_delete(self._key(key))
+
+    def __contains__(self, key: str) -> bool:
+        return backend().kv_get(self._key(key)) is not None
+
+    def pop(self, key: str, default: Any = None) -> Any:
+        value = self.get(key, default)
+        backend().kv_delete(self._key(key))
+        return value
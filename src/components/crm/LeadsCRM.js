@@ -29,6 +29,7 @@ const LeadsCRM = () => {
   const [isScanning, setIsScanning] = useState(false);
   const [leads, setLeads] = useState([]);
   const [isLoadingLeads, setIsLoadingLeads] = useState(true);
+  const [leadsReloadKey, setLeadsReloadKey] = useState(0);
   const [financials, setFinancials] = useState(null);
   const greetedLeadIdsRef = useRef(new Set());
   const paymentAlertedIdsRef = useRef(new Set());
@@ -108,7 +109,7 @@ const LeadsCRM = () => {
     return () => {
       isActive = false;
     };
-  }, [statusFilter, setStoreLeads, activeTenantId, authToken]);
+  }, [statusFilter, setStoreLeads, activeTenantId, authToken, leadsReloadKey]);
 
   useEffect(() => {
     let isActive = true;
@@ -200,7 +201,9 @@ const LeadsCRM = () => {
       (error) => {
         console.error('Lead stream error:', error);
       },
-      handleAutomationStats
+      handleAutomationStats,
+      // Missed events (slow tab / server restarted) — reload the list.
+      () => setLeadsReloadKey((k) => k + 1)
     );
 
     return () => {
@@ -9,6 +9,7 @@ import useTranslations from '../../hooks/useTranslations';
 import { fetchWithRetry, API_URL } from '../../utils/apiClient';
 import api from '../../services/api';
 import hotelRealtime from '../../services/hotelRealtime';
+import { useRealtimeRefresh } from '../../hooks/useRealtimeRefresh';
 import { notifyTasksChanged, subscribeCrossTabTaskSync } from '../../utils/taskSyncBridge';
 import './GodModeDashboard.css';
 
@@ -173,9 +174,8 @@ export default function GodModeDashboard() {
 
   useEffect(() => {
     fetchOverview();
-    const t = setInterval(() => fetchOverview(), 15000);
-    return () => clearInterval(t);
   }, [fetchOverview]);
+  useRealtimeRefresh(['tasks', 'grid', 'activity'], fetchOverview, 15000);
 
   useEffect(() => {
     const bump = () => setRefreshTrigger((n) => n + 1);
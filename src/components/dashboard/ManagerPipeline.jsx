@@ -4,10 +4,12 @@
  * Tab 1: "Completed Today" — scrolling feed with completion times
  * Tab 2: "Worker Productivity" — glassmorphism table with per-worker stats
  *
- * Polls /completed-today (feed) and /worker-productivity (table).
+ * Loads /completed-today (feed) and /worker-productivity (table); both refetch on
+ * pushed task changes (realtime channel) and poll only while it is down.
  */
-import React, { useState, useEffect, useCallback, useRef } from 'react';
+import React, { useState, useEffect, useCallback } from 'react';
 import { API_URL } from '../../utils/apiClient';
+import { useRealtimeRefresh } from '../../hooks/useRealtimeRefresh';
 import { patchEnterpriseGlobalRules, stripOverrideFieldFromAll } from '../../hooks/useEnterpriseRules';
 
 /* ── CSS ─────────────────────────────────────────────────── */
@@ -101,7 +103,6 @@ function FeedTab() {
   const [loading, setLoading] = useState(true);
   const [spin,    setSpin]    = useState(false);
   const [sync,    setSync]    = useState(null);
-  const timer = useRef(null);
 
   const load = useCallback(async (silent = false) => {
     if (!silent) setLoading(true);
@@ -119,9 +120,8 @@ function FeedTab() {
 
   useEffect(() => {
     load();
-    timer.current = setInterval(() => load(true), 12_000);
-    return () => clearInterval(timer.current);
   }, [load]);
+  useRealtimeRefresh(['tasks'], () => load(true), 12_000);
 
   return (
     <div>
@@ -222,7 +222,6 @@ function ProductivityTab() {
   const [loading, setLoading] = useState(true);
   const [spin,    setSpin]    = useState(false);
   const [sync,    setSync]    = useState(null);
-  const timer = useRef(null);
 
   const load = useCallback(async (silent = false) => {
     if (!silent) setLoading(true);
@@ -240,9 +239,8 @@ function ProductivityTab() {
 
   useEffect(() => {
     load();
-    timer.current = setInterval(() => load(true), 15_000);
-    return () => clearInterval(timer.current);
   }, [load]);
+  useRealtimeRefresh(['tasks'], () => load(true), 15_000);
 
   const maxDone = Math.max(1, ...rows.map(r => r.tasks_done || 0));
 
@@ -1,4 +1,4 @@
-import React, { useState, useEffect, useRef, useCallback } from 'react';
+import React, { useState, useEffect, useCallback } from 'react';
 import {
   AreaChart, Area, XAxis, YAxis,
   CartesianGrid, Tooltip, ResponsiveContainer, ReferenceLine,
@@ -10,6 +10,7 @@ import {
 import { API_URL } from '../../utils/apiClient';
 import { getReliabilityScores } from '../../services/api';
 import useCurrency from '../../hooks/useCurrency';
+import { useRealtimeRefresh } from '../../hooks/useRealtimeRefresh';
 import './OwnerDashboard.css';
 
 /* ── helpers ────────────────────────────────────────────────── */
@@ -152,9 +153,8 @@ function StaffReliabilityPanel() {
 
   useEffect(() => {
     refresh();
-    const t = setInterval(refresh, 30_000);
-    return () => clearInterval(t);
   }, [refresh]);
+  useRealtimeRefresh(['tasks'], refresh, 30_000);
 
   const BAR_COLORS = ['#10b981', '#3b82f6', '#f59e0b', '#8b5cf6', '#ef4444'];
 
@@ -271,7 +271,6 @@ export default function OwnerDashboard({ onSwitchToEmployee }) {
   const [error,   setError]   = useState(null);
   const [lastSync, setLastSync] = useState(null);
   const [pulse,   setPulse]   = useState(false);
-  const timerRef = useRef(null);
 
   const load = useCallback(async (silent = false) => {
     if (!silent) setLoading(true);
@@ -303,9 +302,8 @@ export default function OwnerDashboard({ onSwitchToEmployee }) {
 
   useEffect(() => {
     load();
-    timerRef.current = setInterval(() => load(true), 30000);
-    return () => clearInterval(timerRef.current);
   }, [load]);
+  useRealtimeRefresh(['tasks', 'grid'], () => load(true), 30000);
 
   /* ── Maya insight terminal ── */
   const insightText = data?.maya_insight || '';
@@ -6,7 +6,7 @@ import { isBiktaForcePhone, BIKTA_TENANT_ID, parseJwtPayload } from '../../utils
 import { isDashboardAdmin } from '../../utils/dashboardRoles';
 import useTranslations from '../../hooks/useTranslations';
 import {
-  setWorkerLanguage, registerStaff, getStaffTasks,
+  setWorkerLanguage, registerStaff, getStaffTasks, getStaffList,
   updateStaffTaskStatus, subscribeToStaff, updateStaffLocation,
 } from '../../services/api';
 import { API_URL } from '../../utils/apiClient';
@@ -336,6 +336,14 @@ const FieldView = ({ clockInOnly = false, autoClockInOnScan = false, clockInRedi
       const cur = staffProfileRef.current;
       if (update?.id !== cur.staffId) return;
       setStaffProfile({ ...cur, goldPoints: update.gold_points ?? cur.goldPoints, rank: update.rank ?? cur.rank, rankTier: update.rank_tier ?? cur.rankTier });
+    }, undefined, async () => {
+      // Missed updates (slow tab / server restarted) — re-read this worker's points.
+      try {
+        const list = await getStaffList();
+        const cur = staffProfileRef.current;
+        const me = Array.isArray(list) ? list.find((s) => s.id === cur.staffId) : null;
+        if (me) setStaffProfile({ ...cur, goldPoints: me.gold_points ?? me.points ?? cur.goldPoints });
+      } catch (_) {}
     });
     return () => { if (src?.close) src.close(); };
   }, [staffProfile.staffId, setStaffProfile]);
@@ -25,6 +25,7 @@ const LeadsPage = () => {
 
   const eventSourceRef = useRef(null);
   const healthCheckRef = useRef(null);
+  const fetchLeadsRef = useRef(null);
 
   // Status options for filter
   const statusOptions = [
@@ -72,6 +73,7 @@ const LeadsPage = () => {
       setLoading(false);
     }
   }, [statusFilter, translate]);
+  fetchLeadsRef.current = fetchLeads;
 
   // Handle new lead from SSE
   const handleNewLead = useCallback((lead) => {
@@ -108,7 +110,10 @@ const LeadsPage = () => {
     const eventSource = subscribeToLeads(
       handleNewLead,
       handleLeadUpdated,
-      () => setConnectionStatus('error')
+      () => setConnectionStatus('error'),
+      undefined,
+      // Missed events (slow tab / server restarted) — reload the list with the current filter.
+      () => fetchLeadsRef.current?.()
     );
 
     eventSource.addEventListener('connected', () => {
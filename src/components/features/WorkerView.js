@@ -1,10 +1,11 @@
-import React, { useEffect, useState, useCallback, useRef } from 'react';
+import React, { useEffect, useState, useCallback } from 'react';
 import {
   CheckCircle2, Loader2, BedDouble, User, Clock,
   AlertCircle, Phone, MessageCircle, CalendarDays,
   RefreshCw, ListTodo,
 } from 'lucide-react';
 import { API_URL } from '../../utils/apiClient';
+import { useRealtimeRefresh } from '../../hooks/useRealtimeRefresh';
 import './WorkerView.css';
 
 const MAYA_AVATAR = 'https://api.dicebear.com/7.x/personas/svg?seed=MayaManager&backgroundColor=25D366';
@@ -36,6 +37,11 @@ function isPending(s) {
   return ['Pending', 'pending', 'assigned'].includes(s);
 }
 
+// The list view shows pending + accepted tasks (this worker's, or everyone's).
+function isListedTask(t) {
+  return isPending(t.status) || ['Accepted', 'accepted'].includes(t.status);
+}
+
 // Extract workerId from path: /worker/levikobi → "levikobi"
 function getWorkerIdFromPath() {
   const parts = window.location.pathname.split('/').filter(Boolean);
@@ -204,7 +210,6 @@ function WorkerListView({ workerId, workerName }) {
   const [tasks,   setTasks]   = useState([]);
   const [loading, setLoading] = useState(true);
   const [lastFetch, setLast]  = useState(null);
-  const timerRef              = useRef(null);
 
   const fetchTasks = useCallback(async () => {
     setLoading(true);
@@ -212,9 +217,7 @@ function WorkerListView({ workerId, workerName }) {
       const res  = await fetch(`${API_URL}/property-tasks`);
       const data = await res.json();
       const all  = Array.isArray(data) ? data : [];
-      // Show pending + accepted for this worker (or all if workerId matches everyone)
-      const relevant = all.filter((t) => isPending(t.status) || ['Accepted','accepted'].includes(t.status));
-      setTasks(relevant);
+      setTasks(all.filter(isListedTask));
       setLast(new Date());
     } catch {
       /* silent — keep old list */
@@ -223,12 +226,30 @@ function WorkerListView({ workerId, workerName }) {
     }
   }, []);
 
-  // initial + auto-refresh
+  // initial load; afterwards refetch on pushed task changes (polls only while the channel is down)
   useEffect(() => {
     fetchTasks();
-    timerRef.current = setInterval(fetchTasks, REFRESH_MS);
-    return () => clearInterval(timerRef.current);
   }, [fetchTasks]);
+  // Pushed diffs ({ tasks, removed }) are merged in place; resync / refetch payloads reload the list.
+  useRealtimeRefresh(['tasks'], fetchTasks, REFRESH_MS, (diff) => {
+    if (!Array.isArray(diff.tasks)) return false;
+    const removed = new Set((diff.removed || []).map(String));
+    const changed = new Map(diff.tasks.map((t) => [String(t.id), t]));
+    setTasks((prev) => {
+      const kept = prev
+        .filter((t) => !removed.has(String(t.id)))
+        .map((t) => {
+          const next = changed.get(String(t.id));
+          if (!next) return t;
+          changed.delete(String(t.id));
+          return isListedTask(next) ? next : null;
+        })
+        .filter(Boolean);
+      return [...[...changed.values()].filter(isListedTask), ...kept];
+    });
+    setLast(new Date());
+    return true;
+  });
 
   const handleStatusChange = (id, newStatus) => {
     setTasks((prev) => prev.map((t) => t.id === id ? { ...t, status: newStatus } : t));
@@ -6,6 +6,7 @@ import useStore from '../../store/useStore';
 import { maya } from '../../services/agentOrchestrator';
 import { API_URL, withAuthFetchInit } from '../../utils/apiClient';
 import { updatePropertyTaskStatus, fetchMayaChatHistory } from '../../services/api';
+import realtimeChannel from '../../services/realtimeChannel';
 import { notifyTasksChanged, notifyMissionTaskLocalUpdate, notifyStaffChanged } from '../../utils/taskSyncBridge';
 import {
   speakMayaReply,
@@ -347,6 +348,7 @@ const MayaChat = memo(function MayaChat({ onAfterSendSuccess }) {
   /** Prevents concurrent duplicate GET /maya/chat-history requests. */
   const historyFetchInFlightRef = useRef(false);
   const feedSinceRef     = useRef(Date.now());
+  const feedCursorRef    = useRef(null); // activity seq — preferred over the timestamp once known
   const feedSeenRef      = useRef(new Set());
   const autoCloseTimerRef = useRef(null);
   /** Dedupes chat-history fetches (mount + open panel + zustand rehydrate). */
@@ -1368,50 +1370,75 @@ const MayaChat = memo(function MayaChat({ onAfterSendSuccess }) {
     return () => window.removeEventListener('maya-task-created', h);
   }, []);
 
-  /* ── Activity feed poll — bridges SIMULATE / demo events to the chat ── */
+  /* ── Activity feed — bridges SIMULATE / demo events to the chat ──
+   * Pushed over the realtime channel; /activity-feed is polled once on open and
+   * again only while the channel is down. */
   useEffect(() => {
     if (!mayaChatOpen) return;
 
+    const applyEvents = (events) => {
+      events.forEach((ev) => {
+        if (feedSeenRef.current.has(ev.id)) return;
+        feedSeenRef.current.add(ev.id);
+
+        if (ev.type === 'task_created') {
+          const content = ev.text || t('mayaChat.newTaskCreated');
+          addMayaActivityEntry({
+            kind: 'task_created',
+            text: content,
+            taskId: ev.task?.id,
+          });
+          notifyTasksChanged({ task: ev.task });
+        } else {
+          const content = ev.text || t('mayaChat.messageSent');
+          addMayaActivityEntry({
+            kind: 'feed_sim',
+            text: content,
+          });
+        }
+        setOnline(true);
+      });
+    };
+
     const poll = async () => {
       try {
         const since = feedSinceRef.current;
+        const cursor = feedCursorRef.current;
+        const qs = cursor != null ? `cursor=${cursor}` : `since=${since}`;
         const res = await fetch(
-          `${API_URL}/activity-feed?since=${since}&include_manager=1`,
+          `${API_URL}/activity-feed?${qs}&include_manager=1`,
           withAuthFetchInit({ credentials: 'include' }),
         );
         if (!res.ok) return;
-        const { events, server_ts } = await res.json();
+        const { events, server_ts, cursor: nextCursor } = await res.json();
         feedSinceRef.current = server_ts || Date.now();
-
-        events.forEach((ev) => {
-          if (feedSeenRef.current.has(ev.id)) return;
-          feedSeenRef.current.add(ev.id);
-
-          if (ev.type === 'task_created') {
-            const content = ev.text || t('mayaChat.newTaskCreated');
-            addMayaActivityEntry({
-              kind: 'task_created',
-              text: content,
-              taskId: ev.task?.id,
-            });
-            notifyTasksChanged({ task: ev.task });
-          } else {
-            const content = ev.text || t('mayaChat.messageSent');
-            addMayaActivityEntry({
-              kind: 'feed_sim',
-              text: content,
-            });
-          }
-          setOnline(true);
-        });
+        if (nextCursor != null) feedCursorRef.current = nextCursor;
+        applyEvents(events);
       } catch {
         // silent — don't set offline for poll failures
       }
     };
 
     poll(); // immediate first check
-    const interval = setInterval(poll, 15000); // activity-feed — min 15s per ops policy
-    return () => clearInterval(interval);
+    let interval = null;
+    const unsubscribeFeed = realtimeChannel.subscribe(['activity'], (diff) => {
+      if (diff.resync || !Array.isArray(diff.events)) {
+        poll();
+        return;
+      }
+      if (diff.server_ts) feedSinceRef.current = diff.server_ts;
+      if (diff.cursor != null) feedCursorRef.current = diff.cursor;
+      applyEvents(diff.events);
+    });
+    const unsubscribeStatus = realtimeChannel.onStatus((connected) => {
+      if (interval) clearInterval(interval);
+      interval = connected ? null : setInterval(poll, 15000); // activity-feed — min 15s per ops policy
+    });
+    return () => {
+      unsubscribeFeed();
+      unsubscribeStatus();
+      if (interval) clearInterval(interval);
+    };
   }, [mayaChatOpen, addMayaActivityEntry, t]);
 
   /* ── /test-task manual trigger (Manual Trigger Mode) ── */
@@ -1,6 +1,7 @@
 import React, { useEffect, useState } from 'react';
 import { Trophy } from 'lucide-react';
 import { getLeaderboard } from '../../services/api';
+import { useRealtimeRefresh } from '../../hooks/useRealtimeRefresh';
 import './Leaderboard.css';
 
 const Leaderboard = () => {
@@ -17,10 +18,10 @@ const Leaderboard = () => {
 
   useEffect(() => {
     load();
-    const interval = setInterval(load, 15000);
-    return () => clearInterval(interval);
   }, []);
 
+  useRealtimeRefresh(['staff'], load, 15000);
+
   return (
     <div className="leaderboard glass-card">
       <div className="leaderboard-header">
@@ -1,6 +1,7 @@
 import React, { useEffect, useState } from 'react';
 import { Users } from 'lucide-react';
 import { endShiftStaff, getStaffList, toggleStaffActive, updateStaffPhoto, uploadStaffPhoto } from '../../services/api';
+import { useRealtimeRefresh } from '../../hooks/useRealtimeRefresh';
 import './StaffManager.css';
 
 const buildQrUrl = (value) =>
@@ -31,16 +32,23 @@ const StaffManager = () => {
 
   useEffect(() => {
     loadStaff();
-    const interval = setInterval(loadStaff, 15000);
     // Instant refresh when Maya registers a new staff member via chat
     const onMayaStaff = () => loadStaff();
     window.addEventListener('maya-staff-registered', onMayaStaff);
     return () => {
-      clearInterval(interval);
       window.removeEventListener('maya-staff-registered', onMayaStaff);
     };
   }, []);
 
+  // staff_update pushes carry the member's new fields — merge them; refetch when the push says so.
+  useRealtimeRefresh(['staff'], loadStaff, 15000, (diff) => {
+    if (!Array.isArray(diff.updates)) return false;
+    const byId = new Map(diff.updates.map((u) => [u.payload?.id, u.payload]).filter(([id]) => id));
+    if (!byId.size) return true;
+    setStaff((prev) => prev.map((member) => (byId.has(member.id) ? { ...member, ...byId.get(member.id) } : member)));
+    return true;
+  });
+
   const handleToggle = async (member) => {
     try {
       await toggleStaffActive(member.id, !member.active);
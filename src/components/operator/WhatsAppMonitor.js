@@ -1,28 +1,34 @@
-import React, { useEffect, useState } from 'react';
+import React, { useCallback, useEffect, useState } from 'react';
 import { MessageCircle, ArrowDownLeft, ArrowUpRight } from 'lucide-react';
 import { getMessages } from '../../services/api';
+import { useRealtimeRefresh } from '../../hooks/useRealtimeRefresh';
 import './WhatsAppMonitor.css';
 
 const WhatsAppMonitor = () => {
   const [messages, setMessages] = useState([]);
 
+  const loadMessages = useCallback(async () => {
+    try {
+      const data = await getMessages(50);
+      setMessages(data);
+    } catch (error) {
+      console.error('Failed to load messages:', error);
+    }
+  }, []);
+
   useEffect(() => {
-    let isActive = true;
-    const loadMessages = async () => {
-      try {
-        const data = await getMessages(50);
-        if (isActive) setMessages(data);
-      } catch (error) {
-        console.error('Failed to load messages:', error);
-      }
-    };
     loadMessages();
-    const interval = setInterval(loadMessages, 10000);
-    return () => {
-      isActive = false;
-      clearInterval(interval);
-    };
-  }, []);
+  }, [loadMessages]);
+
+  // New rows arrive over the realtime channel (oldest first); polling only while it is down.
+  useRealtimeRefresh(['messages'], loadMessages, 10000, (diff) => {
+    if (!Array.isArray(diff.messages)) return false;
+    setMessages((prev) => {
+      const seen = new Set(prev.map((m) => m.id));
+      const fresh = diff.messages.filter((m) => !seen.has(m.id)).reverse();
+      return [...fresh, ...prev].slice(0, 50);
+    });
+  });
 
   return (
     <div className="whatsapp-monitor glass-card">
@@ -1,6 +1,7 @@
 import React, { createContext, useContext, useState, useCallback, useEffect, useRef } from 'react';
-import { getPropertyTasks, fetchTaskStatusCounts } from '../services/api';
+import { getPropertyTasks, getPropertyTaskChanges, fetchTaskStatusCounts } from '../services/api';
 import hotelRealtime from '../services/hotelRealtime';
+import realtimeChannel from '../services/realtimeChannel';
 import { subscribeCrossTabTaskSync } from '../utils/taskSyncBridge';
 import useStore from '../store/useStore';
 import { isBiktaNessZionaUser } from '../utils/biktaUser';
@@ -46,6 +47,11 @@ export function MissionProvider({ children }) {
   const lastQuietPollAtRef = useRef(0);
   /** Until server confirms the same status, do not let quiet polls overwrite Maya/user-driven transitions. */
   const statusLocksRef = useRef(new Map());
+  /** `{ v, epoch }` change-log cursor the board reflects — quiet syncs ask /property-tasks/changes from here. */
+  const changeCursorRef = useRef(null);
+  const rememberCursor = useCallback((cursor) => {
+    changeCursorRef.current = cursor;
+  }, []);
 
   useEffect(() => {
     tasksRef.current = tasks;
@@ -83,7 +89,7 @@ export function MissionProvider({ children }) {
       setLoading(true);
     }
     if (fullList) {
-      return Promise.all([getPropertyTasks({ limit: 0 }), fetchTaskStatusCounts()])
+      return Promise.all([getPropertyTasks({ limit: 0, onCursor: rememberCursor }), fetchTaskStatusCounts()])
         .then(([list, counts]) => {
           if (loadId !== loadRef.current) return;
           if (!Array.isArray(list)) {
@@ -114,7 +120,7 @@ export function MissionProvider({ children }) {
         });
     }
     return Promise.all([
-      getPropertyTasks({ limit: TASK_MISSION_PAGE_SIZE, offset: 0 }),
+      getPropertyTasks({ limit: TASK_MISSION_PAGE_SIZE, offset: 0, onCursor: rememberCursor }),
       fetchTaskStatusCounts(),
     ])
       .then(([page, counts]) => {
@@ -155,7 +161,7 @@ export function MissionProvider({ children }) {
         if (loadId !== loadRef.current) return;
         setLoading(false);
       });
-  }, [authToken, skipMissionFetch]);
+  }, [authToken, skipMissionFetch, rememberCursor]);
 
   const loadMoreTasks = useCallback(() => {
     if (skipMissionFetch) return Promise.resolve();
@@ -178,19 +184,43 @@ export function MissionProvider({ children }) {
       .finally(() => setLoadingMore(false));
   }, [skipMissionFetch, hasMoreTasks, loadingMore]);
 
-  /** Background sync — refresh first page + authoritative total; keep deeper scrolled pages merged. */
-  const pollTasksQuiet = useCallback((opts = {}) => {
-    if (!authToken) return Promise.resolve();
-    if (skipMissionFetch) return Promise.resolve();
-    if (!opts.force) {
-      const now = Date.now();
-      if (now - lastQuietPollAtRef.current < TASKS_REFRESH_POLL_MS) {
-        return Promise.resolve();
-      }
+  /**
+   * Merge a change-log diff ({ v, since, epoch, resync, tasks, removed } from /property-tasks/changes
+   * or the realtime channel) into the board: changed rows replace theirs in place, new rows go on top,
+   * removed ids drop out. Returns false when the diff cannot be applied — resync, another epoch, or a
+   * gap (the diff starts after the board's cursor) — and the caller catches up from /changes instead.
+   */
+  const applyTaskChanges = useCallback((body) => {
+    if (!body || body.resync) return false;
+    const cursor = changeCursorRef.current;
+    if (cursor && body.epoch && cursor.epoch && body.epoch !== cursor.epoch) return false;
+    if (cursor && body.since != null && Number(body.since) > Number(cursor.v)) return false;
+    if (body.v != null && !(cursor && Number(cursor.v) > Number(body.v))) {
+      changeCursorRef.current = { v: body.v, epoch: body.epoch || cursor?.epoch };
     }
-    lastQuietPollAtRef.current = Date.now();
+    const upserts = (body.tasks || []).map((row) => applyTaskStatusLock(row, statusLocksRef.current));
+    const removed = new Set((body.removed || []).map(String));
+    if (!upserts.length && !removed.size) return true;
+    setTasks((prev) => {
+      const byId = new Map(upserts.map((t) => [String(t.id), t]));
+      const kept = (prev ?? [])
+        .filter((t) => t && !removed.has(String(t.id)))
+        .map((t) => {
+          const next = byId.get(String(t.id));
+          if (!next) return t;
+          byId.delete(String(t.id));
+          return next;
+        });
+      return [...byId.values(), ...kept];
+    });
+    syncTotalFromServer();
+    return true;
+  }, [syncTotalFromServer]);
+
+  /** Background sync — refresh first page + authoritative total; keep deeper scrolled pages merged. */
+  const pollTasksHeadQuiet = useCallback(() => {
     return Promise.all([
-      getPropertyTasks({ limit: TASK_MISSION_PAGE_SIZE, offset: 0 }),
+      getPropertyTasks({ limit: TASK_MISSION_PAGE_SIZE, offset: 0, onCursor: rememberCursor }),
       fetchTaskStatusCounts(),
     ])
       .then(([page, counts]) => {
@@ -217,7 +247,28 @@ export function MissionProvider({ children }) {
         });
       })
       .catch(() => {});
-  }, [authToken, skipMissionFetch]);
+  }, [rememberCursor]);
+
+  /** Quiet sync: only what changed since the board's cursor; first-page refetch when the server asks to resync. */
+  const pollTasksQuiet = useCallback((opts = {}) => {
+    if (!authToken) return Promise.resolve();
+    if (skipMissionFetch) return Promise.resolve();
+    if (!opts.force) {
+      const now = Date.now();
+      if (now - lastQuietPollAtRef.current < TASKS_REFRESH_POLL_MS) {
+        return Promise.resolve();
+      }
+    }
+    lastQuietPollAtRef.current = Date.now();
+    const cursor = changeCursorRef.current;
+    if (!cursor || tasksRef.current === null) return pollTasksHeadQuiet();
+    return getPropertyTaskChanges(cursor.v, cursor.epoch)
+      .then((body) => {
+        if (!applyTaskChanges(body)) return pollTasksHeadQuiet();
+        return undefined;
+      })
+      .catch(() => pollTasksHeadQuiet());
+  }, [authToken, skipMissionFetch, applyTaskChanges, pollTasksHeadQuiet]);
 
   const debouncedRefresh = useCallback(() => {
     if (skipMissionFetch) return;
@@ -290,7 +341,7 @@ export function MissionProvider({ children }) {
     if (skipMissionFetch) return undefined;
     const onFull = () => {
       const loadId = ++loadRef.current;
-      Promise.all([getPropertyTasks({ limit: 0 }), fetchTaskStatusCounts()])
+      Promise.all([getPropertyTasks({ limit: 0, onCursor: rememberCursor }), fetchTaskStatusCounts()])
         .then(([list, counts]) => {
           if (loadId !== loadRef.current) return;
           if (!Array.isArray(list)) return;
@@ -311,7 +362,7 @@ export function MissionProvider({ children }) {
     };
     window.addEventListener('mission-full-tasks-refresh', onFull);
     return () => window.removeEventListener('mission-full-tasks-refresh', onFull);
-  }, [skipMissionFetch]);
+  }, [skipMissionFetch, rememberCursor]);
 
   /** Cross-tab / Maya events: quiet refetch only (no loading=true) so we do not stack requests or spin "טוען...". */
   useEffect(() => {
@@ -338,19 +389,35 @@ export function MissionProvider({ children }) {
     };
   }, [debouncedRefresh, skipMissionFetch]);
 
-  /** TASKS_REFRESH_POLL_MS interval — quiet poll without heavy logs. */
+  /**
+   * Pushed task diffs (realtime channel) are merged in place; a resync (reconnect) or a gap against the
+   * board's cursor catches up from /changes. TASKS_REFRESH_POLL_MS polling only while the channel is down.
+   */
   useEffect(() => {
     if (skipMissionFetch) return undefined;
-    tasksPollIntervalRef.current = setInterval(() => {
-      pollTasksQuiet({});
-    }, TASKS_REFRESH_POLL_MS);
-    return () => {
+    const stopPolling = () => {
       if (tasksPollIntervalRef.current) {
         clearInterval(tasksPollIntervalRef.current);
         tasksPollIntervalRef.current = null;
       }
     };
-  }, [pollTasksQuiet, skipMissionFetch]);
+    const unsubscribeTasks = realtimeChannel.subscribe(['tasks'], (payload) => {
+      if (!applyTaskChanges(payload)) pollTasksQuiet({ force: true });
+    });
+    const unsubscribeStatus = realtimeChannel.onStatus((connected) => {
+      stopPolling();
+      if (!connected) {
+        tasksPollIntervalRef.current = setInterval(() => {
+          pollTasksQuiet({});
+        }, TASKS_REFRESH_POLL_MS);
+      }
+    });
+    return () => {
+      unsubscribeTasks();
+      unsubscribeStatus();
+      stopPolling();
+    };
+  }, [pollTasksQuiet, applyTaskChanges, skipMissionFetch]);
 
   const prependTask = useCallback((newTask) => {
     if (skipMissionFetch) return;
@@ -0,0 +1,37 @@
+/**
+ * Keep a widget in sync with the server push channel (services/realtimeChannel) on `topics`.
+ * `onEvent` (optional) applies a topic payload in place and returns false when it cannot;
+ * `refresh` runs only then, when the payload says resync / refetch (reconnect, evicted cursor,
+ * dropped events) or for widgets without `onEvent` (aggregates that must be re-read).
+ * While the push channel is down, falls back to polling `refresh` every `fallbackMs`.
+ */
+import { useEffect, useRef } from 'react';
+import realtimeChannel from '../services/realtimeChannel';
+
+export function useRealtimeRefresh(topics, refresh, fallbackMs, onEvent) {
+  const refreshRef = useRef(refresh);
+  const onEventRef = useRef(onEvent);
+  refreshRef.current = refresh;
+  onEventRef.current = onEvent;
+  const key = (Array.isArray(topics) ? topics : [topics]).join(',');
+
+  useEffect(() => {
+    const unsubscribe = realtimeChannel.subscribe(key.split(','), (payload) => {
+      if (!payload?.resync && !payload?.refetch && onEventRef.current && onEventRef.current(payload) !== false) return;
+      refreshRef.current?.();
+    });
+    let timer = null;
+    const unsubscribeStatus = realtimeChannel.onStatus((connected) => {
+      if (timer) clearInterval(timer);
+      timer = null;
+      if (!connected && fallbackMs) timer = setInterval(() => refreshRef.current?.(), fallbackMs);
+    });
+    return () => {
+      unsubscribe();
+      unsubscribeStatus();
+      if (timer) clearInterval(timer);
+    };
+  }, [key, fallbackMs]);
+}
+
+export default useRealtimeRefresh;
@@ -598,13 +598,48 @@ export const getTasksVersion = async () => {
   }
 };
 
+/**
+ * GET /property-tasks/changes — delta since the X-Tasks-Version / X-Tasks-Epoch of the last list fetch.
+ * Returns `{ v, epoch, resync, tasks, removed }`; on `resync: true` refetch the full list.
+ */
+export const getPropertyTaskChanges = async (since, epoch, options = {}) => {
+  const params = new URLSearchParams({ since: String(since ?? '') });
+  if (epoch) params.set('epoch', epoch);
+  if (options.worker) params.set('worker', options.worker);
+  if (options.status) params.set('status', options.status);
+  try {
+    const res = await fetch(`${API_URL}/property-tasks/changes?${params.toString()}`, {
+      headers: { 'Content-Type': 'application/json', ...getAuthHeaders() },
+      cache: 'no-store',
+    });
+    if (!res.ok) return { resync: true };
+    return await res.json();
+  } catch {
+    return null;
+  }
+};
+
 /** Direct Flask origin (no proxy) — default matches config API_BASE_URL (localhost:1000 in dev). */
 const LIVE_TASKS_ORIGIN =
   typeof process !== 'undefined' && process.env && process.env.REACT_APP_LIVE_TASKS_ORIGIN
     ? String(process.env.REACT_APP_LIVE_TASKS_ORIGIN).replace(/\/$/, '')
     : API_BASE_URL;
 
-/** GET /api/tasks — bypasses any proxy/CDN cache; direct origin + t=timestamp */
+/** Last 200 response per task-list query (minus `t`) — sent back as If-None-Match, reused on 304. */
+const propertyTasksEtagCache = new Map();
+
+/** `{ v, epoch }` change-log cursor from the X-Tasks-Version / X-Tasks-Epoch headers of a list response. */
+const readPropertyTasksCursor = (response) => {
+  const v = parseInt(response.headers.get('X-Tasks-Version') || '', 10);
+  const epoch = response.headers.get('X-Tasks-Epoch') || '';
+  return Number.isFinite(v) && epoch ? { v, epoch } : null;
+};
+
+/**
+ * GET /api/tasks — bypasses any proxy/CDN cache; direct origin + t=timestamp.
+ * `options.onCursor({ v, epoch })` receives the change-log cursor of this response (pass it to
+ * getPropertyTaskChanges to sync the same list incrementally).
+ */
 export const getPropertyTasks = async (options = {}) => {
   const unlimited = options.limit === 0 || options.unlimited === true;
   const limit = unlimited ? 0 : options.limit != null ? Number(options.limit) : undefined;
@@ -626,15 +661,23 @@ export const getPropertyTasks = async (options = {}) => {
     fetchOpts.signal = AbortSignal.timeout(30000);
   }
   const qs = new URLSearchParams();
-  qs.set('t', String(bust));
   if (unlimited) {
     qs.set('limit', '0');
   } else if (paged) {
     qs.set('limit', String(Math.max(1, Math.min(500, Math.floor(limit)))));
     qs.set('offset', String(Math.max(0, Math.floor(offset) || 0)));
   }
+  const etagKey = `${headers.Authorization}|${qs.toString()}`;
+  const cachedEntry = propertyTasksEtagCache.get(etagKey);
+  if (cachedEntry) fetchOpts.headers = { ...headers, 'If-None-Match': cachedEntry.etag };
+  qs.set('t', String(bust));
   const url = `${LIVE_TASKS_ORIGIN}/api/tasks?${qs.toString()}`;
   const response = await fetch(url, fetchOpts);
+  const onCursor = typeof options.onCursor === 'function' ? options.onCursor : null;
+  if (response.status === 304 && cachedEntry) {
+    if (onCursor && cachedEntry.cursor) onCursor(cachedEntry.cursor);
+    return cachedEntry.result;
+  }
   if (response.status === 204) return paged ? { tasks: [], total: 0, hasMore: false } : [];
   if (!response.ok) {
     if (response.status === 401 && typeof window !== 'undefined') {
@@ -648,10 +691,20 @@ export const getPropertyTasks = async (options = {}) => {
     if (!tasks.length && data && typeof data === 'object' && Array.isArray(data.tasks)) {
       tasks = data.tasks;
     }
-    if (!paged) return tasks;
-    const total = parseInt(response.headers.get('X-Tasks-Total') || String(tasks.length), 10) || tasks.length;
-    const hasMore = response.headers.get('X-Tasks-Has-More') === '1';
-    return { tasks, total, hasMore };
+    let result = tasks;
+    if (paged) {
+      const total = parseInt(response.headers.get('X-Tasks-Total') || String(tasks.length), 10) || tasks.length;
+      const hasMore = response.headers.get('X-Tasks-Has-More') === '1';
+      result = { tasks, total, hasMore };
+    }
+    const cursor = readPropertyTasksCursor(response);
+    if (onCursor && cursor) onCursor(cursor);
+    const etag = response.headers.get('ETag');
+    if (etag) {
+      if (propertyTasksEtagCache.size > 20) propertyTasksEtagCache.clear();
+      propertyTasksEtagCache.set(etagKey, { etag, result, cursor });
+    }
+    return result;
   } catch {
     return paged ? { tasks: [], total: 0, hasMore: false } : [];
   }
@@ -1981,7 +2034,7 @@ export const updateStaffLocation = async (staffId, lat, lng) => {
   return await response.json();
 };
 
-export const subscribeToStaff = (onUpdate, onError) => {
+export const subscribeToStaff = (onUpdate, onError, onResync) => {
   const { token, tenant_id } = _getAuthContextForSSE();
   const qs = new URLSearchParams();
   if (token) qs.set('token', token);
@@ -1996,6 +2049,47 @@ export const subscribeToStaff = (onUpdate, onError) => {
       // ignore parse errors
     }
   });
+  // Server dropped events for this stream (slow tab / resume too old) — refetch the full state.
+  source.addEventListener('resync', () => {
+    onResync?.();
+  });
+  source.onerror = (error) => {
+    onError?.(error);
+  };
+  return source;
+};
+
+/**
+ * Multiplexed push channel: GET /stream/realtime?topics=tasks,grid,… — one EventSource
+ * for several topics. Components should go through services/realtimeChannel.js, which
+ * shares a single stream per tab.
+ */
+export const openRealtimeStream = (topics, { onTopic, onHello, onOpen, onError } = {}) => {
+  const { token, tenant_id } = _getAuthContextForSSE();
+  const qs = new URLSearchParams();
+  qs.set('topics', topics.join(','));
+  if (token) qs.set('token', token);
+  if (tenant_id) qs.set('tenant_id', tenant_id);
+  const source = new EventSource(`${API_URL}/stream/realtime?${qs.toString()}`);
+  source.addEventListener('hello', (event) => {
+    try {
+      onHello?.(JSON.parse(event.data));
+    } catch (error) {
+      // ignore parse errors
+    }
+  });
+  topics.forEach((topic) => {
+    source.addEventListener(topic, (event) => {
+      try {
+        onTopic?.(topic, JSON.parse(event.data));
+      } catch (error) {
+        // ignore parse errors
+      }
+    });
+  });
+  source.onopen = () => {
+    onOpen?.();
+  };
   source.onerror = (error) => {
     onError?.(error);
   };
@@ -2617,7 +2711,7 @@ export const updateRoomStatus = async (roomId, data) => {
  * @param {function} onError - Callback for errors
  * @returns {EventSource} - The event source (call .close() to disconnect)
  */
-export const subscribeToLeads = (onNewLead, onLeadUpdated, onError, onAutomationStats) => {
+export const subscribeToLeads = (onNewLead, onLeadUpdated, onError, onAutomationStats, onResync) => {
   const { token, tenantId } = _getAuthContextForSSE();
   const query = new URLSearchParams();
   if (token) query.set('token', token);
@@ -2652,6 +2746,11 @@ export const subscribeToLeads = (onNewLead, onLeadUpdated, onError, onAutomation
     }
   });
 
+  // Server dropped events for this stream (slow tab / resume too old) — refetch the full list.
+  eventSource.addEventListener('resync', () => {
+    if (onResync) onResync();
+  });
+
   eventSource.addEventListener('connected', (event) => {
     console.log('Connected to leads stream:', event.data);
   });
@@ -2848,6 +2947,7 @@ const api = {
   uploadStaffPhoto,
   updateStaffLocation,
   subscribeToStaff,
+  openRealtimeStream,
   getDispatchStatus,
   setDispatchStatus,
   sendAIAction,
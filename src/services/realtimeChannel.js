@@ -0,0 +1,114 @@
+/**
+ * One server-push channel per tab (GET /api/stream/realtime) shared by every widget.
+ * Widgets subscribe to topics — tasks, grid, activity, staff, leads, messages — and
+ * get the server's compact diff for each change. The EventSource is reopened
+ * (debounced) when the set of topics changes and closed when nobody listens.
+ *
+ * After a reconnect every listener is called with { topic, resync: true } so it can
+ * refetch whatever it missed while disconnected.
+ */
+import { openRealtimeStream } from './api';
+
+export const REALTIME_TOPICS = ['tasks', 'grid', 'activity', 'staff', 'leads', 'messages'];
+
+const _listeners = new Map(); // topic -> Set<callback>
+const _statusListeners = new Set();
+let _source = null;
+let _openKey = '';
+let _reopenTimer = null;
+let _connected = false;
+let _lostConnection = false;
+
+function _setConnected(next) {
+  if (_connected === next) return;
+  _connected = next;
+  _statusListeners.forEach((cb) => {
+    try {
+      cb(next);
+    } catch (_) {}
+  });
+}
+
+function _dispatch(topic, payload) {
+  _listeners.get(topic)?.forEach((cb) => {
+    try {
+      cb(payload);
+    } catch (_) {}
+  });
+}
+
+function _activeTopics() {
+  return REALTIME_TOPICS.filter((t) => (_listeners.get(t)?.size || 0) > 0);
+}
+
+function _close() {
+  try {
+    _source?.close();
+  } catch (_) {}
+  _source = null;
+  _openKey = '';
+  _setConnected(false);
+}
+
+function _reconcile() {
+  _reopenTimer = null;
+  if (typeof window === 'undefined' || typeof EventSource === 'undefined') return;
+  const topics = _activeTopics();
+  const key = topics.join(',');
+  if (key === _openKey && _source) return;
+  _close();
+  if (!topics.length) return;
+  _openKey = key;
+  _lostConnection = false;
+  _source = openRealtimeStream(topics, {
+    onHello: () => {
+      _setConnected(true);
+      if (_lostConnection) {
+        _lostConnection = false;
+        topics.forEach((topic) => _dispatch(topic, { topic, resync: true }));
+      }
+    },
+    onTopic: (topic, payload) => _dispatch(topic, payload),
+    // EventSource reconnects by itself; polling fallbacks take over meanwhile.
+    onError: () => {
+      _lostConnection = true;
+      _setConnected(false);
+    },
+  });
+}
+
+function _scheduleReconcile() {
+  if (_reopenTimer) return;
+  _reopenTimer = setTimeout(_reconcile, 50);
+}
+
+const realtimeChannel = {
+  /** Listen to one or more topics; returns an unsubscribe function. */
+  subscribe(topics, callback) {
+    const list = (Array.isArray(topics) ? topics : [topics]).filter((t) => REALTIME_TOPICS.includes(t));
+    list.forEach((topic) => {
+      if (!_listeners.has(topic)) _listeners.set(topic, new Set());
+      _listeners.get(topic).add(callback);
+    });
+    _scheduleReconcile();
+    return () => {
+      list.forEach((topic) => _listeners.get(topic)?.delete(callback));
+      _scheduleReconcile();
+    };
+  },
+
+  /** Called with true / false as the stream connects and drops; returns an unsubscribe function. */
+  onStatus(callback) {
+    _statusListeners.add(callback);
+    callback(_connected);
+    return () => {
+      _statusListeners.delete(callback);
+    };
+  },
+
+  get connected() {
+    return _connected;
+  },
+};
+
+export default realtimeChannel;
@@ -0,0 +1,246 @@
+"""
+Broadcast hub for Server-Sent Events — every subscriber of a topic (tenant) gets
+every event, through its own bounded buffer.  Events carry monotonically
+increasing ids so a reconnecting EventSource resumes with Last-Event-ID from a
+bounded per-topic history ring.  On the wire an id is "<epoch>:<n>": a Last-Event-ID
+from another epoch (a restarted process whose sequence began again) parses as
+STALE_EVENT_ID and the stream opens with a resync.  Memory stays flat with no
+listeners: only the history ring is kept.  ChangeNotifier wakes multiplexed streams that read
+versions themselves (/api/stream/realtime).
+No Flask imports here.
+"""
+from __future__ import annotations
+
+import json
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+
+# (id, event type, JSON data)
+SseEvent = Tuple[int, str, str]
+
+RESYNC_EVENT = "resync"
+STALE_EVENT_ID = -1  # Last-Event-ID of another epoch: can only be answered with a resync
+
+
+class _Topic:
+    __slots__ = ("history", "floor", "last_id", "subscribers")
+
+    def __init__(self, history: int, floor: int) -> None:
+        self.history: Deque[SseEvent] = deque(maxlen=history)
+        self.floor = floor  # newest id this history can no longer replay
+        self.last_id = floor
+        self.subscribers: Set["Subscription"] = set()
+
+
+class Subscription:
+    """One open stream.  get() blocks until events arrive or the timeout (heartbeat) passes."""
+
+    def __init__(self, hub: "SseHub", topic: str, buffer_size: int) -> None:
+        self.hub = hub
+        self.topic = topic
+        self._buf: Deque[SseEvent] = deque()
+        self._max = buffer_size
+        self._cond = threading.Condition()
+        self._dropped = 0
+        self.closed = False
+
+    def _push(self, ev: SseEvent) -> None:
+        with self._cond:
+            if len(self._buf) >= self._max:
+                # Slow consumer: drop the oldest and tell the client to refetch once it catches up.
+                self._buf.popleft()
+                self._dropped += 1
+            self._buf.append(ev)
+            self._cond.notify()
+
+    def _preload(self, events: List[SseEvent], resync: bool) -> None:
+        with self._cond:
+            if resync:
+                self._dropped += 1
+            self._buf.extend(events[-self._max:])
+
+    def get(self, timeout: float) -> List[SseEvent]:
+        with self._cond:
+            if not self._buf and not self._dropped and not self.closed:
+                self._cond.wait(timeout)
+            out = list(self._buf)
+            self._buf.clear()
+            dropped, self._dropped = self._dropped, 0
+        if dropped:
+            last = out[0][0] - 1 if out else self.hub.last_id(self.topic)
+            out.insert(0, (last, RESYNC_EVENT, json.dumps({"dropped": dropped})))
+        return out
+
+    def close(self) -> None:
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+        self.hub._unsubscribe(self)
+
+
+class SseHub:
+    """
+    ``baseline`` is the last event id published before this process started listening
+    (the shared-state sequence baseline); resumes from older ids get a resync.
+    """
+
+    def __init__(self, name: str, history: int = 256, buffer_size: int = 100, baseline: int = 0) -> None:
+        self.name = name
+        self.baseline = int(baseline or 0)
+        self.history = max(1, int(history))
+        self.buffer_size = max(1, int(buffer_size))
+        self._lock = threading.Lock()
+        self._topics: Dict[str, _Topic] = {}
+        self._stats = {"published": 0, "delivered": 0, "resumed": 0, "resyncs": 0}
+
+    def _topic(self, topic: str) -> _Topic:
+        t = self._topics.get(topic)
+        if t is None:
+            t = _Topic(self.history, self.baseline)
+            self._topics[topic] = t
+        return t
+
+    def publish(self, topic: str, event_type: str, payload: Any, event_id: Optional[int] = None) -> int:
+        """
+        Append to the topic history and fan out to every subscriber.  ``event_id`` lets
+        the caller supply a sequence shared by all workers; it must be increasing per topic.
+        """
+        data = json.dumps(payload, default=str)
+        with self._lock:
+            t = self._topic(topic)
+            eid = int(event_id) if event_id is not None else t.last_id + 1
+            if eid <= t.last_id:
+                eid = t.last_id + 1
+            t.last_id = eid
+            if len(t.history) == t.history.maxlen:
+                t.floor = t.history[0][0]
+            ev = (eid, event_type, data)
+            t.history.append(ev)
+            subs = list(t.subscribers)
+            self._stats["published"] += 1
+            self._stats["delivered"] += len(subs)
+        for sub in subs:
+            sub._push(ev)
+        return eid
+
+    def subscribe(self, topic: str, last_event_id: Optional[int] = None) -> Subscription:
+        """
+        Open a subscription.  With ``last_event_id`` the missed events still in history
+        are replayed first; if some were already evicted a "resync" event leads the stream.
+        """
+        sub = Subscription(self, topic, self.buffer_size)
+        with self._lock:
+            t = self._topic(topic)
+            t.subscribers.add(sub)
+            if last_event_id is not None:
+                if last_event_id > t.last_id or last_event_id == STALE_EVENT_ID:
+                    # Id from another process/epoch — cannot be matched against this history.
+                    sub._preload([], resync=True)
+                    self._stats["resyncs"] += 1
+                else:
+                    missed = [ev for ev in t.history if ev[0] > last_event_id]
+                    gap = last_event_id < t.floor
+                    sub._preload(missed, resync=gap)
+                    self._stats["resumed"] += 1
+                    if gap:
+                        self._stats["resyncs"] += 1
+        return sub
+
+    def _unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            t = self._topics.get(sub.topic)
+            if t is not None:
+                t.subscribers.discard(sub)
+
+    def since(self, topic: str, last_event_id: int) -> Tuple[List[SseEvent], bool]:
+        """(events after last_event_id still in history, gap) — a pull-side read for callers
+        that multiplex several hubs onto one stream."""
+        with self._lock:
+            t = self._topics.get(topic)
+            if t is None:
+                return [], last_event_id not in (None, self.baseline)
+            if last_event_id > t.last_id:
+                return [], True
+            return [ev for ev in t.history if ev[0] > last_event_id], last_event_id < t.floor
+
+    def last_id(self, topic: str) -> int:
+        with self._lock:
+            t = self._topics.get(topic)
+            return t.last_id if t else self.baseline
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out: Dict[str, Any] = dict(self._stats)
+            out.update({
+                "name": self.name,
+                "topics": len(self._topics),
+                "subscribers": sum(len(t.subscribers) for t in self._topics.values()),
+                "buffered": sum(len(t.history) for t in self._topics.values()),
+            })
+        return out
+
+
+class ChangeNotifier:
+    """
+    Wake streams waiting on a key (tenant) when something they watch may have changed.
+    Waiters compare versions themselves, so a notification carries no data and
+    repeated notifications coalesce.  notify(None) wakes every key.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._conds: Dict[str, threading.Condition] = {}
+        self._gen: Dict[str, int] = {}
+        self._global = 0
+
+    def _cond(self, key: str) -> threading.Condition:
+        cond = self._conds.get(key)
+        if cond is None:
+            cond = threading.Condition(self._lock)
+            self._conds[key] = cond
+        return cond
+
+    def notify(self, key: Optional[str] = None) -> None:
+        with self._lock:
+            if key is None:
+                self._global += 1
+                conds = list(self._conds.values())
+            else:
+                self._gen[key] = self._gen.get(key, 0) + 1
+                conds = [self._cond(key)]
+            for cond in conds:
+                cond.notify_all()
+
+    def generation(self, key: str) -> Tuple[int, int]:
+        with self._lock:
+            return (self._global, self._gen.get(key, 0))
+
+    def wait(self, key: str, seen: Tuple[int, int], timeout: float) -> Tuple[int, int]:
+        """Block until the key's generation moves past ``seen`` or timeout; return the current one."""
+        with self._lock:
+            cond = self._cond(key)
+            cond.wait_for(lambda: (self._global, self._gen.get(key, 0)) != seen, timeout)
+            return (self._global, self._gen.get(key, 0))
+
+
+def format_event(ev: SseEvent, epoch: str = "") -> str:
+    eid, event_type, data = ev
+    wire_id = f"{epoch}:{eid}" if epoch else eid
+    return f"id: {wire_id}\nevent: {event_type}\ndata: {data}\n\n"
+
+
+def parse_last_event_id(raw: Optional[str], epoch: str = "") -> Optional[int]:
+    """The numeric id of a Last-Event-ID sent back by the browser; STALE_EVENT_ID when it
+    was issued under another epoch (or before epochs), None when absent or malformed."""
+    if raw in (None, ""):
+        return None
+    text = str(raw).strip()
+    if epoch:
+        raw_epoch, _sep, text = text.rpartition(":")
+        if raw_epoch != epoch:
+            return STALE_EVENT_ID
+    try:
+        return int(text)
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,117 @@
+"""
+Concurrent context stages for one request — independent lookups (DB queries, memory
+files, truth-layer tools) run side by side on a shared bounded thread pool, so the
+wait is the slowest stage instead of the sum.  Every stage has a fallback value and
+a run deadline counted from when a worker picks it up, so time spent queued behind
+other requests' stages does not eat into it; queueing has its own bound (the
+runner's queue_timeout).  A stage that is late, raises or never gets a worker yields
+its fallback and the request carries on with partial context.  A stage still queued
+at that point is cancelled; a running one keeps going and its result is discarded.
+No Flask imports here.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Any, Callable, Dict, Optional
+
+_LOCK = threading.Lock()
+_POOLS: Dict[str, ThreadPoolExecutor] = {}
+_STATS: Dict[str, int] = {"stages": 0, "timeouts": 0, "errors": 0}
+
+
+def get_pool(name: str, max_workers: int) -> ThreadPoolExecutor:
+    """Named process-wide pool, created on first use."""
+    with _LOCK:
+        pool = _POOLS.get(name)
+        if pool is None:
+            pool = _POOLS[name] = ThreadPoolExecutor(max_workers=max(1, int(max_workers)), thread_name_prefix=name)
+        return pool
+
+
+class _Stage:
+    __slots__ = ("future", "fallback", "timeout", "submitted", "started", "running", "finished")
+
+    def __init__(self, fallback: Any, timeout: float) -> None:
+        self.future = None
+        self.fallback = fallback
+        self.timeout = timeout
+        self.submitted = time.perf_counter()
+        self.started: Optional[float] = None
+        self.running = threading.Event()
+        self.finished: Optional[float] = None
+
+
+class StageRunner:
+    """Stages of one request.  submit() starts a stage, result() waits for it (at most until its deadline)."""
+
+    def __init__(self, pool: ThreadPoolExecutor, timeout: float = 5.0,
+                 wrap: Optional[Callable[[Callable[[], Any]], Any]] = None,
+                 queue_timeout: Optional[float] = None) -> None:
+        self._pool = pool
+        self._timeout = float(timeout)
+        self._queue_timeout = self._timeout if queue_timeout is None else float(queue_timeout)
+        self._wrap = wrap  # e.g. run inside an app context
+        self._stages: Dict[str, _Stage] = {}
+        self._timings: Dict[str, int] = {}
+        self._status: Dict[str, str] = {}
+
+    def submit(self, name: str, fn: Callable[..., Any], *args: Any, fallback: Any = None,
+               timeout: Optional[float] = None, **kwargs: Any) -> None:
+        stage = _Stage(fallback, self._timeout if timeout is None else float(timeout))
+
+        def _run() -> Any:
+            stage.started = time.perf_counter()
+            stage.running.set()
+            try:
+                if self._wrap is not None:
+                    return self._wrap(lambda: fn(*args, **kwargs))
+                return fn(*args, **kwargs)
+            finally:
+                stage.finished = time.perf_counter()
+
+        self._stages[name] = stage
+        stage.future = self._pool.submit(_run)
+        with _LOCK:
+            _STATS["stages"] += 1
+
+    def result(self, name: str) -> Any:
+        """Stage value, or its fallback when it timed out / raised.  Idempotent."""
+        stage = self._stages[name]
+        if name in self._status:
+            return stage.future.result() if self._status[name] == "ok" else stage.fallback
+        try:
+            queue_left = stage.submitted + self._queue_timeout - time.perf_counter()
+            if not stage.running.wait(max(0.0, queue_left)) and stage.future.cancel():
+                raise FutureTimeout()
+            stage.running.wait()  # cancel() failed: a worker has just picked it up
+            value = stage.future.result(timeout=max(0.0, stage.started + stage.timeout - time.perf_counter()))
+            status = "ok"
+        except FutureTimeout:
+            value, status = stage.fallback, "timeout"
+        except Exception as e:
+            print(f"[stage_runner] stage {name!r} failed: {type(e).__name__}: {e}", flush=True)
+            value, status = stage.fallback, "error"
+        end = stage.finished if status != "timeout" and stage.finished else time.perf_counter()
+        self._timings[name] = int((end - stage.submitted) * 1000)
+        self._status[name] = status
+        if status != "ok":
+            with _LOCK:
+                _STATS["timeouts" if status == "timeout" else "errors"] += 1
+        return value
+
+    def timings(self) -> Dict[str, int]:
+        """{stage: ms from submission to completion (or to giving up), queueing included} for the stages collected so far."""
+        return dict(self._timings)
+
+    def degraded(self) -> Dict[str, str]:
+        """{stage: "timeout" | "error"} — stages answered by their fallback."""
+        return {k: v for k, v in self._status.items() if v != "ok"}
+
+
+def stats() -> Dict[str, Any]:
+    with _LOCK:
+        out: Dict[str, Any] = dict(_STATS)
+        out["pools"] = {name: pool._max_workers for name, pool in _POOLS.items()}
+    return out
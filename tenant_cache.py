@@ -0,0 +1,217 @@
+"""
+Tenant-scoped in-process cache — per-key TTL, LRU size bound and single-flight loading.
+Replaces the ad-hoc module-level dict caches in app.py (status grid, owner dashboard,
+Maya stats / room inventory / bazaar metrics, rooms+staff, iCal fetch state).
+No Flask imports here.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+_LOCK = threading.Lock()
+_REGISTRY: Dict[str, "TenantCache"] = {}
+_MISSING = object()
+
+
+class _Flight:
+    """One in-progress load; concurrent callers for the same key wait on it."""
+
+    __slots__ = ("event", "value", "error", "waiters")
+
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class TenantCache:
+    """
+    LRU + TTL map keyed by (tenant_id, key).
+
+    get_or_load() coalesces concurrent misses for the same key into one loader call.
+    invalidate() bumps a generation so a load that started before the invalidation
+    still answers its callers but is not stored.
+    """
+
+    def __init__(self, name: str, ttl: float, max_entries: int = 512) -> None:
+        self.name = name
+        self.ttl = float(ttl)
+        self.max_entries = max(1, int(max_entries))
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[Tuple[str, Hashable], Tuple[float, Any]]" = OrderedDict()
+        self._flights: Dict[Tuple[str, Hashable], _Flight] = {}
+        self._gen: Dict[str, int] = {}
+        self._global_gen = 0
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "loads": 0,
+            "load_errors": 0,
+            "coalesced": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "invalidations": 0,
+        }
+
+    @staticmethod
+    def _tenant(tenant_id: Optional[str]) -> str:
+        return str(tenant_id or "_")
+
+    def _gen_of(self, tenant: str) -> Tuple[int, int]:
+        return (self._global_gen, self._gen.get(tenant, 0))
+
+    def _lookup_unlocked(self, ck: Tuple[str, Hashable], now: float) -> Any:
+        hit = self._data.get(ck)
+        if hit is None:
+            return _MISSING
+        expires_at, value = hit
+        if expires_at <= now:
+            del self._data[ck]
+            self._stats["expirations"] += 1
+            return _MISSING
+        self._data.move_to_end(ck)
+        return value
+
+    def _store_unlocked(self, ck: Tuple[str, Hashable], value: Any, ttl: Optional[float], now: float) -> None:
+        self._data[ck] = (now + (self.ttl if ttl is None else float(ttl)), value)
+        self._data.move_to_end(ck)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def get(self, tenant_id: Optional[str], key: Hashable = None, default: Any = None) -> Any:
+        ck = (self._tenant(tenant_id), key)
+        with self._lock:
+            value = self._lookup_unlocked(ck, time.time())
+            if value is _MISSING:
+                self._stats["misses"] += 1
+                return default
+            self._stats["hits"] += 1
+            return value
+
+    def set(self, tenant_id: Optional[str], key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        ck = (self._tenant(tenant_id), key)
+        with self._lock:
+            self._store_unlocked(ck, value, ttl, time.time())
+
+    def get_or_load(
+        self,
+        tenant_id: Optional[str],
+        key: Hashable,
+        loader: Callable[[], Any],
+        ttl: Optional[float] = None,
+        refresh: bool = False,
+    ) -> Any:
+        """
+        Return the cached value or run loader() once for all concurrent callers of the key.
+        refresh=True skips the cached value but still joins an in-flight load.
+        Loader exceptions propagate to every waiter and nothing is cached.
+        """
+        tenant = self._tenant(tenant_id)
+        ck = (tenant, key)
+        with self._lock:
+            now = time.time()
+            if not refresh:
+                value = self._lookup_unlocked(ck, now)
+                if value is not _MISSING:
+                    self._stats["hits"] += 1
+                    return value
+            self._stats["misses"] += 1
+            flight = self._flights.get(ck)
+            if flight is not None:
+                flight.waiters += 1
+                self._stats["coalesced"] += 1
+                owner = False
+            else:
+                flight = _Flight()
+                self._flights[ck] = flight
+                owner = True
+                gen = self._gen_of(tenant)
+        if not owner:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+        try:
+            value = loader()
+        except BaseException as e:
+            with self._lock:
+                self._stats["load_errors"] += 1
+                self._flights.pop(ck, None)
+            flight.error = e
+            flight.event.set()
+            raise
+        with self._lock:
+            self._stats["loads"] += 1
+            if self._gen_of(tenant) == gen:
+                self._store_unlocked(ck, value, ttl, time.time())
+            if self._flights.get(ck) is flight:
+                del self._flights[ck]
+        flight.value = value
+        flight.event.set()
+        return value
+
+    def invalidate(self, tenant_id: Optional[str] = None, key: Hashable = _MISSING) -> int:
+        """Drop one key, every key of a tenant, or (tenant_id=None) the whole cache."""
+        with self._lock:
+            self._stats["invalidations"] += 1
+            if tenant_id is None:
+                n = len(self._data)
+                self._data.clear()
+                self._global_gen += 1
+                return n
+            tenant = self._tenant(tenant_id)
+            if key is not _MISSING:
+                self._gen[tenant] = self._gen.get(tenant, 0) + 1
+                return 1 if self._data.pop((tenant, key), None) is not None else 0
+            stale = [ck for ck in self._data if ck[0] == tenant]
+            for ck in stale:
+                del self._data[ck]
+            self._gen[tenant] = self._gen.get(tenant, 0) + 1
+            return len(stale)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out: Dict[str, Any] = dict(self._stats)
+            out.update({
+                "name": self.name,
+                "size": len(self._data),
+                "max_entries": self.max_entries,
+                "ttl_sec": self.ttl,
+                "tenants": len({ck[0] for ck in self._data}),
+                "in_flight": len(self._flights),
+            })
+        lookups = out["hits"] + out["misses"]
+        out["hit_ratio"] = round(out["hits"] / lookups, 4) if lookups else None
+        return out
+
+
+def get_cache(name: str, ttl: float, max_entries: int = 512) -> TenantCache:
+    """Return the named cache, creating it on first use (one instance per process)."""
+    with _LOCK:
+        cache = _REGISTRY.get(name)
+        if cache is None:
+            cache = TenantCache(name, ttl, max_entries=max_entries)
+            _REGISTRY[name] = cache
+        return cache
+
+
+def all_cache_stats() -> List[Dict[str, Any]]:
+    with _LOCK:
+        caches = list(_REGISTRY.values())
+    return [c.stats() for c in sorted(caches, key=lambda c: c.name)]
+
+
+def invalidate_tenant(tenant_id: str) -> int:
+    """Drop a tenant's entries from every registered cache."""
+    with _LOCK:
+        caches = list(_REGISTRY.values())
+    return sum(c.invalidate(tenant_id) for c in caches)